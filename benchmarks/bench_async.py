@@ -0,0 +1,137 @@
+"""
+Benchmark de la capa síncrona frente a la asíncrona bajo carga concurrente.
+
+Crea una base de datos temporal con U usuarios y T tareas cada uno y lanza
+R peticiones con C en curso a la vez. Cada petición lee una página de 50
+tareas de un usuario, cuenta sus tareas y crea una nueva:
+
+- síncrona: Repository en un ThreadPoolExecutor de C hilos
+- asíncrona: AsyncRepository con C corrutinas en un bucle de eventos
+
+Reporta peticiones por segundo y latencias de cada camino.
+
+    python benchmarks/bench_async.py [--users 50] [--tasks 200] [--requests 2000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from src.database.async_repository import AsyncRepository, create_async_db_engine
+from src.database.db import create_db_engine
+from src.database.migrations import run_migrations
+from src.database.repository import Repository
+from src.models.models import Base, Tarea, Usuario
+
+
+def populate(engine, n_users: int, n_tasks: int) -> list:
+    with engine.begin() as conn:
+        user_ids = [conn.execute(insert(Usuario).values(nombre=f"u{i}", email=f"u{i}@example.com",
+                                                        contraseña="x")).inserted_primary_key[0]
+                    for i in range(n_users)]
+        now = datetime.now()
+        rows = [{
+            "titulo": f"tarea {i}", "descripcion": "", "fechaCreacion": now,
+            "fechaVencimiento": now + timedelta(days=i % 90), "estado": "todo",
+            "prioridad": "normal", "tipo": "General", "idUsuario": user_id,
+        } for user_id in user_ids for i in range(n_tasks)]
+        conn.execute(insert(Tarea), rows)
+    return user_ids
+
+
+def sync_request(repository: Repository, user_id: int) -> float:
+    start = time.perf_counter()
+    with repository.unit_of_work():
+        repository.query_tasks(user_id, limite=50)
+        repository.count_tasks(user_id)
+        now = datetime.now()
+        repository.create_task("nueva", "", now, now, "todo", "normal", "General", user_id)
+    return (time.perf_counter() - start) * 1000
+
+
+async def async_request(repository: AsyncRepository, user_id: int) -> float:
+    start = time.perf_counter()
+    async with repository.unit_of_work():
+        await repository.query_tasks(user_id, limite=50)
+        await repository.count_tasks(user_id)
+        now = datetime.now()
+        await repository.create_task("nueva", "", now, now, "todo", "normal", "General", user_id)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_sync(url: str, targets: list, concurrency: int) -> tuple:
+    engine = create_db_engine(url, pool_size=concurrency, max_overflow=0)
+    repository = Repository(sessionmaker(bind=engine, expire_on_commit=False))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(lambda user_id: sync_request(repository, user_id), targets))
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed, latencies
+
+
+async def run_async(url: str, targets: list, concurrency: int) -> tuple:
+    engine = create_async_db_engine(url, pool_size=concurrency, max_overflow=0)
+    repository = AsyncRepository(async_sessionmaker(engine, expire_on_commit=False))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(user_id):
+        async with semaphore:
+            return await async_request(repository, user_id)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(limited(user_id) for user_id in targets))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed, list(latencies)
+
+
+def report(name: str, elapsed: float, latencies: list) -> None:
+    latencies = sorted(latencies)
+    print(f"{name:<10} {len(latencies) / elapsed:8.0f} req/s   p50 {statistics.median(latencies):7.2f} ms   "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms   máx {latencies[-1]:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        url = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+        engine = create_db_engine(url)
+        Base.metadata.create_all(engine)
+        run_migrations(engine)
+        user_ids = populate(engine, args.users, args.tasks)
+        engine.dispose()
+        rng = random.Random(42)
+        targets = [rng.choice(user_ids) for _ in range(args.requests)]
+
+        print(f"{args.requests} peticiones, {args.concurrency} concurrentes, "
+              f"{args.users} usuarios x {args.tasks} tareas")
+        report("síncrono", *run_sync(url, targets, args.concurrency))
+        report("asíncrono", *asyncio.run(run_async(url, targets, args.concurrency)))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
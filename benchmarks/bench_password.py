@@ -0,0 +1,49 @@
+"""
+Benchmark del costo del hash de contraseñas.
+
+Mide la latencia de verificación (lo que tarda un inicio de sesión) para
+distintos costos de scrypt y PBKDF2, para elegir los valores de
+TODO_SCRYPT_N o TODO_PBKDF2_ITERATIONS según el hardware.
+
+    python benchmarks/bench_password.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.passwords import PBKDF2, SCRYPT, hash_password, verify_password
+
+CONFIGS = [
+    {"algorithm": SCRYPT, "n": 2 ** 13, "r": 8, "p": 1},
+    {"algorithm": SCRYPT, "n": 2 ** 14, "r": 8, "p": 1},
+    {"algorithm": SCRYPT, "n": 2 ** 15, "r": 8, "p": 1},
+    {"algorithm": PBKDF2, "iterations": 200_000},
+    {"algorithm": PBKDF2, "iterations": 600_000},
+    {"algorithm": PBKDF2, "iterations": 1_200_000},
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'configuración':<40}{'p50 (ms)':>10}{'máx (ms)':>10}")
+    for params in CONFIGS:
+        stored = hash_password("contraseña de prueba", params)
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            verify_password("contraseña de prueba", stored)
+            samples.append((time.perf_counter() - start) * 1000)
+        label = " ".join(f"{k}={v}" for k, v in params.items())
+        print(f"{label:<40}{statistics.median(samples):>10.1f}{max(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
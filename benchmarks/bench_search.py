@@ -0,0 +1,105 @@
+"""
+Benchmark de la búsqueda de texto completo.
+
+Crea una base de datos temporal con N tareas (por defecto 100 000) para un
+usuario y mide la latencia de Repository.search_tasks con FTS5 y con el
+respaldo LIKE. El vocabulario es pequeño a propósito: las palabras comunes
+aparecen en la mayoría de las tareas y representan el peor caso del ranking.
+
+    python benchmarks/bench_search.py [--tasks 100000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import create_db_engine
+from src.database.migrations import run_migrations
+from src.database.repository import Repository
+from src.models.models import Base, Tarea, Usuario
+
+WORDS = ("informe reunión cliente factura revisar enviar llamar proyecto diseño prueba "
+         "despliegue servidor base datos correo presupuesto entrega equipo sprint error "
+         "documentación migración backup calendario compra viaje médico banco").split()
+QUERIES = ("informe", "revisar factura", "migr", "despliegue servidor", "xyznoexiste")
+
+
+def populate(engine, n_tasks: int) -> int:
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(Usuario).values(nombre="bench", email="bench@example.com",
+                                                      contraseña="x")).inserted_primary_key[0]
+        rng = random.Random(42)
+        now = datetime.now()
+        batch = []
+        for i in range(n_tasks):
+            batch.append({
+                "titulo": " ".join(rng.choices(WORDS, k=4)),
+                "descripcion": " ".join(rng.choices(WORDS, k=20)),
+                "fechaCreacion": now, "fechaVencimiento": now + timedelta(days=i % 90),
+                "estado": "todo", "prioridad": "normal", "tipo": "General", "idUsuario": user_id,
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(Tarea), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Tarea), batch)
+    return user_id
+
+
+def measure(repository: Repository, user_id: int, repeat: int) -> dict:
+    results = {}
+    for query in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            repository.search_tasks(user_id, query, 0, 20)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[query] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        engine = create_db_engine("sqlite:///" + os.path.join(tmpdir, "bench.db"), profile="fast")
+        Base.metadata.create_all(engine)
+        run_migrations(engine)
+        start = time.perf_counter()
+        user_id = populate(engine, args.tasks)
+        print(f"{args.tasks} tareas insertadas (con índice FTS) en {time.perf_counter() - start:.1f}s")
+
+        repository = Repository()
+        repository.db = sessionmaker(bind=engine)()
+        fts = measure(repository, user_id, args.repeat)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE tareas_fts"))
+        like = measure(repository, user_id, max(1, args.repeat // 4))
+
+        print(f"{'consulta':<22}{'FTS5 p50':>10}{'FTS5 p95':>10}{'LIKE p50':>10}  (ms)")
+        for query in QUERIES:
+            print(f"{query:<22}{fts[query][0]:>10.2f}{fts[query][1]:>10.2f}{like[query][0]:>10.2f}")
+        repository.db.close()
+        engine.dispose()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
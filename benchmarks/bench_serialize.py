@@ -0,0 +1,137 @@
+"""
+Benchmark de la serialización de la lista de tareas (get_tasks).
+
+Crea una base de datos temporal con N tareas (por defecto 10 000) para un
+usuario y compara, de la consulta al JSON:
+
+- antes: objetos Tarea del ORM + el `_task_to_dict` anterior (getattr con
+  respaldo por campo y el mapa de estados construido en cada llamada)
+- ORM + esquema: objetos Tarea + serialize_task
+- filas: tuplas con TASK_COLUMNS + serialize_task_rows
+- columnar: tuplas con TASK_COLUMNS + serialize_task_columns
+
+    python benchmarks/bench_serialize.py [--tasks 10000] [--repeat 10]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import create_db_engine
+from src.database.migrations import run_migrations
+from src.database.repository import Repository
+from src.models.models import Base, Tarea, Usuario
+from src.views.serializers import (
+    TASK_COLUMNS, compact_dumps, serialize_task, serialize_task_columns, serialize_task_rows
+)
+
+STATES = ("todo", "pending", "completed")
+PRIORITIES = ("high", "normal", "postponable")
+
+
+def legacy_task_to_dict(t):
+    """Api._task_to_dict tal como estaba antes del serializador."""
+    def iso(val):
+        if isinstance(val, (date, datetime)):
+            return val.isoformat()
+        return val
+    raw_status = getattr(t, 'status', getattr(t, 'estado', None))
+    status_map = {
+        'todo': 'new',
+        'pending': 'progress',
+        'completed': 'completed',
+        'new': 'new',
+        'progress': 'progress',
+        'complete': 'completed',
+    }
+    status = status_map.get(str(raw_status).lower(), str(raw_status).lower())
+    return {
+        "id": getattr(t, 'task_id', getattr(t, 'idTarea', None)),
+        "name": getattr(t, 'name', getattr(t, 'titulo', None)),
+        "description": getattr(t, 'description', getattr(t, 'descripcion', None)),
+        "priority": getattr(t, 'priority', getattr(t, 'prioridad', None)),
+        "status": status,
+        "start_date": iso(getattr(t, 'start_date', getattr(t, 'fechaCreacion', None))),
+        "end_date": iso(getattr(t, 'end_date', getattr(t, 'fechaVencimiento', None))),
+        "created_at": iso(getattr(t, 'created_at', getattr(t, 'fechaCreacion', None))),
+        "completed_at": iso(getattr(t, 'completed_at', getattr(t, 'fechaCompletado', None))),
+        "recurrence": getattr(t, 'reglaRecurrencia', None),
+        "occurrence": iso(getattr(t, 'ocurrencia', None)),
+    }
+
+
+def populate(engine, n_tasks: int) -> int:
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(Usuario).values(nombre="bench", email="bench@example.com",
+                                                      contraseña="x")).inserted_primary_key[0]
+        now = datetime.now()
+        conn.execute(insert(Tarea), [{
+            "titulo": f"Tarea {i}", "descripcion": f"Descripción de la tarea {i}",
+            "fechaCreacion": now, "fechaVencimiento": now + timedelta(hours=i),
+            "fechaCompletado": now if i % 3 == 2 else None,
+            "estado": STATES[i % 3], "prioridad": PRIORITIES[i % 3], "tipo": "General", "idUsuario": user_id,
+        } for i in range(n_tasks)])
+    return user_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        engine = create_db_engine("sqlite:///" + os.path.join(tmpdir, "bench.db"), profile="fast")
+        Base.metadata.create_all(engine)
+        run_migrations(engine)
+        user_id = populate(engine, args.tasks)
+        repository = Repository()
+        session_factory = sessionmaker(bind=engine)
+
+        def orm_tasks():
+            return repository.query_tasks(user_id, orden='id', limite=None)
+
+        def task_rows():
+            return repository.query_tasks(user_id, orden='id', limite=None, columnas=TASK_COLUMNS)
+
+        variants = [
+            ("antes", lambda: json.dumps([legacy_task_to_dict(t) for t in orm_tasks()])),
+            ("ORM + esquema", lambda: compact_dumps([serialize_task(t) for t in orm_tasks()])),
+            ("filas", lambda: compact_dumps(serialize_task_rows(task_rows()))),
+            ("columnar", lambda: compact_dumps(serialize_task_columns(task_rows()))),
+        ]
+        print(f"{args.tasks} tareas, {args.repeat} repeticiones")
+        print(f"{'variante':<16}{'p50 ms':>10}{'mín ms':>10}{'JSON KB':>10}")
+        baseline = None
+        for name, run in variants:
+            samples = []
+            for _ in range(args.repeat):
+                # Sesión nueva en cada vuelta: sin objetos ya cargados en el mapa de identidad
+                repository.db = session_factory()
+                start = time.perf_counter()
+                payload = run()
+                samples.append((time.perf_counter() - start) * 1000)
+                repository.db.close()
+            median = statistics.median(samples)
+            baseline = baseline or median
+            print(f"{name:<16}{median:>10.1f}{min(samples):>10.1f}{len(payload.encode('utf-8')) / 1024:>10.0f}"
+                  f"  ({baseline / median:.1f}x)")
+        engine.dispose()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
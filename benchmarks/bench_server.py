@@ -0,0 +1,97 @@
+"""
+Benchmark de carga del modo servidor.
+
+Levanta el servidor aiohttp sobre una base de datos temporal y simula N
+usuarios concurrentes; cada uno se registra, inicia sesión, crea tareas y
+consulta su lista. Reporta peticiones por segundo y latencias.
+
+    python benchmarks/bench_server.py [--users 200] [--tasks 5] [--threads 32]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import aiohttp
+from aiohttp.test_utils import TestServer
+from sqlalchemy.orm import sessionmaker
+
+from src.controllers.task_controller import TaskController
+from src.database.db import create_db_engine
+from src.database.migrations import run_migrations
+from src.models.models import Base
+from src.views.server import ApiPool, create_app
+
+
+async def user_session(base_url: str, index: int, n_tasks: int, latencies: list) -> None:
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as http:
+        async def call(method, action, data):
+            start = time.perf_counter()
+            async with http.post(f"{base_url}/api/{method}", json={"action": action, "data": data}) as response:
+                body = await response.json()
+            latencies.append((time.perf_counter() - start) * 1000)
+            return body
+
+        email = f"user{index}@example.com"
+        await call("add_item", "create_user", {"name": f"user{index}", "email": email, "password": "password123"})
+        await call("get_item", "get_user", {"email": email, "password": "password123"})
+        for i in range(n_tasks):
+            await call("add_item", "create_task", {
+                "name": f"tarea {i}", "description": "", "priority": "normal",
+                "start_date": "2025-01-01T00:00:00", "end_date": "2025-01-02T00:00:00"
+            })
+        body = await call("get_item", "get_tasks", {})
+        assert len(body["tasks"]) == n_tasks, body
+
+
+async def run(users: int, n_tasks: int, threads: int, url: str) -> None:
+    engine = create_db_engine(url, pool_size=threads, max_overflow=threads)
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def controller_factory(**kwargs):
+        controller = TaskController(**kwargs)
+        controller.repository.session_factory = SessionLocal
+        return controller
+
+    server = TestServer(create_app(ApiPool(controller_factory=controller_factory), threads=threads))
+    await server.start_server()
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(user_session(str(server.make_url("")).rstrip("/"), i, n_tasks, latencies)
+                           for i in range(users)))
+    elapsed = time.perf_counter() - start
+    await server.close()
+    engine.dispose()
+
+    latencies.sort()
+    print(f"{users} usuarios, {len(latencies)} peticiones en {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"p50 {statistics.median(latencies):.1f} ms  p95 {latencies[int(len(latencies) * 0.95)]:.1f} ms  "
+          f"máx {latencies[-1]:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        asyncio.run(run(args.users, args.tasks, args.threads, "sqlite:///" + os.path.join(tmpdir, "bench.db")))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
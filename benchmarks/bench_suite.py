@@ -0,0 +1,262 @@
+"""
+Suite de benchmarks de TaskController y Repository.
+
+Genera datos sintéticos (U usuarios × T tareas × E eventos) en SQLite en
+memoria y en archivo, y mide cada operación por separado a través del
+controlador: login, get_tasks, get_tasks_page, get_events_in_range, create,
+update, complete y delete. Para cada una reporta operaciones por segundo,
+p50 y p99.
+
+Los resultados se guardan en JSON con --output. Con --compare se comparan
+contra una línea base guardada y el proceso termina con código 1 si el p50
+o el p99 de alguna operación empeoran más que --threshold (0.30 = 30 %):
+
+    python benchmarks/bench_suite.py [--users 20] [--tasks 200] [--events 50] [--repeat 200]
+                                     [--backends memory,file] [--output resultados.json]
+    python benchmarks/bench_suite.py --compare base.json [--threshold 0.3]
+    python benchmarks/bench_suite.py --compare base.json --current resultados.json
+
+El hash de contraseñas usa un costo bajo fijo (BENCH_KDF) para que login
+mida la base de datos y la sesión, no scrypt; bench_password.py mide el hash.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.controllers.passwords import SCRYPT, PasswordHasher, hash_password
+from src.controllers.task_controller import TaskController
+from src.database.db import create_db_engine
+from src.database.migrations import run_migrations
+from src.models.models import Base, Event, Tarea, Usuario
+
+BENCH_KDF = {"algorithm": SCRYPT, "n": 2 ** 10, "r": 8, "p": 1}
+PASSWORD = "benchmark123"
+STATES = ("todo", "pending", "completed")
+PRIORITIES = ("high", "normal", "postponable")
+BACKENDS = ("memory", "file")
+OPERATIONS = ("login", "get_tasks", "get_tasks_page", "get_events_in_range",
+              "create", "update", "complete", "delete")
+# Métricas comparadas con la línea base (más alto es peor)
+COMPARED_METRICS = ("p50_ms", "p99_ms")
+
+
+def generate(engine, n_users: int, n_tasks: int, n_events: int, seed: int = 42) -> List[str]:
+    """
+    Inserta usuarios, tareas y eventos sintéticos.
+
+    Returns:
+        List[str]: Emails de los usuarios creados (todos con la contraseña PASSWORD).
+    """
+    rng = random.Random(seed)
+    stored = hash_password(PASSWORD, BENCH_KDF)
+    start = datetime(2025, 1, 1, 9, 0)
+    emails = [f"bench{i}@example.com" for i in range(n_users)]
+    with engine.begin() as conn:
+        user_ids = [conn.execute(insert(Usuario).values(nombre=f"bench{i}", email=email, contraseña=stored,
+                                                        modoOscuro=False)).inserted_primary_key[0]
+                    for i, email in enumerate(emails)]
+        tasks, events = [], []
+        for user_id in user_ids:
+            for i in range(n_tasks):
+                created = start + timedelta(hours=rng.randrange(24 * 365))
+                state = rng.choice(STATES)
+                tasks.append({
+                    "titulo": f"Tarea {i}", "descripcion": f"Descripción sintética {i}",
+                    "fechaCreacion": created, "fechaVencimiento": created + timedelta(days=rng.randrange(1, 30)),
+                    "fechaCompletado": created if state == "completed" else None,
+                    "estado": state, "prioridad": rng.choice(PRIORITIES), "tipo": "General", "idUsuario": user_id,
+                })
+            for i in range(n_events):
+                events.append({
+                    "titulo": f"Evento {i}", "descripcion": "", "fecha": start.date() + timedelta(days=rng.randrange(365)),
+                    "hora": dtime(rng.randrange(8, 20), 0), "prioridad": rng.choice(PRIORITIES), "idUsuario": user_id,
+                })
+        if tasks:
+            conn.execute(insert(Tarea), tasks)
+        if events:
+            conn.execute(insert(Event), events)
+    return emails
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Resumen de latencias en segundos: n, ops/s, p50, p99 y media en ms."""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[max(0, math.ceil(p * len(ordered)) - 1)] * 1000
+
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "ops_per_sec": round(len(ordered) / total, 1) if total else 0.0,
+        "p50_ms": round(percentile(0.50), 3),
+        "p99_ms": round(percentile(0.99), 3),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+    }
+
+
+def measure(operation: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run_backend(engine, args) -> Dict[str, Dict[str, float]]:
+    """Genera los datos en `engine` y mide cada operación de OPERATIONS."""
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    emails = generate(engine, args.users, args.tasks, args.events)
+    controller = TaskController(passwords=PasswordHasher(BENCH_KDF), seed=False)
+    controller.repository.session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    rng = random.Random(7)
+    results = {"login": measure(lambda i: controller.login(emails[i % len(emails)], PASSWORD), args.repeat)}
+    controller.login(emails[0], PASSWORD)
+    results["get_tasks"] = measure(lambda i: controller.get_tasks(), args.repeat)
+    results["get_tasks_page"] = measure(lambda i: controller.get_tasks_page(limit=50), args.repeat)
+    results["get_events_in_range"] = measure(
+        lambda i: controller.get_events_in_range(date(2025, 1 + i % 12, 1).isoformat(),
+                                                 (date(2025, 1 + i % 12, 1) + timedelta(days=41)).isoformat()),
+        args.repeat)
+
+    created: List[int] = []
+    due = datetime(2025, 6, 1, 12, 0)
+
+    def create(i):
+        ok, _, task = controller.create_task_returning(f"Nueva {i}", "creada por el benchmark", due, due,
+                                                       rng.choice(PRIORITIES))
+        created.append(task.idTarea)
+    results["create"] = measure(create, args.repeat)
+    results["update"] = measure(lambda i: controller.update_task(
+        created[i], f"Editada {i}", "", due, due + timedelta(days=1), "high", "pending"), args.repeat)
+    results["complete"] = measure(lambda i: controller.complete_task(created[i]), args.repeat)
+    results["delete"] = measure(lambda i: controller.delete_task(created[i]), args.repeat)
+    controller.logout()
+    return results
+
+
+def run_suite(args) -> Dict:
+    """Ejecuta la suite en cada backend de args.backends y devuelve el documento JSON."""
+    document = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "params": {"users": args.users, "tasks": args.tasks, "events": args.events, "repeat": args.repeat},
+        },
+        "results": {},
+    }
+    for backend in args.backends:
+        tmpdir = tempfile.mkdtemp()
+        if backend == "memory":
+            engine = create_db_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        else:
+            engine = create_db_engine("sqlite:///" + os.path.join(tmpdir, "bench.db"))
+        try:
+            document["results"][backend] = run_backend(engine, args)
+        finally:
+            engine.dispose()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return document
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara dos documentos de resultados.
+
+    Args:
+        current (Dict): Resultados de la ejecución a evaluar.
+        baseline (Dict): Línea base.
+        threshold (float): Empeoramiento relativo tolerado (0.3 = 30 %).
+
+    Returns:
+        List[str]: Una línea por métrica que empeoró más que el umbral; vacía si no hay regresiones.
+    """
+    regressions = []
+    for backend, operations in baseline.get("results", {}).items():
+        for operation, base in operations.items():
+            result = current.get("results", {}).get(backend, {}).get(operation)
+            if result is None:
+                continue
+            for metric in COMPARED_METRICS:
+                if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                    regressions.append(f"{backend}/{operation} {metric}: {base[metric]:.3f} -> {result[metric]:.3f} "
+                                       f"(+{(result[metric] / base[metric] - 1) * 100:.0f} %)")
+    return regressions
+
+
+def format_results(document: Dict, baseline: Optional[Dict] = None) -> str:
+    lines = [f"{'backend':<8}{'operación':<22}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'p50 base':>10}"]
+    for backend, operations in document["results"].items():
+        for operation, result in operations.items():
+            base = (baseline or {}).get("results", {}).get(backend, {}).get(operation)
+            lines.append(f"{backend:<8}{operation:<22}{result['ops_per_sec']:>10.1f}{result['p50_ms']:>10.3f}"
+                         f"{result['p99_ms']:>10.3f}{base['p50_ms'] if base else '-':>10}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200, help="Tareas por usuario")
+    parser.add_argument("--events", type=int, default=50, help="Eventos por usuario")
+    parser.add_argument("--repeat", type=int, default=200, help="Repeticiones de cada operación")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="memory, file o ambos separados por coma")
+    parser.add_argument("--output", help="Guarda los resultados en este archivo JSON")
+    parser.add_argument("--compare", help="Línea base JSON contra la que comparar")
+    parser.add_argument("--current", help="Resultados JSON ya guardados (con --compare, no ejecuta la suite)")
+    parser.add_argument("--threshold", type=float, default=0.30, help="Empeoramiento tolerado (0.30 = 30 %%)")
+    args = parser.parse_args()
+    args.backends = [b for b in args.backends.split(",") if b]
+    unknown = set(args.backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"backend desconocido: {', '.join(sorted(unknown))}")
+
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            document = json.load(f)
+    else:
+        document = run_suite(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("params") != document["meta"]["params"]:
+            print("Advertencia: la línea base se generó con otros parámetros")
+    print(format_results(document, baseline))
+    if baseline is not None:
+        regressions = compare(document, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESIÓN {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"Sin regresiones (umbral {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
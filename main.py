@@ -1,9 +1,46 @@
-from src.database.db import init_db
-from src.models.models import Base # Inicializar base de datos
+import argparse
+
+# Solo biblioteca estándar: SQLAlchemy, los modelos y la interfaz se importan
+# dentro de las fases medidas con --profile-startup
+from src.controllers.startup import StartupProfile, start_initialization
 # from view.console_ui import ui_console
-from src.views.ui import load_interface
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TODO APP")
+    parser.add_argument("--serve", action="store_true",
+                        help="Servidor HTTP/JSON con la interfaz web en lugar de la ventana de escritorio")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección del servidor (con --serve)")
+    parser.add_argument("--port", type=int, default=8000, help="Puerto del servidor (con --serve)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Muestra el tiempo de las importaciones y fases del arranque")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    init_db(Base)
-    # ui_console()
-    load_interface()
\ No newline at end of file
+    args = parse_args()
+    profile = StartupProfile(enabled=args.profile_startup)
+    with profile.phase("importar base de datos (SQLAlchemy, modelos)"):
+        import src.database.db  # noqa: F401
+        import src.models.models  # noqa: F401
+    # Esquema, migraciones y datos demo en segundo plano; se omiten si la base ya tiene la marca
+    ready = start_initialization(profile=profile)
+    with profile.phase("importar controladores"):
+        from src.controllers.retention import RetentionScheduler
+        from src.controllers.session import SessionManager, SessionSweeper
+    # Archivo y limpieza periódica de tareas completadas en segundo plano
+    retention = RetentionScheduler()
+    retention.start()
+    # Sesiones con token y depuración periódica de las expiradas
+    sessions = SessionManager()
+    SessionSweeper(sessions).start()
+    if args.serve:
+        with profile.phase("importar servidor"):
+            from src.views.server import serve
+        profile.print_when(ready)
+        serve(args.host, args.port, retention=retention, sessions=sessions, ready=ready)
+    else:
+        with profile.phase("importar interfaz"):
+            from src.views.ui import load_interface
+        # ui_console()
+        load_interface(retention, sessions, ready=ready, profile=profile)
@@ -0,0 +1,255 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.controllers.passwords import INVALID_CREDENTIALS, LoginThrottle, PasswordHasher
+from src.controllers.recurrence import EVENT, TASK, OccurrenceCache, event_occurrence, expand_series, occurrence_sort_key, parse_rule
+from src.controllers.session import SessionManager, UserSession
+from src.controllers.task_controller import parse_event_date, parse_event_time
+from src.database.async_repository import AsyncRepository
+from src.database.repository import COMPLETED_STATES
+from src.models.models import Event, Tarea
+
+
+class AsyncTaskController:
+    """
+    Variante asíncrona de TaskController sobre AsyncRepository.
+
+    Crear un controlador no consulta la base de datos, así que se puede usar
+    uno por petición compartiendo el repositorio, el hasher, el límite de
+    intentos y las sesiones; las peticiones concurrentes solapan su espera
+    de E/S en el mismo bucle de eventos.
+    """
+
+    def __init__(self, repository: Optional[AsyncRepository] = None, passwords: Optional[PasswordHasher] = None,
+                 throttle: Optional[LoginThrottle] = None, sessions: Optional[SessionManager] = None,
+                 occurrences: Optional[OccurrenceCache] = None):
+        """
+        Args:
+            repository (AsyncRepository, optional): Repositorio compartido.
+            passwords (PasswordHasher, optional): Hasher compartido entre controladores.
+            throttle (LoginThrottle, optional): Límite de intentos compartido entre controladores.
+            sessions (SessionManager, optional): Tokens de sesión compartidos entre controladores.
+            occurrences (OccurrenceCache, optional): Ocurrencias expandidas compartidas entre controladores.
+        """
+        self.repository = repository or AsyncRepository()
+        self.passwords = passwords or PasswordHasher()
+        self.throttle = throttle or LoginThrottle()
+        self.sessions = sessions or SessionManager()
+        self.occurrences = occurrences if occurrences is not None else OccurrenceCache()
+        self.session: Optional[UserSession] = None
+
+    # ==================== USUARIOS ====================
+
+    async def register_user(self, username: str, email: str, password: str) -> Tuple[bool, str]:
+        """
+        Registra un nuevo usuario.
+
+        Returns:
+            Tuple[bool, str]: Éxito y mensaje de resultado.
+        """
+        if await self.repository.get_user_by_email(email):
+            return False, "El correo ya está en uso"
+        if await self.repository.create_user(username, email, await self.passwords.hash_async(password)):
+            return True, "Usuario registrado exitosamente"
+        return False, "Error al registrar usuario"
+
+    async def login(self, email: str, password: str) -> Tuple[bool, str, Optional[dict]]:
+        """
+        Inicia sesión y emite un token (en `session.token`).
+
+        Returns:
+            Tuple[bool, str, Optional[dict]]: Éxito, mensaje y datos del usuario.
+        """
+        retry_after = self.throttle.retry_after(email)
+        if retry_after > 0:
+            return False, f"Demasiados intentos fallidos. Intenta de nuevo en {int(retry_after) + 1} s", None
+        user = await self.repository.get_user_by_email(email)
+        # Sin usuario también se deriva un hash, para no delatar por el tiempo qué emails existen
+        stored = user.contraseña if user else self.passwords.dummy_hash()
+        if not await self.passwords.verify_async(password, stored) or not user:
+            self.throttle.record_failure(email)
+            return False, INVALID_CREDENTIALS, None
+        self.throttle.reset(email)
+        if self.passwords.needs_rehash(user.contraseña):
+            await self.repository.update_user(user.idUsuario, contraseña=await self.passwords.hash_async(password))
+        self.session = UserSession.from_user(user)
+        await self.sessions.open_async(self.repository, self.session)
+        return True, "Inicio de sesión exitoso", {"email": user.email, "name": user.nombre}
+
+    async def logout(self) -> None:
+        """Cierra la sesión actual e invalida su token."""
+        if self.session is not None:
+            await self.sessions.close_async(self.repository, self.session.token)
+        self.session = None
+
+    async def resume_session(self, token: Optional[str]) -> bool:
+        """
+        Toma la sesión de un token emitido en login.
+
+        Returns:
+            bool: True si el token corresponde a una sesión vigente.
+        """
+        self.session = await self.sessions.resolve_async(self.repository, token)
+        return self.session is not None
+
+    @property
+    def current_user(self) -> Optional[str]:
+        """Email del usuario autenticado, o None si no hay sesión."""
+        return self.session.email if self.session else None
+
+    async def get_current_user_id(self) -> Optional[int]:
+        """
+        Obtiene el ID del usuario autenticado (sin consultar la base de datos
+        si la sesión ya está resuelta).
+        """
+        session = self.session
+        if session is None:
+            return None
+        if not session.resolved:
+            user = await self.repository.get_user_by_email(session.email)
+            if not user:
+                return None
+            session.bind(user)
+        return session.idUsuario
+
+    # ==================== TAREAS ====================
+
+    async def create_task(
+        self, name: str, description: str, start_date: datetime, end_date: datetime,
+        priority: str, status: str = 'todo'
+    ) -> Tuple[bool, str]:
+        """Crea una nueva tarea para el usuario autenticado."""
+        success, message, _ = await self.create_task_returning(name, description, start_date, end_date, priority, status)
+        return success, message
+
+    async def create_task_returning(
+        self, name: str, description: str, start_date: datetime, end_date: datetime,
+        priority: str, status: str = 'todo'
+    ) -> Tuple[bool, str, Optional[Tarea]]:
+        """Igual que create_task, pero devuelve también la tarea creada."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return False, "Usuario no autenticado", None
+        tarea = await self.repository.create_task(
+            titulo=name,
+            descripcion=description,
+            fechaCreacion=start_date,
+            fechaVencimiento=end_date,
+            estado=status,
+            prioridad=priority,
+            tipo='General',
+            idUsuario=user_id
+        )
+        if tarea:
+            return True, "Tarea creada exitosamente", tarea
+        return False, "Error al crear la tarea", None
+
+    async def get_tasks(self, filter_completed: bool = False) -> List[Tarea]:
+        """Obtiene las tareas del usuario actual (sin las completadas si `filter_completed`)."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return []
+        if filter_completed:
+            return await self.repository.query_tasks(user_id, excluir_estados=['completed'], limite=None)
+        return await self.repository.get_tasks_by_user(user_id)
+
+    async def get_task_by_id(self, task_id: int) -> Optional[Tarea]:
+        """Obtiene una tarea del usuario autenticado por su ID."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return None
+        return await self.repository.get_user_task(task_id, user_id)
+
+    async def update_task(
+        self, task_id: int, name: str, description: str, start_date: datetime,
+        end_date: datetime, priority: str, status: str
+    ) -> Tuple[bool, str]:
+        """Actualiza una tarea existente del usuario autenticado."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return False, "Usuario no autenticado"
+        if not await self.repository.update_task(
+            task_id, user_id, titulo=name, descripcion=description, fechaCreacion=start_date,
+            fechaVencimiento=end_date, prioridad=priority, estado=status
+        ):
+            return False, "Tarea no encontrada"
+        return True, "Tarea actualizada exitosamente"
+
+    async def complete_task(self, task_id: int) -> Tuple[bool, str]:
+        """Marca una tarea como completada."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return False, "Usuario no autenticado"
+        now = datetime.now()
+        if not await self.repository.update_task(task_id, user_id, estado=COMPLETED_STATES[0],
+                                                 fechaVencimiento=now, fechaCompletado=now):
+            return False, "Tarea no encontrada"
+        return True, "Tarea completada exitosamente"
+
+    async def delete_task(self, task_id: int) -> Tuple[bool, str]:
+        """Elimina una tarea del usuario autenticado."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return False, "Usuario no autenticado"
+        if await self.repository.delete_task(task_id, user_id):
+            self.occurrences.invalidate(TASK, task_id)
+            return True, "Tarea eliminada exitosamente"
+        return False, "Error al eliminar la tarea"
+
+    # ==================== EVENTOS ====================
+
+    async def create_event(self, title, description, date, time, priority,
+                           recurrence: Optional[str] = None) -> Tuple[bool, str]:
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return False, "Usuario no autenticado"
+        try:
+            fecha, hora = parse_event_date(date), parse_event_time(time)
+        except (TypeError, ValueError):
+            return False, "Fecha u hora inválida"
+        try:
+            rule = parse_rule(recurrence)
+        except ValueError as e:
+            return False, f"Regla de recurrencia inválida: {e}"
+        event = Event(titulo=title, descripcion=description, fecha=fecha, hora=hora,
+                      prioridad=priority, idUsuario=user_id, reglaRecurrencia=str(rule) if rule else None,
+                      finRecurrencia=rule.last_date(fecha) if rule else None)
+        if await self.repository.save_event(event):
+            return True, "Evento creado exitosamente"
+        return False, "Error al crear evento"
+
+    async def get_user_events(self) -> List[Event]:
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return []
+        return await self.repository.get_user_events(user_id)
+
+    async def get_events_in_range(self, start, end) -> List[Event]:
+        """Eventos del usuario actual entre dos días (ambos incluidos)."""
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return []
+        try:
+            desde, hasta = parse_event_date(start), parse_event_date(end)
+        except (TypeError, ValueError):
+            return []
+        if desde > hasta:
+            return []
+        events = await self.repository.get_events_in_range(user_id, desde, hasta)
+        series = await self.repository.get_recurring_events(user_id, desde, hasta)
+        if series:
+            exceptions = await self.repository.get_recurrence_exceptions(
+                EVENT, [e.idEvento for e in series], desde, hasta)
+            events += [event_occurrence(parent, day, override) for parent, day, override
+                       in expand_series(EVENT, series, exceptions, desde, hasta, self.occurrences)]
+            events.sort(key=occurrence_sort_key)
+        return events
+
+    async def delete_event(self, event_id) -> Tuple[bool, str]:
+        user_id = await self.get_current_user_id()
+        if user_id is None:
+            return False, "Usuario no autenticado"
+        if await self.repository.delete_event(event_id, user_id):
+            self.occurrences.invalidate(EVENT, event_id)
+            return True, "Evento eliminado exitosamente"
+        return False, "Error al eliminar evento"
@@ -0,0 +1,239 @@
+"""
+Hash de contraseñas y límite de intentos de inicio de sesión.
+
+Las contraseñas se guardan como `algoritmo$parámetros$sal$hash` usando scrypt
+o PBKDF2-SHA256 de la biblioteca estándar. El costo se configura con
+variables de entorno para poder medir y ajustar la latencia del login:
+
+- TODO_PASSWORD_ALGORITHM: `scrypt` (por defecto) o `pbkdf2_sha256`
+- TODO_SCRYPT_N, TODO_SCRYPT_R, TODO_SCRYPT_P: costo de scrypt (2**14, 8, 1)
+- TODO_PBKDF2_ITERATIONS: iteraciones de PBKDF2 (600000)
+
+Los valores que no tienen ese formato son contraseñas heredadas en texto
+plano; se aceptan una vez y se vuelven a guardar con hash.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+SCRYPT = 'scrypt'
+PBKDF2 = 'pbkdf2_sha256'
+SALT_BYTES = 16
+# Mismo mensaje para email desconocido y contraseña errónea: no revela qué cuentas existen
+INVALID_CREDENTIALS = "Correo o contraseña incorrectos"
+HASH_BYTES = 32
+
+
+def default_params() -> Dict[str, int]:
+    """Lee el algoritmo y su costo de las variables de entorno."""
+    algorithm = os.environ.get("TODO_PASSWORD_ALGORITHM", SCRYPT)
+    if algorithm == PBKDF2:
+        return {"algorithm": PBKDF2, "iterations": int(os.environ.get("TODO_PBKDF2_ITERATIONS", "600000"))}
+    return {
+        "algorithm": SCRYPT,
+        "n": int(os.environ.get("TODO_SCRYPT_N", str(2 ** 14))),
+        "r": int(os.environ.get("TODO_SCRYPT_R", "8")),
+        "p": int(os.environ.get("TODO_SCRYPT_P", "1")),
+    }
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive(password: str, salt: bytes, params: Dict[str, int]) -> bytes:
+    if params["algorithm"] == PBKDF2:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, params["iterations"], HASH_BYTES)
+    n, r, p = params["n"], params["r"], params["p"]
+    # scrypt usa 128 * n * r bytes; se deja margen sobre el límite por defecto de OpenSSL
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=HASH_BYTES)
+
+
+def _parse(stored: str) -> Optional[tuple]:
+    """Devuelve (params, sal, hash) o None si el valor no es un hash conocido."""
+    parts = (stored or "").split("$")
+    try:
+        if parts[0] == SCRYPT and len(parts) == 6:
+            params = {"algorithm": SCRYPT, "n": int(parts[1]), "r": int(parts[2]), "p": int(parts[3])}
+        elif parts[0] == PBKDF2 and len(parts) == 4:
+            params = {"algorithm": PBKDF2, "iterations": int(parts[1])}
+        else:
+            return None
+        return params, base64.b64decode(parts[-2]), base64.b64decode(parts[-1])
+    except ValueError:
+        return None
+
+
+def hash_password(password: str, params: Optional[Dict[str, int]] = None) -> str:
+    """
+    Genera el hash con sal de una contraseña.
+
+    Args:
+        password (str): Contraseña en texto plano.
+        params (dict, optional): Algoritmo y costo. Defaults to default_params().
+
+    Returns:
+        str: Valor a guardar en `usuarios.contraseña`.
+    """
+    params = params or default_params()
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _derive(password, salt, params)
+    if params["algorithm"] == PBKDF2:
+        return f"{PBKDF2}${params['iterations']}${_b64(salt)}${_b64(digest)}"
+    return f"{SCRYPT}${params['n']}${params['r']}${params['p']}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Comprueba una contraseña contra el valor guardado, en tiempo constante.
+
+    Args:
+        password (str): Contraseña ingresada.
+        stored (str): Hash guardado o contraseña heredada en texto plano.
+
+    Returns:
+        bool: True si coincide.
+    """
+    if password is None or stored is None:
+        return False
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    params, salt, digest = parsed
+    return hmac.compare_digest(_derive(password, salt, params), digest)
+
+
+def needs_rehash(stored: str, params: Optional[Dict[str, int]] = None) -> bool:
+    """True si el valor es texto plano o usa un algoritmo/costo distinto al configurado."""
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] != (params or default_params())
+
+
+class PasswordHasher:
+    """
+    Hash y verificación con un límite de derivaciones simultáneas.
+
+    `hash` y `verify` derivan en el hilo que llama y lo bloquean durante todo
+    el KDF; un semáforo acota a `max_workers` las derivaciones a la vez (CPU y
+    memoria). hashlib libera el GIL durante scrypt/PBKDF2, así los demás hilos
+    siguen avanzando. `hash_async` y `verify_async` derivan en un hilo aparte
+    para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, params: Optional[Dict[str, int]] = None, max_workers: int = 2):
+        """
+        Args:
+            params (dict, optional): Algoritmo y costo. Defaults to default_params().
+            max_workers (int): Derivaciones simultáneas como máximo.
+        """
+        self.params = params or default_params()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._dummy: Optional[str] = None
+        # Última duración medida, para ajustar el costo
+        self.last_seconds = 0.0
+
+    def _timed(self, fn, *args):
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.last_seconds = time.perf_counter() - start
+
+    def hash(self, password: str) -> str:
+        """Genera el hash de una contraseña en el hilo que llama."""
+        return self._timed(hash_password, password, self.params)
+
+    def verify(self, password: str, stored: str) -> bool:
+        """Verifica una contraseña en el hilo que llama."""
+        return self._timed(verify_password, password, stored)
+
+    def dummy_hash(self) -> str:
+        """
+        Hash de una contraseña aleatoria con la configuración actual.
+
+        El login lo verifica cuando el email no existe, para que tarde lo
+        mismo que con un email registrado.
+        """
+        if self._dummy is None or needs_rehash(self._dummy, self.params):
+            self._dummy = hash_password(secrets.token_urlsafe(16), self.params)
+        return self._dummy
+
+    async def hash_async(self, password: str) -> str:
+        """Como hash, pero en otro hilo para no bloquear el bucle de eventos."""
+        return await asyncio.to_thread(self.hash, password)
+
+    async def verify_async(self, password: str, stored: str) -> bool:
+        """Como verify, pero en otro hilo para no bloquear el bucle de eventos."""
+        return await asyncio.to_thread(self.verify, password, stored)
+
+    def needs_rehash(self, stored: str) -> bool:
+        """True si el valor guardado debe volver a generarse con la configuración actual."""
+        return needs_rehash(stored, self.params)
+
+
+class LoginThrottle:
+    """
+    Limita los intentos fallidos de inicio de sesión por email.
+
+    Se permiten `max_attempts` fallos dentro de `window` segundos; al
+    superarlos, el email queda bloqueado hasta que el fallo más antiguo
+    salga de la ventana. Un inicio de sesión correcto reinicia el contador.
+    """
+
+    def __init__(self, max_attempts: int = 5, window: float = 300.0, max_tracked: int = 10000):
+        """
+        Args:
+            max_attempts (int): Fallos permitidos dentro de la ventana.
+            window (float): Duración de la ventana en segundos.
+            max_tracked (int): Emails recordados como máximo (los más antiguos se olvidan).
+        """
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_tracked = max_tracked
+        self._failures: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return (email or "").strip().lower()
+
+    def retry_after(self, email: str, now: Optional[float] = None) -> float:
+        """
+        Segundos que faltan para poder intentarlo de nuevo (0 si no está bloqueado).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            failures = self._failures.get(self._key(email))
+            if not failures:
+                return 0.0
+            while failures and failures[0] <= now - self.window:
+                failures.popleft()
+            if len(failures) < self.max_attempts:
+                return 0.0
+            return failures[0] + self.window - now
+
+    def record_failure(self, email: str, now: Optional[float] = None) -> None:
+        """Registra un intento fallido."""
+        now = time.monotonic() if now is None else now
+        key = self._key(email)
+        with self._lock:
+            failures = self._failures.pop(key, None) or deque(maxlen=self.max_attempts)
+            failures.append(now)
+            self._failures[key] = failures
+            while len(self._failures) > self.max_tracked:
+                self._failures.popitem(last=False)
+
+    def reset(self, email: str) -> None:
+        """Olvida los fallos de un email tras un inicio de sesión correcto."""
+        with self._lock:
+            self._failures.pop(self._key(email), None)
@@ -0,0 +1,404 @@
+"""
+Recurrencia de tareas y eventos.
+
+Una serie se guarda una sola vez: la fila padre lleva la regla
+(`reglaRecurrencia`, subconjunto de RRULE de RFC 5545) y su primera
+ocurrencia es la fecha ancla (`Event.fecha` o el día de
+`Tarea.fechaVencimiento`). Las ocurrencias no se guardan; se generan solo
+para la ventana consultada. Los cambios a una ocurrencia concreta (mover,
+editar o cancelar) se guardan como filas de `excepciones_recurrencia`.
+
+Reglas admitidas:
+
+    FREQ=DAILY|WEEKLY|MONTHLY|YEARLY[;INTERVAL=n][;BYDAY=MO,WE,...][;COUNT=n][;UNTIL=YYYYMMDD]
+
+BYDAY solo se admite con FREQ=WEEKLY. Como en RFC 5545, las fechas que no
+existen (31 de abril, 29 de febrero en años no bisiestos) se omiten.
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.models.models import Event, ExcepcionRecurrencia, Tarea
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+# Tope de COUNT y de ocurrencias devueltas por ventana
+MAX_COUNT = 1000
+MAX_OCCURRENCES = 1000
+# Entradas (serie, ventana) que recuerda OccurrenceCache
+OCCURRENCE_CACHE_SIZE = int(os.environ.get("TODO_RECURRENCE_CACHE", "4096"))
+
+# Valores de ExcepcionRecurrencia.entidad
+EVENT = ExcepcionRecurrencia.EVENTO
+TASK = ExcepcionRecurrencia.TAREA
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """
+    Regla de recurrencia ya validada.
+
+    Atributos:
+        freq (str): DAILY, WEEKLY, MONTHLY o YEARLY.
+        interval (int): Cada cuántos periodos se repite.
+        byday (tuple): Días de la semana (0 = lunes) para WEEKLY; vacío = el del ancla.
+        count (int): Número total de ocurrencias, o None.
+        until (date): Último día posible (incluido), o None.
+    """
+    freq: str
+    interval: int = 1
+    byday: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[date] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "RecurrenceRule":
+        """
+        Interpreta una regla RRULE.
+
+        Args:
+            text (str): Regla, con o sin el prefijo 'RRULE:'.
+
+        Returns:
+            RecurrenceRule: Regla validada.
+
+        Raises:
+            ValueError: Si la regla no es válida o usa partes no admitidas.
+        """
+        text = (text or '').strip()
+        if text.upper().startswith('RRULE:'):
+            text = text[6:]
+        parts = {}
+        for part in filter(None, text.upper().split(';')):
+            key, sep, value = part.partition('=')
+            if not sep or not value or key in parts:
+                raise ValueError(f"Parte de regla inválida: {part}")
+            parts[key] = value
+        freq = parts.pop('FREQ', None)
+        if freq not in FREQUENCIES:
+            raise ValueError("FREQ debe ser DAILY, WEEKLY, MONTHLY o YEARLY")
+        interval = int(parts.pop('INTERVAL', '1'))
+        if interval < 1:
+            raise ValueError("INTERVAL debe ser mayor que 0")
+        count = parts.pop('COUNT', None)
+        count = int(count) if count is not None else None
+        if count is not None and not 1 <= count <= MAX_COUNT:
+            raise ValueError(f"COUNT debe estar entre 1 y {MAX_COUNT}")
+        until = parts.pop('UNTIL', None)
+        until = datetime.strptime(until.replace('-', '')[:8], '%Y%m%d').date() if until else None
+        byday = parts.pop('BYDAY', None)
+        if byday is not None:
+            if freq != 'WEEKLY':
+                raise ValueError("BYDAY solo se admite con FREQ=WEEKLY")
+            byday = tuple(sorted({WEEKDAYS.index(day) for day in byday.split(',')}))
+        if parts:
+            raise ValueError(f"Partes no admitidas: {', '.join(sorted(parts))}")
+        return cls(freq, interval, byday or (), count, until)
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval > 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until:%Y%m%d}")
+        return ";".join(parts)
+
+    def occurrences(self, anchor: date, desde: date, hasta: date, limit: int = MAX_OCCURRENCES) -> List[date]:
+        """
+        Ocurrencias de la serie entre `desde` y `hasta` (ambos incluidos).
+
+        Sin COUNT, la generación salta directamente al primer periodo de la
+        ventana, así que el costo depende del tamaño de la ventana y no de la
+        antigüedad de la serie.
+
+        Args:
+            anchor (date): Primera ocurrencia de la serie.
+            desde (date): Primer día de la ventana.
+            hasta (date): Último día de la ventana.
+            limit (int): Máximo de ocurrencias devueltas.
+
+        Returns:
+            List[date]: Fechas en orden creciente.
+        """
+        if self.until is not None:
+            hasta = min(hasta, self.until)
+        result: List[date] = []
+        if hasta < desde or hasta < anchor:
+            return result
+        emitted = 0
+        try:
+            for day in self._iterate(anchor, max(desde, anchor)):
+                if self.count is not None:
+                    if emitted >= self.count:
+                        break
+                    emitted += 1
+                if day > hasta:
+                    break
+                if day >= desde:
+                    result.append(day)
+                    if len(result) >= limit:
+                        break
+        except OverflowError:
+            pass
+        return result
+
+    def includes(self, anchor: date, day: date) -> bool:
+        """Indica si `day` es una ocurrencia de la serie."""
+        return self.occurrences(anchor, day, day, limit=1) == [day]
+
+    def last_date(self, anchor: date) -> Optional[date]:
+        """Última ocurrencia de la serie, o None si no termina."""
+        if self.count is not None:
+            days = self.occurrences(anchor, anchor, self.until or date.max, limit=self.count)
+            return days[-1] if days else anchor
+        return self.until
+
+    def _iterate(self, anchor: date, start: date) -> Iterator[date]:
+        """
+        Genera ocurrencias en orden desde el primer periodo que puede contener `start`.
+
+        Con COUNT siempre se parte del ancla, porque hay que contar las
+        ocurrencias anteriores a la ventana.
+        """
+        skip = self.count is None
+        if self.freq == 'DAILY':
+            k = max(0, math.ceil((start - anchor).days / self.interval)) if skip else 0
+            while True:
+                yield anchor + timedelta(days=k * self.interval)
+                k += 1
+        elif self.freq == 'WEEKLY':
+            weekdays = self.byday or (anchor.weekday(),)
+            week0 = anchor - timedelta(days=anchor.weekday())
+            p = max(0, (start - week0).days // 7 // self.interval) if skip else 0
+            while True:
+                base = week0 + timedelta(weeks=p * self.interval)
+                for weekday in weekdays:
+                    day = base + timedelta(days=weekday)
+                    if day >= anchor:
+                        yield day
+                p += 1
+        elif self.freq == 'MONTHLY':
+            months = (start.year - anchor.year) * 12 + start.month - anchor.month
+            m = max(0, months // self.interval) if skip else 0
+            while True:
+                total = anchor.month - 1 + m * self.interval
+                if anchor.year + total // 12 > date.max.year:
+                    return
+                try:
+                    yield date(anchor.year + total // 12, total % 12 + 1, anchor.day)
+                except ValueError:
+                    pass
+                m += 1
+        else:
+            y = max(0, (start.year - anchor.year) // self.interval) if skip else 0
+            while anchor.year + y * self.interval <= date.max.year:
+                try:
+                    yield anchor.replace(year=anchor.year + y * self.interval)
+                except ValueError:
+                    pass
+                y += 1
+
+
+def parse_rule(text: Optional[str]) -> Optional[RecurrenceRule]:
+    """Regla de un texto RRULE; None o vacío = sin recurrencia."""
+    return RecurrenceRule.parse(text) if text and text.strip() else None
+
+
+class OccurrenceCache:
+    """
+    Caché LRU de ocurrencias ya expandidas por (serie, ventana).
+
+    Solo guarda las fechas que genera la regla; las excepciones se aplican
+    en cada consulta. Cada entrada recuerda la regla y el ancla con que se
+    calculó, así que una serie editada nunca devuelve fechas viejas aunque
+    no se haya llamado a `invalidate`.
+    """
+
+    def __init__(self, max_entries: int = OCCURRENCE_CACHE_SIZE):
+        """
+        Args:
+            max_entries (int): Cantidad máxima de ventanas en memoria.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (entidad, idPadre, desde, hasta) -> ((regla, ancla), fechas)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # (entidad, idPadre) -> claves de sus ventanas
+        self._by_series: Dict[Tuple[str, int], set] = {}
+
+    def occurrences(self, kind: str, parent_id: int, rule: RecurrenceRule, anchor: date,
+                    desde: date, hasta: date) -> List[date]:
+        """
+        Ocurrencias de una serie en la ventana, expandidas solo si no están en caché.
+
+        Returns:
+            List[date]: Fechas en orden creciente (no modificar).
+        """
+        key = (kind, parent_id, desde, hasta)
+        fingerprint = (str(rule), anchor)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        days = rule.occurrences(anchor, desde, hasta)
+        with self._lock:
+            self._entries[key] = (fingerprint, days)
+            self._entries.move_to_end(key)
+            self._by_series.setdefault((kind, parent_id), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old, _ = self._entries.popitem(last=False)
+                self._discard(old)
+        return days
+
+    def invalidate(self, kind: str, parent_id: int) -> None:
+        """Olvida todas las ventanas de una serie (regla editada o eliminada)."""
+        with self._lock:
+            for key in self._by_series.pop((kind, parent_id), ()):
+                self._entries.pop(key, None)
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: tuple) -> None:
+        keys = self._by_series.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_series[key[:2]]
+
+
+def anchor_of(parent) -> Optional[date]:
+    """Primera ocurrencia de una serie: la fecha del evento o el día de vencimiento de la tarea."""
+    if isinstance(parent, Tarea):
+        return parent.fechaVencimiento.date() if parent.fechaVencimiento else None
+    return parent.fecha
+
+
+def expand_series(kind: str, parents: Iterable, exceptions: Iterable[ExcepcionRecurrencia],
+                  desde: date, hasta: date, cache: OccurrenceCache) -> List[Tuple[object, date, Optional[ExcepcionRecurrencia]]]:
+    """
+    Expande las series que se cruzan con la ventana aplicando sus excepciones.
+
+    Una ocurrencia cancelada no aparece; una movida aparece en su nueva
+    fecha, aunque su fecha original quede fuera de la ventana.
+
+    Args:
+        kind (str): EVENT o TASK.
+        parents (Iterable): Filas padre con `reglaRecurrencia`.
+        exceptions (Iterable[ExcepcionRecurrencia]): Excepciones de esas series.
+        desde (date): Primer día de la ventana.
+        hasta (date): Último día de la ventana.
+        cache (OccurrenceCache): Caché de fechas expandidas.
+
+    Returns:
+        List[Tuple]: (padre, fecha original, excepción o None) por ocurrencia visible.
+    """
+    by_parent: Dict[int, Dict[date, ExcepcionRecurrencia]] = {}
+    for exception in exceptions:
+        by_parent.setdefault(exception.idPadre, {})[exception.fechaOriginal] = exception
+    result = []
+    for parent in parents:
+        parent_id = parent.idEvento if kind == EVENT else parent.idTarea
+        anchor = anchor_of(parent)
+        try:
+            rule = parse_rule(parent.reglaRecurrencia)
+        except ValueError as e:
+            print(f"Advertencia: regla de recurrencia inválida en {kind} {parent_id}: {e}")
+            rule = None
+        if rule is None or anchor is None:
+            continue
+        overrides = by_parent.get(parent_id, {})
+        for day in cache.occurrences(kind, parent_id, rule, anchor, desde, hasta):
+            override = overrides.get(day)
+            if override is not None and (override.cancelada or not _moved_into(override, day, desde, hasta)):
+                continue
+            result.append((parent, day, override))
+        # Ocurrencias de otras ventanas movidas a esta
+        for day, override in overrides.items():
+            if (not override.cancelada and not desde <= day <= hasta and override.fecha is not None
+                    and desde <= override.fecha <= hasta and rule.includes(anchor, day)):
+                result.append((parent, day, override))
+    return result
+
+
+def _moved_into(override: ExcepcionRecurrencia, day: date, desde: date, hasta: date) -> bool:
+    """True si la ocurrencia editada sigue dentro de la ventana."""
+    target = override.fecha or day
+    return desde <= target <= hasta
+
+
+def event_occurrence(parent: Event, day: date, override: Optional[ExcepcionRecurrencia] = None) -> Event:
+    """
+    Evento transitorio (no pertenece a ninguna sesión) de una ocurrencia.
+
+    Conserva `idEvento` del padre y agrega `ocurrencia` con la fecha original,
+    que identifica la ocurrencia al editarla o cancelarla.
+    """
+    event = Event(
+        idEvento=parent.idEvento,
+        titulo=_pick(override, 'titulo', parent.titulo),
+        descripcion=_pick(override, 'descripcion', parent.descripcion),
+        fecha=_pick(override, 'fecha', day),
+        hora=_pick(override, 'hora', parent.hora),
+        prioridad=_pick(override, 'prioridad', parent.prioridad),
+        idUsuario=parent.idUsuario,
+        reglaRecurrencia=parent.reglaRecurrencia,
+        finRecurrencia=parent.finRecurrencia,
+    )
+    event.ocurrencia = day
+    return event
+
+
+def task_occurrence(parent: Tarea, day: date, override: Optional[ExcepcionRecurrencia] = None) -> Tarea:
+    """
+    Tarea transitoria de una ocurrencia: vence el día de la ocurrencia a la
+    hora del padre y conserva la distancia entre creación y vencimiento.
+    """
+    target = _pick(override, 'fecha', day)
+    due = datetime.combine(target, _pick(override, 'hora', parent.fechaVencimiento.time()))
+    start = due - (parent.fechaVencimiento - parent.fechaCreacion) if parent.fechaCreacion else None
+    estado = _pick(override, 'estado', parent.estado)
+    task = Tarea(
+        idTarea=parent.idTarea,
+        titulo=_pick(override, 'titulo', parent.titulo),
+        descripcion=_pick(override, 'descripcion', parent.descripcion),
+        fechaCreacion=start,
+        fechaVencimiento=due,
+        estado=estado,
+        prioridad=_pick(override, 'prioridad', parent.prioridad),
+        tipo=parent.tipo,
+        fechaCompletado=override.fechaCompletado if override is not None else None,
+        idUsuario=parent.idUsuario,
+        reglaRecurrencia=parent.reglaRecurrencia,
+        finRecurrencia=parent.finRecurrencia,
+    )
+    task.ocurrencia = day
+    return task
+
+
+def _pick(override: Optional[ExcepcionRecurrencia], field: str, default):
+    value = getattr(override, field, None) if override is not None else None
+    return default if value is None else value
+
+
+def occurrence_sort_key(item) -> tuple:
+    """Orden cronológico de eventos o tareas (simples u ocurrencias)."""
+    if isinstance(item, Tarea):
+        return item.fechaVencimiento or datetime.min, item.idTarea
+    return item.fecha or date.min, item.hora or time.min, item.idEvento
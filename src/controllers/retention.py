@@ -0,0 +1,153 @@
+"""
+Motor de retención de tareas completadas.
+
+Periódicamente, en un hilo en segundo plano, mueve a `tareas_archivo` las
+tareas completadas hace más de unos días y elimina las que superan la
+retención de su usuario, para que la tabla `tareas` solo contenga el
+trabajo vigente. El archivo es el historial y se conserva salvo que se
+configure su propia retención (TODO_ARCHIVE_RETENTION_DAYS).
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.database.repository import Repository, BULK_CHUNK_SIZE
+
+# Configuración por variables de entorno
+DEFAULT_RETENTION_DAYS = int(os.environ.get("TODO_RETENTION_DAYS", "30"))
+DEFAULT_INTERVAL_SECONDS = float(os.environ.get("TODO_RETENTION_INTERVAL", "3600"))
+DEFAULT_ARCHIVE_DAYS = float(os.environ.get("TODO_ARCHIVE_DAYS", "7"))
+# Días que se conservan las tareas archivadas; 0 (por defecto) las conserva siempre
+DEFAULT_ARCHIVE_RETENTION_DAYS = float(os.environ.get("TODO_ARCHIVE_RETENTION_DAYS", "0"))
+
+
+def run_retention(repository: Repository, default_days: Optional[int] = None,
+                  chunk_size: int = BULK_CHUNK_SIZE, idUsuario: Optional[int] = None,
+                  archive_retention_days: Optional[float] = None) -> dict:
+    """
+    Ejecuta una pasada de limpieza y mide su duración.
+
+    Args:
+        repository (Repository): Repositorio a usar.
+        default_days (int, optional): Retención por defecto. Defaults to DEFAULT_RETENTION_DAYS.
+        chunk_size (int): Filas como máximo por transacción.
+        idUsuario (int, optional): Limitar la limpieza a un usuario.
+        archive_retention_days (float, optional): Días que se conserva el archivo.
+            Defaults to DEFAULT_ARCHIVE_RETENTION_DAYS.
+
+    Returns:
+        dict: `removed` (tareas eliminadas), `deleted` (IDs por usuario) y
+        `seconds` (tiempo empleado).
+    """
+    days = DEFAULT_RETENTION_DAYS if default_days is None else default_days
+    start = time.perf_counter()
+    if archive_retention_days is None:
+        archive_retention_days = DEFAULT_ARCHIVE_RETENTION_DAYS
+    deleted = repository.cleanup_completed_tasks(default_days=days, chunk_size=chunk_size, idUsuario=idUsuario,
+                                                 archive_retention_days=archive_retention_days)
+    return {"removed": sum(len(ids) for ids in deleted.values()), "deleted": deleted,
+            "seconds": time.perf_counter() - start}
+
+
+def run_archive(repository: Repository, delay_days: Optional[float] = None,
+                chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """
+    Archiva las tareas completadas hace más de `delay_days` días y mide la duración.
+
+    Args:
+        repository (Repository): Repositorio a usar.
+        delay_days (float, optional): Días antes de archivar. Defaults to DEFAULT_ARCHIVE_DAYS.
+        chunk_size (int): Filas como máximo por transacción.
+
+    Returns:
+        dict: `archived` (IDs por usuario) y `seconds` (tiempo empleado).
+    """
+    days = DEFAULT_ARCHIVE_DAYS if delay_days is None else delay_days
+    start = time.perf_counter()
+    archived = repository.archive_completed_tasks(days, chunk_size=chunk_size)
+    return {"archived": archived, "seconds": time.perf_counter() - start}
+
+
+class RetentionScheduler(threading.Thread):
+    """
+    Hilo que ejecuta run_archive y run_retention cada `interval` segundos.
+
+    Usa su propio Repository (y por lo tanto su propia sesión de base de
+    datos) para no compartir estado con la interfaz.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS, default_days: Optional[int] = None,
+                 chunk_size: int = BULK_CHUNK_SIZE, initial_delay: float = 60.0,
+                 repository_factory: Callable[[], Repository] = Repository,
+                 archive_days: Optional[float] = None, archive_retention_days: Optional[float] = None):
+        """
+        Args:
+            interval (float): Segundos entre pasadas.
+            default_days (int, optional): Retención por defecto.
+            chunk_size (int): Filas como máximo por transacción.
+            initial_delay (float): Espera antes de la primera pasada, para no
+                competir con el arranque de la aplicación.
+            repository_factory (Callable): Crea el repositorio del hilo.
+            archive_days (float, optional): Días antes de archivar; negativo
+                desactiva el archivo.
+            archive_retention_days (float, optional): Días que se conservan
+                las tareas archivadas (0 = siempre).
+        """
+        super().__init__(name="retention-scheduler", daemon=True)
+        self.interval = interval
+        self.default_days = default_days
+        self.chunk_size = chunk_size
+        self.initial_delay = initial_delay
+        self.repository_factory = repository_factory
+        self.archive_days = archive_days
+        self.archive_retention_days = archive_retention_days
+        self.last_report: Optional[dict] = None
+        self._listeners: List[Callable[[Dict[int, List[int]]], None]] = []
+        self._stop_event = threading.Event()
+
+    def add_listener(self, listener: Callable[[Dict[int, List[int]]], None]) -> None:
+        """
+        Registra una función a la que se pasan los IDs archivados o eliminados
+        por usuario, para que la interfaz deje de mostrarlos.
+        """
+        self._listeners.append(listener)
+
+    def run_once(self) -> dict:
+        """Ejecuta una pasada de archivo y limpieza y guarda el reporte."""
+        repository = self.repository_factory()
+        archived = {}
+        if self.archive_days is None or self.archive_days >= 0:
+            archived = run_archive(repository, self.archive_days, self.chunk_size)["archived"]
+        report = run_retention(repository, self.default_days, self.chunk_size,
+                               archive_retention_days=self.archive_retention_days)
+        report["archived"] = sum(len(ids) for ids in archived.values())
+        self.last_report = report
+        if archived:
+            print(f"Archivo: {report['archived']} tareas completadas movidas a tareas_archivo")
+        if report["removed"]:
+            print(f"Retención: {report['removed']} tareas completadas eliminadas en {report['seconds']:.3f}s")
+        # Las que la retención borró directamente de `tareas` también desaparecen de la interfaz
+        gone = {user_id: list(ids) for user_id, ids in archived.items()}
+        for user_id, ids in report["deleted"].items():
+            gone.setdefault(user_id, []).extend(ids)
+        if gone:
+            for listener in self._listeners:
+                listener(gone)
+        return report
+
+    def run(self) -> None:
+        if self._stop_event.wait(self.initial_delay):
+            return
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error en la limpieza programada: {e}")
+            if self._stop_event.wait(self.interval):
+                return
+
+    def stop(self) -> None:
+        """Detiene el hilo al terminar la espera actual."""
+        self._stop_event.set()
@@ -0,0 +1,275 @@
+import hashlib
+import heapq
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from src.database.repository import Repository
+from src.models.models import Usuario
+
+# Configuración por variables de entorno
+SESSION_TTL_SECONDS = float(os.environ.get("TODO_SESSION_TTL", str(7 * 24 * 3600)))
+SESSION_CACHE_SIZE = int(os.environ.get("TODO_SESSION_CACHE", "10000"))
+SESSION_SWEEP_INTERVAL = float(os.environ.get("TODO_SESSION_SWEEP_INTERVAL", "300"))
+
+
+class UserSession:
+    """
+    Sesión del usuario autenticado.
+
+    Guarda los datos del perfil ya resueltos al iniciar sesión para que las
+    operaciones del controlador no vuelvan a buscar al usuario por email.
+
+    Atributos:
+        email (str): Correo con el que se inició sesión.
+        idUsuario (int): ID del usuario, o None si aún no se resolvió.
+        nombre (str): Nombre del usuario.
+        modoOscuro (bool): Preferencia de tema oscuro.
+        inicio (datetime): Momento en que se creó la sesión.
+        token (str): Token opaco emitido por SessionManager, o None.
+        expira (datetime): Expiración del token, o None.
+    """
+
+    def __init__(self, email: str, idUsuario: Optional[int] = None, nombre: Optional[str] = None, modoOscuro: bool = False):
+        self.email = email
+        self.idUsuario = idUsuario
+        self.nombre = nombre
+        self.modoOscuro = modoOscuro
+        self.inicio = datetime.utcnow()
+        self.token: Optional[str] = None
+        self.expira: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: Usuario) -> "UserSession":
+        """Crea una sesión ya resuelta a partir de un usuario de la base de datos."""
+        return cls(user.email, user.idUsuario, user.nombre, bool(user.modoOscuro))
+
+    @property
+    def resolved(self) -> bool:
+        """True si la sesión ya conoce el ID del usuario."""
+        return self.idUsuario is not None
+
+    def bind(self, user: Usuario) -> None:
+        """Completa la sesión con los datos del usuario."""
+        self.email = user.email
+        self.idUsuario = user.idUsuario
+        self.nombre = user.nombre
+        self.modoOscuro = bool(user.modoOscuro)
+
+
+def hash_token(token: str) -> str:
+    """SHA-256 (hex) del token; es lo único que se guarda en `sesiones`."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class SessionManager:
+    """
+    Emite y resuelve tokens de sesión.
+
+    Las sesiones se guardan en la tabla `sesiones` y las más usadas se
+    mantienen en una caché LRU en memoria, de modo que resolver un token
+    conocido no consulta la base de datos. Un heap ordenado por expiración
+    permite descartar las sesiones vencidas en O(vencidas · log n).
+
+    Es seguro usarlo desde varios hilos; el acceso a la base de datos se hace
+    con el Repository de quien llama.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_cached: int = SESSION_CACHE_SIZE):
+        """
+        Args:
+            ttl (float): Segundos de validez de un token.
+            max_cached (int): Sesiones en memoria como máximo (las menos usadas se descartan).
+        """
+        self.ttl = ttl
+        self.max_cached = max_cached
+        # hash del token -> UserSession, de menos a más usada
+        self._cache: "OrderedDict[str, UserSession]" = OrderedDict()
+        # (expira, hash del token); puede contener entradas ya descartadas
+        self._expiry: List[Tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+        # Resoluciones servidas desde memoria y desde la base de datos (métrica)
+        self.hits = 0
+        self.misses = 0
+
+    def open(self, repository: Repository, session: UserSession, now: Optional[datetime] = None) -> Optional[str]:
+        """
+        Emite un token para una sesión ya resuelta y lo guarda en `sesiones`.
+
+        Args:
+            repository (Repository): Repositorio de quien llama.
+            session (UserSession): Sesión del usuario que inició sesión.
+            now (datetime, optional): Momento de referencia (por defecto, ahora).
+
+        Returns:
+            Optional[str]: Token opaco, o None si no se pudo guardar.
+        """
+        token, key, expires = self._new_token(now)
+        if not repository.create_session(key, session.idUsuario, expires):
+            return None
+        return self._issue(key, token, expires, session)
+
+    async def open_async(self, repository, session: UserSession, now: Optional[datetime] = None) -> Optional[str]:
+        """Como open, con un AsyncRepository."""
+        token, key, expires = self._new_token(now)
+        if not await repository.create_session(key, session.idUsuario, expires):
+            return None
+        return self._issue(key, token, expires, session)
+
+    def resolve(self, repository: Repository, token: Optional[str], now: Optional[datetime] = None) -> Optional[UserSession]:
+        """
+        Obtiene la sesión de un token.
+
+        Args:
+            repository (Repository): Repositorio de quien llama (solo se usa si el token no está en memoria).
+            token (str): Token recibido del cliente.
+            now (datetime, optional): Momento de referencia (por defecto, ahora).
+
+        Returns:
+            Optional[UserSession]: Sesión vigente, o None si el token no existe o expiró.
+        """
+        if not token:
+            return None
+        now = now or datetime.utcnow()
+        key = hash_token(token)
+        session = self._cached(key, now)
+        if session is not None:
+            return session
+        return self._load(key, token, repository.get_session_user(key, now))
+
+    async def resolve_async(self, repository, token: Optional[str], now: Optional[datetime] = None) -> Optional[UserSession]:
+        """Como resolve, con un AsyncRepository."""
+        if not token:
+            return None
+        now = now or datetime.utcnow()
+        key = hash_token(token)
+        session = self._cached(key, now)
+        if session is not None:
+            return session
+        return self._load(key, token, await repository.get_session_user(key, now))
+
+    def close(self, repository: Repository, token: Optional[str]) -> None:
+        """Invalida un token (cierre de sesión)."""
+        if token:
+            repository.delete_session(self._forget(token))
+
+    async def close_async(self, repository, token: Optional[str]) -> None:
+        """Como close, con un AsyncRepository."""
+        if token:
+            await repository.delete_session(self._forget(token))
+
+    def forget_user(self, idUsuario: int) -> None:
+        """Descarta de memoria todas las sesiones de un usuario (por ejemplo, al eliminarlo)."""
+        with self._lock:
+            for key in [k for k, s in self._cache.items() if s.idUsuario == idUsuario]:
+                self._cache.pop(key)
+
+    def sweep(self, repository: Repository, now: Optional[datetime] = None) -> int:
+        """
+        Descarta las sesiones expiradas de memoria y de la base de datos.
+
+        Args:
+            repository (Repository): Repositorio a usar.
+            now (datetime, optional): Momento de referencia (por defecto, ahora).
+
+        Returns:
+            int: Sesiones eliminadas de la tabla `sesiones`.
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, key = heapq.heappop(self._expiry)
+                session = self._cache.get(key)
+                if session is not None and session.expira <= now:
+                    self._cache.pop(key)
+        return repository.delete_expired_sessions(now)
+
+    def _new_token(self, now: Optional[datetime]) -> Tuple[str, str, datetime]:
+        token = secrets.token_urlsafe(32)
+        return token, hash_token(token), (now or datetime.utcnow()) + timedelta(seconds=self.ttl)
+
+    def _issue(self, key: str, token: str, expires: datetime, session: UserSession) -> str:
+        session.token = token
+        session.expira = expires
+        self._remember(key, session)
+        return token
+
+    def _cached(self, key: str, now: datetime) -> Optional[UserSession]:
+        with self._lock:
+            session = self._cache.get(key)
+            if session is not None:
+                if session.expira > now:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return session
+                self._cache.pop(key)
+            self.misses += 1
+            return None
+
+    def _load(self, key: str, token: str, row: Optional[tuple]) -> Optional[UserSession]:
+        if row is None:
+            return None
+        stored, user = row
+        session = UserSession.from_user(user)
+        session.token = token
+        session.expira = stored.fechaExpiracion
+        self._remember(key, session)
+        return session
+
+    def _forget(self, token: str) -> str:
+        key = hash_token(token)
+        with self._lock:
+            self._cache.pop(key, None)
+        return key
+
+    def _remember(self, key: str, session: UserSession) -> None:
+        with self._lock:
+            self._cache[key] = session
+            self._cache.move_to_end(key)
+            heapq.heappush(self._expiry, (session.expira, key))
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+            # Las entradas de sesiones cerradas o descartadas se acumulan en el heap:
+            # se reconstruye cuando dobla a la caché (costo amortizado O(1))
+            if len(self._expiry) > 2 * len(self._cache) + 64:
+                self._expiry = [(s.expira, k) for k, s in self._cache.items()]
+                heapq.heapify(self._expiry)
+
+
+class SessionSweeper(threading.Thread):
+    """
+    Hilo que ejecuta SessionManager.sweep cada `interval` segundos con su
+    propio Repository.
+    """
+
+    def __init__(self, manager: SessionManager, interval: float = SESSION_SWEEP_INTERVAL,
+                 repository_factory: Callable[[], Repository] = Repository):
+        """
+        Args:
+            manager (SessionManager): Sesiones a depurar.
+            interval (float): Segundos entre pasadas.
+            repository_factory (Callable): Crea el repositorio del hilo.
+        """
+        super().__init__(name="session-sweeper", daemon=True)
+        self.manager = manager
+        self.interval = interval
+        self.repository_factory = repository_factory
+        self._stop_event = threading.Event()
+
+    def run_once(self) -> int:
+        """Ejecuta una pasada y devuelve las sesiones eliminadas."""
+        return self.manager.sweep(self.repository_factory())
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error al depurar sesiones: {e}")
+
+    def stop(self) -> None:
+        """Detiene el hilo al terminar la espera actual."""
+        self._stop_event.set()
@@ -0,0 +1,158 @@
+"""
+Arranque de la aplicación por fases.
+
+La ventana (o el servidor) se muestra primero. Crear y migrar el esquema y
+cargar los usuarios y tareas demo se hace en un hilo aparte (StartupInit),
+y se omite por completo si la base de datos ya tiene la marca de
+inicializada (`is_initialized`). Las acciones del Api que lleguen mientras
+tanto esperan al evento `ready`.
+
+StartupProfile mide importaciones y fases para `python main.py --profile-startup`.
+Este módulo solo importa la biblioteca estándar al cargarse, para que la
+medición incluya a SQLAlchemy, los modelos y la interfaz.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+
+class StartupProfile:
+    """
+    Tiempos de cada fase del arranque, relativos al momento en que se creó.
+
+    Con `enabled=False` las fases se ejecutan igual pero no se registra nada.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        # (fase, inicio relativo, duración) en segundos; duración None para marcas
+        self.entries: List[Tuple[str, float, Optional[float]]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mide el bloque como una fase (puede correr en cualquier hilo)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start - self.started, time.perf_counter() - start)
+
+    def mark(self, name: str) -> None:
+        """Registra un instante (por ejemplo, la ventana ya visible)."""
+        self._record(name, time.perf_counter() - self.started, None)
+
+    def _record(self, name: str, offset: float, duration: Optional[float]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.entries.append((name, offset, duration))
+
+    def report(self) -> str:
+        """Tabla con el inicio y la duración de cada fase, en orden de inicio."""
+        with self._lock:
+            entries = sorted(self.entries, key=lambda entry: entry[1])
+        width = max([len(name) for name, _, _ in entries] + [4])
+        lines = [f"{'fase':<{width}}  {'inicio ms':>10}  {'duración ms':>12}"]
+        for name, offset, duration in entries:
+            lines.append(f"{name:<{width}}  {offset * 1000:>10.1f}  "
+                         f"{'-' if duration is None else f'{duration * 1000:.1f}':>12}")
+        return "\n".join(lines)
+
+    def print_when(self, *events: Optional[threading.Event]) -> None:
+        """Imprime el informe en segundo plano cuando todos los eventos (los no None) estén activos."""
+        if not self.enabled:
+            return
+
+        def wait_and_print():
+            for event in events:
+                if event is not None:
+                    event.wait()
+            print(self.report(), flush=True)
+        threading.Thread(target=wait_and_print, name="startup-profile", daemon=True).start()
+
+
+class StartupInit(threading.Thread):
+    """
+    Hilo que crea y migra el esquema, carga los datos demo y escribe la marca
+    de inicializada. `ready` se activa al terminar, también si algo falla.
+    """
+
+    def __init__(self, bind=None, base=None, repository_factory: Optional[Callable] = None,
+                 profile: Optional[StartupProfile] = None):
+        """
+        Args:
+            bind (Engine, optional): Motor de la base de datos. Defaults to el de src.database.db.
+            base (optional): Base declarativa con los modelos. Defaults to la de src.models.models.
+            repository_factory (Callable, optional): Crea el repositorio para los
+                datos demo. Defaults to un Repository sobre `bind`.
+            profile (StartupProfile, optional): Dónde registrar las fases.
+        """
+        super().__init__(name="startup-init", daemon=True)
+        self.bind = bind
+        self.base = base
+        self.repository_factory = repository_factory
+        self.profile = profile or StartupProfile(enabled=False)
+        self.ready = threading.Event()
+        self.succeeded = False
+
+    def run(self) -> None:
+        from sqlalchemy.orm import sessionmaker
+        from src.database.db import engine, init_db
+        from src.database.migrations import mark_initialized
+        from src.database.repository import Repository
+        from src.models.models import Base
+
+        bind = self.bind if self.bind is not None else engine
+        try:
+            with self.profile.phase("esquema y migraciones (hilo)"):
+                schema_ok = init_db(self.base if self.base is not None else Base, bind)
+            if not schema_ok:
+                return
+            with self.profile.phase("datos demo (hilo)"):
+                if self.repository_factory is not None:
+                    repository = self.repository_factory()
+                else:
+                    repository = Repository(sessionmaker(bind=bind, expire_on_commit=False))
+                try:
+                    repository.seed_initial_users()
+                    repository.seed_initial_tasks()
+                finally:
+                    repository.close()
+            mark_initialized(bind)
+            self.succeeded = True
+        except Exception as e:
+            print(f"Error al inicializar la aplicación: {e}")
+        finally:
+            self.ready.set()
+
+
+def start_initialization(bind=None, profile: Optional[StartupProfile] = None, **kwargs) -> threading.Event:
+    """
+    Lanza StartupInit salvo que la base de datos ya tenga la marca de inicializada.
+
+    Args:
+        bind (Engine, optional): Motor de la base de datos. Defaults to el de src.database.db.
+        profile (StartupProfile, optional): Dónde registrar las fases.
+        **kwargs: Argumentos adicionales para StartupInit.
+
+    Returns:
+        threading.Event: Se activa cuando la base de datos está lista (ya activo si no hizo falta nada).
+    """
+    from src.database.db import engine
+    from src.database.migrations import is_initialized
+
+    profile = profile or StartupProfile(enabled=False)
+    bind = bind if bind is not None else engine
+    with profile.phase("comprobar marca de inicializada"):
+        initialized = is_initialized(bind)
+    if initialized:
+        ready = threading.Event()
+        ready.set()
+        return ready
+    init = StartupInit(bind=bind, profile=profile, **kwargs)
+    init.start()
+    return init.ready
@@ -0,0 +1,109 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class TaskChangeFeed:
+    """
+    Registro de cambios de tareas por usuario con revisiones monótonas.
+
+    Cada mutación (creación, actualización, eliminación) recibe una revisión
+    global creciente. Por usuario solo se guarda el último cambio de cada
+    tarea, de modo que consultar los cambios desde una revisión cuesta
+    O(cambios) y no O(tareas).
+
+    La revisión vive en memoria: al reiniciar el proceso cambia `epoch` y los
+    clientes deben volver a pedir la lista completa.
+    """
+
+    INSERTED = 'inserted'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+
+    def __init__(self, max_entries_per_user: int = 1000):
+        """
+        Args:
+            max_entries_per_user (int): Cantidad máxima de tareas cuyo último
+                cambio se recuerda por usuario. Los más antiguos se descartan.
+        """
+        self.max_entries_per_user = max_entries_per_user
+        self.epoch = uuid.uuid4().hex
+        self._revision = 0
+        self._lock = threading.Lock()
+        # user_key -> OrderedDict(task_id -> (revision, kind)) ordenado por revisión
+        self._logs: Dict[object, OrderedDict] = {}
+        # user_key -> revisión más antigua descartada (no se puede reconstruir desde antes)
+        self._floors: Dict[object, int] = {}
+
+    @property
+    def revision(self) -> int:
+        """Revisión global actual."""
+        return self._revision
+
+    def record(self, user_key, task_id: int, kind: str) -> int:
+        """
+        Registra un cambio sobre una tarea y devuelve la nueva revisión.
+
+        Args:
+            user_key: Identificador del usuario propietario.
+            task_id (int): ID de la tarea afectada.
+            kind (str): INSERTED, UPDATED o DELETED.
+
+        Returns:
+            int: Revisión asignada al cambio.
+        """
+        with self._lock:
+            self._revision += 1
+            log = self._logs.setdefault(user_key, OrderedDict())
+            previous = log.pop(task_id, None)
+            # Una tarea insertada y luego actualizada sigue siendo una inserción
+            if previous and previous[1] == self.INSERTED and kind == self.UPDATED:
+                kind = self.INSERTED
+            log[task_id] = (self._revision, kind)
+            while len(log) > self.max_entries_per_user:
+                _, (dropped_revision, _) = log.popitem(last=False)
+                self._floors[user_key] = dropped_revision
+            return self._revision
+
+    def record_deleted(self, task_ids_by_user: Dict[object, List[int]]) -> None:
+        """
+        Registra como eliminadas tareas agrupadas por usuario, por ejemplo las
+        que el planificador movió al archivo.
+        """
+        for user_key, task_ids in task_ids_by_user.items():
+            for task_id in task_ids:
+                self.record(user_key, task_id, self.DELETED)
+
+    def changes_since(self, user_key, since_revision: int, epoch: Optional[str] = None) -> Optional[Tuple[int, List[int], List[int], List[int]]]:
+        """
+        Obtiene los IDs cambiados desde una revisión.
+
+        Args:
+            user_key: Identificador del usuario.
+            since_revision (int): Última revisión conocida por el cliente.
+            epoch (str, optional): Epoch recibido junto a esa revisión.
+
+        Returns:
+            Optional[Tuple[int, List[int], List[int], List[int]]]: Revisión actual
+            e IDs insertados, actualizados y eliminados, o None si el cliente
+            debe recargar la lista completa.
+        """
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return None
+            if since_revision > self._revision or since_revision < self._floors.get(user_key, 0):
+                return None
+            inserted, updated, deleted = [], [], []
+            buckets = {self.INSERTED: inserted, self.UPDATED: updated, self.DELETED: deleted}
+            for task_id, (revision, kind) in reversed(self._logs.get(user_key, {}).items()):
+                if revision <= since_revision:
+                    break
+                buckets[kind].append(task_id)
+            return self._revision, inserted, updated, deleted
+
+    def forget(self, user_key) -> None:
+        """Descarta el historial de un usuario (por ejemplo, al eliminarlo)."""
+        with self._lock:
+            self._logs.pop(user_key, None)
+            self._floors[user_key] = self._revision
@@ -1,22 +1,148 @@
-from datetime import datetime
-from typing import List, Optional, Tuple
-from src.models.models import Usuario, Tarea, Event
-from src.database.repository import Repository
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Sequence, Tuple, Union
+from src.models.models import Usuario, Tarea, TareaArchivo, Event
+from src.database.instrumentation import traced_methods
+from src.database.list_cache import ListCache
+from src.database.repository import Repository, COMPLETED_STATES, TASK_SORT_COLUMNS
+from src.controllers.session import SessionManager, UserSession
+from src.controllers.passwords import INVALID_CREDENTIALS, LoginThrottle, PasswordHasher
+from src.controllers.recurrence import (
+    EVENT, TASK, OccurrenceCache, anchor_of, event_occurrence, expand_series, occurrence_sort_key, parse_rule, task_occurrence
+)
+from src.controllers.retention import run_archive, run_retention
+
+# Nombres de campo de la vista/controlador -> columnas de Tarea
+TASK_FIELD_MAP = {
+    'name': 'titulo',
+    'description': 'descripcion',
+    'start_date': 'fechaCreacion',
+    'end_date': 'fechaVencimiento',
+    'priority': 'prioridad',
+    'status': 'estado',
+}
+
+# Tamaño de página máximo de get_tasks_page
+MAX_PAGE_SIZE = 200
+
+# Tipos de elemento recurrente que acepta la vista -> ExcepcionRecurrencia.entidad
+RECURRENCE_KINDS = {'event': EVENT, 'task': TASK}
+
+
+def parse_event_date(value: Union[str, date]) -> date:
+    """
+    Convierte la fecha de un evento ('YYYY-MM-DD' o date) en date.
+
+    Raises:
+        ValueError: Si el valor no es una fecha válida.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def parse_event_time(value: Union[str, time, None]) -> Optional[time]:
+    """
+    Convierte la hora de un evento ('HH:MM' o time) en time; vacía = todo el día.
+
+    Raises:
+        ValueError: Si el valor no es una hora válida.
+    """
+    if value is None or isinstance(value, time):
+        return value
+    value = str(value).strip()
+    return time.fromisoformat(value) if value else None
+
+
+def encode_cursor(sort: str, task: Tarea) -> str:
+    """
+    Genera el cursor opaco que apunta a la última tarea de una página.
+
+    Args:
+        sort (str): Clave de orden usada en la consulta.
+        task (Tarea): Última tarea de la página.
+
+    Returns:
+        str: Cursor en base64 (JSON con la clave de orden, el valor y el ID).
+    """
+    value = getattr(task, TASK_SORT_COLUMNS[sort])
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, task.idTarea]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
 
 
+def decode_cursor(sort: str, cursor: str) -> Tuple[Any, int]:
+    """
+    Interpreta un cursor de encode_cursor.
+
+    Raises:
+        ValueError: Si el cursor es inválido o se generó con otro orden.
+    """
+    try:
+        if not isinstance(cursor, str):
+            raise TypeError("el cursor no es texto")
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        # Un cursor manipulado puede traer cualquier JSON: solo se aceptan los tipos de encode_cursor
+        if not isinstance(decoded, list) or len(decoded) != 3:
+            raise TypeError("se esperaba [orden, valor, ID]")
+        cursor_sort, value, task_id = decoded
+        if isinstance(task_id, bool) or not isinstance(task_id, int):
+            raise TypeError("ID de tarea inválido")
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int))):
+            raise TypeError("valor de orden inválido")
+        if value is not None and sort in ('end_date', 'start_date', 'completed_at'):
+            if not isinstance(value, str):
+                raise TypeError("fecha inválida")
+            value = datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Cursor inválido") from e
+    if cursor_sort != sort:
+        raise ValueError("El cursor no corresponde al orden solicitado")
+    return value, task_id
+
+
+@traced_methods("TaskController")
 class TaskController:
     """
     Controlador principal de la aplicación para gestión de usuarios y tareas.
     """
-    def __init__(self):
+    def __init__(self, passwords: Optional[PasswordHasher] = None, throttle: Optional[LoginThrottle] = None,
+                 sessions: Optional[SessionManager] = None, occurrences: Optional[OccurrenceCache] = None,
+                 list_cache: Optional[ListCache] = None, seed: bool = True):
         """
         Inicializa el controlador con un repositorio y sin usuario logueado.
+
+        Args:
+            passwords (PasswordHasher, optional): Hasher compartido entre controladores.
+            throttle (LoginThrottle, optional): Límite de intentos compartido entre controladores.
+            sessions (SessionManager, optional): Tokens de sesión compartidos entre controladores.
+            occurrences (OccurrenceCache, optional): Ocurrencias expandidas compartidas entre controladores.
+            list_cache (ListCache, optional): Listas serializadas compartidas entre controladores.
+            seed (bool): Crear los usuarios y tareas demo si faltan. main.py lo
+                desactiva y los crea en segundo plano (src/controllers/startup.py).
         """
         self.repository = Repository()
-        self.current_user = None
+        self.session: Optional[UserSession] = None
+        # Consultas a `usuarios` evitadas gracias a la sesión (métrica)
+        self.identity_queries_saved = 0
+        # Hash de contraseñas fuera del hilo llamador y límite de intentos por email
+        self.passwords = passwords or PasswordHasher()
+        self.throttle = throttle or LoginThrottle()
+        # Tokens de sesión: permiten que un mismo proceso atienda a varios usuarios
+        self.sessions = sessions or SessionManager()
+        # Series recurrentes ya expandidas por ventana
+        self.occurrences = occurrences if occurrences is not None else OccurrenceCache()
+        # Listas completas ya serializadas; el repositorio las descarta al escribir
+        self.list_cache = list_cache if list_cache is not None else ListCache()
+        self.repository.list_cache = self.list_cache
         # Seed de usuarios y tareas iniciales
-        self.repository.seed_initial_users()
-        self.repository.seed_initial_tasks()
+        if seed:
+            self.repository.seed_initial_users()
+            self.repository.seed_initial_tasks()
 
     # ==================== USUARIOS ====================
 
@@ -35,8 +161,7 @@ class TaskController:
         """
         if self.repository.get_user_by_email(email):
             return False, "El correo ya está en uso"
-        db_user = Usuario(nombre=username, email=email, contraseña=password, modoOscuro=False)
-        if self.repository.create_user(username, email, password):
+        if self.repository.create_user(username, email, self.passwords.hash(password)):
             return True, "Usuario registrado exitosamente"
         return False, "Error al registrar usuario"
 
@@ -52,19 +177,127 @@ class TaskController:
         Returns:
             Tuple[bool, str]: Éxito y mensaje de resultado.
         """
+        retry_after = self.throttle.retry_after(email)
+        if retry_after > 0:
+            return False, f"Demasiados intentos fallidos. Intenta de nuevo en {int(retry_after) + 1} s", None
         user = self.repository.get_user_by_email(email)
-        if not user:
-            return False, "Usuario no encontrado", None
-        if user.contraseña != password:
-            return False, "Contraseña incorrecta", None
-        self.current_user = user.email
+        # Sin usuario también se deriva un hash, para no delatar por el tiempo qué emails existen
+        stored = user.contraseña if user else self.passwords.dummy_hash()
+        if not self.passwords.verify(password, stored) or not user:
+            self.throttle.record_failure(email)
+            return False, INVALID_CREDENTIALS, None
+        self.throttle.reset(email)
+        # Contraseñas heredadas en texto plano o con otro costo se vuelven a guardar
+        if self.passwords.needs_rehash(user.contraseña):
+            self.repository.update_user(user.idUsuario, contraseña=self.passwords.hash(password))
+        self.session = UserSession.from_user(user)
+        self.sessions.open(self.repository, self.session)
         return True, "Inicio de sesión exitoso", {"email": user.email, "name": user.nombre}
 
+    def verify_password(self, password: str) -> bool:
+        """
+        Comprueba la contraseña del usuario autenticado.
+
+        Args:
+            password (str): Contraseña ingresada.
+
+        Returns:
+            bool: True si coincide.
+        """
+        user = self.get_current_user()
+        if not user or not password:
+            return False
+        return self.passwords.verify(password, user.contraseña)
+
     def logout(self):
         """
-        Cierra la sesión del usuario actual.
+        Cierra la sesión del usuario actual e invalida su token.
         """
-        self.current_user = None
+        if self.session is not None:
+            self.sessions.close(self.repository, self.session.token)
+        self.session = None
+
+    def resume_session(self, token: Optional[str]) -> bool:
+        """
+        Toma la sesión de un token emitido en login (una por llamada en modo servidor).
+
+        Args:
+            token (str): Token de sesión del cliente, o None.
+
+        Returns:
+            bool: True si el token corresponde a una sesión vigente.
+        """
+        self.session = self.sessions.resolve(self.repository, token)
+        return self.session is not None
+
+    @property
+    def current_user(self) -> Optional[str]:
+        """Email del usuario autenticado, o None si no hay sesión."""
+        return self.session.email if self.session else None
+
+    @current_user.setter
+    def current_user(self, email: Optional[str]) -> None:
+        # Asignar un email crea una sesión sin resolver: el ID se busca en el primer uso
+        if email is None:
+            self.session = None
+        elif self.session is None or self.session.email != email:
+            self.session = UserSession(email)
+
+    def get_current_user_id(self) -> Optional[int]:
+        """
+        Obtiene el ID del usuario autenticado usando la sesión.
+
+        Solo consulta la base de datos si la sesión aún no está resuelta.
+
+        Returns:
+            Optional[int]: ID del usuario o None si no hay sesión o no existe.
+        """
+        session = self.session
+        if session is None:
+            return None
+        if session.resolved:
+            return session.idUsuario
+        user = self.repository.get_user_by_email(session.email)
+        if not user:
+            return None
+        session.bind(user)
+        return session.idUsuario
+
+    def _current_user_id(self) -> Optional[int]:
+        """
+        ID del usuario para una operación del controlador.
+
+        Cuenta en `identity_queries_saved` la búsqueda por email que la
+        operación hacía antes de tener la sesión resuelta (una por operación).
+        """
+        if self.session is not None and self.session.resolved:
+            self.identity_queries_saved += 1
+        return self.get_current_user_id()
+
+    def get_current_user(self) -> Optional[Usuario]:
+        """
+        Obtiene el usuario autenticado completo por su ID (clave primaria).
+
+        Returns:
+            Optional[Usuario]: Usuario o None si no hay sesión.
+        """
+        user_id = self._current_user_id()
+        if user_id is None:
+            return None
+        return self.repository.get_user_by_id(user_id)
+
+    def refresh_session(self) -> None:
+        """
+        Vuelve a leer el perfil del usuario tras modificarlo (por ejemplo,
+        después de update_user). Si el usuario ya no existe, cierra la sesión.
+        """
+        if self.session is None or not self.session.resolved:
+            return
+        user = self.repository.get_user_by_id(self.session.idUsuario)
+        if user:
+            self.session.bind(user)
+        else:
+            self.session = None
 
     # ==================== TAREAS ====================
 
@@ -86,11 +319,31 @@ class TaskController:
         Returns:
             Tuple[bool, str]: Éxito y mensaje de resultado.
         """
+        success, message, _ = self.create_task_returning(name, description, start_date, end_date, priority, status)
+        return success, message
+
+    def create_task_returning(
+        self, name: str, description: str, start_date: datetime, end_date: datetime,
+        priority: str, status: str = 'todo', recurrence: Optional[str] = None
+    ) -> Tuple[bool, str, Optional[Tarea]]:
+        """
+        Igual que create_task, pero devuelve también la tarea creada.
+
+        Args:
+            recurrence (str, optional): Regla RRULE; la tarea se repite a partir de `end_date`.
+
+        Returns:
+            Tuple[bool, str, Optional[Tarea]]: Éxito, mensaje y tarea creada.
+        """
         if not self.current_user:
-            return False, "Usuario no autenticado"
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
-            return False, "Usuario no encontrado"
+            return False, "Usuario no autenticado", None
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", None
+        try:
+            rule = parse_rule(recurrence)
+        except ValueError as e:
+            return False, f"Regla de recurrencia inválida: {e}", None
         tarea = self.repository.create_task(
             titulo=name,
             descripcion=description,
@@ -99,33 +352,102 @@ class TaskController:
             estado=status,
             prioridad=priority,
             tipo='General',
-            idUsuario=user.idUsuario
+            idUsuario=user_id,
+            reglaRecurrencia=str(rule) if rule else None,
+            finRecurrencia=rule.last_date(end_date.date()) if rule else None
         )
         if tarea:
-            return True, "Tarea creada exitosamente"
-        return False, "Error al crear la tarea"
+            return True, "Tarea creada exitosamente", tarea
+        return False, "Error al crear la tarea", None
 
     # Read
-    def get_tasks(self, filter_completed: bool = False) -> List[Tarea]:
+    def get_tasks(self, filter_completed: bool = False, columns: Optional[Sequence] = None) -> List[Tarea]:
         """
         Obtiene todas las tareas del usuario actual.
 
         Args:
             filter_completed (bool, optional): Si True, filtra tareas completadas.
                                                Actualmente no usado. Defaults to False.
+            columns (Sequence, optional): Columnas de Tarea a seleccionar; con
+                ellas se devuelven tuplas (en orden de ID) en vez de objetos Tarea.
 
         Returns:
             List[Task]: Lista de tareas.
         """
         if not self.current_user:
             return []
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
             return []
-        tareas = self.repository.get_tasks_by_user(user.idUsuario)
         if filter_completed:
-            return [t for t in tareas if t.estado != 'completed']
-        return tareas
+            return self.repository.query_tasks(user_id, excluir_estados=['completed'], limite=None, columnas=columns)
+        if columns:
+            return self.repository.query_tasks(user_id, orden='id', limite=None, columnas=columns)
+        return self.repository.get_tasks_by_user(user_id)
+
+    def get_tasks_page(
+        self, status: Optional[List[str]] = None, priority: Optional[List[str]] = None,
+        due_from: Optional[datetime] = None, due_to: Optional[datetime] = None,
+        sort: str = 'end_date', descending: bool = False, cursor: Optional[str] = None, limit: int = 50,
+        columns: Optional[Sequence] = None
+    ) -> Tuple[bool, str, dict]:
+        """
+        Obtiene una página de tareas del usuario actual, filtrada y ordenada en SQL.
+
+        Args:
+            status (List[str], optional): Estados a incluir (new, progress, completed).
+            priority (List[str], optional): Prioridades a incluir.
+            due_from (datetime, optional): Vencimiento mínimo.
+            due_to (datetime, optional): Vencimiento máximo.
+            sort (str): Clave de orden (end_date, start_date, completed_at, priority, name, id).
+            descending (bool): Orden descendente.
+            cursor (str, optional): `next_cursor` de la página anterior.
+            limit (int): Tareas por página (máximo MAX_PAGE_SIZE).
+            columns (Sequence, optional): Columnas de Tarea a seleccionar; con
+                ellas `tasks` son tuplas en vez de objetos Tarea. Deben incluir
+                idTarea y la columna de orden, que forman el cursor.
+
+        Returns:
+            Tuple[bool, str, dict]: Éxito, mensaje y página con `tasks`,
+            `next_cursor` (None en la última página) y `total` (solo en la
+            primera página).
+        """
+        if not self.current_user:
+            return False, "Usuario no autenticado", {}
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", {}
+        if sort not in TASK_SORT_COLUMNS:
+            return False, f"Orden no válido: {sort}", {}
+        try:
+            after = decode_cursor(sort, cursor) if cursor else None
+        except ValueError as e:
+            return False, str(e), {}
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        filters = dict(estados=status, prioridades=priority, desde=due_from, hasta=due_to)
+        # Se pide una fila de más para saber si hay otra página
+        tareas = self.repository.query_tasks(user_id, orden=sort, descendente=descending,
+                                             despues=after, limite=limit + 1, columnas=columns, **filters)
+        page = {"tasks": tareas[:limit], "next_cursor": None, "total": None}
+        if len(tareas) > limit:
+            page["next_cursor"] = encode_cursor(sort, tareas[limit - 1])
+        if after is None:
+            page["total"] = self.repository.count_tasks(user_id, **filters)
+        return True, "OK", page
+
+    def get_stats(self) -> Optional[dict]:
+        """
+        Obtiene las estadísticas de tareas del usuario actual sin recorrer sus tareas.
+
+        Returns:
+            Optional[dict]: `total`, `estados`, `prioridades` y `vencidas`, o None sin sesión.
+        """
+        if not self.current_user:
+            return None
+        user_id = self._current_user_id()
+        if user_id is None:
+            return None
+        return self.repository.get_task_stats(user_id)
 
     def get_task_by_id(self, task_id: int) -> Optional[Tarea]:
         """
@@ -139,14 +461,31 @@ class TaskController:
         """
         if not self.current_user:
             return None
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
             return None
-        return self.repository.db.query(Tarea).filter_by(idTarea=task_id, idUsuario=user.idUsuario).first()
+        return self.repository.get_user_task(task_id, user_id)
 
     def get_user_tasks(self, *args, **kwargs):
         return self.get_tasks(*args, **kwargs)
 
+    def get_tasks_by_ids(self, task_ids: List[int]) -> List[Tarea]:
+        """
+        Obtiene varias tareas del usuario autenticado en una sola consulta.
+
+        Args:
+            task_ids (List[int]): IDs de las tareas.
+
+        Returns:
+            List[Tarea]: Tareas encontradas (las ajenas o inexistentes se omiten).
+        """
+        if not self.current_user or not task_ids:
+            return []
+        user_id = self._current_user_id()
+        if user_id is None:
+            return []
+        return self.repository.get_tasks_by_ids(task_ids, user_id)
+
     # Update
     def update_task(
         self, task_id: int, name: str, description: str, start_date: datetime,
@@ -168,19 +507,14 @@ class TaskController:
         """
         if not self.current_user:
             return False, "Usuario no autenticado"
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
             return False, "Usuario no encontrado"
-        tarea = self.repository.db.query(Tarea).filter_by(idTarea=task_id, idUsuario=user.idUsuario).first()
-        if not tarea:
+        if not self.repository.update_task(
+            task_id, user_id, titulo=name, descripcion=description, fechaCreacion=start_date,
+            fechaVencimiento=end_date, prioridad=priority, estado=status
+        ):
             return False, "Tarea no encontrada"
-        tarea.titulo = name
-        tarea.descripcion = description
-        tarea.fechaCreacion = start_date
-        tarea.fechaVencimiento = end_date
-        tarea.prioridad = priority
-        tarea.estado = status
-        self.repository.db.commit()
         return True, "Tarea actualizada exitosamente"
 
     def complete_task(self, task_id: int) -> Tuple[bool, str]:
@@ -195,15 +529,12 @@ class TaskController:
         """
         if not self.current_user:
             return False, "Usuario no autenticado"
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
             return False, "Usuario no encontrado"
-        tarea = self.repository.db.query(Tarea).filter_by(idTarea=task_id, idUsuario=user.idUsuario).first()
-        if not tarea:
+        now = datetime.now()
+        if not self.repository.update_task(task_id, user_id, estado='completed', fechaVencimiento=now, fechaCompletado=now):
             return False, "Tarea no encontrada"
-        tarea.estado = 'completed'
-        tarea.fechaVencimiento = datetime.now()
-        self.repository.db.commit()
         return True, "Tarea completada exitosamente"
 
     # Delete
@@ -219,56 +550,412 @@ class TaskController:
         """
         if not self.current_user:
             return False, "Usuario no autenticado"
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
             return False, "Usuario no encontrado"
-        if self.repository.delete_task(task_id, user.idUsuario):
+        if self.repository.delete_task(task_id, user_id):
+            self.occurrences.invalidate(TASK, task_id)
             return True, "Tarea eliminada exitosamente"
         return False, "Error al eliminar la tarea"
 
+    # Operaciones masivas
+    def bulk_create_tasks(self, tasks: List[dict]) -> Tuple[bool, str, List[int]]:
+        """
+        Crea varias tareas en una sola transacción.
+
+        Args:
+            tasks (List[dict]): Cada dict con name, description, start_date,
+                end_date, priority y opcionalmente status.
+
+        Returns:
+            Tuple[bool, str, List[int]]: Éxito, mensaje e IDs creados en orden.
+        """
+        if not self.current_user:
+            return False, "Usuario no autenticado", []
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", []
+        rows = []
+        for task in tasks:
+            row = {column: task.get(field) for field, column in TASK_FIELD_MAP.items()}
+            row['estado'] = row['estado'] or 'todo'
+            rows.append(row)
+        ids = self.repository.bulk_create_tasks(user_id, rows)
+        if len(ids) != len(rows):
+            return False, "Error al crear las tareas", []
+        return True, f"{len(ids)} tareas creadas", ids
+
+    def bulk_update_tasks(self, updates: List[dict]) -> Tuple[bool, str, List[int]]:
+        """
+        Actualiza varias tareas en una sola transacción.
+
+        Args:
+            updates (List[dict]): Cada dict con task_id y los campos a cambiar
+                (name, description, start_date, end_date, priority, status).
+
+        Returns:
+            Tuple[bool, str, List[int]]: Éxito, mensaje e IDs actualizados.
+        """
+        if not self.current_user:
+            return False, "Usuario no autenticado", []
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", []
+        cambios = []
+        for item in updates:
+            cambio = {'idTarea': item['task_id']}
+            cambio.update({TASK_FIELD_MAP[k]: v for k, v in item.items() if k in TASK_FIELD_MAP})
+            cambios.append(cambio)
+        ids = self.repository.bulk_update_tasks(user_id, cambios)
+        return True, f"{len(ids)} tareas actualizadas", ids
+
+    def bulk_complete_tasks(self, task_ids: List[int]) -> Tuple[bool, str, List[int]]:
+        """
+        Marca varias tareas como completadas (igual que complete_task).
+
+        Returns:
+            Tuple[bool, str, List[int]]: Éxito, mensaje e IDs completados.
+        """
+        now = datetime.now()
+        return self.bulk_update_tasks([
+            {'task_id': task_id, 'status': 'completed', 'end_date': now} for task_id in task_ids
+        ])
+
+    def bulk_delete_tasks(self, task_ids: List[int]) -> Tuple[bool, str, List[int]]:
+        """
+        Elimina varias tareas del usuario autenticado en una sola transacción.
+
+        Returns:
+            Tuple[bool, str, List[int]]: Éxito, mensaje e IDs eliminados.
+        """
+        if not self.current_user:
+            return False, "Usuario no autenticado", []
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", []
+        ids = self.repository.bulk_delete_tasks(task_ids, user_id)
+        for task_id in ids:
+            self.occurrences.invalidate(TASK, task_id)
+        return True, f"{len(ids)} tareas eliminadas", ids
+
     # Limpieza
-    def cleanup_completed_tasks(self):
-        """Elimina tareas completadas hace más de X días."""
-        self.repository.cleanup_completed_tasks()
+    def cleanup_completed_tasks(self, default_days: Optional[int] = None) -> dict:
+        """
+        Elimina tareas completadas hace más días que la retención configurada.
+
+        Con sesión iniciada limpia solo las tareas del usuario actual; sin
+        sesión recorre todos los usuarios.
+
+        Args:
+            default_days (int, optional): Retención para usuarios sin valor propio.
+
+        Returns:
+            dict: Reporte con `removed` (tareas eliminadas), `deleted` (IDs por usuario) y `seconds`.
+        """
+        user_id = self._current_user_id() if self.current_user else None
+        return run_retention(self.repository, default_days=default_days, idUsuario=user_id)
+
+    def archive_completed_tasks(self, delay_days: Optional[float] = None) -> dict:
+        """
+        Mueve al archivo las tareas completadas hace más de `delay_days` días.
+
+        Returns:
+            dict: Reporte con `archived` (IDs por usuario) y `seconds`.
+        """
+        return run_archive(self.repository, delay_days=delay_days)
+
+    def get_archived_tasks(self, page: int = 1, page_size: int = 50) -> Tuple[List[TareaArchivo], int]:
+        """
+        Obtiene una página del historial de tareas archivadas del usuario actual.
+
+        Args:
+            page (int): Número de página, empezando en 1.
+            page_size (int): Tareas por página.
+
+        Returns:
+            Tuple[List[TareaArchivo], int]: Tareas de la página y total archivado.
+        """
+        if not self.current_user:
+            return [], 0
+        user_id = self._current_user_id()
+        if user_id is None:
+            return [], 0
+        page = max(1, int(page))
+        page_size = max(1, min(int(page_size), 200))
+        tasks = self.repository.get_archived_tasks(user_id, offset=(page - 1) * page_size, limit=page_size)
+        return tasks, self.repository.count_archived_tasks(user_id)
+
+    # Búsqueda
+    def search(self, query: str, scope: str = 'all', page: int = 1, page_size: int = 20) -> Tuple[bool, str, dict]:
+        """
+        Busca en tareas y/o eventos del usuario actual, ordenando por relevancia.
+
+        Args:
+            query (str): Texto a buscar.
+            scope (str): 'tasks', 'events' o 'all'.
+            page (int): Número de página, empezando en 1.
+            page_size (int): Resultados por página y por tipo.
+
+        Returns:
+            Tuple[bool, str, dict]: Éxito, mensaje y resultados con `tasks`,
+            `events` y sus totales (`tasks_total`, `events_total`).
+        """
+        if not self.current_user:
+            return False, "Usuario no autenticado", {}
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", {}
+        if scope not in ('tasks', 'events', 'all'):
+            return False, f"Ámbito de búsqueda no válido: {scope}", {}
+        page = max(1, int(page))
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        offset = (page - 1) * page_size
+        results = {"tasks": [], "tasks_total": 0, "events": [], "events_total": 0}
+        if scope in ('tasks', 'all'):
+            results["tasks"], results["tasks_total"] = self.repository.search_tasks(user_id, query, offset, page_size)
+        if scope in ('events', 'all'):
+            results["events"], results["events_total"] = self.repository.search_events(user_id, query, offset, page_size)
+        return True, "OK", results
+
+    def set_retention_days(self, days: Optional[int]) -> Tuple[bool, str]:
+        """
+        Configura cuántos días se conservan las tareas completadas del usuario.
+
+        Args:
+            days (int, optional): Días de retención; None usa el valor por
+                defecto y 0 o negativo desactiva la limpieza.
+
+        Returns:
+            Tuple[bool, str]: Éxito y mensaje de resultado.
+        """
+        if not self.current_user:
+            return False, "Usuario no autenticado"
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado"
+        if self.repository.update_user(user_id, diasRetencion=days):
+            return True, "Retención actualizada"
+        return False, "Error al actualizar la retención"
 
     # ==================== EVENTOS ====================
 
     # Create
     def create_event(self, title, description, date, time, priority):
+        success, message, _ = self.create_event_returning(title, description, date, time, priority)
+        return success, message
+
+    def create_event_returning(self, title, description, date, time, priority,
+                               recurrence: Optional[str] = None) -> Tuple[bool, str, Optional[Event]]:
+        """
+        Crea un evento para el usuario autenticado y lo devuelve.
+
+        Args:
+            date (str | date): Día del evento ('YYYY-MM-DD'); primera ocurrencia si se repite.
+            time (str | time | None): Hora ('HH:MM'); vacía = todo el día.
+            recurrence (str, optional): Regla RRULE (p. ej. 'FREQ=WEEKLY;BYDAY=MO').
+
+        Returns:
+            Tuple[bool, str, Optional[Event]]: Éxito, mensaje y evento creado.
+        """
         if not self.current_user:
-            return False, "Usuario no autenticado"
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
-            return False, "Usuario no encontrado"
+            return False, "Usuario no autenticado", None
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False, "Usuario no encontrado", None
+        try:
+            fecha, hora = parse_event_date(date), parse_event_time(time)
+        except (TypeError, ValueError):
+            return False, "Fecha u hora inválida", None
+        try:
+            rule = parse_rule(recurrence)
+        except ValueError as e:
+            return False, f"Regla de recurrencia inválida: {e}", None
         event = Event(
             titulo=title,
             descripcion=description,
-            fecha=date,
-            hora=time,
+            fecha=fecha,
+            hora=hora,
             prioridad=priority,
-            idUsuario=user.idUsuario
+            idUsuario=user_id,
+            reglaRecurrencia=str(rule) if rule else None,
+            finRecurrencia=rule.last_date(fecha) if rule else None
         )
         if self.repository.save_event(event):
-            return True, "Evento creado exitosamente"
-        return False, "Error al crear evento"
+            return True, "Evento creado exitosamente", event
+        return False, "Error al crear evento", None
 
     # Read
     def get_user_events(self):
         if not self.current_user:
             return []
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
+            return []
+        return self.repository.get_user_events(user_id)
+
+    def get_events_in_range(self, start, end) -> List[Event]:
+        """
+        Obtiene los eventos del usuario actual entre dos días (ambos incluidos),
+        p. ej. las semanas visibles de un mes del calendario.
+
+        Args:
+            start (str | date): Primer día ('YYYY-MM-DD').
+            end (str | date): Último día ('YYYY-MM-DD').
+
+        Returns:
+            List[Event]: Eventos ordenados por fecha y hora (vacía si el rango no es válido).
+        """
+        if not self.current_user:
+            return []
+        user_id = self._current_user_id()
+        if user_id is None:
+            return []
+        try:
+            desde, hasta = parse_event_date(start), parse_event_date(end)
+        except (TypeError, ValueError):
+            return []
+        if desde > hasta:
+            return []
+        events = self.repository.get_events_in_range(user_id, desde, hasta)
+        series = self.repository.get_recurring_events(user_id, desde, hasta)
+        if series:
+            exceptions = self.repository.get_recurrence_exceptions(EVENT, [e.idEvento for e in series], desde, hasta)
+            events += [event_occurrence(parent, day, override) for parent, day, override
+                       in expand_series(EVENT, series, exceptions, desde, hasta, self.occurrences)]
+            events.sort(key=occurrence_sort_key)
+        return events
+
+    def get_task_occurrences(self, start, end) -> List[Tarea]:
+        """
+        Obtiene las tareas del usuario actual que vencen entre dos días, con
+        las series recurrentes expandidas en una tarea por ocurrencia.
+
+        Args:
+            start (str | date): Primer día ('YYYY-MM-DD').
+            end (str | date): Último día ('YYYY-MM-DD').
+
+        Returns:
+            List[Tarea]: Tareas ordenadas por vencimiento (vacía si el rango no es válido).
+        """
+        if not self.current_user:
+            return []
+        user_id = self._current_user_id()
+        if user_id is None:
+            return []
+        try:
+            desde, hasta = parse_event_date(start), parse_event_date(end)
+        except (TypeError, ValueError):
+            return []
+        if desde > hasta:
             return []
-        return self.repository.get_user_events(user.idUsuario)
+        tasks = [t for t in self.repository.query_tasks(
+            user_id, desde=datetime.combine(desde, datetime.min.time()),
+            hasta=datetime.combine(hasta, datetime.max.time()), limite=None
+        ) if not t.reglaRecurrencia]
+        series = self.repository.get_recurring_tasks(user_id, desde, hasta)
+        if series:
+            exceptions = self.repository.get_recurrence_exceptions(TASK, [t.idTarea for t in series], desde, hasta)
+            tasks += [task_occurrence(parent, day, override) for parent, day, override
+                      in expand_series(TASK, series, exceptions, desde, hasta, self.occurrences)]
+        tasks.sort(key=occurrence_sort_key)
+        return tasks
+
+    def set_recurrence(self, kind: str, item_id: int, recurrence: Optional[str]) -> Tuple[bool, str]:
+        """
+        Cambia (o quita, con una regla vacía) la regla de una tarea o evento.
+
+        Args:
+            kind (str): 'event' o 'task'.
+            item_id (int): ID del evento o tarea.
+            recurrence (str): Regla RRULE; vacía = deja de repetirse.
+
+        Returns:
+            Tuple[bool, str]: Éxito y mensaje de resultado.
+        """
+        user_id, parent, error = self._recurrence_target(kind, item_id, require_rule=False)
+        if error:
+            return False, error
+        try:
+            rule = parse_rule(recurrence)
+        except ValueError as e:
+            return False, f"Regla de recurrencia inválida: {e}"
+        entidad = RECURRENCE_KINDS[kind]
+        fin = rule.last_date(anchor_of(parent)) if rule else None
+        update = self.repository.update_event if entidad == EVENT else self.repository.update_task
+        if not update(item_id, user_id, reglaRecurrencia=str(rule) if rule else None, finRecurrencia=fin):
+            return False, "Error al actualizar la recurrencia"
+        self.occurrences.invalidate(entidad, item_id)
+        return True, "Recurrencia actualizada"
+
+    def edit_occurrence(self, kind: str, item_id: int, occurrence, cancel: bool = False,
+                        **changes) -> Tuple[bool, str]:
+        """
+        Modifica o cancela una sola ocurrencia de una serie.
+
+        Args:
+            kind (str): 'event' o 'task'.
+            item_id (int): ID de la serie.
+            occurrence (str | date): Fecha original de la ocurrencia ('YYYY-MM-DD').
+            cancel (bool): True para eliminar solo esta ocurrencia.
+            **changes: title, description, date, time, priority o status propios de la ocurrencia.
+
+        Returns:
+            Tuple[bool, str]: Éxito y mensaje de resultado.
+        """
+        _, parent, error = self._recurrence_target(kind, item_id, require_rule=True)
+        if error:
+            return False, error
+        try:
+            day = parse_event_date(occurrence)
+            values = {'cancelada': bool(cancel)}
+            for field, column in (('title', 'titulo'), ('description', 'descripcion'),
+                                  ('priority', 'prioridad'), ('status', 'estado')):
+                if changes.get(field) is not None:
+                    values[column] = changes[field]
+            if changes.get('date'):
+                values['fecha'] = parse_event_date(changes['date'])
+            if changes.get('time'):
+                values['hora'] = parse_event_time(changes['time'])
+        except (TypeError, ValueError):
+            return False, "Fecha u hora inválida"
+        if not parse_rule(parent.reglaRecurrencia).includes(anchor_of(parent), day):
+            return False, "La fecha no corresponde a una ocurrencia de la serie"
+        if values.get('estado') in COMPLETED_STATES:
+            values['fechaCompletado'] = datetime.now()
+        elif 'estado' in values:
+            values['fechaCompletado'] = None
+        if not self.repository.save_recurrence_exception(RECURRENCE_KINDS[kind], item_id, day, **values):
+            return False, "Error al guardar la ocurrencia"
+        return True, "Ocurrencia eliminada" if cancel else "Ocurrencia actualizada"
+
+    def _recurrence_target(self, kind: str, item_id: int, require_rule: bool):
+        """(user_id, serie, mensaje de error) para operar sobre la recurrencia de un elemento."""
+        if not self.current_user:
+            return None, None, "Usuario no autenticado"
+        user_id = self._current_user_id()
+        if user_id is None:
+            return None, None, "Usuario no encontrado"
+        if kind not in RECURRENCE_KINDS:
+            return user_id, None, "Tipo inválido (event o task)"
+        if RECURRENCE_KINDS[kind] == EVENT:
+            parent = self.repository.get_user_event(item_id, user_id)
+        else:
+            parent = self.repository.get_user_task(item_id, user_id)
+        if parent is None or anchor_of(parent) is None:
+            return user_id, None, "Elemento no encontrado"
+        if require_rule and not parent.reglaRecurrencia:
+            return user_id, None, "El elemento no se repite"
+        return user_id, parent, None
 
     # Delete
     def delete_event(self, event_id):
         if not self.current_user:
             return False, "Usuario no autenticado"
-        user = self.repository.get_user_by_email(self.current_user)
-        if not user:
+        user_id = self._current_user_id()
+        if user_id is None:
             return False, "Usuario no encontrado"
-        if self.repository.delete_event(event_id, user.idUsuario):
+        if self.repository.delete_event(event_id, user_id):
+            self.occurrences.invalidate(EVENT, event_id)
             return True, "Evento eliminado exitosamente"
         return False, "Error al eliminar evento"
 
@@ -0,0 +1,460 @@
+"""
+Repositorio asíncrono (SQLAlchemy asyncio + aiosqlite).
+
+Ofrece las mismas operaciones de usuarios, sesiones, tareas y eventos que
+Repository, pero como corrutinas: mientras una consulta espera a la base de
+datos, el bucle de eventos atiende otras peticiones en lugar de bloquear un
+hilo. Requiere `aiosqlite` (y `greenlet`, que SQLAlchemy usa internamente).
+"""
+
+import functools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .db import DATABASE_URL, install_sqlite_pragmas
+from .repository import (
+    BULK_CHUNK_SIZE, TASK_SORT_COLUMNS, COMPLETED_STATES, Repository, completion_changes, events_between,
+    exceptions_between, series_between
+)
+from src.models.models import Usuario, Tarea, TareaArchivo, Event, ExcepcionRecurrencia, Sesion
+
+# Sesión abierta por cada AsyncRepository en la tarea asyncio actual
+_current_sessions: ContextVar[Dict[int, AsyncSession]] = ContextVar("async_repository_sessions", default={})
+
+# Driver síncrono -> driver asyncio equivalente
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+_default_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def to_async_url(url: str) -> str:
+    """Cambia el driver de una URL síncrona por su equivalente asyncio (sqlite -> aiosqlite)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+def create_async_db_engine(url: str = DATABASE_URL, profile: Optional[str] = None,
+                           config_path: Optional[str] = None, **kwargs) -> AsyncEngine:
+    """
+    Crea el motor asíncrono aplicando el mismo perfil de PRAGMAs que create_db_engine.
+
+    Args:
+        url (str): URL de la base de datos (síncrona o asyncio).
+        profile (str, optional): Perfil de SQLite a usar.
+        config_path (str, optional): Archivo de configuración INI.
+        **kwargs: Argumentos adicionales para create_async_engine.
+
+    Returns:
+        AsyncEngine: Motor configurado.
+    """
+    kwargs.setdefault("echo", False)
+    engine = create_async_engine(to_async_url(url), **kwargs)
+    install_sqlite_pragmas(engine.sync_engine, profile, config_path)
+    return engine
+
+
+def default_async_sessionmaker() -> async_sessionmaker:
+    """Fábrica de sesiones sobre la base de datos de la aplicación (se crea en el primer uso)."""
+    global _default_sessionmaker
+    if _default_sessionmaker is None:
+        _default_sessionmaker = async_sessionmaker(create_async_db_engine(), expire_on_commit=False)
+    return _default_sessionmaker
+
+
+def _unit_of_work(method):
+    """Ejecuta la corrutina dentro de una unidad de trabajo (reutiliza la que esté abierta)."""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self.unit_of_work():
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class AsyncRepository:
+    """
+    CRUD asíncrono para usuarios, sesiones, tareas y eventos.
+
+    Como Repository, cada operación usa su propia sesión y `unit_of_work()`
+    agrupa varias en una. La sesión actual se guarda en una ContextVar, así
+    que cada tarea asyncio tiene la suya aunque compartan el repositorio.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        """
+        Args:
+            session_factory (async_sessionmaker, optional): Crea las sesiones.
+                Defaults to default_async_sessionmaker().
+        """
+        self.session_factory = session_factory or default_async_sessionmaker()
+
+    @property
+    def db(self) -> AsyncSession:
+        """Sesión de la unidad de trabajo actual."""
+        session = _current_sessions.get().get(id(self))
+        if session is None:
+            raise RuntimeError("AsyncRepository.db solo está disponible dentro de unit_of_work()")
+        return session
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[AsyncSession]:
+        """
+        Agrupa operaciones en una sola sesión que se cierra al salir.
+
+        Yields:
+            AsyncSession: Sesión de la unidad de trabajo.
+        """
+        current = _current_sessions.get()
+        session = current.get(id(self))
+        if session is not None:
+            yield session
+            return
+        session = self.session_factory()
+        token = _current_sessions.set({**current, id(self): session})
+        try:
+            yield session
+        finally:
+            _current_sessions.reset(token)
+            await session.close()
+
+    # ==== USUARIOS ====
+    @_unit_of_work
+    async def create_user(self, nombre: str, email: str, contraseña: str, modoOscuro: bool = False) -> Optional[Usuario]:
+        try:
+            user = Usuario(nombre=nombre, email=email, contraseña=contraseña, modoOscuro=modoOscuro)
+            self.db.add(user)
+            await self.db.commit()
+            await self.db.refresh(user)
+            return user
+        except SQLAlchemyError as e:
+            print(f"Error al crear usuario: {e}")
+            await self.db.rollback()
+            return None
+
+    @_unit_of_work
+    async def get_user_by_email(self, email: str) -> Optional[Usuario]:
+        try:
+            return (await self.db.execute(select(Usuario).filter_by(email=email).limit(1))).scalars().first()
+        except SQLAlchemyError as e:
+            print(f"Error al obtener usuario por email: {e}")
+            return None
+
+    @_unit_of_work
+    async def get_user_by_id(self, idUsuario: int) -> Optional[Usuario]:
+        try:
+            return await self.db.get(Usuario, idUsuario)
+        except SQLAlchemyError as e:
+            print(f"Error al obtener usuario por id: {e}")
+            return None
+
+    @_unit_of_work
+    async def update_user(self, idUsuario: int, **kwargs) -> bool:
+        try:
+            user = await self.db.get(Usuario, idUsuario)
+            if not user:
+                return False
+            for key, value in kwargs.items():
+                if hasattr(user, key):
+                    setattr(user, key, value)
+            await self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al actualizar usuario: {e}")
+            await self.db.rollback()
+            return False
+
+    @_unit_of_work
+    async def delete_user(self, idUsuario: int) -> bool:
+        try:
+            user = await self.db.get(Usuario, idUsuario)
+            if not user:
+                return False
+            # Con foreign_keys=ON hay que borrar primero lo que referencia al usuario
+            for entidad, model, key in ((ExcepcionRecurrencia.TAREA, Tarea, Tarea.idTarea),
+                                        (ExcepcionRecurrencia.EVENTO, Event, Event.idEvento)):
+                await self.db.execute(delete(ExcepcionRecurrencia).where(
+                    ExcepcionRecurrencia.entidad == entidad,
+                    ExcepcionRecurrencia.idPadre.in_(select(key).where(model.idUsuario == idUsuario))
+                ))
+            for model in (Tarea, TareaArchivo, Event, Sesion):
+                await self.db.execute(delete(model).where(model.idUsuario == idUsuario))
+            await self.db.delete(user)
+            await self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar usuario: {e}")
+            await self.db.rollback()
+            return False
+
+    # ==== SESIONES ====
+    @_unit_of_work
+    async def create_session(self, token: str, idUsuario: int, fechaExpiracion: datetime) -> bool:
+        try:
+            self.db.add(Sesion(token=token, idUsuario=idUsuario, fechaExpiracion=fechaExpiracion))
+            await self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al crear sesión: {e}")
+            await self.db.rollback()
+            return False
+
+    @_unit_of_work
+    async def get_session_user(self, token: str, now: Optional[datetime] = None) -> Optional[Tuple[Sesion, Usuario]]:
+        now = now or datetime.utcnow()
+        try:
+            row = (await self.db.execute(
+                select(Sesion, Usuario)
+                .join(Usuario, Usuario.idUsuario == Sesion.idUsuario)
+                .where(Sesion.token == token, Sesion.fechaExpiracion > now)
+            )).first()
+            return tuple(row) if row else None
+        except SQLAlchemyError as e:
+            print(f"Error al obtener sesión: {e}")
+            return None
+
+    @_unit_of_work
+    async def delete_session(self, token: str) -> bool:
+        try:
+            deleted = (await self.db.execute(delete(Sesion).where(Sesion.token == token))).rowcount
+            await self.db.commit()
+            return deleted > 0
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar sesión: {e}")
+            await self.db.rollback()
+            return False
+
+    # ==== TAREAS ====
+    @_unit_of_work
+    async def create_task(self, titulo: str, descripcion: str, fechaCreacion: datetime, fechaVencimiento: datetime,
+                          estado: str, prioridad: str, tipo: str, idUsuario: int, idGrupo: Optional[int] = None,
+                          idTipoTarea: Optional[int] = None) -> Optional[Tarea]:
+        try:
+            tarea = Tarea(
+                titulo=titulo,
+                descripcion=descripcion,
+                fechaCreacion=fechaCreacion,
+                fechaVencimiento=fechaVencimiento,
+                estado=estado,
+                prioridad=prioridad,
+                tipo=tipo,
+                idUsuario=idUsuario,
+                idGrupo=idGrupo,
+                idTipoTarea=idTipoTarea,
+                fechaCompletado=datetime.now() if estado in COMPLETED_STATES else None
+            )
+            self.db.add(tarea)
+            await self.db.commit()
+            await self.db.refresh(tarea)
+            return tarea
+        except SQLAlchemyError as e:
+            print(f"Error al crear tarea: {e}")
+            await self.db.rollback()
+            return None
+
+    @_unit_of_work
+    async def get_task_by_id(self, idTarea: int) -> Optional[Tarea]:
+        try:
+            return await self.db.get(Tarea, idTarea)
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tarea por id: {e}")
+            return None
+
+    @_unit_of_work
+    async def get_user_task(self, idTarea: int, idUsuario: int) -> Optional[Tarea]:
+        try:
+            return (await self.db.execute(
+                select(Tarea).filter_by(idTarea=idTarea, idUsuario=idUsuario)
+            )).scalars().first()
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tarea del usuario: {e}")
+            return None
+
+    @_unit_of_work
+    async def get_tasks_by_user(self, idUsuario: int) -> List[Tarea]:
+        try:
+            return list((await self.db.execute(select(Tarea).filter_by(idUsuario=idUsuario))).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tareas de usuario: {e}")
+            return []
+
+    @_unit_of_work
+    async def query_tasks(self, idUsuario: int, estados: Optional[Sequence[str]] = None,
+                          excluir_estados: Optional[Sequence[str]] = None, prioridades: Optional[Sequence[str]] = None,
+                          desde: Optional[datetime] = None, hasta: Optional[datetime] = None,
+                          orden: str = 'end_date', descendente: bool = False,
+                          despues: Optional[Tuple[Any, int]] = None, limite: Optional[int] = 50) -> List[Tarea]:
+        """Igual que Repository.query_tasks (filtros, orden y paginación por cursor)."""
+        try:
+            stmt = select(Tarea).where(Tarea.idUsuario == idUsuario)
+            stmt = Repository._filter_tasks(stmt, estados, excluir_estados, prioridades, desde, hasta)
+            column = getattr(Tarea, TASK_SORT_COLUMNS.get(orden, 'fechaVencimiento'))
+            if despues is not None:
+                stmt = stmt.where(Repository._after_cursor(column, despues, descendente))
+            if descendente:
+                stmt = stmt.order_by(column.desc(), Tarea.idTarea.desc())
+            else:
+                stmt = stmt.order_by(column.asc(), Tarea.idTarea.asc())
+            if limite is not None:
+                stmt = stmt.limit(limite)
+            return list((await self.db.execute(stmt)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al consultar tareas: {e}")
+            return []
+
+    @_unit_of_work
+    async def count_tasks(self, idUsuario: int, estados: Optional[Sequence[str]] = None,
+                          excluir_estados: Optional[Sequence[str]] = None, prioridades: Optional[Sequence[str]] = None,
+                          desde: Optional[datetime] = None, hasta: Optional[datetime] = None) -> int:
+        try:
+            stmt = select(func.count(Tarea.idTarea)).where(Tarea.idUsuario == idUsuario)
+            stmt = Repository._filter_tasks(stmt, estados, excluir_estados, prioridades, desde, hasta)
+            return (await self.db.execute(stmt)).scalar()
+        except SQLAlchemyError as e:
+            print(f"Error al contar tareas: {e}")
+            return 0
+
+    @_unit_of_work
+    async def get_tasks_by_ids(self, ids: List[int], idUsuario: int) -> List[Tarea]:
+        if not ids:
+            return []
+        try:
+            return list((await self.db.execute(
+                select(Tarea).where(Tarea.idUsuario == idUsuario, Tarea.idTarea.in_(ids))
+            )).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tareas por id: {e}")
+            return []
+
+    @_unit_of_work
+    async def update_task(self, idTarea: int, idUsuario: int, **kwargs) -> bool:
+        try:
+            tarea = await self.get_user_task(idTarea, idUsuario)
+            if not tarea:
+                return False
+            for key, value in completion_changes(tarea, kwargs).items():
+                if hasattr(tarea, key):
+                    setattr(tarea, key, value)
+            await self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al actualizar tarea: {e}")
+            await self.db.rollback()
+            return False
+
+    @_unit_of_work
+    async def delete_task(self, idTarea: int, idUsuario: int) -> bool:
+        try:
+            deleted = (await self.db.execute(
+                delete(Tarea).where(Tarea.idTarea == idTarea, Tarea.idUsuario == idUsuario)
+            )).rowcount
+            if deleted:
+                await self._delete_exceptions(ExcepcionRecurrencia.TAREA, [idTarea])
+            await self.db.commit()
+            return deleted > 0
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar tarea: {e}")
+            await self.db.rollback()
+            return False
+
+    @_unit_of_work
+    async def bulk_delete_tasks(self, ids: List[int], idUsuario: int) -> List[int]:
+        """Elimina varias tareas del usuario en una sola transacción y devuelve los IDs borrados."""
+        if not ids:
+            return []
+        try:
+            deleted = []
+            for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                deleted.extend((await self.db.execute(
+                    delete(Tarea)
+                    .where(Tarea.idUsuario == idUsuario, Tarea.idTarea.in_(ids[start:start + BULK_CHUNK_SIZE]))
+                    .returning(Tarea.idTarea)
+                )).scalars())
+            if deleted:
+                await self._delete_exceptions(ExcepcionRecurrencia.TAREA, deleted)
+            await self.db.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar tareas en bloque: {e}")
+            await self.db.rollback()
+            return []
+
+    # ==== EVENTOS ====
+    @_unit_of_work
+    async def save_event(self, event: Event) -> bool:
+        try:
+            self.db.add(event)
+            await self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al guardar evento: {e}")
+            await self.db.rollback()
+            return False
+
+    @_unit_of_work
+    async def get_user_events(self, idUsuario: int) -> List[Event]:
+        try:
+            return list((await self.db.execute(events_between(idUsuario))).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener eventos: {e}")
+            return []
+
+    @_unit_of_work
+    async def get_events_in_range(self, idUsuario: int, desde: date, hasta: date) -> List[Event]:
+        """Eventos del usuario entre `desde` y `hasta` (ambos incluidos)."""
+        try:
+            return list((await self.db.execute(events_between(idUsuario, desde, hasta))).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener eventos por rango: {e}")
+            return []
+
+    @_unit_of_work
+    async def delete_event(self, idEvento: int, idUsuario: int) -> bool:
+        try:
+            deleted = (await self.db.execute(
+                delete(Event).where(Event.idEvento == idEvento, Event.idUsuario == idUsuario)
+            )).rowcount
+            if deleted:
+                await self._delete_exceptions(ExcepcionRecurrencia.EVENTO, [idEvento])
+            await self.db.commit()
+            return deleted > 0
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar evento: {e}")
+            await self.db.rollback()
+            return False
+
+    # ==== RECURRENCIA ====
+    @_unit_of_work
+    async def get_recurring_events(self, idUsuario: int, desde: date, hasta: date) -> List[Event]:
+        """Series de eventos del usuario que pueden tener ocurrencias en la ventana."""
+        try:
+            return list((await self.db.execute(series_between(Event, idUsuario, desde, hasta))).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener eventos recurrentes: {e}")
+            return []
+
+    @_unit_of_work
+    async def get_recurrence_exceptions(self, entidad: str, ids: List[int], desde: date,
+                                        hasta: date) -> List[ExcepcionRecurrencia]:
+        if not ids:
+            return []
+        try:
+            return list((await self.db.execute(exceptions_between(entidad, ids, desde, hasta))).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener excepciones de recurrencia: {e}")
+            return []
+
+    async def _delete_exceptions(self, entidad: str, ids: List[int]) -> None:
+        """Borra las excepciones de las series (dentro de la transacción del llamador)."""
+        await self.db.execute(delete(ExcepcionRecurrencia).where(
+            ExcepcionRecurrencia.entidad == entidad, ExcepcionRecurrencia.idPadre.in_(ids)
+        ))
@@ -1,26 +1,284 @@
-from sqlalchemy import create_engine
+import os
+import threading
+import time
+from configparser import ConfigParser
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from .instrumentation import query_metrics, query_metrics_enabled
+from .migrations import run_migrations
+
+# Otra base de datos (por ejemplo PostgreSQL) se elige con TODO_DATABASE_URL
+DATABASE_URL = os.environ.get("TODO_DATABASE_URL", "sqlite:///todo_app.db")
+
+# Variables de entorno y archivo de configuración para elegir el perfil de SQLite
+PROFILE_ENV_VAR = "TODO_DB_PROFILE"
+CONFIG_ENV_VAR = "TODO_DB_CONFIG"
+DEFAULT_CONFIG_FILE = "todo_app.ini"
+
+# PRAGMAs aplicados a cada conexión nueva según el perfil.
+# cache_size negativo = KiB; mmap_size en bytes; busy_timeout en ms.
+SQLITE_PROFILES: Dict[str, Dict[str, object]] = {
+    # Máxima durabilidad: fsync en cada commit
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    # WAL + synchronous=NORMAL: no se corrompe ante caídas, puede perder el último commit
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    # Sin fsync: para pruebas, importaciones masivas o datos desechables
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 2000,
+        "foreign_keys": "ON",
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+# Pool de conexiones: variable de entorno, clave de [database] y valor por defecto.
+# SQLite en WAL admite muchos lectores y un escritor; las conexiones sobrantes
+# solo esperan el bloqueo de escritura, así que el pool no necesita ser grande.
+POOL_SETTINGS = {
+    "pool_size": ("TODO_DB_POOL_SIZE", int, 10),
+    "max_overflow": ("TODO_DB_MAX_OVERFLOW", int, 20),
+    "pool_timeout": ("TODO_DB_POOL_TIMEOUT", float, 30.0),
+}
+
+# Orden de aplicación: journal_mode primero porque afecta a los demás
+_PRAGMA_ORDER = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout", "foreign_keys")
+
+
+def _read_config(path: Optional[str]) -> Dict[str, str]:
+    """Lee la sección [database] del archivo de configuración, si existe."""
+    path = path or os.environ.get(CONFIG_ENV_VAR) or DEFAULT_CONFIG_FILE
+    if not os.path.isfile(path):
+        return {}
+    parser = ConfigParser()
+    parser.read(path, encoding="utf-8")
+    return dict(parser["database"]) if parser.has_section("database") else {}
+
+
+def resolve_pragmas(profile: Optional[str] = None, config_path: Optional[str] = None) -> Dict[str, object]:
+    """
+    Calcula los PRAGMAs a aplicar.
+
+    Prioridad: argumento `profile` > variable TODO_DB_PROFILE > clave `profile`
+    del archivo de configuración > perfil por defecto. Cualquier otra clave de
+    la sección [database] (por ejemplo `cache_size`) sobrescribe el valor del perfil.
+
+    Args:
+        profile (str, optional): Nombre del perfil ("durable", "balanced", "fast").
+        config_path (str, optional): Ruta del archivo INI. Por defecto
+            TODO_DB_CONFIG o todo_app.ini.
+
+    Returns:
+        Dict[str, object]: PRAGMA -> valor.
+    """
+    config = _read_config(config_path)
+    name = (profile or os.environ.get(PROFILE_ENV_VAR) or config.get("profile") or DEFAULT_PROFILE).lower()
+    if name not in SQLITE_PROFILES:
+        print(f"Perfil de base de datos desconocido '{name}', se usa '{DEFAULT_PROFILE}'.")
+        name = DEFAULT_PROFILE
+    pragmas = dict(SQLITE_PROFILES[name])
+    for key in _PRAGMA_ORDER:
+        if key in config:
+            pragmas[key] = config[key]
+    return pragmas
+
+
+def resolve_pool_settings(config_path: Optional[str] = None) -> Dict[str, object]:
+    """
+    Calcula el tamaño, desborde y espera máxima del pool.
+
+    Prioridad: variables TODO_DB_POOL_SIZE, TODO_DB_MAX_OVERFLOW y
+    TODO_DB_POOL_TIMEOUT > claves de la sección [database] > valores por defecto.
+
+    Returns:
+        Dict[str, object]: Argumentos de pool para create_engine.
+    """
+    config = _read_config(config_path)
+    settings = {}
+    for key, (env_var, cast, default) in POOL_SETTINGS.items():
+        value = os.environ.get(env_var) or config.get(key)
+        settings[key] = cast(value) if value else default
+    return settings
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool que mide cuánto esperan los hilos por una conexión.
+
+    La espera incluye abrir la conexión cuando el pool crece; los tiempos
+    altos con `checked_out` igual a `pool_size + max_overflow` indican que el
+    pool es el cuello de botella.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def pool_metrics(bind: Optional[Engine] = None) -> Dict[str, object]:
+    """
+    Estado del pool de conexiones de un motor.
+
+    Args:
+        bind (Engine, optional): Motor a inspeccionar. Defaults to el motor global.
+
+    Returns:
+        Dict[str, object]: Clase del pool, conexiones en uso y, si el pool lo
+        permite, tamaño, desborde y tiempos de espera.
+    """
+    pool = (bind or engine).pool
+    metrics: Dict[str, object] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, MeteredQueuePool):
+        with pool._metrics_lock:
+            checkouts = pool.checkouts
+            metrics.update({
+                "checkouts": checkouts,
+                "timeouts": pool.timeouts,
+                "wait_ms_avg": round(pool.wait_seconds_total * 1000 / checkouts, 3) if checkouts else 0.0,
+                "wait_ms_max": round(pool.wait_seconds_max * 1000, 3),
+            })
+    return metrics
 
-DATABASE_URL = "sqlite:///todo_app.db"
 
-engine = create_engine(DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(bind=engine)
+def create_db_engine(url: str = DATABASE_URL, profile: Optional[str] = None, config_path: Optional[str] = None, **kwargs) -> Engine:
+    """
+    Crea el motor de SQLAlchemy aplicando el perfil de PRAGMAs en cada conexión.
+
+    Las bases de datos en archivo (y las que no son SQLite) usan un
+    MeteredQueuePool configurado con resolve_pool_settings, salvo que se
+    indique otro `poolclass`.
+
+    Args:
+        url (str): URL de la base de datos.
+        profile (str, optional): Perfil de SQLite a usar.
+        config_path (str, optional): Archivo de configuración INI.
+        **kwargs: Argumentos adicionales para create_engine.
+
+    Returns:
+        Engine: Motor configurado.
+    """
+    kwargs.setdefault("echo", False)
+    parsed = make_url(url)
+    in_memory = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory and "poolclass" not in kwargs:
+        kwargs["poolclass"] = MeteredQueuePool
+        for key, value in resolve_pool_settings(config_path).items():
+            kwargs.setdefault(key, value)
+    engine = create_engine(url, **kwargs)
+    install_sqlite_pragmas(engine, profile, config_path)
+    return engine
+
+
+def install_sqlite_pragmas(engine: Engine, profile: Optional[str] = None, config_path: Optional[str] = None) -> None:
+    """
+    Aplica el perfil de PRAGMAs en cada conexión nueva del motor (solo SQLite).
+
+    Args:
+        engine (Engine): Motor síncrono (para un AsyncEngine, su `sync_engine`).
+        profile (str, optional): Perfil de SQLite a usar.
+        config_path (str, optional): Archivo de configuración INI.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = resolve_pragmas(profile, config_path)
+    if engine.url.database in (None, "", ":memory:"):
+        # WAL y mmap no aplican a bases en memoria
+        pragmas.pop("journal_mode", None)
+        pragmas.pop("mmap_size", None)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for key in _PRAGMA_ORDER:
+                if key in pragmas:
+                    cursor.execute(f"PRAGMA {key}={pragmas[key]}")
+        finally:
+            cursor.close()
+
+
+engine = create_db_engine(DATABASE_URL)
+# Conteo y tiempos por sentencia, consultas lentas y N+1 (get_item('get_query_metrics'))
+if query_metrics_enabled():
+    query_metrics.install(engine)
+# Las sesiones duran una unidad de trabajo: los objetos devueltos se siguen
+# leyendo después del commit sin volver a consultar la base de datos
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 Base = declarative_base()
 
 
-def init_db(my_base):
+def init_db(my_base, bind: Optional[Engine] = None) -> bool:
     """
-    Inicializa la base de datos creando todas las tablas definidas en el modelo.
+    Inicializa la base de datos creando todas las tablas definidas en el modelo
+    y aplicando las migraciones pendientes (índices, columnas nuevas, etc.).
 
     Args:
         my_base: La base declarativa de SQLAlchemy que contiene los modelos.
+        bind (Engine, optional): Motor a inicializar. Defaults to engine.
+
+    Returns:
+        bool: True si el esquema quedó creado y migrado.
 
     Prints:
         Mensaje de éxito o error al inicializar la base de datos.
     """
+    bind = bind if bind is not None else engine
     try:
-        my_base.metadata.create_all(bind=engine)
+        my_base.metadata.create_all(bind=bind)
+        run_migrations(bind)
         print("Base de datos inicializada correctamente.")
+        return True
     except SQLAlchemyError as e:
         print(f"Error al inicializar la base de datos: {e}")
+        return False
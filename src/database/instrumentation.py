@@ -0,0 +1,470 @@
+"""
+Instrumentación de las consultas SQL.
+
+Escucha los eventos del motor de SQLAlchemy y acumula, por sentencia y por
+el método que la originó (`Repository.x`, `TaskController.y`), cuántas
+veces se ejecutó, cuánto tardó y cuántas filas devolvió o modificó. Además:
+
+- las sentencias que tardan más de TODO_SLOW_QUERY_MS (100 ms por defecto)
+  se imprimen y se guardan (las últimas SLOW_LOG_SIZE) con su
+  EXPLAIN QUERY PLAN;
+- si una misma sentencia se ejecuta TODO_N_PLUS_ONE_THRESHOLD veces (10 por
+  defecto) dentro de una sola llamada de primer nivel, se marca como
+  posible N+1.
+
+Las sentencias se agrupan por su texto con parámetros (`?`); las listas
+`IN (?, ?, ...)` cuentan como una sola forma sin importar su largo.
+`traced` etiqueta una función: Repository lo aplica en `_unit_of_work` y
+TaskController en todos sus métodos públicos con `traced_methods`.
+`get_item('get_query_metrics')` devuelve `query_metrics.snapshot()`.
+Dentro de un bloque `tracing(...)` los métodos etiquetados y las sentencias
+se registran además como spans (lo usa la traza de acciones del Api).
+
+TODO_QUERY_METRICS=0 desactiva la instrumentación del motor global.
+"""
+
+import functools
+import inspect
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+QUERY_METRICS_ENV_VAR = "TODO_QUERY_METRICS"
+SLOW_QUERY_ENV_VAR = "TODO_SLOW_QUERY_MS"
+N_PLUS_ONE_ENV_VAR = "TODO_N_PLUS_ONE_THRESHOLD"
+DEFAULT_SLOW_QUERY_MS = 100.0
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+# Consultas lentas que se conservan para snapshot()
+SLOW_LOG_SIZE = 50
+# Sentencias distintas en snapshot(), las de mayor tiempo total
+TOP_STATEMENTS = 20
+# Etiqueta de las sentencias ejecutadas fuera de un método instrumentado
+UNTRACED = "(sin etiqueta)"
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# Método instrumentado más interno y llamada de primer nivel del hilo o tarea actual
+_caller: ContextVar[Optional[str]] = ContextVar("query_caller", default=None)
+_scope: ContextVar[Optional["_Scope"]] = ContextVar("query_scope", default=None)
+# Traza activa (ver `tracing`); None si la llamada actual no se está trazando
+_trace: ContextVar[Optional["Trace"]] = ContextVar("query_trace", default=None)
+
+
+class _Stats:
+    __slots__ = ("count", "seconds", "max_seconds", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.seconds * 1000, 3),
+            "avg_ms": round(self.seconds * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+class _Scope:
+    """
+    Llamada de primer nivel: ejecuciones por sentencia (para detectar N+1) y
+    sentencias cuyo tiempo se cierra al terminar la llamada.
+    """
+    __slots__ = ("label", "executions", "pending")
+
+    def __init__(self, label: str):
+        self.label = label
+        # (id de QueryMetrics, sentencia) -> ejecuciones, por si hay varias instaladas
+        self.executions: Dict[Tuple[int, str], int] = {}
+        self.pending: List["_Execution"] = []
+
+
+class _Execution:
+    """
+    Una ejecución de sentencia. El tiempo incluye la lectura de las filas: el
+    `row_factory` del cursor lo extiende con cada fila leída.
+    """
+    __slots__ = ("metrics", "engine", "fp", "caller", "stats", "statement", "parameters",
+                 "seconds", "last", "rows", "done", "previous", "span")
+
+    def __init__(self, metrics, engine, fp, caller, stats, statement, parameters):
+        self.metrics = metrics
+        self.engine = engine
+        self.fp = fp
+        self.caller = caller
+        self.stats = stats
+        self.statement = statement
+        self.parameters = parameters
+        self.seconds = 0.0
+        self.last = time.perf_counter()
+        self.rows = 0
+        self.done = False
+        # row_factory que ya tenía el cursor (por ejemplo, el de otra instancia instalada)
+        self.previous = None
+        # Span de la traza activa, si la hay
+        self.span = None
+
+    def count_row(self, cursor, row):
+        now = time.perf_counter()
+        self.rows += 1
+        if self.done:
+            # Filas leídas después de cerrar la medición (fuera de un método instrumentado)
+            self.stats[0].rows += 1
+            self.stats[1].rows += 1
+        else:
+            self.seconds += now - self.last
+            self.last = now
+        return row if self.previous is None else self.previous(cursor, row)
+
+
+class Trace:
+    """
+    Spans de una llamada trazada: cada método instrumentado y cada sentencia
+    SQL, con su inicio, duración y profundidad de anidamiento.
+    """
+    __slots__ = ("name", "start", "end", "depth", "spans")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.depth = 0
+        # [nombre, profundidad, inicio, fin, filas]
+        self.spans: List[list] = []
+
+    def open(self, name: str) -> list:
+        span = [name, self.depth, time.perf_counter(), None, None]
+        self.spans.append(span)
+        self.depth += 1
+        return span
+
+    def close(self, span: list) -> None:
+        span[3] = time.perf_counter()
+        self.depth -= 1
+
+    def to_dict(self) -> Dict:
+        """Traza lista para JSON; los tiempos en ms relativos al inicio de la traza."""
+        end = self.end if self.end is not None else time.perf_counter()
+        spans = []
+        for name, depth, start, span_end, rows in self.spans:
+            span = {
+                "name": name,
+                "depth": depth,
+                "start_ms": round((start - self.start) * 1000, 3),
+                "ms": round(((span_end if span_end is not None else end) - start) * 1000, 3),
+            }
+            if rows is not None:
+                span["rows"] = rows
+            spans.append(span)
+        return {"name": self.name, "ms": round((end - self.start) * 1000, 3), "spans": spans}
+
+
+@contextmanager
+def tracing(name: str) -> Iterator[Trace]:
+    """
+    Traza todo lo que se ejecute dentro del bloque: los métodos `traced` y las
+    sentencias de los motores con QueryMetrics instalada se agregan como spans.
+    """
+    trace = Trace(name)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.end = time.perf_counter()
+        _trace.reset(token)
+
+
+def traced(label: str):
+    """
+    Decorador que etiqueta las sentencias ejecutadas dentro de la función.
+
+    Las llamadas anidadas usan la etiqueta más interna; la más externa define
+    el alcance en el que se cuentan las repeticiones (N+1). Dentro de
+    `tracing`, cada llamada se registra además como un span.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            caller_token = _caller.set(label)
+            scope_token = _scope.set(_Scope(label)) if _scope.get() is None else None
+            trace = _trace.get()
+            span = trace.open(label) if trace is not None else None
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if scope_token is not None:
+                    scope = _scope.get()
+                    _scope.reset(scope_token)
+                    for execution in scope.pending:
+                        execution.metrics._finish(execution, scope.label)
+                if span is not None:
+                    trace.close(span)
+                _caller.reset(caller_token)
+        return wrapper
+    return decorator
+
+
+def traced_methods(prefix: str):
+    """Decorador de clase: aplica traced('<prefix>.<método>') a cada método público."""
+    def decorator(cls):
+        for name, value in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.isfunction(value):
+                setattr(cls, name, traced(f"{prefix}.{name}")(value))
+        return cls
+    return decorator
+
+
+def fingerprint(statement: str) -> str:
+    """Forma normalizada de una sentencia: espacios colapsados y listas IN de cualquier largo iguales."""
+    return _IN_LIST.sub("(?, ...)", _SPACES.sub(" ", statement).strip())
+
+
+class QueryMetrics:
+    """
+    Contadores de sentencias SQL de uno o varios motores.
+
+    Es seguro usarla desde varios hilos. En SQLite el tiempo de una sentencia
+    incluye la lectura de sus filas (contadas con un `row_factory` en el
+    cursor) y se cierra al terminar la llamada de primer nivel; fuera de un
+    método instrumentado solo se mide la ejecución.
+    """
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_QUERY_MS,
+                 n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD, explain: bool = True,
+                 log: bool = True):
+        """
+        Args:
+            slow_ms (float): Umbral de consulta lenta en milisegundos.
+            n_plus_one_threshold (int): Repeticiones de una sentencia en una
+                llamada de primer nivel a partir de las cuales se marca como N+1.
+            explain (bool): Guardar EXPLAIN QUERY PLAN de las consultas lentas (SQLite).
+            log (bool): Imprimir las consultas lentas y los N+1 detectados.
+        """
+        self.slow_ms = slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.explain = explain
+        self.log = log
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, str] = {}
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "QueryMetrics":
+        """Crea la instancia con los umbrales de TODO_SLOW_QUERY_MS y TODO_N_PLUS_ONE_THRESHOLD."""
+        return cls(
+            slow_ms=float(os.environ.get(SLOW_QUERY_ENV_VAR, DEFAULT_SLOW_QUERY_MS)),
+            n_plus_one_threshold=int(os.environ.get(N_PLUS_ONE_ENV_VAR, DEFAULT_N_PLUS_ONE_THRESHOLD)),
+        )
+
+    def reset(self) -> None:
+        """Descarta todo lo acumulado."""
+        with self._lock:
+            self._statements: Dict[str, _Stats] = {}
+            self._callers: Dict[str, _Stats] = {}
+            self._statement_callers: Dict[str, set] = {}
+            self._errors: Dict[str, int] = {}
+            self._slow: deque = deque(maxlen=SLOW_LOG_SIZE)
+            self._n_plus_one: Dict[Tuple[str, str], int] = {}
+
+    def install(self, engine: Engine) -> "QueryMetrics":
+        """Registra los eventos en el motor (para un AsyncEngine, su `sync_engine`)."""
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(engine, "handle_error", self._handle_error)
+        return self
+
+    def _fingerprint(self, statement: str) -> str:
+        fp = self._fingerprints.get(statement)
+        if fp is None:
+            fp = fingerprint(statement)
+            if len(self._fingerprints) > 4096:
+                self._fingerprints.clear()
+            self._fingerprints[statement] = fp
+        return fp
+
+    def _stats_for(self, fp: str, caller: str) -> Tuple[_Stats, _Stats]:
+        statement = self._statements.get(fp)
+        by_caller = self._callers.get(caller)
+        if statement is None or by_caller is None:
+            with self._lock:
+                statement = self._statements.setdefault(fp, _Stats())
+                by_caller = self._callers.setdefault(caller, _Stats())
+        return statement, by_caller
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        fp = self._fingerprint(statement)
+        caller = _caller.get() or UNTRACED
+        execution = _Execution(self, conn.engine, fp, caller, self._stats_for(fp, caller), statement,
+                               parameters[0] if executemany and parameters else parameters)
+        if isinstance(cursor, sqlite3.Cursor):
+            previous = cursor.row_factory
+            # Un cursor reutilizado conserva el row_factory de su ejecución anterior
+            while isinstance(getattr(previous, "__self__", None), _Execution) and previous.__self__.metrics is self:
+                previous = previous.__self__.previous
+            execution.previous = previous
+            cursor.row_factory = execution.count_row
+        trace = _trace.get()
+        if trace is not None:
+            execution.span = trace.open(fp)
+        conn.info.setdefault("query_metrics_stack", []).append(execution)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("query_metrics_stack")
+        if not stack:
+            return
+        execution = stack.pop()
+        now = time.perf_counter()
+        execution.seconds = now - execution.last
+        execution.last = now
+        if cursor.description is None and cursor.rowcount > 0:
+            execution.rows = cursor.rowcount
+        if execution.span is not None:
+            _trace.get().close(execution.span)
+        with self._lock:
+            callers = self._statement_callers.setdefault(execution.fp, set())
+            if len(callers) < 10:
+                callers.add(execution.caller)
+
+        scope = _scope.get()
+        if scope is None:
+            self._finish(execution, None)
+            return
+        scope.pending.append(execution)
+        key = (id(self), execution.fp)
+        executions = scope.executions[key] = scope.executions.get(key, 0) + 1
+        if executions >= self.n_plus_one_threshold:
+            self._flag_n_plus_one(scope.label, execution.fp, executions)
+
+    def _finish(self, execution: _Execution, scope_label: Optional[str]) -> None:
+        """Suma la ejecución a sus contadores y la registra si fue lenta."""
+        execution.done = True
+        if execution.span is not None:
+            # El span cubre también la lectura de las filas
+            execution.span[3] = execution.span[2] + execution.seconds
+            execution.span[4] = execution.rows
+        statement_stats, caller_stats = execution.stats
+        with self._lock:
+            statement_stats.add(execution.seconds)
+            caller_stats.add(execution.seconds)
+            statement_stats.rows += execution.rows
+            caller_stats.rows += execution.rows
+        if execution.seconds * 1000 >= self.slow_ms:
+            self._log_slow(execution, scope_label)
+
+    def _flag_n_plus_one(self, label: str, fp: str, executions: int) -> None:
+        key = (label, fp)
+        with self._lock:
+            first = key not in self._n_plus_one
+            self._n_plus_one[key] = max(self._n_plus_one.get(key, 0), executions)
+        if first and self.log:
+            print(f"Posible N+1 en {label}: la misma sentencia se ejecutó {executions} veces: {fp}")
+
+    def _log_slow(self, execution: _Execution, scope_label: Optional[str]) -> None:
+        entry = {
+            "statement": execution.fp,
+            "ms": round(execution.seconds * 1000, 3),
+            "rows": execution.rows,
+            "caller": execution.caller,
+            "scope": scope_label,
+            "plan": self._explain(execution),
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self._slow.append(entry)
+        if self.log:
+            print(f"Consulta lenta ({entry['ms']:.1f} ms, {entry['rows']} filas, {execution.caller}): {execution.fp}")
+            for line in entry["plan"] or []:
+                print(f"    {line}")
+
+    def _explain(self, execution: _Execution) -> Optional[List[str]]:
+        """
+        Detalle de EXPLAIN QUERY PLAN (solo SQLite). Se ejecuta con una conexión
+        del pool directamente sobre el driver, sin disparar los eventos.
+        """
+        statement = execution.statement
+        if (not self.explain or execution.engine.dialect.name != "sqlite"
+                or not statement.lstrip().upper().startswith(_EXPLAINABLE)):
+            return None
+        raw = execution.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, execution.parameters or ())
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            return [f"(sin plan: {e})"]
+        finally:
+            raw.close()
+
+    def _handle_error(self, exception_context) -> None:
+        caller = _caller.get() or UNTRACED
+        connection = exception_context.connection
+        stack = connection.info.get("query_metrics_stack") if connection is not None else None
+        if stack:
+            execution = stack.pop()
+            if execution.span is not None:
+                _trace.get().close(execution.span)
+        with self._lock:
+            self._errors[caller] = self._errors.get(caller, 0) + 1
+
+    def snapshot(self) -> Dict:
+        """
+        Copia de los contadores, lista para serializar como JSON.
+
+        Returns:
+            Dict: `statements` y `total_ms` globales, `by_caller` {método: contadores},
+            `top_statements` (las de mayor tiempo total), `slow_queries`,
+            `n_plus_one`, `errors` {método: n} y los umbrales.
+        """
+        with self._lock:
+            statements = [(fp, stats.to_dict(), sorted(self._statement_callers.get(fp, ())))
+                          for fp, stats in self._statements.items() if stats.count]
+            by_caller = {caller: stats.to_dict() for caller, stats in self._callers.items() if stats.count}
+            slow = list(self._slow)
+            n_plus_one = [{"scope": label, "statement": fp, "executions": n}
+                          for (label, fp), n in self._n_plus_one.items()]
+            errors = dict(self._errors)
+        statements.sort(key=lambda item: item[1]["total_ms"], reverse=True)
+        return {
+            "statements": sum(item[1]["count"] for item in statements),
+            "total_ms": round(sum(item[1]["total_ms"] for item in statements), 3),
+            "by_caller": dict(sorted(by_caller.items(), key=lambda item: item[1]["total_ms"], reverse=True)),
+            "top_statements": [dict(stats, statement=fp, callers=callers)
+                               for fp, stats, callers in statements[:TOP_STATEMENTS]],
+            "slow_queries": slow,
+            "n_plus_one": sorted(n_plus_one, key=lambda item: item["executions"], reverse=True),
+            "errors": errors,
+            "slow_threshold_ms": self.slow_ms,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+        }
+
+
+# Métricas del proceso; db.py las instala en el motor global
+query_metrics = QueryMetrics.from_env()
+
+
+def query_metrics_enabled() -> bool:
+    """False si TODO_QUERY_METRICS vale 0, false, no u off."""
+    return os.environ.get(QUERY_METRICS_ENV_VAR, "1").strip().lower() not in ("0", "false", "no", "off")
@@ -0,0 +1,278 @@
+"""
+Caché de las listas completas de tareas y eventos de cada usuario.
+
+Guarda la lista ya serializada (la que devuelve el Api) por (usuario, lista,
+variante) en un LRU limitado por la cantidad total de filas guardadas,
+compartido por todos los usuarios. Una entrada deja de valer cuando:
+
+- en este proceso, un método de escritura de Repository marca la lista del
+  usuario como cambiada: al confirmarse la transacción se descartan sus
+  entradas (`mark_changed`);
+- otro proceso u otra conexión escribe en el mismo archivo SQLite: se
+  detecta con `PRAGMA data_version` en una conexión propia de solo lectura;
+  si cambió, antes de devolver la entrada se compara la versión del usuario
+  en `versiones_listas`, que los triggers incrementan en la misma
+  transacción que cualquier cambio de `tareas` o `eventos`.
+
+Sin la tabla de versiones (base sin migrar) cualquier escritura de otra
+conexión invalida todas las entradas; con SQLite en memoria o con otra base
+de datos solo se consideran las escrituras del propio proceso.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+
+VERSIONS_TABLE = 'versiones_listas'
+TASKS = 'tareas'
+EVENTS = 'eventos'
+LISTS = (TASKS, EVENTS)
+# Filas como máximo entre todas las listas guardadas
+DEFAULT_MAX_ROWS = int(os.environ.get("TODO_LIST_CACHE_ROWS", "50000"))
+# Listas del usuario marcadas como cambiadas en la transacción en curso de la sesión
+_PENDING_KEY = "list_cache_pending"
+
+
+def _triggers() -> list:
+    statements = []
+    for table in LISTS:
+        bump = {
+            row: (f'INSERT INTO {VERSIONS_TABLE} ("idUsuario", {table}) SELECT {row}."idUsuario", 1 '
+                  f'WHERE {row}."idUsuario" IS NOT NULL '
+                  f'ON CONFLICT ("idUsuario") DO UPDATE SET {table} = {table} + 1;')
+            for row in ("new", "old")
+        }
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {VERSIONS_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN {bump['new']} END",
+            f"CREATE TRIGGER IF NOT EXISTS {VERSIONS_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN {bump['old']} END",
+            f"CREATE TRIGGER IF NOT EXISTS {VERSIONS_TABLE}_{table}_au AFTER UPDATE ON {table} "
+            f"BEGIN {bump['old']} {bump['new']} END",
+        ]
+    return statements
+
+
+def ensure_list_versions(conn: Connection) -> bool:
+    """
+    Crea la tabla de versiones por usuario y sus triggers si no existen.
+
+    Args:
+        conn (Connection): Conexión dentro de una transacción.
+
+    Returns:
+        bool: False si la base de datos no es SQLite.
+    """
+    if conn.dialect.name != 'sqlite':
+        return False
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} ("
+        f'"idUsuario" INTEGER PRIMARY KEY, {TASKS} INTEGER NOT NULL DEFAULT 0, '
+        f'{EVENTS} INTEGER NOT NULL DEFAULT 0)'
+    ))
+    for statement in _triggers():
+        conn.execute(text(statement))
+    return True
+
+
+def mark_changed(session: Session, cache: Optional["ListCache"], user_id: Optional[int], kind: Optional[str]) -> None:
+    """
+    Anota que la transacción en curso cambia la lista `kind` del usuario (None = todas).
+
+    Las entradas se descartan después del commit, no antes: una lectura que
+    empiece entre el cambio y el commit no puede dejar guardada la lista vieja.
+    """
+    if cache is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add((cache, user_id, kind))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for cache, user_id, kind in session.info.pop(_PENDING_KEY, ()):
+        cache.invalidate(user_id, kind)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class _Watch:
+    """Conexión propia al archivo SQLite para leer data_version y las versiones por usuario."""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA busy_timeout = 5000")
+        self.has_versions: Optional[bool] = None
+
+    def data_version(self) -> int:
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def user_version(self, user_id: int, kind: str) -> Optional[int]:
+        """Versión de la lista del usuario; None si la tabla de versiones no existe."""
+        if not self.has_versions:
+            self.has_versions = self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (VERSIONS_TABLE,)
+            ).fetchone() is not None
+            if not self.has_versions:
+                return None
+        row = self.connection.execute(
+            f'SELECT {kind} FROM {VERSIONS_TABLE} WHERE "idUsuario" = ?', (user_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+
+class ListCache:
+    """
+    Caché LRU de listas serializadas por usuario, con invalidación por escritura.
+
+    Es segura desde varios hilos; una misma instancia se comparte entre los
+    controladores del proceso (como OccurrenceCache).
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        """
+        Args:
+            max_rows (int): Filas como máximo entre todas las entradas; las
+                menos usadas se descartan primero. 0 desactiva la caché.
+        """
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+        # (usuario, lista, variante) -> [valor, filas, generación, data_version, versión del usuario]
+        self._entries: "OrderedDict[tuple, list]" = OrderedDict()
+        # (usuario, lista) -> generación; cambia con cada invalidación del proceso
+        self._generations: Dict[Tuple[Optional[int], str], int] = {}
+        self._epoch = 0
+        self._watches: Dict[str, Optional[_Watch]] = {}
+
+    def get(self, user_id: int, kind: str, variant: Hashable, loader: Callable[[], Any],
+            bind: Optional[Engine] = None) -> Any:
+        """
+        Devuelve la lista guardada o la carga con `loader` y la guarda.
+
+        Args:
+            user_id (int): Usuario dueño de la lista.
+            kind (str): TASKS o EVENTS.
+            variant (Hashable): Distingue formas de la misma lista (por ejemplo, el formato).
+            loader (Callable): Consulta y serializa la lista.
+            bind (Engine, optional): Motor de la consulta; si es un archivo SQLite,
+                se vigilan las escrituras de otras conexiones.
+
+        Returns:
+            Any: La lista (compartida entre llamadas: no modificar).
+        """
+        if self.max_rows <= 0:
+            return loader()
+        key = (user_id, kind, variant)
+        watch = self._watch(bind)
+        with self._lock:
+            generation = self._generation(user_id, kind)
+            entry = self._entries.get(key)
+        data_version = user_version = None
+        if watch is not None:
+            with watch.lock:
+                data_version = watch.data_version()
+                current = entry is not None and entry[2] == generation
+                if not current or entry[3] != data_version:
+                    # Otra conexión escribió algo: la entrada sigue valiendo si la lista del usuario no cambió
+                    user_version = watch.user_version(user_id, kind)
+                    if current and user_version is not None and user_version == entry[4]:
+                        entry[3] = data_version
+        with self._lock:
+            if entry is not None and entry[2] == generation and entry[3] == data_version \
+                    and self._entries.get(key) is entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = loader()
+        rows = _row_count(value)
+        with self._lock:
+            # Si hubo una invalidación mientras se cargaba, la lista puede ser vieja: no se guarda
+            if self._generation(user_id, kind) == generation and rows <= self.max_rows:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self.rows -= old[1]
+                self._entries[key] = [value, rows, generation, data_version, user_version]
+                self.rows += rows
+                while self.rows > self.max_rows:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.rows -= evicted[1]
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, user_id: Optional[int] = None, kind: Optional[str] = None) -> None:
+        """
+        Descarta las listas de un usuario.
+
+        Args:
+            user_id (int, optional): Usuario; None descarta las de todos.
+            kind (str, optional): TASKS o EVENTS; None, ambas.
+        """
+        with self._lock:
+            self.invalidations += 1
+            if user_id is None:
+                self._epoch += 1
+                self._generations.clear()
+                dropped = list(self._entries)
+            else:
+                for name in (LISTS if kind is None else (kind,)):
+                    self._generations[(user_id, name)] = self._generation(user_id, name) + 1
+                dropped = [key for key in self._entries
+                           if key[0] == user_id and (kind is None or key[1] == kind)]
+            for key in dropped:
+                self.rows -= self._entries.pop(key)[1]
+
+    def clear(self) -> None:
+        """Descarta todas las entradas."""
+        self.invalidate()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores para get_metrics."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "size": len(self._entries), "rows": self.rows,
+                    "max_rows": self.max_rows}
+
+    def _generation(self, user_id: Optional[int], kind: str) -> int:
+        return self._generations.get((user_id, kind), 0) + (self._epoch << 32)
+
+    def _watch(self, bind: Optional[Engine]) -> Optional[_Watch]:
+        if bind is None or bind.dialect.name != 'sqlite' or bind.url.database in (None, '', ':memory:'):
+            return None
+        path = os.path.abspath(bind.url.database)
+        if path not in self._watches:
+            with self._lock:
+                if path not in self._watches:
+                    try:
+                        self._watches[path] = _Watch(path)
+                    except sqlite3.Error as e:
+                        print(f"No se pudo vigilar {path}: {e}")
+                        self._watches[path] = None
+        return self._watches[path]
+
+
+def _row_count(value: Any) -> int:
+    """Filas de una lista serializada por filas (list) o columnar (dict de arreglos)."""
+    if isinstance(value, dict):
+        return max((len(column) for column in value.values()), default=0) or 1
+    try:
+        return len(value) or 1
+    except TypeError:
+        return 1
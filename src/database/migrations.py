@@ -0,0 +1,255 @@
+"""
+Migraciones versionadas del esquema.
+
+`create_all` solo crea las tablas que faltan y nunca modifica una base de
+datos existente. Este módulo guarda la versión del esquema en la tabla
+`schema_version` y aplica, en orden y una sola vez, los pasos de
+actualización pendientes al iniciar la aplicación.
+
+Para agregar un cambio de esquema se define una función `_vN_...` que recibe
+una conexión y se añade al final de MIGRATIONS con el siguiente número.
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .list_cache import ensure_list_versions
+from .search import FTS_TABLES, ensure_search_index, has_search_index
+from .stats import ensure_task_stats, populate_task_stats
+
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+
+def _v1_indices(conn: Connection) -> None:
+    """Índices para login, listados de tareas por usuario y eventos por fecha."""
+    duplicados = conn.execute(text(
+        "SELECT email FROM usuarios GROUP BY email HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicados:
+        # No se puede crear el índice único sin perder datos: se crea uno normal
+        print(f"Advertencia: emails duplicados en usuarios ({len(duplicados)}); se crea un índice no único.")
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_usuarios_email ON usuarios (email)"))
+    else:
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ux_usuarios_email ON usuarios (email)"))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_tareas_usuario_estado ON tareas ("idUsuario", estado)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_tareas_usuario_vencimiento ON tareas ("idUsuario", "fechaVencimiento")'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_eventos_usuario_fecha ON eventos ("idUsuario", fecha)'))
+    conn.execute(text("ANALYZE"))
+
+
+def _v2_retencion(conn: Connection) -> None:
+    """Fecha de completado por tarea y días de retención por usuario."""
+    _add_column_if_missing(conn, "tareas", "fechaCompletado", "TIMESTAMP")
+    _add_column_if_missing(conn, "usuarios", "diasRetencion", "INTEGER")
+    # Las tareas ya completadas usan la fecha que complete_task guardaba en fechaVencimiento
+    conn.execute(text(
+        'UPDATE tareas SET "fechaCompletado" = "fechaVencimiento" '
+        "WHERE estado IN ('completed', 'complete') AND \"fechaCompletado\" IS NULL"
+    ))
+
+
+def _v3_archivo(conn: Connection) -> None:
+    """Tabla fría para tareas completadas antiguas."""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS tareas_archivo ("
+        '"idTarea" INTEGER PRIMARY KEY, titulo VARCHAR, descripcion TEXT, "fechaCreacion" DATETIME, '
+        '"fechaVencimiento" DATETIME, estado VARCHAR, prioridad VARCHAR, tipo VARCHAR, "fechaCompletado" DATETIME, '
+        '"idUsuario" INTEGER REFERENCES usuarios ("idUsuario"), "idGrupo" INTEGER, "idTipoTarea" INTEGER, '
+        '"fechaArchivado" DATETIME)'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_tareas_archivo_usuario_archivado ON tareas_archivo ("idUsuario", "fechaArchivado")'
+    ))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_tareas_estado_completado ON tareas (estado, "fechaCompletado")'))
+
+
+def _v4_busqueda(conn: Connection) -> None:
+    """Índices FTS5 de tareas y eventos, poblados con los datos existentes."""
+    if ensure_search_index(conn):
+        for fts in FTS_TABLES:
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def _v5_sesiones(conn: Connection) -> None:
+    """Sesiones con token y expiración."""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS sesiones ("
+        'token VARCHAR(64) PRIMARY KEY, "idUsuario" INTEGER NOT NULL REFERENCES usuarios ("idUsuario"), '
+        '"fechaCreacion" DATETIME, "fechaExpiracion" DATETIME NOT NULL)'
+    ))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_sesiones_expiracion ON sesiones ("fechaExpiracion")'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_sesiones_usuario ON sesiones ("idUsuario")'))
+
+
+def _v6_eventos_fecha_hora(conn: Connection) -> None:
+    """Columnas DATE/TIME en eventos (antes texto libre)."""
+    if conn.dialect.name != 'sqlite':
+        return
+    invalidas = conn.execute(text(
+        "SELECT COUNT(*) FROM eventos WHERE date(fecha) IS NULL OR (hora IS NOT NULL AND time(hora) IS NULL)"
+    )).scalar()
+    if invalidas:
+        print(f"Advertencia: {invalidas} eventos con fecha u hora inválida; quedan sin ese valor.")
+    # SQLite no cambia el tipo de una columna: se reconstruye la tabla con los
+    # valores normalizados al formato que usa SQLAlchemy (YYYY-MM-DD, HH:MM:SS.ffffff)
+    conn.execute(text(
+        "CREATE TABLE eventos_nueva ("
+        '"idEvento" INTEGER PRIMARY KEY, titulo VARCHAR, descripcion TEXT, fecha DATE, hora TIME, '
+        'prioridad VARCHAR, "idUsuario" INTEGER REFERENCES usuarios ("idUsuario"))'
+    ))
+    conn.execute(text(
+        'INSERT INTO eventos_nueva ("idEvento", titulo, descripcion, fecha, hora, prioridad, "idUsuario") '
+        "SELECT \"idEvento\", titulo, descripcion, date(fecha), time(hora) || '.000000', prioridad, \"idUsuario\" "
+        "FROM eventos"
+    ))
+    conn.execute(text("DROP TABLE eventos"))
+    conn.execute(text("ALTER TABLE eventos_nueva RENAME TO eventos"))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_eventos_usuario_fecha ON eventos ("idUsuario", fecha)'))
+    # Los triggers de búsqueda se eliminaron con la tabla anterior
+    if has_search_index(conn, 'eventos_fts'):
+        ensure_search_index(conn)
+
+
+def _v7_recurrencia(conn: Connection) -> None:
+    """Reglas de recurrencia en tareas y eventos, y excepciones por ocurrencia."""
+    for table in ("tareas", "tareas_archivo", "eventos"):
+        _add_column_if_missing(conn, table, "reglaRecurrencia", "VARCHAR")
+        _add_column_if_missing(conn, table, "finRecurrencia", "DATE")
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS excepciones_recurrencia ("
+        '"idExcepcion" INTEGER PRIMARY KEY, entidad VARCHAR(10) NOT NULL, "idPadre" INTEGER NOT NULL, '
+        '"fechaOriginal" DATE NOT NULL, cancelada BOOLEAN NOT NULL DEFAULT 0, titulo VARCHAR, descripcion TEXT, '
+        'fecha DATE, hora TIME, prioridad VARCHAR, estado VARCHAR, "fechaCompletado" DATETIME)'
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_excepciones_recurrencia "
+        'ON excepciones_recurrencia (entidad, "idPadre", "fechaOriginal")'
+    ))
+    # Índices parciales: solo las series, que son pocas frente a las filas simples
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_tareas_recurrentes ON tareas ("idUsuario", "finRecurrencia") '
+        'WHERE "reglaRecurrencia" IS NOT NULL'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_eventos_recurrentes ON eventos ("idUsuario", "finRecurrencia") '
+        'WHERE "reglaRecurrencia" IS NOT NULL'
+    ))
+
+
+def _v8_estadisticas(conn: Connection) -> None:
+    """Contadores de tareas por usuario mantenidos con triggers, poblados con los datos existentes."""
+    if ensure_task_stats(conn):
+        populate_task_stats(conn)
+
+
+def _v9_versiones_listas(conn: Connection) -> None:
+    """Versión por usuario de sus listas de tareas y eventos, incrementada con triggers."""
+    ensure_list_versions(conn)
+
+
+# (versión, descripción, función de actualización), en orden creciente
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Índices de usuarios, tareas y eventos", _v1_indices),
+    (2, "Retención de tareas completadas", _v2_retencion),
+    (3, "Archivo de tareas completadas", _v3_archivo),
+    (4, "Búsqueda de texto completo", _v4_busqueda),
+    (5, "Sesiones con token", _v5_sesiones),
+    (6, "Fecha y hora de eventos", _v6_eventos_fecha_hora),
+    (7, "Tareas y eventos recurrentes", _v7_recurrencia),
+    (8, "Estadísticas de tareas", _v8_estadisticas),
+    (9, "Versiones de listas por usuario", _v9_versiones_listas),
+]
+
+
+def latest_version(migrations=None) -> int:
+    """Versión a la que lleva la última migración de la lista (MIGRATIONS por defecto)."""
+    migrations = MIGRATIONS if migrations is None else migrations
+    return migrations[-1][0] if migrations else 0
+
+
+def is_initialized(bind: Engine) -> bool:
+    """
+    Indica si la base de datos tiene la marca de arranque de la versión actual.
+
+    La marca es `PRAGMA user_version` (solo SQLite): se escribe al terminar
+    de crear el esquema, migrarlo y cargar los datos demo, y deja de coincidir
+    en cuanto se agrega una migración. Leerla no toca ninguna tabla.
+
+    Args:
+        bind (Engine): Motor de la base de datos.
+
+    Returns:
+        bool: True si se puede omitir la inicialización al arrancar.
+    """
+    if bind.dialect.name != 'sqlite':
+        return False
+    with bind.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar() == latest_version()
+
+
+def mark_initialized(bind: Engine) -> None:
+    """Escribe la marca de arranque de is_initialized (no hace nada fuera de SQLite)."""
+    if bind.dialect.name != 'sqlite':
+        return
+    with bind.begin() as conn:
+        conn.execute(text(f"PRAGMA user_version = {int(latest_version())}"))
+
+
+def get_schema_version(bind: Engine) -> int:
+    """
+    Obtiene la versión actual del esquema.
+
+    Args:
+        bind (Engine): Motor de la base de datos.
+
+    Returns:
+        int: Última versión aplicada (0 si nunca se migró).
+    """
+    with bind.begin() as conn:
+        _ensure_version_table(conn)
+        return conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+
+
+def run_migrations(bind: Engine, migrations=None) -> int:
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción.
+
+    Args:
+        bind (Engine): Motor de la base de datos (las tablas ya deben existir).
+        migrations (list, optional): Lista de migraciones. Defaults to MIGRATIONS.
+
+    Returns:
+        int: Versión del esquema después de migrar.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    current = get_schema_version(bind)
+    for version, description, upgrade in migrations:
+        if version <= current:
+            continue
+        with bind.begin() as conn:
+            upgrade(conn)
+            conn.execute(
+                text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, descripcion, aplicada) VALUES (:v, :d, :a)"),
+                {"v": version, "d": description, "a": datetime.utcnow()}
+            )
+        print(f"Migración {version} aplicada: {description}")
+        current = version
+    return current
+
+
+def _add_column_if_missing(conn: Connection, table: str, column: str, ddl_type: str) -> None:
+    """ALTER TABLE ADD COLUMN solo si la columna no existe (create_all pudo crearla)."""
+    columns = {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table}")'))}
+    if column not in columns:
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {ddl_type}'))
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+        "version INTEGER PRIMARY KEY, descripcion TEXT, aplicada TIMESTAMP)"
+    ))
@@ -1,21 +1,225 @@
-from sqlalchemy.orm import Session
+import functools
+import threading
+from contextlib import contextmanager
+from sqlalchemy import and_, bindparam, case, delete, func, insert, literal, or_, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from .db import SessionLocal
-from src.models.models import Usuario, Tarea
+from .instrumentation import traced
+from .list_cache import EVENTS, TASKS, ListCache, mark_changed
+from .search import HIGHLIGHT_CLOSE, HIGHLIGHT_OPEN, search_index_ready, to_match_query
+from .stats import COMPLETED_STATES, DUE_PREFIX, PRIORITY_PREFIX, STATS_TABLE, STATUS_PREFIX, has_task_stats, split_counters
+from src.controllers.passwords import hash_password
+from src.models.models import Usuario, Tarea, TareaArchivo, Event, ExcepcionRecurrencia, Sesion
+
+
+# Columnas de Tarea que se pueden asignar en operaciones masivas
+TASK_BULK_FIELDS = ('titulo', 'descripcion', 'fechaCreacion', 'fechaVencimiento', 'estado', 'prioridad', 'tipo', 'idGrupo', 'idTipoTarea')
+# Máximo de parámetros por sentencia IN (SQLite limita las variables por consulta)
+BULK_CHUNK_SIZE = 500
+# Estado de la vista -> valores equivalentes guardados en `estado`
+STATUS_ALIASES = {
+    'new': ('new', 'todo'),
+    'progress': ('progress', 'pending'),
+    'completed': COMPLETED_STATES,
+}
+# Claves de orden permitidas -> columna de Tarea
+TASK_SORT_COLUMNS = {
+    'end_date': 'fechaVencimiento',
+    'start_date': 'fechaCreacion',
+    'completed_at': 'fechaCompletado',
+    'priority': 'prioridad',
+    'name': 'titulo',
+    'id': 'idTarea',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _demo_password(password: str) -> str:
+    """Hash de la contraseña de un usuario demo, calculado una vez por proceso."""
+    return hash_password(password)
+
+
+def completion_changes(tarea: Tarea, cambios: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Completa los cambios de una tarea con su fecha de completado: se conserva
+    si ya estaba completada, se fija al completarla y se borra si deja de estarlo.
+    """
+    if 'estado' not in cambios or 'fechaCompletado' in cambios:
+        return cambios
+    cambios = dict(cambios)
+    if cambios['estado'] not in COMPLETED_STATES:
+        cambios['fechaCompletado'] = None
+    elif tarea.estado not in COMPLETED_STATES:
+        cambios['fechaCompletado'] = datetime.now()
+    return cambios
+
+
+def events_between(idUsuario: int, desde: Optional[date] = None, hasta: Optional[date] = None):
+    """
+    Consulta los eventos de un usuario entre dos días (ambos incluidos),
+    ordenados por fecha y hora; usa el índice (idUsuario, fecha).
+
+    Con un rango solo devuelve eventos simples: las series recurrentes se
+    consultan con series_between y se expanden aparte.
+
+    Args:
+        idUsuario (int): Usuario dueño de los eventos.
+        desde (date, optional): Primer día; None = sin límite.
+        hasta (date, optional): Último día; None = sin límite.
+
+    Returns:
+        Select: Sentencia lista para ejecutar en una sesión síncrona o asíncrona.
+    """
+    stmt = select(Event).where(Event.idUsuario == idUsuario)
+    if desde is not None or hasta is not None:
+        stmt = stmt.where(Event.reglaRecurrencia.is_(None))
+    if desde is not None:
+        stmt = stmt.where(Event.fecha >= desde)
+    if hasta is not None:
+        stmt = stmt.where(Event.fecha <= hasta)
+    return stmt.order_by(Event.fecha, Event.hora, Event.idEvento)
+
+
+def series_between(model, idUsuario: int, desde: date, hasta: date):
+    """
+    Consulta las series (Tarea o Event con regla) de un usuario que pueden
+    tener ocurrencias entre `desde` y `hasta`: empiezan antes del final de la
+    ventana y no terminaron antes de su inicio. Usa el índice parcial
+    (idUsuario, finRecurrencia) de las filas recurrentes.
+    """
+    if model is Tarea:
+        starts_before = Tarea.fechaVencimiento < datetime.combine(hasta + timedelta(days=1), time.min)
+    else:
+        starts_before = Event.fecha <= hasta
+    return select(model).where(
+        model.idUsuario == idUsuario,
+        model.reglaRecurrencia.isnot(None),
+        or_(model.finRecurrencia.is_(None), model.finRecurrencia >= desde),
+        starts_before,
+    )
+
+
+def exceptions_between(entidad: str, ids: Sequence[int], desde: date, hasta: date):
+    """
+    Consulta las excepciones de las series `ids` que afectan a la ventana:
+    ocurrencias originalmente en ella o movidas a ella.
+    """
+    return select(ExcepcionRecurrencia).where(
+        ExcepcionRecurrencia.entidad == entidad,
+        ExcepcionRecurrencia.idPadre.in_(ids),
+        or_(ExcepcionRecurrencia.fechaOriginal.between(desde, hasta),
+            ExcepcionRecurrencia.fecha.between(desde, hasta)),
+    )
+
+
+def _unit_of_work(method):
+    """
+    Ejecuta el método dentro de una unidad de trabajo (reutiliza la que esté
+    abierta) y etiqueta sus sentencias como `Repository.<método>`.
+    """
+    @traced(f"Repository.{method.__name__}")
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.unit_of_work():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class Repository:
     """
     CRUD para usuarios y tareas según el esquema de todo.sql
+
+    Cada operación usa una sesión propia que se cierra al terminar, de modo
+    que el identity map no crece, no se devuelven objetos de transacciones ya
+    cerradas y un mismo Repository puede usarse desde varios hilos. Para que
+    varias operaciones compartan sesión (por ejemplo, todas las de una
+    petición) se agrupan con `unit_of_work()`.
+
+    Asignar `db` fija una sesión para todas las operaciones, como hacía la
+    versión anterior; las pruebas lo usan para trabajar con una base en memoria.
     """
 
-    def __init__(self):
-        self.db: Session = SessionLocal()
+    def __init__(self, session_factory: Optional[sessionmaker] = None):
+        """
+        Args:
+            session_factory (sessionmaker, optional): Crea las sesiones. Defaults to SessionLocal.
+        """
+        self.session_factory = session_factory or SessionLocal
+        self._pinned: Optional[Session] = None
+        self._local = threading.local()
+        # Listas cacheadas que se descartan al confirmar una escritura (la asigna TaskController)
+        self.list_cache: Optional[ListCache] = None
+
+    @property
+    def db(self) -> Session:
+        """
+        Sesión de la unidad de trabajo actual del hilo.
+
+        Fuera de una unidad de trabajo se abre una sesión del hilo que dura
+        hasta `close()`.
+        """
+        if self._pinned is not None:
+            return self._pinned
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self.session_factory()
+        return session
+
+    @db.setter
+    def db(self, session: Optional[Session]) -> None:
+        self._pinned = session
+
+    @property
+    def bind(self) -> Optional[Engine]:
+        """Motor de la sesión fija, de la unidad de trabajo actual o del session_factory, sin abrir una sesión."""
+        if self._pinned is not None:
+            return self._pinned.get_bind()
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            return session.get_bind()
+        return self.session_factory.kw.get("bind")
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """
+        Agrupa operaciones en una sola sesión que se cierra al salir.
+
+        Las unidades anidadas reutilizan la exterior. Lo que no se haya
+        confirmado con commit se descarta al cerrar.
+
+        Yields:
+            Session: Sesión de la unidad de trabajo.
+        """
+        if self._pinned is not None or getattr(self._local, "session", None) is not None:
+            yield self.db
+            return
+        session = self._local.session = self.session_factory()
+        try:
+            yield session
+        finally:
+            self._local.session = None
+            session.close()
+
+    def _lists_changed(self, idUsuario: Optional[int], kind: Optional[str] = None) -> None:
+        """Descarta al confirmar la transacción las listas cacheadas del usuario (None = de todos)."""
+        mark_changed(self.db, self.list_cache, idUsuario, kind)
+
+    def close(self) -> None:
+        """Libera la conexión de la sesión fija o de la sesión abierta fuera de una unidad de trabajo."""
+        if self._pinned is not None:
+            self._pinned.close()
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            self._local.session = None
+            session.close()
 
     # ==== USUARIOS ====
+    @_unit_of_work
     def create_user(self, nombre: str, email: str, contraseña: str, modoOscuro: bool = False) -> Optional[Usuario]:
         try:
             user = Usuario(nombre=nombre, email=email, contraseña=contraseña, modoOscuro=modoOscuro)
@@ -28,6 +232,7 @@ class Repository:
             self.db.rollback()
             return None
 
+    @_unit_of_work
     def get_user_by_email(self, email: str) -> Optional[Usuario]:
         try:
             return self.db.query(Usuario).filter_by(email=email).first()
@@ -35,6 +240,7 @@ class Repository:
             print(f"Error al obtener usuario por email: {e}")
             return None
 
+    @_unit_of_work
     def get_user_by_id(self, idUsuario: int) -> Optional[Usuario]:
         try:
             return self.db.query(Usuario).filter_by(idUsuario=idUsuario).first()
@@ -42,6 +248,7 @@ class Repository:
             print(f"Error al obtener usuario por id: {e}")
             return None
 
+    @_unit_of_work
     def update_user(self, idUsuario: int, **kwargs) -> bool:
         try:
             user = self.get_user_by_id(idUsuario)
@@ -57,12 +264,24 @@ class Repository:
             self.db.rollback()
             return False
 
+    @_unit_of_work
     def delete_user(self, idUsuario: int) -> bool:
         try:
             user = self.get_user_by_id(idUsuario)
             if not user:
                 return False
+            # Con foreign_keys=ON hay que borrar primero lo que referencia al usuario
+            for entidad, model, key in ((ExcepcionRecurrencia.TAREA, Tarea, Tarea.idTarea), (ExcepcionRecurrencia.EVENTO, Event, Event.idEvento)):
+                self.db.execute(delete(ExcepcionRecurrencia).where(
+                    ExcepcionRecurrencia.entidad == entidad,
+                    ExcepcionRecurrencia.idPadre.in_(select(key).where(model.idUsuario == idUsuario))
+                ))
+            self.db.query(Tarea).filter_by(idUsuario=idUsuario).delete(synchronize_session=False)
+            self.db.query(TareaArchivo).filter_by(idUsuario=idUsuario).delete(synchronize_session=False)
+            self.db.query(Event).filter_by(idUsuario=idUsuario).delete(synchronize_session=False)
+            self.db.query(Sesion).filter_by(idUsuario=idUsuario).delete(synchronize_session=False)
             self.db.delete(user)
+            self._lists_changed(idUsuario)
             self.db.commit()
             return True
         except SQLAlchemyError as e:
@@ -70,22 +289,222 @@ class Repository:
             self.db.rollback()
             return False
 
+    @_unit_of_work
     def seed_initial_users(self):
         """Crea usuarios demo si no existen."""
         try:
+            # Con hash desde el inicio: el texto plano solo se acepta en filas heredadas
             if not self.get_user_by_email('admin@gmail.com'):
-                self.create_user('Admin', 'admin@gmail.com', 'admin', False)
+                self.create_user('Admin', 'admin@gmail.com', _demo_password('admin'), False)
             if not self.get_user_by_email('user@example.com'):
-                self.create_user('User', 'user@example.com', 'user123', False)
+                self.create_user('User', 'user@example.com', _demo_password('user123'), False)
         except Exception as e:
             print(f"Error al crear usuarios iniciales: {e}")
 
-    def cleanup_completed_tasks(self):
-        """Método dummy para pasar el test de limpieza de tareas completadas (puedes implementar la lógica real si lo deseas)."""
-        pass
+    # ==== SESIONES ====
+    @_unit_of_work
+    def create_session(self, token: str, idUsuario: int, fechaExpiracion: datetime) -> bool:
+        try:
+            self.db.add(Sesion(token=token, idUsuario=idUsuario, fechaExpiracion=fechaExpiracion))
+            self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al crear sesión: {e}")
+            self.db.rollback()
+            return False
+
+    @_unit_of_work
+    def get_session_user(self, token: str, now: Optional[datetime] = None) -> Optional[Tuple[Sesion, Usuario]]:
+        """Sesión vigente del token (ya en SHA-256) y su usuario, en una sola consulta."""
+        now = now or datetime.utcnow()
+        try:
+            row = self.db.execute(
+                select(Sesion, Usuario)
+                .join(Usuario, Usuario.idUsuario == Sesion.idUsuario)
+                .where(Sesion.token == token, Sesion.fechaExpiracion > now)
+            ).first()
+            return tuple(row) if row else None
+        except SQLAlchemyError as e:
+            print(f"Error al obtener sesión: {e}")
+            return None
+
+    @_unit_of_work
+    def delete_session(self, token: str) -> bool:
+        try:
+            deleted = self.db.execute(
+                delete(Sesion).where(Sesion.token == token), execution_options={"synchronize_session": False}
+            ).rowcount
+            self.db.commit()
+            return deleted > 0
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar sesión: {e}")
+            self.db.rollback()
+            return False
+
+    @_unit_of_work
+    def delete_expired_sessions(self, now: Optional[datetime] = None, chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Elimina por bloques las sesiones expiradas.
+
+        El recorrido usa el índice de `fechaExpiracion`, así que cuesta
+        O(sesiones expiradas) y no O(sesiones).
+
+        Returns:
+            int: Cantidad de sesiones eliminadas.
+        """
+        now = now or datetime.utcnow()
+        removed = 0
+        try:
+            while True:
+                tokens = list(self.db.execute(
+                    select(Sesion.token).where(Sesion.fechaExpiracion <= now).limit(chunk_size)
+                ).scalars())
+                if not tokens:
+                    break
+                self.db.execute(delete(Sesion).where(Sesion.token.in_(tokens)), execution_options={"synchronize_session": False})
+                self.db.commit()
+                removed += len(tokens)
+                if len(tokens) < chunk_size:
+                    break
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar sesiones expiradas: {e}")
+            self.db.rollback()
+        return removed
+
+    @_unit_of_work
+    def cleanup_completed_tasks(self, default_days: int = 30, chunk_size: int = BULK_CHUNK_SIZE,
+                                idUsuario: Optional[int] = None, now: Optional[datetime] = None,
+                                archive_retention_days: Optional[float] = None) -> Dict[int, List[int]]:
+        """
+        Elimina de `tareas` las tareas completadas hace más días que la
+        retención del usuario y, si se indica, las del archivo más antiguas
+        que `archive_retention_days`.
+
+        El archivo es el historial: la retención del usuario no lo recorta.
+
+        Se borra por bloques de `chunk_size` filas, cada uno en su propia
+        transacción, para no retener el bloqueo de escritura mucho tiempo.
+
+        Args:
+            default_days (int): Retención para usuarios sin `diasRetencion`.
+            chunk_size (int): Filas como máximo por transacción.
+            idUsuario (int, optional): Limitar la limpieza a un usuario.
+            now (datetime, optional): Momento de referencia (por defecto, ahora).
+            archive_retention_days (float, optional): Días que se conserva una
+                tarea completada en el archivo; None o 0 lo conserva siempre.
+
+        Returns:
+            Dict[int, List[int]]: IDs eliminados (de `tareas` y del archivo) agrupados por usuario.
+        """
+        now = now or datetime.now()
+        removed: Dict[int, List[int]] = {}
+        try:
+            users = self.db.query(Usuario.idUsuario, Usuario.diasRetencion)
+            if idUsuario is not None:
+                users = users.filter(Usuario.idUsuario == idUsuario)
+            for user_id, days in users.all():
+                days = default_days if days is None else days
+                ids = []
+                if days > 0:
+                    ids += self._delete_completed_before(Tarea, user_id, now - timedelta(days=days), chunk_size)
+                if archive_retention_days:
+                    ids += self._delete_completed_before(
+                        TareaArchivo, user_id, now - timedelta(days=archive_retention_days), chunk_size)
+                if ids:
+                    removed[user_id] = ids
+        except SQLAlchemyError as e:
+            print(f"Error al limpiar tareas completadas: {e}")
+            self.db.rollback()
+        return removed
+
+    def _delete_completed_before(self, model, idUsuario: int, cutoff: datetime, chunk_size: int) -> List[int]:
+        completed_at = func.coalesce(model.fechaCompletado, model.fechaVencimiento)
+        removed: List[int] = []
+        while True:
+            ids = list(self.db.execute(
+                select(model.idTarea)
+                .where(model.idUsuario == idUsuario, model.estado.in_(COMPLETED_STATES), completed_at < cutoff)
+                .limit(chunk_size)
+            ).scalars())
+            if not ids:
+                return removed
+            self.db.execute(delete(model).where(model.idTarea.in_(ids)), execution_options={"synchronize_session": False})
+            if model is Tarea:
+                self._lists_changed(idUsuario, TASKS)
+            self.db.commit()
+            removed += ids
+            if len(ids) < chunk_size:
+                return removed
+
+    # ==== ARCHIVO ====
+    @_unit_of_work
+    def archive_completed_tasks(self, delay_days: float, chunk_size: int = BULK_CHUNK_SIZE,
+                                now: Optional[datetime] = None) -> Dict[int, List[int]]:
+        """
+        Mueve a `tareas_archivo` las tareas completadas hace más de `delay_days` días.
+
+        Cada bloque se copia y se borra de `tareas` en la misma transacción,
+        así una tarea nunca queda en ambas tablas ni en ninguna.
+
+        Args:
+            delay_days (float): Días que una tarea completada permanece en `tareas`.
+            chunk_size (int): Filas como máximo por transacción.
+            now (datetime, optional): Momento de referencia (por defecto, ahora).
+
+        Returns:
+            Dict[int, List[int]]: IDs archivados agrupados por usuario.
+        """
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=delay_days)
+        columns = [c.name for c in Tarea.__table__.columns]
+        archived: Dict[int, List[int]] = {}
+        try:
+            while True:
+                rows = self.db.execute(
+                    select(Tarea.idTarea, Tarea.idUsuario)
+                    .where(Tarea.estado.in_(COMPLETED_STATES), Tarea.fechaCompletado < cutoff)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                ids = [row.idTarea for row in rows]
+                self.db.execute(
+                    insert(TareaArchivo).from_select(
+                        columns + ['fechaArchivado'],
+                        select(*[Tarea.__table__.c[name] for name in columns], literal(now))
+                        .where(Tarea.idTarea.in_(ids))
+                    )
+                )
+                self.db.execute(delete(Tarea).where(Tarea.idTarea.in_(ids)), execution_options={"synchronize_session": False})
+                for idUsuario in {row.idUsuario for row in rows}:
+                    self._lists_changed(idUsuario, TASKS)
+                self.db.commit()
+                for row in rows:
+                    archived.setdefault(row.idUsuario, []).append(row.idTarea)
+                if len(ids) < chunk_size:
+                    break
+        except SQLAlchemyError as e:
+            print(f"Error al archivar tareas completadas: {e}")
+            self.db.rollback()
+        return archived
+
+    @_unit_of_work
+    def get_archived_tasks(self, idUsuario: int, offset: int = 0, limit: int = 50) -> List[TareaArchivo]:
+        """Obtiene tareas archivadas de un usuario, de la más reciente a la más antigua."""
+        return (self.db.query(TareaArchivo)
+                .filter(TareaArchivo.idUsuario == idUsuario)
+                .order_by(TareaArchivo.fechaArchivado.desc(), TareaArchivo.idTarea.desc())
+                .offset(offset).limit(limit).all())
+
+    @_unit_of_work
+    def count_archived_tasks(self, idUsuario: int) -> int:
+        """Cuenta las tareas archivadas de un usuario."""
+        return self.db.query(func.count(TareaArchivo.idTarea)).filter(TareaArchivo.idUsuario == idUsuario).scalar()
 
     # ==== TAREAS ====
-    def create_task(self, titulo: str, descripcion: str, fechaCreacion: datetime, fechaVencimiento: datetime, estado: str, prioridad: str, tipo: str, idUsuario: int, idGrupo: Optional[int] = None, idTipoTarea: Optional[int] = None) -> Optional[Tarea]:
+    @_unit_of_work
+    def create_task(self, titulo: str, descripcion: str, fechaCreacion: datetime, fechaVencimiento: datetime, estado: str, prioridad: str, tipo: str, idUsuario: int, idGrupo: Optional[int] = None, idTipoTarea: Optional[int] = None,
+                    reglaRecurrencia: Optional[str] = None, finRecurrencia: Optional[date] = None) -> Optional[Tarea]:
         try:
             tarea = Tarea(
                 titulo=titulo,
@@ -97,9 +516,13 @@ class Repository:
                 tipo=tipo,
                 idUsuario=idUsuario,
                 idGrupo=idGrupo,
-                idTipoTarea=idTipoTarea
+                idTipoTarea=idTipoTarea,
+                reglaRecurrencia=reglaRecurrencia,
+                finRecurrencia=finRecurrencia,
+                fechaCompletado=datetime.now() if estado in COMPLETED_STATES else None
             )
             self.db.add(tarea)
+            self._lists_changed(idUsuario, TASKS)
             self.db.commit()
             self.db.refresh(tarea)
             return tarea
@@ -108,6 +531,7 @@ class Repository:
             self.db.rollback()
             return None
 
+    @_unit_of_work
     def get_task_by_id(self, idTarea: int) -> Optional[Tarea]:
         try:
             return self.db.query(Tarea).filter_by(idTarea=idTarea).first()
@@ -115,6 +539,7 @@ class Repository:
             print(f"Error al obtener tarea por id: {e}")
             return None
 
+    @_unit_of_work
     def get_tasks_by_user(self, idUsuario: int) -> List[Tarea]:
         try:
             return self.db.query(Tarea).filter_by(idUsuario=idUsuario).all()
@@ -122,14 +547,183 @@ class Repository:
             print(f"Error al obtener tareas de usuario: {e}")
             return []
 
+    @_unit_of_work
+    def query_tasks(self, idUsuario: int, estados: Optional[Sequence[str]] = None,
+                    excluir_estados: Optional[Sequence[str]] = None, prioridades: Optional[Sequence[str]] = None,
+                    desde: Optional[datetime] = None, hasta: Optional[datetime] = None,
+                    orden: str = 'end_date', descendente: bool = False,
+                    despues: Optional[Tuple[Any, int]] = None, limite: Optional[int] = 50,
+                    columnas: Optional[Sequence] = None) -> List[Tarea]:
+        """
+        Consulta tareas de un usuario con filtros, orden y paginación por cursor en SQL.
+
+        La paginación es por conjunto de claves: `despues` es el par
+        (valor de la columna de orden, idTarea) de la última fila de la página
+        anterior, así cada página cuesta lo mismo sin importar su posición.
+        SQLite ordena los NULL como el menor valor, y el cursor respeta ese orden.
+
+        Args:
+            idUsuario (int): ID del usuario.
+            estados (Sequence[str], optional): Estados de la vista (new, progress,
+                completed) o valores de `estado`.
+            excluir_estados (Sequence[str], optional): Estados a omitir.
+            prioridades (Sequence[str], optional): Prioridades a incluir.
+            desde (datetime, optional): Vencimiento mínimo (incluido).
+            hasta (datetime, optional): Vencimiento máximo (incluido).
+            orden (str): Clave de TASK_SORT_COLUMNS.
+            descendente (bool): Orden descendente.
+            despues (Tuple[Any, int], optional): Cursor de la página anterior.
+            limite (int, optional): Tareas como máximo; None trae todas.
+            columnas (Sequence, optional): Columnas de Tarea a seleccionar; si se
+                indican se devuelven tuplas con esos valores en vez de objetos Tarea.
+
+        Returns:
+            List[Tarea]: Tareas de la página (o filas, con `columnas`).
+        """
+        try:
+            query = self.db.query(*columnas) if columnas else self.db.query(Tarea)
+            query = query.filter(Tarea.idUsuario == idUsuario)
+            query = self._filter_tasks(query, estados, excluir_estados, prioridades, desde, hasta)
+            column = getattr(Tarea, TASK_SORT_COLUMNS.get(orden, 'fechaVencimiento'))
+            if despues is not None:
+                query = query.filter(self._after_cursor(column, despues, descendente))
+            if descendente:
+                query = query.order_by(column.desc(), Tarea.idTarea.desc())
+            else:
+                query = query.order_by(column.asc(), Tarea.idTarea.asc())
+            if limite is not None:
+                query = query.limit(limite)
+            return query.all()
+        except SQLAlchemyError as e:
+            print(f"Error al consultar tareas: {e}")
+            return []
+
+    @_unit_of_work
+    def count_tasks(self, idUsuario: int, estados: Optional[Sequence[str]] = None,
+                    excluir_estados: Optional[Sequence[str]] = None, prioridades: Optional[Sequence[str]] = None,
+                    desde: Optional[datetime] = None, hasta: Optional[datetime] = None) -> int:
+        """Cuenta las tareas que cumplen los mismos filtros que query_tasks."""
+        try:
+            query = self.db.query(func.count(Tarea.idTarea)).filter(Tarea.idUsuario == idUsuario)
+            return self._filter_tasks(query, estados, excluir_estados, prioridades, desde, hasta).scalar()
+        except SQLAlchemyError as e:
+            print(f"Error al contar tareas: {e}")
+            return 0
+
+    @_unit_of_work
+    def get_task_stats(self, idUsuario: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Estadísticas de las tareas del usuario leídas de `estadisticas_tareas`.
+
+        Sin la tabla de contadores (base de datos no SQLite o sin migrar) se
+        calculan con GROUP BY sobre `tareas`.
+
+        Args:
+            idUsuario (int): ID del usuario.
+            now (datetime, optional): Momento de referencia para las vencidas. Defaults to ahora.
+
+        Returns:
+            Dict[str, Any]: `total`, `estados` {estado: n}, `prioridades` {prioridad: n}
+            y `vencidas` (sin completar con vencimiento anterior a `now`).
+        """
+        now = now or datetime.now()
+        today = datetime.combine(now.date(), time.min)
+        try:
+            if not has_task_stats(self.db):
+                return self._scan_task_stats(idUsuario, now)
+            params = {"u": idUsuario, "p": DUE_PREFIX, "hoy": DUE_PREFIX + now.date().isoformat()}
+            stats = split_counters(self.db.execute(text(
+                f'SELECT clave, valor FROM {STATS_TABLE} WHERE "idUsuario" = :u AND clave < :p'
+            ), params).all())
+            # Días anteriores desde los contadores; las que vencen hoy antes de `now`, del índice por vencimiento
+            stats["vencidas"] = self.db.execute(text(
+                f'SELECT COALESCE(SUM(valor), 0) FROM {STATS_TABLE} '
+                'WHERE "idUsuario" = :u AND clave >= :p AND clave < :hoy'
+            ), params).scalar() + self.count_tasks(idUsuario, excluir_estados=COMPLETED_STATES, desde=today,
+                                                   hasta=now - timedelta(microseconds=1))
+            return stats
+        except SQLAlchemyError as e:
+            print(f"Error al obtener estadísticas: {e}")
+            self.db.rollback()
+            return {"total": 0, "estados": {}, "prioridades": {}, "vencidas": 0}
+
+    def _scan_task_stats(self, idUsuario: int, now: datetime) -> Dict[str, Any]:
+        """get_task_stats recorriendo las tareas del usuario."""
+        rows = [(STATUS_PREFIX + (estado or ''), n) for estado, n in self.db.query(Tarea.estado, func.count()).filter(
+            Tarea.idUsuario == idUsuario).group_by(Tarea.estado)]
+        rows += [(PRIORITY_PREFIX + (prioridad or ''), n) for prioridad, n in self.db.query(Tarea.prioridad, func.count()).filter(
+            Tarea.idUsuario == idUsuario).group_by(Tarea.prioridad)]
+        stats = split_counters(rows)
+        stats["total"] = sum(stats["estados"].values())
+        stats["vencidas"] = self.count_tasks(idUsuario, excluir_estados=COMPLETED_STATES,
+                                             hasta=now - timedelta(microseconds=1))
+        return stats
+
+    @staticmethod
+    def _expand_states(estados: Sequence[str]) -> List[str]:
+        expanded = []
+        for estado in estados:
+            expanded.extend(STATUS_ALIASES.get(estado, (estado,)))
+        return expanded
+
+    @classmethod
+    def _filter_tasks(cls, query, estados, excluir_estados, prioridades, desde, hasta):
+        # Sirve tanto para Query como para select() (AsyncRepository)
+        if estados:
+            query = query.filter(Tarea.estado.in_(cls._expand_states(estados)))
+        if excluir_estados:
+            query = query.filter(Tarea.estado.notin_(cls._expand_states(excluir_estados)))
+        if prioridades:
+            query = query.filter(Tarea.prioridad.in_(list(prioridades)))
+        if desde is not None:
+            query = query.filter(Tarea.fechaVencimiento >= desde)
+        if hasta is not None:
+            query = query.filter(Tarea.fechaVencimiento <= hasta)
+        return query
+
+    @staticmethod
+    def _after_cursor(column, despues: Tuple[Any, int], descendente: bool):
+        value, last_id = despues
+        if column is Tarea.idTarea:
+            return Tarea.idTarea < last_id if descendente else Tarea.idTarea > last_id
+        if descendente:
+            # NULL va al final: tras un NULL solo quedan NULL con ID menor
+            if value is None:
+                return and_(column.is_(None), Tarea.idTarea < last_id)
+            return or_(column < value, and_(column == value, Tarea.idTarea < last_id), column.is_(None))
+        # NULL va al principio: tras un NULL siguen los NULL con ID mayor y todos los valores
+        if value is None:
+            return or_(and_(column.is_(None), Tarea.idTarea > last_id), column.isnot(None))
+        return or_(column > value, and_(column == value, Tarea.idTarea > last_id))
+
+    @_unit_of_work
+    def get_tasks_by_ids(self, ids: List[int], idUsuario: int) -> List[Tarea]:
+        if not ids:
+            return []
+        try:
+            return self.db.query(Tarea).filter(Tarea.idUsuario == idUsuario, Tarea.idTarea.in_(ids)).all()
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tareas por id: {e}")
+            return []
+
+    @_unit_of_work
+    def get_user_task(self, idTarea: int, idUsuario: int) -> Optional[Tarea]:
+        try:
+            return self.db.query(Tarea).filter_by(idTarea=idTarea, idUsuario=idUsuario).first()
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tarea del usuario: {e}")
+            return None
+
+    @_unit_of_work
     def update_task(self, idTarea: int, idUsuario: int, **kwargs) -> bool:
         try:
             tarea = self.db.query(Tarea).filter_by(idTarea=idTarea, idUsuario=idUsuario).first()
             if not tarea:
                 return False
-            for key, value in kwargs.items():
+            for key, value in completion_changes(tarea, kwargs).items():
                 if hasattr(tarea, key):
                     setattr(tarea, key, value)
+            self._lists_changed(idUsuario, TASKS)
             self.db.commit()
             return True
         except SQLAlchemyError as e:
@@ -137,12 +731,16 @@ class Repository:
             self.db.rollback()
             return False
 
+    @_unit_of_work
     def delete_task(self, idTarea: int, idUsuario: int) -> bool:
         try:
             tarea = self.db.query(Tarea).filter_by(idTarea=idTarea, idUsuario=idUsuario).first()
             if not tarea:
                 return False
+            if tarea.reglaRecurrencia:
+                self._delete_exceptions(ExcepcionRecurrencia.TAREA, [idTarea])
             self.db.delete(tarea)
+            self._lists_changed(idUsuario, TASKS)
             self.db.commit()
             return True
         except SQLAlchemyError as e:
@@ -150,6 +748,350 @@ class Repository:
             self.db.rollback()
             return False
 
+    # ==== EVENTOS ====
+    @_unit_of_work
+    def save_event(self, event: Event) -> bool:
+        try:
+            self.db.add(event)
+            self._lists_changed(event.idUsuario, EVENTS)
+            self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al guardar evento: {e}")
+            self.db.rollback()
+            return False
+
+    @_unit_of_work
+    def get_user_events(self, idUsuario: int) -> List[Event]:
+        try:
+            return list(self.db.execute(events_between(idUsuario)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener eventos: {e}")
+            return []
+
+    @_unit_of_work
+    def get_events_in_range(self, idUsuario: int, desde: date, hasta: date) -> List[Event]:
+        """Eventos simples del usuario entre `desde` y `hasta` (ambos incluidos)."""
+        try:
+            return list(self.db.execute(events_between(idUsuario, desde, hasta)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener eventos por rango: {e}")
+            return []
+
+    @_unit_of_work
+    def get_user_event(self, idEvento: int, idUsuario: int) -> Optional[Event]:
+        try:
+            return self.db.query(Event).filter_by(idEvento=idEvento, idUsuario=idUsuario).first()
+        except SQLAlchemyError as e:
+            print(f"Error al obtener evento del usuario: {e}")
+            return None
+
+    @_unit_of_work
+    def update_event(self, idEvento: int, idUsuario: int, **kwargs) -> bool:
+        try:
+            event = self.db.query(Event).filter_by(idEvento=idEvento, idUsuario=idUsuario).first()
+            if not event:
+                return False
+            for key, value in kwargs.items():
+                if hasattr(event, key):
+                    setattr(event, key, value)
+            self._lists_changed(idUsuario, EVENTS)
+            self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error al actualizar evento: {e}")
+            self.db.rollback()
+            return False
+
+    @_unit_of_work
+    def delete_event(self, idEvento: int, idUsuario: int) -> bool:
+        try:
+            deleted = self.db.query(Event).filter_by(idEvento=idEvento, idUsuario=idUsuario).delete(synchronize_session=False)
+            if deleted:
+                self._delete_exceptions(ExcepcionRecurrencia.EVENTO, [idEvento])
+                self._lists_changed(idUsuario, EVENTS)
+            self.db.commit()
+            return deleted > 0
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar evento: {e}")
+            self.db.rollback()
+            return False
+
+    # ==== RECURRENCIA ====
+    @_unit_of_work
+    def get_recurring_events(self, idUsuario: int, desde: date, hasta: date) -> List[Event]:
+        """Series de eventos del usuario que pueden tener ocurrencias en la ventana."""
+        try:
+            return list(self.db.execute(series_between(Event, idUsuario, desde, hasta)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener eventos recurrentes: {e}")
+            return []
+
+    @_unit_of_work
+    def get_recurring_tasks(self, idUsuario: int, desde: date, hasta: date) -> List[Tarea]:
+        """Series de tareas del usuario que pueden tener ocurrencias en la ventana."""
+        try:
+            return list(self.db.execute(series_between(Tarea, idUsuario, desde, hasta)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener tareas recurrentes: {e}")
+            return []
+
+    @_unit_of_work
+    def get_recurrence_exceptions(self, entidad: str, ids: List[int], desde: date, hasta: date) -> List[ExcepcionRecurrencia]:
+        if not ids:
+            return []
+        try:
+            return list(self.db.execute(exceptions_between(entidad, ids, desde, hasta)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Error al obtener excepciones de recurrencia: {e}")
+            return []
+
+    @_unit_of_work
+    def save_recurrence_exception(self, entidad: str, idPadre: int, fechaOriginal: date,
+                                  **cambios) -> Optional[ExcepcionRecurrencia]:
+        """
+        Crea o actualiza la excepción de una ocurrencia.
+
+        Args:
+            entidad (str): 'tarea' o 'evento'.
+            idPadre (int): ID de la serie (ya verificada como del usuario).
+            fechaOriginal (date): Fecha generada por la regla.
+            **cambios: Columnas de ExcepcionRecurrencia a fijar (p. ej. cancelada, fecha, titulo).
+
+        Returns:
+            Optional[ExcepcionRecurrencia]: La excepción guardada, o None si hubo un error.
+        """
+        try:
+            excepcion = self.db.query(ExcepcionRecurrencia).filter_by(
+                entidad=entidad, idPadre=idPadre, fechaOriginal=fechaOriginal).first()
+            if excepcion is None:
+                excepcion = ExcepcionRecurrencia(entidad=entidad, idPadre=idPadre, fechaOriginal=fechaOriginal)
+                self.db.add(excepcion)
+            for key, value in cambios.items():
+                if hasattr(excepcion, key):
+                    setattr(excepcion, key, value)
+            self.db.commit()
+            return excepcion
+        except SQLAlchemyError as e:
+            print(f"Error al guardar excepción de recurrencia: {e}")
+            self.db.rollback()
+            return None
+
+    def _delete_exceptions(self, entidad: str, ids: List[int]) -> None:
+        """Borra las excepciones de las series (dentro de la transacción del llamador)."""
+        self.db.execute(
+            delete(ExcepcionRecurrencia).where(ExcepcionRecurrencia.entidad == entidad,
+                                               ExcepcionRecurrencia.idPadre.in_(ids)),
+            execution_options={"synchronize_session": False}
+        )
+
+    # ==== TAREAS (operaciones masivas) ====
+    def _existing_task_ids(self, ids: List[int], idUsuario: int) -> List[int]:
+        """IDs de `ids` que existen y pertenecen al usuario (consulta por bloques)."""
+        found = []
+        unique_ids = list(dict.fromkeys(ids))
+        for start in range(0, len(unique_ids), BULK_CHUNK_SIZE):
+            chunk = unique_ids[start:start + BULK_CHUNK_SIZE]
+            found.extend(self.db.execute(
+                select(Tarea.idTarea).where(Tarea.idUsuario == idUsuario, Tarea.idTarea.in_(chunk))
+            ).scalars())
+        return found
+
+    @_unit_of_work
+    def bulk_create_tasks(self, idUsuario: int, tareas: List[Dict]) -> List[int]:
+        """
+        Inserta varias tareas en una sola transacción (un INSERT multi-fila).
+
+        Args:
+            idUsuario (int): Usuario propietario de todas las tareas.
+            tareas (List[Dict]): Valores de cada tarea (claves de TASK_BULK_FIELDS).
+
+        Returns:
+            List[int]: IDs creados, en el mismo orden que `tareas`. Vacía si falla.
+        """
+        if not tareas:
+            return []
+        rows = []
+        for tarea in tareas:
+            row = {key: tarea.get(key) for key in TASK_BULK_FIELDS}
+            row['fechaCreacion'] = row['fechaCreacion'] or datetime.utcnow()
+            row['tipo'] = row['tipo'] or 'General'
+            row['fechaCompletado'] = datetime.now() if row['estado'] in COMPLETED_STATES else None
+            row['idUsuario'] = idUsuario
+            rows.append(row)
+        try:
+            ids = list(self.db.execute(
+                insert(Tarea).returning(Tarea.idTarea, sort_by_parameter_order=True), rows
+            ).scalars())
+            self._lists_changed(idUsuario, TASKS)
+            self.db.commit()
+            return ids
+        except SQLAlchemyError as e:
+            print(f"Error al crear tareas en bloque: {e}")
+            self.db.rollback()
+            return []
+
+    @_unit_of_work
+    def bulk_update_tasks(self, idUsuario: int, cambios: List[Dict]) -> List[int]:
+        """
+        Actualiza varias tareas en una sola transacción.
+
+        Las filas con el mismo conjunto de columnas se envían juntas como un
+        único UPDATE parametrizado (executemany).
+
+        Args:
+            idUsuario (int): Usuario propietario.
+            cambios (List[Dict]): Cada dict lleva `idTarea` y las columnas a cambiar.
+
+        Returns:
+            List[int]: IDs efectivamente actualizados (los ajenos o inexistentes se omiten).
+        """
+        if not cambios:
+            return []
+        try:
+            existing = set(self._existing_task_ids([c['idTarea'] for c in cambios], idUsuario))
+            groups: Dict[tuple, List[Dict]] = {}
+            for cambio in cambios:
+                if cambio['idTarea'] not in existing:
+                    continue
+                fields = tuple(sorted(k for k in cambio if k in TASK_BULK_FIELDS))
+                if not fields:
+                    continue
+                params = {'b_idTarea': cambio['idTarea']}
+                params.update({f'b_{k}': cambio[k] for k in fields})
+                groups.setdefault(fields, []).append(params)
+            updated = []
+            table = Tarea.__table__
+            now = datetime.now()
+            for fields, params in groups.items():
+                values = {k: bindparam(f'b_{k}') for k in fields}
+                if 'estado' in fields:
+                    # Conservar la fecha de completado si ya lo estaba; borrarla si deja de estarlo
+                    values['fechaCompletado'] = case(
+                        # IN (...) expandido no se admite con executemany: se usa OR
+                        (or_(*(bindparam('b_estado') == state for state in COMPLETED_STATES)),
+                         func.coalesce(table.c.fechaCompletado, now)),
+                        else_=None
+                    )
+                stmt = (
+                    update(table)
+                    .where(table.c.idTarea == bindparam('b_idTarea'), table.c.idUsuario == idUsuario)
+                    .values(values)
+                )
+                self.db.execute(stmt, params)
+                updated.extend(p['b_idTarea'] for p in params)
+            if updated:
+                self._lists_changed(idUsuario, TASKS)
+            self.db.commit()
+            return updated
+        except SQLAlchemyError as e:
+            print(f"Error al actualizar tareas en bloque: {e}")
+            self.db.rollback()
+            return []
+
+    @_unit_of_work
+    def bulk_delete_tasks(self, ids: List[int], idUsuario: int) -> List[int]:
+        """
+        Elimina varias tareas del usuario con DELETE ... WHERE idTarea IN (...)
+        en una sola transacción.
+
+        Args:
+            ids (List[int]): IDs a eliminar.
+            idUsuario (int): Usuario propietario.
+
+        Returns:
+            List[int]: IDs eliminados.
+        """
+        if not ids:
+            return []
+        try:
+            existing = self._existing_task_ids(ids, idUsuario)
+            for start in range(0, len(existing), BULK_CHUNK_SIZE):
+                chunk = existing[start:start + BULK_CHUNK_SIZE]
+                self._delete_exceptions(ExcepcionRecurrencia.TAREA, chunk)
+                self.db.execute(
+                    delete(Tarea).where(Tarea.idUsuario == idUsuario, Tarea.idTarea.in_(chunk)),
+                    execution_options={"synchronize_session": False}
+                )
+            if existing:
+                self._lists_changed(idUsuario, TASKS)
+            self.db.commit()
+            return existing
+        except SQLAlchemyError as e:
+            print(f"Error al eliminar tareas en bloque: {e}")
+            self.db.rollback()
+            return []
+
+    # ==== BÚSQUEDA ====
+    @_unit_of_work
+    def search_tasks(self, idUsuario: int, consulta: str, offset: int = 0, limit: int = 20) -> Tuple[List[Dict], int]:
+        """
+        Busca tareas del usuario por título y descripción, ordenadas por relevancia.
+
+        Args:
+            idUsuario (int): ID del usuario.
+            consulta (str): Texto a buscar (cada palabra como prefijo).
+            offset (int): Resultados a omitir.
+            limit (int): Resultados como máximo.
+
+        Returns:
+            Tuple[List[Dict], int]: Resultados (`item`, `titulo` y `descripcion`
+            resaltados con HIGHLIGHT_OPEN/HIGHLIGHT_CLOSE) y total de coincidencias.
+        """
+        return self._search(Tarea, 'tareas_fts', 'tareas', 'idTarea', idUsuario, consulta, offset, limit)
+
+    @_unit_of_work
+    def search_events(self, idUsuario: int, consulta: str, offset: int = 0, limit: int = 20) -> Tuple[List[Dict], int]:
+        """Igual que search_tasks, sobre los eventos del usuario."""
+        return self._search(Event, 'eventos_fts', 'eventos', 'idEvento', idUsuario, consulta, offset, limit)
+
+    def _search(self, model, fts: str, table: str, rowid: str, idUsuario: int, consulta: str,
+                offset: int, limit: int) -> Tuple[List[Dict], int]:
+        match = to_match_query(consulta)
+        if not match:
+            return [], 0
+        try:
+            if not search_index_ready(self.db, fts):
+                return self._search_like(model, rowid, idUsuario, consulta, offset, limit)
+            where = f'{fts} MATCH :q AND t."idUsuario" = :u'
+            # CROSS JOIN fija el orden: primero MATCH y luego cada coincidencia en la tabla,
+            # nunca un MATCH por cada fila del usuario
+            join = f'{fts} CROSS JOIN {table} t ON t."{rowid}" = {fts}.rowid'
+            params = {"q": match, "u": idUsuario, "o": HIGHLIGHT_OPEN, "c": HIGHLIGHT_CLOSE,
+                      "limit": limit, "offset": offset}
+            rows = self.db.execute(text(
+                f"SELECT {fts}.rowid, highlight({fts}, 0, :o, :c), snippet({fts}, 1, :o, :c, '…', 16) "
+                f"FROM {join} WHERE {where} ORDER BY bm25({fts}, 10.0, 1.0) LIMIT :limit OFFSET :offset"
+            ), params).all()
+            if offset == 0 and len(rows) < limit:
+                total = len(rows)
+            else:
+                total = self.db.execute(text(f"SELECT COUNT(*) FROM {join} WHERE {where}"), params).scalar()
+            ids = [row[0] for row in rows]
+            items = {getattr(obj, rowid): obj for obj in
+                     self.db.query(model).filter(getattr(model, rowid).in_(ids)).all()} if ids else {}
+            return [{"item": items[row[0]], "titulo": row[1], "descripcion": row[2]}
+                    for row in rows if row[0] in items], total
+        except SQLAlchemyError as e:
+            print(f"Error al buscar: {e}")
+            self.db.rollback()
+            return [], 0
+
+    def _search_like(self, model, rowid: str, idUsuario: int, consulta: str,
+                     offset: int, limit: int) -> Tuple[List[Dict], int]:
+        """Búsqueda sin FTS5: subcadena en título o descripción, sin ranking ni resaltado."""
+        # % y _ escritos por el usuario se buscan literalmente, no como comodines
+        literal_text = consulta.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{literal_text}%"
+        query = self.db.query(model).filter(
+            model.idUsuario == idUsuario,
+            or_(model.titulo.ilike(pattern, escape='\\'), model.descripcion.ilike(pattern, escape='\\'))
+        )
+        total = query.count()
+        items = query.order_by(getattr(model, rowid).desc()).offset(offset).limit(limit).all()
+        return [{"item": item, "titulo": None, "descripcion": None} for item in items], total
+
+    @_unit_of_work
     def seed_initial_tasks(self):
         """Crea tareas demo para los usuarios iniciales si no existen."""
         try:
@@ -0,0 +1,150 @@
+"""
+Índice de búsqueda de texto completo (SQLite FTS5).
+
+`tareas_fts` y `eventos_fts` son tablas FTS5 de contenido externo: no
+duplican el texto, solo indexan `titulo` y `descripcion` de `tareas` y
+`eventos`. Los triggers las mantienen sincronizadas con cualquier INSERT,
+UPDATE o DELETE, venga del ORM o de sentencias masivas.
+
+Para reconstruir el índice de una base de datos existente:
+
+    python -m src.database.search [ruta/a/todo_app.db]
+"""
+
+import re
+import sys
+import weakref
+from typing import List, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+
+# Tabla FTS -> (tabla de contenido, columna rowid)
+FTS_TABLES = {
+    'tareas_fts': ('tareas', 'idTarea'),
+    'eventos_fts': ('eventos', 'idEvento'),
+}
+# Marcadores de highlight/snippet; la vista los convierte en <mark> tras escapar el HTML
+HIGHLIGHT_OPEN = '\x02'
+HIGHLIGHT_CLOSE = '\x03'
+# Motor -> tablas FTS ya encontradas; solo se guardan los positivos porque las
+# migraciones en segundo plano pueden crear el índice más tarde
+_indexed: "weakref.WeakKeyDictionary[Engine, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+def _triggers(fts: str, table: str, rowid: str) -> List[str]:
+    new_values = f'new."{rowid}", new.titulo, new.descripcion'
+    old_values = f"'delete', old.\"{rowid}\", old.titulo, old.descripcion"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, titulo, descripcion) VALUES ({new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, titulo, descripcion) VALUES ({old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF titulo, descripcion ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, titulo, descripcion) VALUES ({old_values}); "
+        f"INSERT INTO {fts}(rowid, titulo, descripcion) VALUES ({new_values}); END",
+    ]
+
+
+def ensure_search_index(conn: Connection) -> bool:
+    """
+    Crea las tablas FTS5 y sus triggers si no existen.
+
+    Args:
+        conn (Connection): Conexión dentro de una transacción.
+
+    Returns:
+        bool: False si SQLite no tiene FTS5 (la búsqueda usará LIKE).
+    """
+    try:
+        for fts, (table, rowid) in FTS_TABLES.items():
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"titulo, descripcion, content='{table}', content_rowid='{rowid}', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+            for statement in _triggers(fts, table, rowid):
+                conn.execute(text(statement))
+        return True
+    except OperationalError as e:
+        print(f"Advertencia: FTS5 no disponible, la búsqueda usará LIKE ({e})")
+        return False
+
+
+def rebuild_search_index(bind: Engine) -> bool:
+    """
+    Crea (si hace falta) y reconstruye los índices FTS5 desde las tablas de contenido.
+
+    Args:
+        bind (Engine): Motor de la base de datos.
+
+    Returns:
+        bool: True si el índice quedó reconstruido.
+    """
+    with bind.begin() as conn:
+        if not ensure_search_index(conn):
+            return False
+        for fts in FTS_TABLES:
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    return True
+
+
+def has_search_index(conn, fts: str) -> bool:
+    """Indica si la tabla FTS existe en la base de datos de la conexión o sesión."""
+    # Sin SQLite no hay sqlite_master ni FTS5: se busca con LIKE
+    dialect = conn.dialect if isinstance(conn, Connection) else conn.get_bind().dialect
+    if dialect.name != 'sqlite':
+        return False
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+    ).first() is not None
+
+
+def search_index_ready(session, fts: str) -> bool:
+    """
+    Igual que has_search_index, pero recuerda por motor las tablas FTS encontradas.
+
+    Args:
+        session: Sesión o conexión sobre la que se va a buscar.
+        fts (str): Nombre de la tabla FTS.
+
+    Returns:
+        bool: True si la tabla FTS existe.
+    """
+    engine = session.engine if isinstance(session, Connection) else session.get_bind()
+    found = _indexed.get(engine)
+    if found is not None and fts in found:
+        return True
+    if not has_search_index(session, fts):
+        return False
+    _indexed.setdefault(engine, set()).add(fts)
+    return True
+
+
+def to_match_query(query: str) -> str:
+    """
+    Convierte el texto del usuario en una consulta MATCH segura.
+
+    Cada palabra se busca como prefijo y todas deben aparecer; la sintaxis
+    FTS5 (comillas, operadores, columnas) no se interpreta.
+
+    Args:
+        query (str): Texto escrito por el usuario.
+
+    Returns:
+        str: Consulta FTS5, vacía si no hay palabras.
+    """
+    words = re.findall(r"\w+", query or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+if __name__ == "__main__":
+    from src.database.db import DATABASE_URL, create_db_engine
+
+    url = f"sqlite:///{sys.argv[1]}" if len(sys.argv) > 1 else DATABASE_URL
+    if rebuild_search_index(create_db_engine(url)):
+        print("Índice de búsqueda reconstruido")
+    else:
+        sys.exit(1)
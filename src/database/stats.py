@@ -0,0 +1,205 @@
+"""
+Contadores de tareas por usuario (SQLite).
+
+`estadisticas_tareas` guarda una fila por (usuario, clave) con el número de
+tareas de `tareas` en cada grupo:
+
+- `total`
+- `estado:<estado>` y `prioridad:<prioridad>`
+- `vence:<YYYY-MM-DD>`: tareas sin completar que vencen ese día
+
+Los triggers la actualizan en la misma transacción que cualquier INSERT,
+UPDATE o DELETE de `tareas`, venga del ORM o de sentencias masivas, así que
+leer las estadísticas de un usuario no recorre sus tareas. Las tareas
+vencidas son la suma de las claves `vence:` anteriores a hoy (más las que
+vencen hoy antes de la hora actual, que se cuentan aparte).
+
+Para comprobar o reconstruir los contadores de una base de datos existente:
+
+    python -m src.database.stats [--check] [ruta/a/todo_app.db]
+"""
+
+import sys
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+STATS_TABLE = 'estadisticas_tareas'
+# Valores de `estado` que cuentan como tarea completada
+COMPLETED_STATES = ('completed', 'complete')
+# Prefijos de clave; las de vencimiento ordenan después de las demás
+STATUS_PREFIX = 'estado:'
+PRIORITY_PREFIX = 'prioridad:'
+DUE_PREFIX = 'vence:'
+TOTAL_KEY = 'total'
+
+_COMPLETED_SQL = ", ".join(f"'{state}'" for state in COMPLETED_STATES)
+
+
+def _counters(row: str) -> List[Tuple[str, str]]:
+    """(expresión de la clave, condición) de cada contador de una fila de `tareas`."""
+    return [
+        (f"'{TOTAL_KEY}'", "1"),
+        (f"'{STATUS_PREFIX}' || ifnull({row}.estado, '')", "1"),
+        (f"'{PRIORITY_PREFIX}' || ifnull({row}.prioridad, '')", "1"),
+        (f"'{DUE_PREFIX}' || date({row}.\"fechaVencimiento\")",
+         f"ifnull({row}.estado, '') NOT IN ({_COMPLETED_SQL}) AND date({row}.\"fechaVencimiento\") IS NOT NULL"),
+    ]
+
+
+def _bump(row: str, delta: int) -> str:
+    """Sentencias de trigger que suman `delta` a los contadores de la fila."""
+    statements = [
+        # El WHERE evita la ambigüedad de ON CONFLICT tras un SELECT
+        f'INSERT INTO {STATS_TABLE} ("idUsuario", clave, valor) '
+        f'SELECT {row}."idUsuario", {key}, {delta} WHERE {row}."idUsuario" IS NOT NULL AND {condition} '
+        f'ON CONFLICT ("idUsuario", clave) DO UPDATE SET valor = valor + excluded.valor;'
+        for key, condition in _counters(row)
+    ]
+    if delta < 0:
+        keys = ", ".join(key for key, _ in _counters(row))
+        statements.append(
+            f'DELETE FROM {STATS_TABLE} WHERE "idUsuario" = {row}."idUsuario" AND clave IN ({keys}) AND valor = 0;'
+        )
+    return " ".join(statements)
+
+
+def _triggers() -> List[str]:
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_ai AFTER INSERT ON tareas BEGIN {_bump('new', 1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_ad AFTER DELETE ON tareas BEGIN {_bump('old', -1)} END",
+        f'CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_au AFTER UPDATE OF estado, prioridad, "fechaVencimiento", '
+        '"idUsuario" ON tareas WHEN old.estado IS NOT new.estado OR old.prioridad IS NOT new.prioridad '
+        'OR old."fechaVencimiento" IS NOT new."fechaVencimiento" OR old."idUsuario" IS NOT new."idUsuario" '
+        f"BEGIN {_bump('old', -1)} {_bump('new', 1)} END",
+    ]
+
+
+def _expected_sql() -> str:
+    """Consulta (idUsuario, clave, valor) con los contadores calculados desde `tareas`."""
+    selects = [
+        f'SELECT t."idUsuario", {key} AS clave, COUNT(*) AS valor FROM tareas t '
+        f'WHERE t."idUsuario" IS NOT NULL AND {condition} GROUP BY t."idUsuario", clave'
+        for key, condition in _counters('t')
+    ]
+    return " UNION ALL ".join(selects)
+
+
+def ensure_task_stats(conn: Connection) -> bool:
+    """
+    Crea la tabla de contadores y sus triggers si no existen.
+
+    Una tabla recién creada queda vacía: hay que poblarla con
+    `populate_task_stats` en la misma transacción.
+
+    Args:
+        conn (Connection): Conexión dentro de una transacción.
+
+    Returns:
+        bool: False si la base de datos no es SQLite (las estadísticas se calcularán con GROUP BY).
+    """
+    if conn.dialect.name != 'sqlite':
+        return False
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {STATS_TABLE} ("
+        '"idUsuario" INTEGER NOT NULL, clave VARCHAR NOT NULL, valor INTEGER NOT NULL DEFAULT 0, '
+        'PRIMARY KEY ("idUsuario", clave)) WITHOUT ROWID'
+    ))
+    for statement in _triggers():
+        conn.execute(text(statement))
+    return True
+
+
+def populate_task_stats(conn: Connection) -> None:
+    """Reemplaza los contadores por los calculados desde `tareas`."""
+    conn.execute(text(f"DELETE FROM {STATS_TABLE}"))
+    conn.execute(text(f'INSERT INTO {STATS_TABLE} ("idUsuario", clave, valor) {_expected_sql()}'))
+
+
+def rebuild_task_stats(bind: Engine) -> bool:
+    """
+    Crea (si hace falta) y recalcula los contadores de todos los usuarios.
+
+    Args:
+        bind (Engine): Motor de la base de datos.
+
+    Returns:
+        bool: True si los contadores quedaron reconstruidos.
+    """
+    with bind.begin() as conn:
+        if not ensure_task_stats(conn):
+            return False
+        populate_task_stats(conn)
+    return True
+
+
+def check_task_stats(bind: Engine) -> List[Tuple[int, str, int, int]]:
+    """
+    Compara los contadores guardados con los calculados desde `tareas`.
+
+    Args:
+        bind (Engine): Motor de la base de datos.
+
+    Returns:
+        List[Tuple[int, str, int, int]]: (idUsuario, clave, guardado, real) de
+        cada contador distinto; vacía si todo coincide.
+    """
+    with bind.connect() as conn:
+        stored = {(row[0], row[1]): row[2] for row in conn.execute(
+            text(f'SELECT "idUsuario", clave, valor FROM {STATS_TABLE} WHERE valor != 0'))}
+        expected = {(row[0], row[1]): row[2] for row in conn.execute(text(_expected_sql()))}
+    return [(user_id, key, stored.get((user_id, key), 0), expected.get((user_id, key), 0))
+            for user_id, key in sorted(stored.keys() | expected.keys())
+            if stored.get((user_id, key), 0) != expected.get((user_id, key), 0)]
+
+
+def has_task_stats(conn) -> bool:
+    """Indica si la tabla de contadores existe en la base de datos de la conexión o sesión."""
+    # Sin SQLite no hay sqlite_master ni triggers de contadores: se usa el GROUP BY
+    dialect = conn.dialect if isinstance(conn, Connection) else conn.get_bind().dialect
+    if dialect.name != 'sqlite':
+        return False
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": STATS_TABLE}
+    ).first() is not None
+
+
+def split_counters(rows) -> Dict:
+    """
+    Agrupa filas (clave, valor) de contadores en total, estados y prioridades.
+
+    Returns:
+        Dict: `total`, `estados` {estado: n} y `prioridades` {prioridad: n}.
+    """
+    stats = {"total": 0, "estados": {}, "prioridades": {}}
+    for key, value in rows:
+        if key == TOTAL_KEY:
+            stats["total"] = value
+        elif key.startswith(STATUS_PREFIX):
+            stats["estados"][key[len(STATUS_PREFIX):]] = value
+        elif key.startswith(PRIORITY_PREFIX):
+            stats["prioridades"][key[len(PRIORITY_PREFIX):]] = value
+    return stats
+
+
+if __name__ == "__main__":
+    from src.database.db import DATABASE_URL, create_db_engine
+
+    args = [arg for arg in sys.argv[1:] if arg != "--check"]
+    engine = create_db_engine(f"sqlite:///{args[0]}" if args else DATABASE_URL)
+    if "--check" in sys.argv:
+        with engine.connect() as conn:
+            if not has_task_stats(conn):
+                print("La tabla de estadísticas no existe; ejecuta sin --check para crearla")
+                sys.exit(1)
+        differences = check_task_stats(engine)
+        for user_id, key, stored, actual in differences:
+            print(f"usuario {user_id} {key}: guardado {stored}, real {actual}")
+        print(f"{len(differences)} contadores distintos" if differences else "Estadísticas consistentes")
+        sys.exit(1 if differences else 0)
+    if rebuild_task_stats(engine):
+        print("Estadísticas de tareas reconstruidas")
+    else:
+        sys.exit(1)
@@ -36,3 +36,98 @@ CREATE TABLE IF NOT EXISTS tareas (
     FOREIGN KEY (idTipoTarea) REFERENCES tipo_tareas(idTipoTarea)
 );
 
+CREATE TABLE IF NOT EXISTS eventos (
+    idEvento INTEGER PRIMARY KEY AUTOINCREMENT,
+    titulo TEXT,
+    descripcion TEXT,
+    fecha DATE,
+    hora TIME,
+    prioridad TEXT,
+    idUsuario INTEGER,
+    FOREIGN KEY (idUsuario) REFERENCES usuarios(idUsuario)
+);
+
+-- Índices (migración 1)
+CREATE UNIQUE INDEX IF NOT EXISTS ux_usuarios_email ON usuarios (email);
+CREATE INDEX IF NOT EXISTS ix_tareas_usuario_estado ON tareas (idUsuario, estado);
+CREATE INDEX IF NOT EXISTS ix_tareas_usuario_vencimiento ON tareas (idUsuario, fechaVencimiento);
+CREATE INDEX IF NOT EXISTS ix_eventos_usuario_fecha ON eventos (idUsuario, fecha);
+
+-- Versión del esquema aplicada por src/database/migrations.py
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    descripcion TEXT,
+    aplicada TIMESTAMP
+);
+INSERT OR IGNORE INTO schema_version (version, descripcion) VALUES (1, 'Índices de usuarios, tareas y eventos');
+
+-- Retención (migración 2)
+ALTER TABLE tareas ADD COLUMN fechaCompletado TIMESTAMP;
+ALTER TABLE usuarios ADD COLUMN diasRetencion INTEGER;
+
+-- Archivo de tareas completadas (migración 3)
+CREATE TABLE IF NOT EXISTS tareas_archivo (
+    idTarea INTEGER PRIMARY KEY,
+    titulo TEXT,
+    descripcion TEXT,
+    fechaCreacion TIMESTAMP,
+    fechaVencimiento TIMESTAMP,
+    estado TEXT,
+    prioridad TEXT,
+    tipo TEXT,
+    fechaCompletado TIMESTAMP,
+    idUsuario INTEGER,
+    idGrupo INTEGER,
+    idTipoTarea INTEGER,
+    fechaArchivado TIMESTAMP,
+    FOREIGN KEY (idUsuario) REFERENCES usuarios(idUsuario)
+);
+CREATE INDEX IF NOT EXISTS ix_tareas_archivo_usuario_archivado ON tareas_archivo (idUsuario, fechaArchivado);
+CREATE INDEX IF NOT EXISTS ix_tareas_estado_completado ON tareas (estado, fechaCompletado);
+
+-- Sesiones con token (migración 5)
+CREATE TABLE IF NOT EXISTS sesiones (
+    token TEXT PRIMARY KEY,
+    idUsuario INTEGER NOT NULL,
+    fechaCreacion TIMESTAMP,
+    fechaExpiracion TIMESTAMP NOT NULL,
+    FOREIGN KEY (idUsuario) REFERENCES usuarios(idUsuario)
+);
+CREATE INDEX IF NOT EXISTS ix_sesiones_expiracion ON sesiones (fechaExpiracion);
+CREATE INDEX IF NOT EXISTS ix_sesiones_usuario ON sesiones (idUsuario);
+
+-- Fecha y hora de eventos (migración 6): eventos.fecha DATE y eventos.hora TIME (ver tabla eventos)
+
+-- Tareas y eventos recurrentes (migración 7)
+ALTER TABLE tareas ADD COLUMN reglaRecurrencia TEXT;
+ALTER TABLE tareas ADD COLUMN finRecurrencia DATE;
+ALTER TABLE tareas_archivo ADD COLUMN reglaRecurrencia TEXT;
+ALTER TABLE tareas_archivo ADD COLUMN finRecurrencia DATE;
+ALTER TABLE eventos ADD COLUMN reglaRecurrencia TEXT;
+ALTER TABLE eventos ADD COLUMN finRecurrencia DATE;
+CREATE TABLE IF NOT EXISTS excepciones_recurrencia (
+    idExcepcion INTEGER PRIMARY KEY AUTOINCREMENT,
+    entidad TEXT NOT NULL,
+    idPadre INTEGER NOT NULL,
+    fechaOriginal DATE NOT NULL,
+    cancelada BOOLEAN NOT NULL DEFAULT 0,
+    titulo TEXT,
+    descripcion TEXT,
+    fecha DATE,
+    hora TIME,
+    prioridad TEXT,
+    estado TEXT,
+    fechaCompletado TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_excepciones_recurrencia ON excepciones_recurrencia (entidad, idPadre, fechaOriginal);
+CREATE INDEX IF NOT EXISTS ix_tareas_recurrentes ON tareas (idUsuario, finRecurrencia) WHERE reglaRecurrencia IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_eventos_recurrentes ON eventos (idUsuario, finRecurrencia) WHERE reglaRecurrencia IS NOT NULL;
+
+-- Estadísticas de tareas (migración 8): contadores por usuario mantenidos por
+-- triggers sobre tareas (ver src/database/stats.py)
+CREATE TABLE IF NOT EXISTS estadisticas_tareas (
+    idUsuario INTEGER NOT NULL,
+    clave TEXT NOT NULL,
+    valor INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (idUsuario, clave)
+) WITHOUT ROWID;
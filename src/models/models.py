@@ -5,7 +5,11 @@ from sqlalchemy import (
     Boolean,
     Text,
     ForeignKey,
+    Date,
     DateTime,
+    Index,
+    Time,
+    text,
 )
 from sqlalchemy.orm import relationship
 from src.database.db import Base
@@ -22,15 +26,21 @@ class Usuario(Base):
         email (str): Correo electrónico del usuario.
         contraseña (str): Contraseña del usuario.
         modoOscuro (bool): Preferencia de tema oscuro.
+        diasRetencion (int): Días que se conservan las tareas completadas
+            (None = valor por defecto, 0 o negativo = no se eliminan).
         tareas (list): Lista de tareas asociadas al usuario.
     """
     __tablename__ = 'usuarios'
+    __table_args__ = (
+        Index('ux_usuarios_email', 'email', unique=True),
+    )
 
     idUsuario = Column(Integer, primary_key=True, autoincrement=True)
     nombre = Column(String)
     email = Column(String)
     contraseña = Column(String)
     modoOscuro = Column(Boolean)
+    diasRetencion = Column(Integer, nullable=True)
     tareas = relationship("Tarea", back_populates="usuario")
 
 
@@ -81,6 +91,9 @@ class Tarea(Base):
         estado (str): Estado actual de la tarea.
         prioridad (str): Prioridad asignada a la tarea.
         tipo (str): Tipo o categoría de la tarea.
+        fechaCompletado (datetime): Momento en que se completó (None si no lo está).
+        reglaRecurrencia (str): Regla RRULE si la tarea se repite (None = única).
+        finRecurrencia (date): Última ocurrencia de la serie (None = sin fin).
         idUsuario (int): ID del usuario propietario.
         idGrupo (int): ID del grupo al que pertenece la tarea.
         idTipoTarea (int): ID del tipo de tarea.
@@ -89,6 +102,13 @@ class Tarea(Base):
         tipo_tarea (TipoTarea): Relación con el tipo de tarea.
     """
     __tablename__ = 'tareas'
+    __table_args__ = (
+        Index('ix_tareas_usuario_estado', 'idUsuario', 'estado'),
+        Index('ix_tareas_usuario_vencimiento', 'idUsuario', 'fechaVencimiento'),
+        Index('ix_tareas_estado_completado', 'estado', 'fechaCompletado'),
+        Index('ix_tareas_recurrentes', 'idUsuario', 'finRecurrencia',
+              sqlite_where=text('"reglaRecurrencia" IS NOT NULL')),
+    )
 
     idTarea = Column(Integer, primary_key=True, autoincrement=True)
     titulo = Column(String)
@@ -98,6 +118,9 @@ class Tarea(Base):
     estado = Column(String)
     prioridad = Column(String)
     tipo = Column(String)
+    fechaCompletado = Column(DateTime, nullable=True)
+    reglaRecurrencia = Column(String, nullable=True)
+    finRecurrencia = Column(Date, nullable=True)
 
     idUsuario = Column(Integer, ForeignKey('usuarios.idUsuario'))
     idGrupo = Column(Integer, ForeignKey('grupos.idGrupo'))
@@ -108,13 +131,131 @@ class Tarea(Base):
     tipo_tarea = relationship("TipoTarea", back_populates="tareas")
 
 
+class TareaArchivo(Base):
+    """
+    Tarea completada movida al archivo (almacenamiento frío).
+
+    Tiene las mismas columnas que Tarea, conservando su idTarea original,
+    para que ambas se serialicen igual.
+
+    Atributos:
+        fechaArchivado (datetime): Momento en que se movió al archivo.
+    """
+    __tablename__ = 'tareas_archivo'
+    __table_args__ = (
+        Index('ix_tareas_archivo_usuario_archivado', 'idUsuario', 'fechaArchivado'),
+    )
+
+    idTarea = Column(Integer, primary_key=True, autoincrement=False)
+    titulo = Column(String)
+    descripcion = Column(Text)
+    fechaCreacion = Column(DateTime)
+    fechaVencimiento = Column(DateTime)
+    estado = Column(String)
+    prioridad = Column(String)
+    tipo = Column(String)
+    fechaCompletado = Column(DateTime)
+    reglaRecurrencia = Column(String)
+    finRecurrencia = Column(Date)
+    idUsuario = Column(Integer, ForeignKey('usuarios.idUsuario'))
+    idGrupo = Column(Integer)
+    idTipoTarea = Column(Integer)
+    fechaArchivado = Column(DateTime, default=datetime.utcnow)
+
+
 class Event(Base):
+    """
+    Evento del calendario de un usuario.
+
+    Atributos:
+        idEvento (int): Identificador único del evento.
+        titulo (str): Título del evento.
+        descripcion (str): Descripción del evento.
+        fecha (date): Día del evento.
+        hora (time): Hora del evento (None = todo el día).
+        prioridad (str): Prioridad del evento.
+        reglaRecurrencia (str): Regla RRULE si el evento se repite; `fecha`
+            es entonces la primera ocurrencia (None = único).
+        finRecurrencia (date): Última ocurrencia de la serie (None = sin fin).
+        idUsuario (int): Usuario dueño del evento.
+    """
     __tablename__ = 'eventos'
+    __table_args__ = (
+        Index('ix_eventos_usuario_fecha', 'idUsuario', 'fecha'),
+        Index('ix_eventos_recurrentes', 'idUsuario', 'finRecurrencia',
+              sqlite_where=text('"reglaRecurrencia" IS NOT NULL')),
+    )
     idEvento = Column(Integer, primary_key=True, autoincrement=True)
     titulo = Column(String)
     descripcion = Column(Text)
-    fecha = Column(String)  # ISO date string
-    hora = Column(String)   # HH:MM
+    fecha = Column(Date)
+    hora = Column(Time)
     prioridad = Column(String)
+    reglaRecurrencia = Column(String, nullable=True)
+    finRecurrencia = Column(Date, nullable=True)
     idUsuario = Column(Integer, ForeignKey('usuarios.idUsuario'))
     usuario = relationship("Usuario")
+
+
+class ExcepcionRecurrencia(Base):
+    """
+    Cambio a una ocurrencia concreta de una tarea o evento recurrente.
+
+    Los campos en None conservan el valor de la serie.
+
+    Atributos:
+        idExcepcion (int): Identificador único.
+        entidad (str): 'tarea' o 'evento'.
+        idPadre (int): idTarea o idEvento de la serie.
+        fechaOriginal (date): Fecha que la regla genera para la ocurrencia.
+        cancelada (bool): True si la ocurrencia se eliminó.
+        titulo, descripcion, prioridad (str): Valores propios de la ocurrencia.
+        fecha (date): Nueva fecha si la ocurrencia se movió.
+        hora (time): Nueva hora.
+        estado (str): Estado propio (solo tareas).
+        fechaCompletado (datetime): Momento en que se completó (solo tareas).
+    """
+    __tablename__ = 'excepciones_recurrencia'
+    TAREA = 'tarea'
+    EVENTO = 'evento'
+    __table_args__ = (
+        Index('ux_excepciones_recurrencia', 'entidad', 'idPadre', 'fechaOriginal', unique=True),
+    )
+
+    idExcepcion = Column(Integer, primary_key=True, autoincrement=True)
+    entidad = Column(String(10), nullable=False)
+    idPadre = Column(Integer, nullable=False)
+    fechaOriginal = Column(Date, nullable=False)
+    cancelada = Column(Boolean, default=False, nullable=False)
+    titulo = Column(String)
+    descripcion = Column(Text)
+    fecha = Column(Date)
+    hora = Column(Time)
+    prioridad = Column(String)
+    estado = Column(String)
+    fechaCompletado = Column(DateTime)
+
+
+class Sesion(Base):
+    """
+    Sesión iniciada con un token opaco.
+
+    Solo se guarda el SHA-256 del token, de modo que una copia de la base de
+    datos no permite suplantar a nadie.
+
+    Atributos:
+        token (str): SHA-256 (hex) del token entregado al cliente.
+        idUsuario (int): Usuario de la sesión.
+        fechaCreacion (datetime): Momento del inicio de sesión.
+        fechaExpiracion (datetime): Momento a partir del cual el token deja de valer.
+    """
+    __tablename__ = 'sesiones'
+    __table_args__ = (
+        Index('ix_sesiones_expiracion', 'fechaExpiracion'),
+        Index('ix_sesiones_usuario', 'idUsuario'),
+    )
+
+    token = Column(String(64), primary_key=True)
+    idUsuario = Column(Integer, ForeignKey('usuarios.idUsuario'), nullable=False)
+    fechaCreacion = Column(DateTime, default=datetime.utcnow)
+    fechaExpiracion = Column(DateTime, nullable=False)
@@ -0,0 +1,282 @@
+"""
+Métricas de las acciones del Api.
+
+Api despacha cada llamada (`get_item('get_tasks')`, `toggle_item('complete_task')`,
+`batch`, ...) a través de `ActionMetrics.call`, que registra por método y
+acción:
+
+- un histograma de latencia con cubetas fijas (LATENCY_BUCKETS);
+- el tamaño del JSON recibido y devuelto: el modo servidor usa el tamaño
+  real de la petición y la respuesta (`record_payload`); fuera de él medirlo
+  obliga a serializar de nuevo, por eso solo se hace con
+  TODO_ACTION_PAYLOADS=1;
+- las excepciones y las respuestas con `success: false`.
+
+Con TODO_ACTION_TRACING=1 (o `action_metrics.tracing = True`) cada llamada se
+traza con `instrumentation.tracing`: los métodos de TaskController y
+Repository y las sentencias SQL quedan como spans; se guardan las últimas
+TRACE_LOG_SIZE trazas.
+
+`snapshot()` devuelve todo como JSON y `to_prometheus()` en el formato de
+texto de Prometheus (`GET /metrics` en modo servidor).
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.database.instrumentation import tracing
+from src.views.serializers import compact_dumps
+
+
+ACTION_TRACING_ENV_VAR = "TODO_ACTION_TRACING"
+ACTION_PAYLOADS_ENV_VAR = "TODO_ACTION_PAYLOADS"
+# Límites superiores de las cubetas de latencia, en segundos (más +Inf)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Trazas que se conservan para snapshot()
+TRACE_LOG_SIZE = 50
+# Etiqueta de las acciones no registradas, para no crear una serie por cada nombre recibido
+UNKNOWN_ACTION = "(desconocida)"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+def payload_size(value: Any) -> int:
+    """Bytes del JSON compacto de `value` (lo que no es serializable se cuenta como texto)."""
+    return len(compact_dumps(value, default=str).encode("utf-8"))
+
+
+class _ActionStats:
+    __slots__ = ("buckets", "count", "seconds", "max_seconds", "errors", "failures",
+                 "payloads", "bytes_in", "bytes_out")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.errors = 0
+        self.failures = 0
+        self.payloads = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def percentile_ms(self, p: float) -> float:
+        """Estimación por cubetas: límite superior de la cubeta que contiene el percentil."""
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                bound = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max_seconds
+                return round(min(bound, self.max_seconds) * 1000, 3)
+        return round(self.max_seconds * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "failures": self.failures,
+            "total_ms": round(self.seconds * 1000, 3),
+            "avg_ms": round(self.seconds * 1000 / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile_ms(0.50),
+            "p95_ms": self.percentile_ms(0.95),
+            "p99_ms": self.percentile_ms(0.99),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "avg_bytes_out": round(self.bytes_out / self.payloads) if self.payloads else 0,
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+
+class ActionMetrics:
+    """
+    Histogramas de latencia, tamaños y errores por acción del Api.
+
+    Una sola instancia (`action_metrics`) la comparten todos los Api del
+    proceso; es segura desde varios hilos.
+    """
+
+    def __init__(self, tracing_enabled: bool = False, measure_payloads: bool = False):
+        """
+        Args:
+            tracing_enabled (bool): Trazar cada llamada con spans del controlador,
+                el repositorio y las sentencias SQL.
+            measure_payloads (bool): Medir el tamaño del JSON de entrada y salida
+                en `call` (el modo servidor usa en cambio `record_payload`).
+        """
+        self.tracing = tracing_enabled
+        self.measure_payloads = measure_payloads
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "ActionMetrics":
+        """Crea la instancia según TODO_ACTION_TRACING y TODO_ACTION_PAYLOADS."""
+        return cls(tracing_enabled=_env_flag(ACTION_TRACING_ENV_VAR, False),
+                   measure_payloads=_env_flag(ACTION_PAYLOADS_ENV_VAR, False))
+
+    def reset(self) -> None:
+        """Descarta todo lo acumulado."""
+        with self._lock:
+            self._actions: Dict[Tuple[str, str], _ActionStats] = {}
+            self._traces: deque = deque(maxlen=TRACE_LOG_SIZE)
+
+    def _stats(self, method: str, action: str) -> _ActionStats:
+        key = (method, action)
+        stats = self._actions.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._actions.setdefault(key, _ActionStats())
+        return stats
+
+    def call(self, method: str, action: str, handler: Callable[[], dict], data: Any = None,
+             measure_payloads: Optional[bool] = None) -> dict:
+        """
+        Ejecuta `handler` midiendo su latencia; las excepciones se cuentan y se propagan.
+
+        Args:
+            method (str): Método del Api (get_item, add_item, ..., batch).
+            action (str): Acción despachada (UNKNOWN_ACTION si no está registrada).
+            handler (Callable): Función sin argumentos que produce la respuesta.
+            data (Any, optional): Datos recibidos, para medir su tamaño.
+            measure_payloads (bool, optional): Medir tamaños en esta llamada
+                (None = según `self.measure_payloads`).
+
+        Returns:
+            dict: La respuesta de `handler`.
+        """
+        stats = self._stats(method, action)
+        start = time.perf_counter()
+        result = None
+        trace = None
+        error = False
+        try:
+            with (tracing(f"{method}:{action}") if self.tracing else nullcontext()) as trace:
+                result = handler()
+            return result
+        except Exception as e:
+            error = True
+            # Para que record_error no la vuelva a contar
+            e.action_metrics_recorded = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            failed = not error and isinstance(result, dict) and result.get("success") is False
+            sizes = None
+            if (self.measure_payloads if measure_payloads is None else measure_payloads) and not error:
+                sizes = (payload_size(data), payload_size(result))
+            with self._lock:
+                stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+                stats.count += 1
+                stats.seconds += elapsed
+                if elapsed > stats.max_seconds:
+                    stats.max_seconds = elapsed
+                stats.errors += error
+                stats.failures += failed
+                if sizes is not None:
+                    stats.payloads += 1
+                    stats.bytes_in += sizes[0]
+                    stats.bytes_out += sizes[1]
+                if trace is not None:
+                    self._traces.append(dict(trace.to_dict(), error=error, failed=failed))
+
+    def record_payload(self, method: str, action: str, bytes_in: int, bytes_out: int) -> None:
+        """Suma tamaños medidos fuera del Api (el cuerpo HTTP en modo servidor)."""
+        stats = self._stats(method, action)
+        with self._lock:
+            stats.payloads += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+    def record_error(self, method: str, action: str, error: BaseException) -> None:
+        """Cuenta una excepción ocurrida fuera de `call` (en modo servidor, al preparar o cerrar la petición)."""
+        if getattr(error, "action_metrics_recorded", False):
+            return
+        stats = self._stats(method, action)
+        with self._lock:
+            stats.errors += 1
+
+    def snapshot(self, traces: bool = True) -> Dict:
+        """
+        Copia de las métricas, lista para serializar como JSON.
+
+        Args:
+            traces (bool): Incluir las últimas trazas.
+
+        Returns:
+            Dict: `actions` {"método:acción": métricas} ordenadas por tiempo
+            total, `tracing`, `buckets` y, con `traces`, la lista de trazas.
+        """
+        with self._lock:
+            actions = {f"{method}:{action}": stats.to_dict() for (method, action), stats in self._actions.items()}
+            recent = list(self._traces) if traces else None
+        result = {
+            "actions": dict(sorted(actions.items(), key=lambda item: item[1]["total_ms"], reverse=True)),
+            "tracing": self.tracing,
+            "buckets": list(LATENCY_BUCKETS),
+        }
+        if recent is not None:
+            result["traces"] = recent
+        return result
+
+    def to_prometheus(self) -> str:
+        """Métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        with self._lock:
+            items = sorted((key, list(stats.buckets), stats.count, stats.seconds, stats.errors, stats.failures,
+                            stats.payloads, stats.bytes_in, stats.bytes_out)
+                           for key, stats in self._actions.items())
+        lines: List[str] = [
+            "# HELP todo_action_duration_seconds Latencia de las acciones del Api.",
+            "# TYPE todo_action_duration_seconds histogram",
+        ]
+        for (method, action), buckets, count, seconds, *_ in items:
+            labels = f'method="{_escape(method)}",action="{_escape(action)}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'todo_action_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'todo_action_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"todo_action_duration_seconds_sum{{{labels}}} {seconds:.6f}")
+            lines.append(f"todo_action_duration_seconds_count{{{labels}}} {count}")
+        for name, kind, help_text, index in (
+            ("todo_action_errors_total", "counter", "Acciones que terminaron con una excepción.", 4),
+            ("todo_action_failures_total", "counter", "Acciones que respondieron success=false.", 5),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for item in items:
+                method, action = item[0]
+                lines.append(f'{name}{{method="{_escape(method)}",action="{_escape(action)}"}} {item[index]}')
+        for name, help_text, index in (
+            ("todo_action_request_bytes", "Tamaño del JSON recibido por acción.", 7),
+            ("todo_action_response_bytes", "Tamaño del JSON devuelto por acción.", 8),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for item in items:
+                labels = f'method="{_escape(item[0][0])}",action="{_escape(item[0][1])}"'
+                lines.append(f"{name}_sum{{{labels}}} {item[index]}")
+                lines.append(f"{name}_count{{{labels}}} {item[6]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Métricas del proceso, compartidas por todos los Api
+action_metrics = ActionMetrics.from_env()
@@ -0,0 +1,145 @@
+"""
+Serialización de tareas para la interfaz.
+
+El esquema de la respuesta es estático: cada clave JSON sale de una columna
+de `tareas` en una posición fija. Las listas se consultan como tuplas con
+solo esas columnas (`TASK_COLUMNS`), sin construir objetos del ORM, y se
+convierten por posición; las tareas sueltas (ORM, archivadas u ocurrencias
+transitorias) se leen con un único `attrgetter` sobre las mismas columnas.
+
+Además del formato por filas (lista de diccionarios), las listas grandes se
+pueden pedir en formato columnar: un arreglo por campo, sin repetir las
+claves en cada tarea.
+"""
+
+import json
+from functools import partial
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.database.repository import STATUS_ALIASES
+from src.models.models import Tarea
+
+
+# (clave JSON, columna de Tarea); start_date y created_at comparten fechaCreacion
+TASK_SCHEMA = (
+    ("id", "idTarea"),
+    ("name", "titulo"),
+    ("description", "descripcion"),
+    ("priority", "prioridad"),
+    ("status", "estado"),
+    ("start_date", "fechaCreacion"),
+    ("end_date", "fechaVencimiento"),
+    ("created_at", "fechaCreacion"),
+    ("completed_at", "fechaCompletado"),
+    ("recurrence", "reglaRecurrencia"),
+)
+# Campos de cada tarea serializada, en orden; `occurrence` solo lo tienen las ocurrencias
+TASK_FIELDS = tuple(key for key, _ in TASK_SCHEMA) + ("occurrence",)
+# Columnas seleccionadas, sin repetir, en el orden en que llegan las tuplas
+TASK_COLUMN_NAMES = tuple(dict.fromkeys(column for _, column in TASK_SCHEMA))
+TASK_COLUMNS = tuple(getattr(Tarea, name) for name in TASK_COLUMN_NAMES)
+# Estado guardado -> estado de la vista (new, progress, completed)
+STATUS_MAP = {alias: status for status, aliases in STATUS_ALIASES.items() for alias in aliases}
+
+FORMAT_ROWS = 'rows'
+FORMAT_COLUMNAR = 'columnar'
+
+_task_values = attrgetter(*TASK_COLUMN_NAMES)
+
+# JSON sin espacios entre separadores
+compact_dumps = partial(json.dumps, separators=(',', ':'), ensure_ascii=False)
+
+
+def view_status(estado) -> str:
+    """Estado de la vista de un valor de `estado`; los desconocidos se devuelven en minúsculas."""
+    status = STATUS_MAP.get(estado)
+    if status is None:
+        status = str(estado).lower()
+        status = STATUS_MAP.get(status, status)
+    return status
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def task_row_to_dict(row: Sequence, occurrence=None) -> Dict:
+    """
+    Convierte una tupla con las columnas de TASK_COLUMNS en el diccionario de la vista.
+
+    Args:
+        row (Sequence): Valores en el orden de TASK_COLUMN_NAMES.
+        occurrence (date, optional): Fecha original si es la ocurrencia de una serie.
+
+    Returns:
+        Dict: Tarea con las claves de TASK_FIELDS.
+    """
+    task_id, titulo, descripcion, prioridad, estado, creada, vence, completada, regla = row
+    creada = creada.isoformat() if creada is not None else None
+    return {
+        "id": task_id,
+        "name": titulo,
+        "description": descripcion,
+        "priority": prioridad,
+        "status": view_status(estado),
+        "start_date": creada,
+        "end_date": vence.isoformat() if vence is not None else None,
+        "created_at": creada,
+        "completed_at": completada.isoformat() if completada is not None else None,
+        "recurrence": regla,
+        "occurrence": occurrence.isoformat() if occurrence is not None else None,
+    }
+
+
+def serialize_task(task) -> Dict:
+    """Serializa un objeto con las columnas de Tarea (Tarea, TareaArchivo u ocurrencia)."""
+    return task_row_to_dict(_task_values(task), getattr(task, 'ocurrencia', None))
+
+
+def serialize_task_rows(rows: Iterable[Sequence]) -> List[Dict]:
+    """Serializa tuplas de TASK_COLUMNS como lista de diccionarios."""
+    return [task_row_to_dict(row) for row in rows]
+
+
+def serialize_task_columns(rows: Iterable[Sequence]) -> Dict[str, list]:
+    """
+    Serializa tuplas de TASK_COLUMNS en formato columnar.
+
+    Args:
+        rows (Iterable[Sequence]): Tuplas en el orden de TASK_COLUMN_NAMES.
+
+    Returns:
+        Dict[str, list]: Un arreglo por cada campo de TASK_FIELDS, todos del
+        mismo largo; la tarea i es el elemento i de cada arreglo.
+    """
+    rows = list(rows)
+    if not rows:
+        return {field: [] for field in TASK_FIELDS}
+    ids, titulos, descripciones, prioridades, estados, creadas, vencen, completadas, reglas = zip(*rows)
+    creadas = [_iso(value) for value in creadas]
+    return {
+        "id": list(ids),
+        "name": list(titulos),
+        "description": list(descripciones),
+        "priority": list(prioridades),
+        "status": [view_status(estado) for estado in estados],
+        "start_date": creadas,
+        "end_date": [_iso(value) for value in vencen],
+        "created_at": list(creadas),
+        "completed_at": [_iso(value) for value in completadas],
+        "recurrence": list(reglas),
+        "occurrence": [None] * len(rows),
+    }
+
+
+def task_list_format(value: Optional[str]) -> str:
+    """Formato de lista pedido por la interfaz; cualquier valor distinto de columnar es por filas."""
+    return FORMAT_COLUMNAR if value == FORMAT_COLUMNAR else FORMAT_ROWS
+
+
+def serialize_task_list(rows: Iterable[Sequence], format: str = FORMAT_ROWS):
+    """Serializa tuplas de TASK_COLUMNS por filas (por defecto) o en formato columnar."""
+    if format == FORMAT_COLUMNAR:
+        return serialize_task_columns(rows)
+    return serialize_task_rows(rows)
@@ -0,0 +1,218 @@
+"""
+Modo servidor: expone las acciones de Api por HTTP/JSON y sirve la interfaz web.
+
+Al iniciar sesión el cliente recibe una cookie con el token de
+SessionManager; cada llamada resuelve el usuario a partir de ese token, de
+modo que varios usuarios pueden trabajar a la vez. Las llamadas corren en un
+grupo de hilos (cada hilo con su propio Api)
+para no bloquear el bucle de aiohttp con SQLite ni con el hash de contraseñas;
+cada petición es una unidad de trabajo con su propia sesión de base de datos.
+
+    python main.py --serve [--host 0.0.0.0] [--port 8000]
+
+POST /api/<método> con cuerpo {"action": ..., "data": {...}} para get_item,
+add_item, update_item, remove_item y toggle_item, o {"data": {...}} para batch.
+GET /metrics devuelve las métricas de las acciones en formato Prometheus.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from aiohttp import web
+
+from src.controllers.passwords import LoginThrottle, PasswordHasher
+from src.controllers.recurrence import OccurrenceCache
+from src.controllers.session import SessionManager
+from src.controllers.task_changes import TaskChangeFeed
+from src.controllers.task_controller import TaskController
+from src.database.list_cache import ListCache
+from src.views.action_metrics import PROMETHEUS_CONTENT_TYPE, UNKNOWN_ACTION, action_metrics
+from src.views.serializers import compact_dumps
+from src.views.ui import ACTIONS, Api
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SESSION_COOKIE = "todo_session"
+# Métodos de Api accesibles por HTTP y si reciben `action`
+API_METHODS = {
+    "get_item": True,
+    "add_item": True,
+    "update_item": True,
+    "remove_item": True,
+    "toggle_item": True,
+    "batch": False,
+}
+DEFAULT_THREADS = int(os.environ.get("TODO_SERVER_THREADS", "32"))
+INTERNAL_ERROR = "Error interno del servidor"
+
+
+class ApiPool:
+    """
+    Un Api por hilo del grupo, todos sin usuario propio.
+
+    Los Api comparten el registro de cambios, el hasher, el límite de
+    intentos de login, las sesiones y la caché de ocurrencias; el usuario
+    de cada llamada sale del token de la petición.
+    """
+
+    def __init__(self, controller_factory: Optional[Callable[..., TaskController]] = None,
+                 sessions: Optional[SessionManager] = None, ready: Optional[threading.Event] = None):
+        """
+        Args:
+            controller_factory (Callable, optional): Crea el controlador de cada
+                hilo; recibe `passwords`, `throttle`, `sessions`, `occurrences` y
+                `list_cache` (y `seed=False` si hay `ready`). Defaults to TaskController.
+            sessions (SessionManager, optional): Sesiones compartidas (se crea uno si falta).
+            ready (threading.Event, optional): Fin de la inicialización en segundo
+                plano; las llamadas esperan a que se active.
+        """
+        self.controller_factory = controller_factory or TaskController
+        self.changes = TaskChangeFeed()
+        self.passwords = PasswordHasher()
+        self.throttle = LoginThrottle()
+        self.sessions = sessions or SessionManager()
+        self.occurrences = OccurrenceCache()
+        self.list_cache = ListCache()
+        self.ready = ready
+        self._local = threading.local()
+
+    def get(self) -> Api:
+        """Devuelve el Api del hilo actual, creándolo en el primer uso."""
+        api = getattr(self._local, "api", None)
+        if api is None:
+            kwargs = dict(passwords=self.passwords, throttle=self.throttle,
+                          sessions=self.sessions, occurrences=self.occurrences, list_cache=self.list_cache)
+            if self.ready is not None:
+                # Los datos demo los carga el hilo de arranque
+                kwargs["seed"] = False
+            controller = self.controller_factory(**kwargs)
+            # El tamaño de cada acción se toma del cuerpo HTTP, sin volver a serializar
+            api = self._local.api = Api(controller=controller, changes=self.changes, ready=self.ready,
+                                        payload_sizes=False)
+        return api
+
+
+POOL_KEY = web.AppKey("pool", ApiPool)
+EXECUTOR_KEY = web.AppKey("executor", ThreadPoolExecutor)
+INDEX_HTML_KEY = web.AppKey("index_html", str)
+
+
+def _call(pool: ApiPool, token: Optional[str], method: str, action: Optional[str],
+          data: dict) -> Tuple[dict, Optional[str]]:
+    """
+    Ejecuta una acción de Api en un hilo del grupo con la sesión del token.
+
+    Returns:
+        Tuple[dict, Optional[str]]: Resultado y token de la sesión al terminar
+        (cambia tras login o logout).
+    """
+    api = pool.get()
+    controller = api.controller
+    # Una sesión de base de datos por petición, cerrada al terminar
+    with controller.repository.unit_of_work():
+        try:
+            controller.resume_session(token)
+            if API_METHODS[method]:
+                result = getattr(api, method)(action, data)
+            else:
+                result = getattr(api, method)(data)
+            return result, controller.session.token if controller.session is not None else None
+        finally:
+            # El hilo no conserva usuario entre peticiones
+            controller.session = None
+            controller.repository.close()
+
+
+async def api_handler(request: web.Request) -> web.Response:
+    method = request.match_info["method"]
+    if method not in API_METHODS:
+        return web.json_response({"success": False, "message": "Método desconocido"}, status=404)
+    try:
+        raw = await request.read()
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"success": False, "message": "JSON inválido"}, status=400)
+    if not isinstance(body, dict):
+        return web.json_response({"success": False, "message": "JSON inválido"}, status=400)
+    data = body.get("data") or {}
+    if not isinstance(data, dict):
+        return web.json_response({"success": False, "message": "`data` debe ser un objeto JSON"}, status=400)
+
+    action = body.get("action") if API_METHODS[method] else method
+    if not (isinstance(action, str) and (method, action) in ACTIONS):
+        action = UNKNOWN_ACTION
+    token = request.cookies.get(SESSION_COOKIE)
+    status = 200
+    try:
+        result, new_token = await asyncio.get_running_loop().run_in_executor(
+            request.app[EXECUTOR_KEY], _call, request.app[POOL_KEY], token, method,
+            body.get("action"), data
+        )
+    except Exception as e:
+        print(f"Error en {method}:{action}: {e}")
+        action_metrics.record_error(method, action, e)
+        result, new_token, status = {"success": False, "message": INTERNAL_ERROR}, token, 500
+    response = web.json_response(result, status=status, dumps=compact_dumps)
+    action_metrics.record_payload(method, action, len(raw), len(response.body))
+    if new_token and new_token != token:
+        response.set_cookie(SESSION_COOKIE, new_token, httponly=True, samesite="Strict")
+    elif token and not new_token:
+        response.del_cookie(SESSION_COOKIE)
+    return response
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """Métricas de las acciones en el formato de texto de Prometheus."""
+    return web.Response(body=action_metrics.to_prometheus().encode("utf-8"),
+                        headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+
+async def index_handler(request: web.Request) -> web.Response:
+    """Sirve index.html indicando al puente JS que use la API HTTP en lugar de pywebview."""
+    html = request.app[INDEX_HTML_KEY]
+    return web.Response(text=html, content_type="text/html")
+
+
+def create_app(pool: Optional[ApiPool] = None, threads: int = DEFAULT_THREADS,
+               retention=None) -> web.Application:
+    """
+    Crea la aplicación aiohttp.
+
+    Args:
+        pool (ApiPool, optional): Api por hilo y estado compartido (se crea uno si falta).
+        threads (int): Hilos para las llamadas a Api.
+        retention (RetentionScheduler, optional): Planificador cuyas tareas
+            archivadas se publican en el registro de cambios.
+
+    Returns:
+        web.Application: Aplicación lista para web.run_app.
+    """
+    app = web.Application(client_max_size=1024 * 1024)
+    app[POOL_KEY] = pool or ApiPool()
+    if retention is not None:
+        retention.add_listener(app[POOL_KEY].changes.record_deleted)
+    app[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api")
+    with open(os.path.join(STATIC_DIR, "index.html"), encoding="utf-8") as f:
+        app[INDEX_HTML_KEY] = f.read().replace(
+            "</head>", '    <script>window.TODO_HTTP_API = "/api";</script>\n</head>', 1
+        )
+
+    async def shutdown_executor(app: web.Application) -> None:
+        app[EXECUTOR_KEY].shutdown(wait=False)
+
+    app.on_cleanup.append(shutdown_executor)
+    app.router.add_post("/api/{method}", api_handler)
+    app.router.add_get("/metrics", metrics_handler)
+    app.router.add_get("/", index_handler)
+    app.router.add_get("/index.html", index_handler)
+    app.router.add_static("/", STATIC_DIR)
+    return app
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, threads: int = DEFAULT_THREADS, retention=None,
+          sessions: Optional[SessionManager] = None, ready: Optional[threading.Event] = None) -> None:
+    """Inicia el servidor HTTP (bloqueante); con `ready`, las llamadas esperan a la inicialización."""
+    web.run_app(create_app(ApiPool(sessions=sessions, ready=ready), threads=threads, retention=retention),
+                host=host, port=port)
@@ -0,0 +1,37 @@
+// ===== HTTP BRIDGE =====
+// En modo servidor (python main.py --serve) no existe window.pywebview:
+// se expone la misma interfaz `pywebview.api` enviando cada llamada por HTTP.
+(function () {
+    if (!window.TODO_HTTP_API || window.pywebview) return;
+
+    const post = async (method, body) => {
+        const response = await fetch(`${window.TODO_HTTP_API}/${method}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify(body)
+        });
+        if (!response.ok && response.headers.get('Content-Type')?.indexOf('application/json') === -1) {
+            return { success: false, message: `HTTP ${response.status}` };
+        }
+        return response.json();
+    };
+
+    const withAction = method => (action, data) => post(method, { action, data });
+
+    window.pywebview = {
+        api: {
+            get_item: withAction('get_item'),
+            add_item: withAction('add_item'),
+            update_item: withAction('update_item'),
+            remove_item: withAction('remove_item'),
+            toggle_item: withAction('toggle_item'),
+            batch: data => post('batch', { data }),
+            // En el navegador se usa la API de pantalla completa del documento
+            toggle_fullscreen: async () => {
+                if (document.fullscreenElement) await document.exitFullscreen();
+                else await document.documentElement.requestFullscreen();
+            }
+        }
+    };
+})();
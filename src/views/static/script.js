@@ -4,6 +4,12 @@ const AppState = {
     currentPage: 'dashboard',
     users: [],
     tasks: [],
+    // Revisión del backend a partir de la cual se piden solo los cambios
+    taskRevision: null,
+    taskEpoch: null,
+    // Paginación por columna del Kanban: cursor de la siguiente página y tareas aún no cargadas
+    columnCursors: {},
+    columnUnloaded: {},
     events: [],
     settings: {}
 };
@@ -89,24 +95,8 @@ const UserAuth = {
                 role: data.role || "user",
                 loginTime: new Date().toISOString()
             };
-            // Cargar tareas desde backend
-            const tasksResp = await window.pywebview.api.get_item('get_tasks', {});
-            if (tasksResp.success) {
-                // Usar los campos tal como los entrega el backend: id, name, description, priority, status, start_date, end_date, created_at, completed_at
-                AppState.tasks = (tasksResp.tasks || []).map(t => ({
-                    id: t.id,
-                    name: t.name, // Usar 'name' en vez de 'title' para consistencia con backend
-                    description: t.description,
-                    priority: t.priority,
-                    status: t.status,
-                    start_date: t.start_date,
-                    end_date: t.end_date,
-                    created_at: t.created_at,
-                    completed_at: t.completed_at
-                }));
-            } else {
-                AppState.tasks = [];
-            }
+            // Cargar la primera página de cada columna
+            await TaskManager.loadColumnPages();
             this.showApp();
         } else {
             this.showLoginError('Invalid email or password. Please try again.');
@@ -376,8 +366,18 @@ const UserAuth = {
 
     // Logout function
     logout() {
+        // Invalidate the server-side session token
+        if (window.pywebview && window.pywebview.api) {
+            window.pywebview.api.remove_item('logout', {}).catch(() => {});
+        }
         // Clear session
         AppState.currentUser = null;
+        AppState.tasks = [];
+        TaskManager.selectedTaskIds.clear();
+        AppState.taskRevision = null;
+        AppState.taskEpoch = null;
+        AppState.columnCursors = {};
+        AppState.columnUnloaded = {};
         localStorage.removeItem('currentUser');
         this.showLogin();
         this.hideLoadingState();
@@ -456,9 +456,9 @@ const Navigation = {
     },
 
     // Update dashboard content
-    updateDashboard() {
-        // Update dashboard stats
-        const stats = TaskManager.getTaskStats();
+    async updateDashboard() {
+        // Contadores del backend (tabla de estadísticas); si fallan, los de las tareas cargadas
+        const stats = await this.loadStats() || TaskManager.getTaskStats();
         const statCards = document.querySelectorAll('.stat-card');
         if (statCards.length >= 4) {
             statCards[0].querySelector('.stat-number').textContent = stats.total;
@@ -466,15 +466,32 @@ const Navigation = {
             statCards[2].querySelector('.stat-number').textContent = stats.inProgress;
             statCards[3].querySelector('.stat-number').textContent = stats.new;
         }
+        if (statCards.length >= 5) {
+            statCards[4].querySelector('.stat-number').textContent = stats.overdue ?? '-';
+        }
         // Render recent tasks
         TaskManager.renderRecentTasks();
         console.log('Dashboard updated for user:', AppState.currentUser.email);
+    },
+
+    async loadStats() {
+        try {
+            const response = await window.pywebview.api.get_item('get_stats', {});
+            if (!response.success) return null;
+            const { total, by_status, overdue } = response.stats;
+            return { total, completed: by_status.completed, inProgress: by_status.progress, new: by_status.new, overdue };
+        } catch (error) {
+            console.error('Error al cargar estadísticas:', error);
+            return null;
+        }
     }
 };
 
 // ===== TASK MANAGER MODULE =====
 const TaskManager = {
     currentEditingTask: null,
+    // IDs de tareas marcadas para acciones masivas
+    selectedTaskIds: new Set(),
 
     // Inicializar y cargar tareas desde backend
     async init() {
@@ -483,27 +500,207 @@ const TaskManager = {
         this.renderTasks();
     },
 
+    // Columnas del Kanban y tareas por página que se piden a la vez
+    COLUMN_STATUSES: ['new', 'progress', 'completed'],
+    COLUMN_PAGE_SIZE: 30,
+    loadingColumns: new Set(),
+
+    // Carga inicial (primera página por columna) o, si ya hay una revisión, solo los cambios desde ella
     async loadTasksFromBackend() {
-        const response = await window.pywebview.api.get_item('get_tasks', {});
-        if (response.success) {
-            AppState.tasks = (response.tasks || []).map(t => ({
-                id: t.id,
-                title: t.name,
-                description: t.description,
-                priority: t.priority,
-                status: t.status,
-                start_date: t.start_date,
-                end_date: t.end_date,
-                createdAt: t.created_at,
-                completedAt: t.completed_at
-            }));
+        if (AppState.taskRevision === null) {
+            await this.loadColumnPages();
+            return;
+        }
+        const response = await window.pywebview.api.get_item('get_task_changes', {
+            since_revision: AppState.taskRevision,
+            epoch: AppState.taskEpoch
+        });
+        if (!response.success) return;
+        if (response.reset) {
+            await this.loadColumnPages();
+            return;
+        }
+        (response.deleted || []).forEach(id => this.removeTask(id));
+        (response.tasks || []).forEach(t => this.upsertTask(t));
+        AppState.taskRevision = response.revision;
+    },
+
+    // Convertir una tarea del backend al formato usado en AppState
+    mapTask(t) {
+        return {
+            id: t.id,
+            title: t.name,
+            description: t.description,
+            priority: t.priority,
+            status: t.status,
+            start_date: t.start_date,
+            end_date: t.end_date,
+            createdAt: t.created_at,
+            completedAt: t.completed_at
+        };
+    },
+
+    // Pedir la primera página de cada columna, filtrada y ordenada en el backend
+    async loadColumnPages() {
+        const responses = await Promise.all(this.COLUMN_STATUSES.map(status =>
+            window.pywebview.api.get_item('get_tasks', { status, sort: 'end_date', limit: this.COLUMN_PAGE_SIZE })
+        ));
+        AppState.tasks = [];
+        AppState.columnCursors = {};
+        AppState.columnUnloaded = {};
+        AppState.taskRevision = null;
+        AppState.taskEpoch = null;
+        if (!responses.every(r => r && r.success)) return;
+        this.COLUMN_STATUSES.forEach((status, i) => {
+            const response = responses[i];
+            response.tasks.forEach(t => AppState.tasks.push(this.mapTask(t)));
+            AppState.columnCursors[status] = response.next_cursor;
+            AppState.columnUnloaded[status] = Math.max(0, (response.total || 0) - response.tasks.length);
+        });
+        // La revisión más antigua garantiza que ningún cambio intermedio se pierda
+        AppState.taskRevision = Math.min(...responses.map(r => r.revision));
+        AppState.taskEpoch = responses[0].epoch;
+    },
+
+    // Pedir la siguiente página de una columna (al hacer scroll o con "Load more")
+    async loadMoreTasks(status) {
+        const cursor = AppState.columnCursors[status];
+        if (!cursor || this.loadingColumns.has(status)) return;
+        this.loadingColumns.add(status);
+        try {
+            const response = await window.pywebview.api.get_item('get_tasks', {
+                status, sort: 'end_date', limit: this.COLUMN_PAGE_SIZE, cursor
+            });
+            if (!response.success) return;
+            response.tasks.forEach(t => this.upsertTask(t));
+            AppState.columnCursors[status] = response.next_cursor;
+            AppState.columnUnloaded[status] = response.next_cursor
+                ? Math.max(0, (AppState.columnUnloaded[status] || 0) - response.tasks.length)
+                : 0;
+            this.renderTasks();
+        } finally {
+            this.loadingColumns.delete(status);
+        }
+    },
+
+    // Insertar o reemplazar una tarea; solo se tocan las columnas de su estado anterior y nuevo
+    upsertTask(t) {
+        this.ensureIndexed();
+        const task = this.mapTask(t);
+        const existing = this.tasksById.get(task.id);
+        if (!existing) {
+            AppState.tasks.push(task);
+            this.tasksById.set(task.id, task);
+            this.indexedLength = AppState.tasks.length;
         } else {
-            AppState.tasks = [];
+            this.unindexTask(existing);
+            Object.assign(existing, task);
+        }
+        this.indexTask(this.tasksById.get(task.id));
+    },
+
+    removeTask(taskId) {
+        this.ensureIndexed();
+        const task = this.tasksById.get(taskId);
+        this.selectedTaskIds.delete(taskId);
+        if (!task) return;
+        this.unindexTask(task);
+        this.tasksById.delete(taskId);
+        AppState.tasks.splice(AppState.tasks.indexOf(task), 1);
+        this.indexedLength = AppState.tasks.length;
+    },
+
+    // ===== Índice por columna =====
+    // Cada columna guarda los IDs de sus tareas ordenados como en el backend (vencimiento, id)
+    tasksById: new Map(),
+    columns: {},
+    indexedTasks: null,
+    indexedLength: 0,
+
+    column(status) {
+        if (!this.columns[status]) {
+            this.columns[status] = { ids: [], cards: new Map(), rowHeight: 0, items: null };
         }
+        return this.columns[status];
+    },
+
+    compareTasks(a, b) {
+        const dateA = a.end_date || '';
+        const dateB = b.end_date || '';
+        if (dateA !== dateB) return dateA < dateB ? -1 : 1;
+        return a.id - b.id;
+    },
+
+    // Reconstruir el índice desde AppState.tasks (carga inicial o cambios hechos fuera de TaskManager)
+    reindexTasks() {
+        this.tasksById = new Map(AppState.tasks.map(task => [task.id, task]));
+        this.COLUMN_STATUSES.forEach(status => {
+            this.column(status).ids = AppState.tasks
+                .filter(task => task.status === status)
+                .sort((a, b) => this.compareTasks(a, b))
+                .map(task => task.id);
+            this.dirtyColumns.add(status);
+        });
+        this.indexedTasks = AppState.tasks;
+        this.indexedLength = AppState.tasks.length;
+    },
+
+    ensureIndexed() {
+        if (this.indexedTasks !== AppState.tasks || this.indexedLength !== AppState.tasks.length) this.reindexTasks();
+    },
+
+    // Búsqueda binaria de la posición en la columna
+    indexTask(task) {
+        if (!this.COLUMN_STATUSES.includes(task.status)) return;
+        const ids = this.column(task.status).ids;
+        let low = 0;
+        let high = ids.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (this.compareTasks(this.tasksById.get(ids[mid]), task) < 0) low = mid + 1;
+            else high = mid;
+        }
+        ids.splice(low, 0, task.id);
+        this.dirtyColumns.add(task.status);
+    },
+
+    unindexTask(task) {
+        if (!this.COLUMN_STATUSES.includes(task.status)) return;
+        const ids = this.column(task.status).ids;
+        const index = ids.indexOf(task.id);
+        if (index !== -1) ids.splice(index, 1);
+        this.dirtyColumns.add(task.status);
+    },
+
+    // Aplicar la respuesta de una mutación sin volver a pedir toda la lista.
+    // Si hubo cambios intermedios (otra revisión), se piden solo esos cambios.
+    async applyMutation(response, deletedId = null) {
+        if (!response || !response.success) return;
+        const expected = AppState.taskRevision === null ? null : AppState.taskRevision + 1;
+        if (expected !== null && response.revision !== expected) {
+            await this.loadTasksFromBackend();
+            return;
+        }
+        if (deletedId !== null) this.removeTask(deletedId);
+        if (response.task) this.upsertTask(response.task);
+        AppState.taskRevision = response.revision;
     },
 
     // Setup task event listeners
     setupEventListeners() {
+        // Cargar la siguiente página de una columna al llegar al final de su scroll
+        this.COLUMN_STATUSES.forEach(status => {
+            const container = document.getElementById(`${status}TasksContainer`);
+            if (!container) return;
+            container.addEventListener('scroll', () => {
+                // Mover la ventana de tarjetas visibles en el siguiente frame
+                this.dirtyColumns.add(status);
+                this.scheduleRender();
+                if (container.scrollTop + container.clientHeight >= container.scrollHeight - 100) {
+                    this.loadMoreTasks(status);
+                }
+            });
+        });
         // Close modals when clicking outside
         document.addEventListener('click', (e) => {
             if (e.target.classList.contains('modal')) {
@@ -522,101 +719,172 @@ const TaskManager = {
 
     // Get task statistics
     getTaskStats() {
-        const total = AppState.tasks.length;
-        const completed = AppState.tasks.filter(task => task.status === 'completed').length;
-        const inProgress = AppState.tasks.filter(task => task.status === 'progress').length;
-        const newTasks = AppState.tasks.filter(task => task.status === 'new').length;
-        return { total, completed, inProgress, new: newTasks };
+        // Tareas cargadas más las que el backend aún no ha enviado por columna
+        this.ensureIndexed();
+        const counts = {};
+        this.COLUMN_STATUSES.forEach(status => {
+            counts[status] = this.column(status).ids.length + (AppState.columnUnloaded[status] || 0);
+        });
+        const total = counts.new + counts.progress + counts.completed;
+        return { total, completed: counts.completed, inProgress: counts.progress, new: counts.new };
     },
 
+    // ===== Renderizado virtualizado =====
+    // Alto estimado de tarjeta + separación hasta medir la primera; tarjetas extra por encima y por debajo
+    ESTIMATED_ROW_HEIGHT: 236,
+    OVERSCAN: 6,
+    COLUMN_LABELS: { new: 'Nuevas', progress: 'En Proceso', completed: 'Completadas' },
+    dirtyColumns: new Set(),
+    renderFrame: null,
+
     // Render all tasks
     renderTasks() {
-        // Render encabezados y tareas por estado
-        this.renderSectionWithHeader('new', 'Nuevas');
-        this.renderSectionWithHeader('progress', 'En Proceso');
-        this.renderSectionWithHeader('completed', 'Completadas');
+        this.ensureIndexed();
+        this.COLUMN_STATUSES.forEach(status => this.dirtyColumns.add(status));
+        this.scheduleRender();
+    },
+
+    // Agrupar los cambios de un mismo frame en un solo renderizado
+    scheduleRender() {
+        if (this.renderFrame !== null) return;
+        this.renderFrame = requestAnimationFrame(() => this.flushRender());
+    },
+
+    // Pintar ya lo pendiente (también lo usa benchmarks/bench_kanban.html)
+    flushRender() {
+        if (this.renderFrame !== null) cancelAnimationFrame(this.renderFrame);
+        this.renderFrame = null;
+        const dirty = [...this.dirtyColumns];
+        this.dirtyColumns.clear();
+        dirty.forEach(status => this.renderColumn(status));
         this.updateTaskCounts();
         // Sincronizar dashboard
-        if (typeof TaskManager.renderRecentTasks === 'function') {
-            TaskManager.renderRecentTasks();
-        }
+        this.renderRecentTasks();
     },
 
-    renderSectionWithHeader(status, label) {
+    // Estructura fija de una columna: espaciadores arriba y abajo, y solo las tarjetas visibles en medio
+    buildColumn(status, container, column) {
+        const sectionHeader = container.parentElement.querySelector('.section-header');
+        const titleElem = sectionHeader && sectionHeader.querySelector('.section-title');
+        if (titleElem) titleElem.textContent = this.COLUMN_LABELS[status];
+        const empty = document.createElement('div');
+        empty.className = 'task-column-empty';
+        empty.textContent = `No ${status === 'new' ? 'new' : status === 'progress' ? 'in progress' : 'completed'} tasks.`;
+        const top = document.createElement('div');
+        const items = document.createElement('div');
+        items.className = 'task-cards-window';
+        const bottom = document.createElement('div');
+        const more = document.createElement('button');
+        more.className = 'btn-secondary column-load-more';
+        more.onclick = () => this.loadMoreTasks(status);
+        container.classList.add('virtual-list');
+        container.replaceChildren(empty, top, items, bottom, more);
+        Object.assign(column, { empty, top, items, bottom, more, cards: new Map() });
+    },
+
+    renderColumn(status) {
         const container = document.getElementById(`${status}TasksContainer`);
         if (!container) return;
-        // Encabezado: buscar el .section-title dentro del .section-header padre
-        const sectionHeader = container.parentElement.querySelector('.section-header');
-        if (sectionHeader) {
-            const titleElem = sectionHeader.querySelector('.section-title');
-            if (titleElem) titleElem.textContent = label;
+        const column = this.column(status);
+        if (!column.items || !column.items.isConnected) this.buildColumn(status, container, column);
+        const { ids, cards } = column;
+        const rowHeight = column.rowHeight || this.ESTIMATED_ROW_HEIGHT;
+        // Columna oculta (otra página): se pinta como si mostrara diez tarjetas
+        const viewport = container.clientHeight || rowHeight * 10;
+        const first = Math.min(ids.length, Math.max(0, Math.floor(container.scrollTop / rowHeight) - this.OVERSCAN));
+        const last = Math.min(ids.length, Math.ceil((container.scrollTop + viewport) / rowHeight) + this.OVERSCAN);
+        column.empty.style.display = ids.length ? 'none' : '';
+        column.top.style.height = `${first * rowHeight}px`;
+        column.bottom.style.height = `${(ids.length - last) * rowHeight}px`;
+
+        // Diff por id: las tarjetas que siguen visibles se conservan y solo se reescriben las que cambiaron
+        const visible = new Set(ids.slice(first, last));
+        cards.forEach((entry, id) => {
+            if (!visible.has(id)) {
+                entry.card.remove();
+                cards.delete(id);
+            }
+        });
+        let previous = null;
+        for (let i = first; i < last; i++) {
+            const task = this.tasksById.get(ids[i]);
+            let entry = cards.get(task.id);
+            if (!entry) {
+                entry = { card: document.createElement('div'), signature: null };
+                cards.set(task.id, entry);
+            }
+            const signature = this.cardSignature(task);
+            if (entry.signature !== signature) {
+                this.fillTaskCard(entry.card, task);
+                entry.signature = signature;
+            }
+            const expected = previous ? previous.nextSibling : column.items.firstChild;
+            if (entry.card !== expected) column.items.insertBefore(entry.card, expected);
+            previous = entry.card;
+        }
+
+        column.more.style.display = AppState.columnCursors[status] ? '' : 'none';
+        column.more.textContent = `Load more (${AppState.columnUnloaded[status] || ''})`;
+
+        // Medir el alto real una vez que hay una tarjeta visible
+        if (!column.rowHeight && previous && previous.offsetHeight) {
+            const gap = parseFloat(getComputedStyle(column.items).rowGap) || 0;
+            column.rowHeight = previous.offsetHeight + gap;
+            if (Math.abs(column.rowHeight - rowHeight) > 1) {
+                this.dirtyColumns.add(status);
+                this.scheduleRender();
+            }
         }
-        // Render tareas
-        const tasks = AppState.tasks.filter(task => task.status === status);
-        this.renderTaskCards(tasks, container, status);
-        console.log(`[TaskManager] Rendered ${tasks.length} tasks for status: ${status}`);
     },
 
-    // Render tasks by status
-    renderTasksByStatus(status) {
-        const container = document.getElementById(`${status}TasksContainer`);
-        if (!container) return;
-        const tasks = AppState.tasks.filter(task => task.status === status);
-        this.renderTaskCards(tasks, container, status);
-        console.log(`[TaskManager] Rendered ${tasks.length} tasks for status: ${status}`);
+    // Todo lo que se muestra en la tarjeta: si no cambia, la tarjeta no se toca
+    cardSignature(task) {
+        return [task.status, task.title, task.description, task.priority, task.createdAt,
+                task.completedAt, this.selectedTaskIds.has(task.id)].join('\u0000');
     },
 
-    // Render a list of tasks in a given container (dashboard style)
-    renderTaskCards(tasks, container, status = null) {
-        container.innerHTML = '';
-        if (tasks.length === 0) {
-            let label = 'tasks';
-            if (status === 'new') label = 'new tasks';
-            else if (status === 'progress') label = 'in progress tasks';
-            else if (status === 'completed') label = 'completed tasks';
-            container.innerHTML = `<div style='color:#64748b;'>No ${label}.</div>`;
-            return;
-        }
-        tasks.forEach(task => {
-            const card = document.createElement('div');
-            card.className = `task-card ${task.status}`;
-            card.dataset.taskId = task.id;
-            // Botones de acción según el estado
-            let actions = '';
-            if (status === 'new') {
-                actions = `
-                    <button class="btn-move-progress" onclick="TaskManager.moveTask(${task.id}, 'progress')">Mover a En Proceso</button>
-                    <button class="btn-move-completed" onclick="TaskManager.moveTask(${task.id}, 'completed')">Completar</button>
-                `;
-            } else if (status === 'progress') {
-                actions = `
-                    <button class="btn-move-new" onclick="TaskManager.moveTask(${task.id}, 'new')">Mover a Nuevas</button>
-                    <button class="btn-move-completed" onclick="TaskManager.moveTask(${task.id}, 'completed')">Completar</button>
-                `;
-            } else if (status === 'completed') {
-                actions = `
-                    <button class="btn-move-new" onclick="TaskManager.moveTask(${task.id}, 'new')">Mover a Nuevas</button>
-                    <button class="btn-move-progress" onclick="TaskManager.moveTask(${task.id}, 'progress')">Mover a En Proceso</button>
-                `;
-            }
-            card.innerHTML += `
-                <div class="task-quick-actions">
-                    <button class="task-edit-btn" title="editar tarea" onclick="TaskManager.editTask(${task.id})"><span class="edit-pencil">✏️</span></button>
-                    <button class="task-delete-btn" title="eliminar tarea" onclick="TaskManager.deleteTask(${task.id})"><span class="delete-x">&times;</span></button>
-                </div>
-                <div class="task-header">
-                    <h3 class="task-title">${task.title}</h3>
-                    ${task.status === 'completed' ? '<span class="task-status">✓</span>' : ''}
-                </div>
-                <p class="task-description">${task.description || ''}</p>
-                <div class="task-footer">
-                    <span class="task-time">${task.status === 'completed' ? 'Completed ' + Utils.formatDate(task.completedAt) : task.status === 'progress' ? 'Started ' + Utils.formatDate(task.createdAt) : 'Created ' + Utils.formatDate(task.createdAt)}</span>
-                    <span class="task-priority ${task.priority}">${this.getPriorityLabel(task.priority)}</span>
-                </div>
-                <div class="task-actions">${actions}</div>
+    fillTaskCard(card, task) {
+        const status = task.status;
+        const selected = this.selectedTaskIds.has(task.id);
+        card.className = `task-card ${status}${selected ? ' selected' : ''}`;
+        card.dataset.taskId = task.id;
+        // Botones de acción según el estado
+        let actions = '';
+        if (status === 'new') {
+            actions = `
+                <button class="btn-move-progress" onclick="TaskManager.moveTask(${task.id}, 'progress')">Mover a En Proceso</button>
+                <button class="btn-move-completed" onclick="TaskManager.moveTask(${task.id}, 'completed')">Completar</button>
             `;
-            container.appendChild(card);
-        });
+        } else if (status === 'progress') {
+            actions = `
+                <button class="btn-move-new" onclick="TaskManager.moveTask(${task.id}, 'new')">Mover a Nuevas</button>
+                <button class="btn-move-completed" onclick="TaskManager.moveTask(${task.id}, 'completed')">Completar</button>
+            `;
+        } else if (status === 'completed') {
+            actions = `
+                <button class="btn-move-new" onclick="TaskManager.moveTask(${task.id}, 'new')">Mover a Nuevas</button>
+                <button class="btn-move-progress" onclick="TaskManager.moveTask(${task.id}, 'progress')">Mover a En Proceso</button>
+            `;
+        }
+        card.innerHTML = `
+            <label class="task-select" title="seleccionar tarea">
+                <input type="checkbox" ${selected ? 'checked' : ''} onchange="TaskManager.toggleSelection(${task.id}, this.checked)">
+            </label>
+            <div class="task-quick-actions">
+                <button class="task-edit-btn" title="editar tarea" onclick="TaskManager.editTask(${task.id})"><span class="edit-pencil">✏️</span></button>
+                <button class="task-delete-btn" title="eliminar tarea" onclick="TaskManager.deleteTask(${task.id})"><span class="delete-x">&times;</span></button>
+            </div>
+            <div class="task-header">
+                <h3 class="task-title">${task.title}</h3>
+                ${status === 'completed' ? '<span class="task-status">✓</span>' : ''}
+            </div>
+            <p class="task-description">${task.description || ''}</p>
+            <div class="task-footer">
+                <span class="task-time">${status === 'completed' ? 'Completed ' + Utils.formatDate(task.completedAt) : status === 'progress' ? 'Started ' + Utils.formatDate(task.createdAt) : 'Created ' + Utils.formatDate(task.createdAt)}</span>
+                <span class="task-priority ${task.priority}">${this.getPriorityLabel(task.priority)}</span>
+            </div>
+            <div class="task-actions">${actions}</div>
+        `;
     },
 
     // Get priority label
@@ -666,8 +934,8 @@ const TaskManager = {
         else if (updatedStatus === 'progress') statusMsg = 'Tarea movida a En Proceso';
         else if (updatedStatus === 'new') statusMsg = 'Tarea movida a Nuevas';
         if (response && response.success) {
-            await this.loadTasksFromBackend();
-            this.renderTasks();
+            await this.applyMutation(response);
+            this.scheduleRender();
         }
         document.querySelectorAll('.task-menu').forEach(menu => menu.classList.remove('show'));
         // Mostrar mensaje de actualización de estado
@@ -699,8 +967,8 @@ const TaskManager = {
         if (confirm('¿Seguro que deseas eliminar esta tarea?')) {
             const response = await window.pywebview.api.remove_item('delete_task', { task_id: taskId });
             if (response.success) {
-                await this.loadTasksFromBackend();
-                this.renderTasks();
+                await this.applyMutation(response, taskId);
+                this.scheduleRender();
             }
         }
         document.querySelectorAll('.task-menu').forEach(menu => menu.classList.remove('show'));
@@ -759,8 +1027,8 @@ const TaskManager = {
             });
         }
         if (response && response.success) {
-            await this.loadTasksFromBackend();
-            this.renderTasks();
+            await this.applyMutation(response);
+            this.scheduleRender();
             // Mostrar mensaje de estado si está disponible
             let statusMsg = '';
             const createdStatus = response.created_status;
@@ -782,6 +1050,102 @@ const TaskManager = {
         this.closeModal();
     },
 
+    // ===== Selección múltiple y acciones masivas =====
+    toggleSelection(taskId, checked) {
+        if (checked) this.selectedTaskIds.add(taskId);
+        else this.selectedTaskIds.delete(taskId);
+        const card = document.querySelector(`.task-card[data-task-id='${taskId}']`);
+        if (card) card.classList.toggle('selected', checked);
+        this.updateBulkActions();
+    },
+
+    clearSelection() {
+        this.selectedTaskIds.clear();
+        document.querySelectorAll('.task-card.selected').forEach(card => {
+            card.classList.remove('selected');
+            const checkbox = card.querySelector('.task-select input');
+            if (checkbox) checkbox.checked = false;
+        });
+        this.updateBulkActions();
+    },
+
+    updateBulkActions() {
+        const bar = document.getElementById('bulkActions');
+        if (!bar) return;
+        const count = this.selectedTaskIds.size;
+        bar.style.display = count > 0 ? 'flex' : 'none';
+        const label = document.getElementById('bulkSelectedCount');
+        if (label) label.textContent = `${count} selected`;
+    },
+
+    // Enviar todas las operaciones en una sola llamada al backend
+    async runBatch(operations) {
+        if (operations.length === 0) return;
+        const response = await window.pywebview.api.batch({ operations });
+        const failed = (response.results || []).filter(r => !r.success).length;
+        // Pedir solo los cambios desde la última revisión conocida
+        await this.loadTasksFromBackend();
+        this.selectedTaskIds.clear();
+        this.updateBulkActions();
+        this.renderTasks();
+        if (failed > 0) alert(`${failed} de ${operations.length} operaciones fallaron.`);
+    },
+
+    async bulkComplete() {
+        const operations = [...this.selectedTaskIds].map(id => ({ op: 'complete', data: { task_id: id } }));
+        await this.runBatch(operations);
+    },
+
+    async bulkMove(newStatus) {
+        const operations = [...this.selectedTaskIds].map(id => ({ op: 'update', data: { task_id: id, status: newStatus } }));
+        await this.runBatch(operations);
+    },
+
+    async bulkDelete() {
+        const count = this.selectedTaskIds.size;
+        if (count === 0 || !confirm(`¿Seguro que deseas eliminar ${count} tareas?`)) return;
+        const operations = [...this.selectedTaskIds].map(id => ({ op: 'delete', data: { task_id: id } }));
+        await this.runBatch(operations);
+    },
+
+    // Historial de tareas archivadas (tabla fría), cargado por páginas
+    archivePage: 0,
+    archiveTotal: 0,
+
+    async openArchive() {
+        this.archivePage = 0;
+        this.archiveTotal = 0;
+        document.getElementById('archiveList').innerHTML = '';
+        document.getElementById('archiveModal').style.display = 'flex';
+        await this.loadArchivePage();
+    },
+
+    async loadArchivePage() {
+        const response = await window.pywebview.api.get_item('get_archived_tasks', { page: this.archivePage + 1, page_size: 50 });
+        if (!response || !response.success) return;
+        this.archivePage = response.page;
+        this.archiveTotal = response.total;
+        const list = document.getElementById('archiveList');
+        const fragment = document.createDocumentFragment();
+        response.tasks.map(t => this.mapTask(t)).forEach(task => {
+            const item = document.createElement('div');
+            item.className = 'archive-item';
+            item.innerHTML = `
+                <span class="archive-title">${task.title}</span>
+                <span class="task-time">Completed ${Utils.formatDate(task.completedAt)}</span>
+            `;
+            fragment.appendChild(item);
+        });
+        list.appendChild(fragment);
+        const shown = list.children.length;
+        document.getElementById('archiveCount').textContent = `${shown} / ${this.archiveTotal}`;
+        document.getElementById('archiveMore').style.display = shown < this.archiveTotal ? '' : 'none';
+    },
+
+    closeArchive() {
+        document.getElementById('archiveModal').style.display = 'none';
+    },
+
     // Update task counts
     updateTaskCounts() {
         const stats = this.getTaskStats();
@@ -796,14 +1160,16 @@ const TaskManager = {
     renderRecentTasks() {
         const container = document.getElementById('recentTasksGrid');
         if (!container) return;
-        // Ordenar por fecha de creación o completado (la más reciente primero)
-        const tasksSorted = [...AppState.tasks].sort((a, b) => {
-            const dateA = a.completedAt || a.createdAt;
-            const dateB = b.completedAt || b.createdAt;
-            return new Date(dateB) - new Date(dateA);
+        // Las 3 más recientes por fecha de creación o completado, en una sola pasada
+        const recent = [];
+        AppState.tasks.forEach(task => {
+            const time = new Date(task.completedAt || task.createdAt).getTime() || 0;
+            const at = recent.findIndex(entry => entry.time < time);
+            if (at !== -1) recent.splice(at, 0, { task, time });
+            else if (recent.length < 3) recent.push({ task, time });
+            if (recent.length > 3) recent.pop();
         });
-        // Tomar las 3 más recientes
-        const recentTasks = tasksSorted.slice(0, 3);
+        const recentTasks = recent.map(entry => entry.task);
         container.innerHTML = '';
         if (recentTasks.length === 0) {
             container.innerHTML = '<div style="color:#64748b;">No recent tasks.</div>';
@@ -830,38 +1196,127 @@ const TaskManager = {
 
 // ===== CALENDAR MANAGER MODULE =====
 const CalendarManager = {
+    // Celdas de la cuadrícula: 6 semanas completas cubren cualquier mes
+    GRID_CELLS: 42,
     currentDate: new Date(),
-    events: [],
-    
+    // Índice de eventos: 'YYYY-MM-DD' -> eventos del día ordenados por hora
+    eventsByDate: new Map(),
+    // Meses ya pedidos al backend: 'YYYY-MM' -> Promise de la carga
+    loadedMonths: new Map(),
+    cells: [],
+
     init() {
-        this.loadEvents();
+        this.currentDate = new Date();
+        this.eventsByDate = new Map();
+        this.loadedMonths = new Map();
+    },
+
+    // Dibujar el mes visible con lo que ya está en el índice, cargarlo si
+    // falta y precargar los meses vecinos para que navegar sea inmediato
+    async render() {
+        const month = this.monthKey(this.currentDate);
         this.renderCalendar();
-        this.renderMiniCalendar();
-        this.setupEventListeners();
+        await this.loadMonth(this.currentDate);
+        if (this.monthKey(this.currentDate) !== month) return;
+        this.renderCalendar();
+        this.prefetchAround(this.currentDate);
     },
-    
-    loadEvents() {
-        // Ejemplo de eventos (luego se pueden cargar desde localStorage o API)
-        this.events = [
-            {
-                title: 'Project Deadline',
-                date: '2024-12-15',
-                time: '23:59',
-                priority: 'high'
-            },
-            {
-                title: 'Team Meeting',
-                date: '2024-12-20',
-                time: '14:00',
-                priority: 'normal'
-            },
-            {
-                title: 'Code Review Session',
-                date: '2024-12-22',
-                time: '10:00',
-                priority: 'low'
-            }
-        ];
+
+    monthKey(date) {
+        return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
+    },
+
+    toDateString(date) {
+        return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
+    },
+
+    // Pedir al backend los eventos de un mes una sola vez
+    loadMonth(date) {
+        const key = this.monthKey(date);
+        if (!this.loadedMonths.has(key)) {
+            const year = date.getFullYear();
+            const month = date.getMonth();
+            const range = {
+                start: this.toDateString(new Date(year, month, 1)),
+                end: this.toDateString(new Date(year, month + 1, 0))
+            };
+            const loading = window.pywebview.api.get_item('get_events_in_range', range).then(response => {
+                if (!response.success) {
+                    // Permitir reintentar en la próxima visita
+                    this.loadedMonths.delete(key);
+                    return;
+                }
+                response.events.forEach(event => this.indexEvent(event));
+            });
+            this.loadedMonths.set(key, loading);
+        }
+        return this.loadedMonths.get(key);
+    },
+
+    prefetchAround(date) {
+        const year = date.getFullYear();
+        const month = date.getMonth();
+        this.loadMonth(new Date(year, month - 1, 1));
+        this.loadMonth(new Date(year, month + 1, 1));
+    },
+
+    // Las ocurrencias de una serie comparten id; se distinguen por su fecha original
+    eventKey(event) {
+        return event.occurrence ? `${event.id}@${event.occurrence}` : String(event.id);
+    },
+
+    // Insertar un evento en su día manteniendo el orden por hora
+    indexEvent(event) {
+        const day = this.eventsByDate.get(event.date) || [];
+        const key = this.eventKey(event);
+        if (day.some(e => this.eventKey(e) === key)) return;
+        const at = day.findIndex(e => (e.time || '') > (event.time || ''));
+        day.splice(at === -1 ? day.length : at, 0, event);
+        this.eventsByDate.set(event.date, day);
+    },
+
+    unindexEvent(key) {
+        for (const [date, day] of this.eventsByDate) {
+            const at = day.findIndex(e => this.eventKey(e) === key);
+            if (at === -1) continue;
+            day.splice(at, 1);
+            if (!day.length) this.eventsByDate.delete(date);
+            return;
+        }
+    },
+
+    async changeMonth(delta) {
+        this.currentDate = new Date(this.currentDate.getFullYear(), this.currentDate.getMonth() + delta, 1);
+        await this.render();
+    },
+
+    async goToToday() {
+        this.currentDate = new Date();
+        await this.render();
+    },
+
+    // Crear una vez las celdas de la cuadrícula en un solo fragmento
+    buildGrid() {
+        const daysContainer = document.getElementById('calendarDays');
+        const fragment = document.createDocumentFragment();
+        this.cells = [];
+        for (let i = 0; i < this.GRID_CELLS; i++) {
+            const cell = document.createElement('div');
+            cell.className = 'calendar-day';
+            const number = document.createElement('span');
+            number.className = 'day-number';
+            const indicators = document.createElement('div');
+            indicators.className = 'event-indicators';
+            cell.append(number, indicators);
+            fragment.appendChild(cell);
+            this.cells.push({ cell, number, indicators });
+        }
+        daysContainer.replaceChildren(fragment);
+        // Un solo listener para todas las celdas
+        daysContainer.addEventListener('click', (e) => {
+            const cell = e.target.closest('.calendar-day');
+            if (cell && cell.dataset.date) this.showEventModal(cell.dataset.date);
+        });
     },
 
     renderCalendar() {
@@ -872,53 +1327,121 @@ const CalendarManager = {
         document.getElementById('currentMonth').textContent = 
             this.currentDate.toLocaleString('default', { month: 'long', year: 'numeric' });
         
-        const firstDay = new Date(year, month, 1);
-        const lastDay = new Date(year, month + 1, 0);
-        const daysContainer = document.getElementById('calendarDays');
-        daysContainer.innerHTML = '';
-        
-        // Agregar días vacíos al inicio
-        for (let i = 0; i < firstDay.getDay(); i++) {
-            daysContainer.appendChild(this.createDayElement(''));
-        }
-        
-        // Agregar días del mes
-        for (let day = 1; day <= lastDay.getDate(); day++) {
+        if (!this.cells.length || !this.cells[0].cell.isConnected) this.buildGrid();
+        const offset = new Date(year, month, 1).getDay();
+        const daysInMonth = new Date(year, month + 1, 0).getDate();
+        const today = this.toDateString(new Date());
+
+        // Reutilizar las celdas: solo cambian número, fecha, clases e indicadores
+        this.cells.forEach(({ cell, number, indicators }, i) => {
+            const day = i - offset + 1;
+            const inMonth = day >= 1 && day <= daysInMonth;
+            const dateStr = inMonth ? `${year}-${String(month + 1).padStart(2, '0')}-${String(day).padStart(2, '0')}` : '';
+            const events = inMonth ? (this.eventsByDate.get(dateStr) || []) : [];
+            number.textContent = inMonth ? day : '';
+            cell.dataset.date = dateStr;
+            cell.classList.toggle('other-month', !inMonth);
+            cell.classList.toggle('today', dateStr === today);
+            cell.classList.toggle('has-events', events.length > 0);
+            indicators.replaceChildren(...events.map(event => this.createEventDot(event)));
+        });
+
+        this.renderEventList(year, month, daysInMonth);
+    },
+
+    createEventDot(event) {
+        const dot = document.createElement('div');
+        dot.className = `event-dot ${event.priority}-priority`;
+        dot.title = event.title || '';
+        return dot;
+    },
+
+    // Lista lateral con los eventos del mes visible, recorriendo el índice por día
+    renderEventList(year, month, daysInMonth) {
+        const list = document.getElementById('monthEventsList');
+        if (!list) return;
+        const events = [];
+        for (let day = 1; day <= daysInMonth; day++) {
             const dateStr = `${year}-${String(month + 1).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
-            const dayEvents = this.events.filter(event => event.date === dateStr);
-            
-            const dayElement = this.createDayElement(day, dayEvents);
-            daysContainer.appendChild(dayElement);
+            events.push(...(this.eventsByDate.get(dateStr) || []));
         }
+        if (!events.length) {
+            list.innerHTML = '<div class="event-date">No events this month.</div>';
+            return;
+        }
+        list.innerHTML = events.map(event => `
+            <div class="event-item ${event.priority}-priority">
+                <div class="event-indicator"></div>
+                <div class="event-content">
+                    <div class="event-title">${event.recurrence ? '&#8635; ' : ''}${this.escape(event.title)}</div>
+                    <div class="event-date">${event.date}</div>
+                    <div class="event-time">${event.time || 'All day'}</div>
+                </div>
+                <button class="modal-close" title="Delete" onclick="CalendarManager.deleteEvent(${event.id}, '${event.occurrence || ''}')">&times;</button>
+            </div>
+        `).join('');
     },
 
-    createDayElement(day, events = []) {
+    escape(text) {
         const div = document.createElement('div');
-        div.className = 'calendar-day';
-        
-        if (day !== '') {
-            div.innerHTML = `
-                <span class="day-number">${day}</span>
-                ${events.length > 0 ? this.createEventIndicators(events) : ''}
-            `;
-            
-            if (events.length > 0) {
-                div.classList.add('has-events');
-            }
+        div.textContent = text || '';
+        return div.innerHTML;
+    },
+
+    showEventModal(date) {
+        document.getElementById('eventForm').reset();
+        document.getElementById('eventDate').value = date || this.toDateString(new Date());
+        document.getElementById('eventModal').style.display = 'flex';
+    },
+
+    closeEventModal() {
+        document.getElementById('eventModal').style.display = 'none';
+    },
+
+    async saveEvent() {
+        const title = document.getElementById('eventTitle').value.trim();
+        const date = document.getElementById('eventDate').value;
+        if (!title || !date) {
+            alert('Please enter a title and a date.');
+            return;
         }
-        
-        return div;
+        const response = await window.pywebview.api.add_item('create_event', {
+            title,
+            description: document.getElementById('eventDescription').value.trim(),
+            date,
+            time: document.getElementById('eventTime').value,
+            priority: document.getElementById('eventPriority').value,
+            recurrence: document.getElementById('eventRecurrence').value
+        });
+        if (!response.success) {
+            alert(response.message || 'Error al crear evento');
+            return;
+        }
+        this.closeEventModal();
+        // Si el mes ya está cargado basta con agregarlo al índice; si no, lo traerá la carga
+        const [year, month] = date.split('-').map(Number);
+        this.currentDate = new Date(year, month - 1, 1);
+        if (response.event.recurrence) {
+            // Una serie aparece en varios meses: se vuelven a pedir los rangos
+            this.eventsByDate = new Map();
+            this.loadedMonths = new Map();
+        } else if (this.loadedMonths.has(this.monthKey(this.currentDate))) {
+            this.indexEvent(response.event);
+        }
+        await this.render();
     },
 
-    createEventIndicators(events) {
-        return `
-            <div class="event-indicators">
-                ${events.map(event => `
-                    <div class="event-dot ${event.priority}-priority" 
-                         title="${event.title}"></div>
-                `).join('')}
-            </div>
-        `;
+    // Con `occurrence` solo se cancela ese día de la serie
+    async deleteEvent(eventId, occurrence) {
+        const response = occurrence
+            ? await window.pywebview.api.remove_item('delete_occurrence', { kind: 'event', id: eventId, occurrence })
+            : await window.pywebview.api.remove_item('delete_event', { event_id: eventId });
+        if (!response.success) {
+            alert(response.message || 'Error al eliminar evento');
+            return;
+        }
+        this.unindexEvent(this.eventKey({ id: eventId, occurrence }));
+        this.renderCalendar();
     }
 };
 
@@ -1088,6 +1611,75 @@ const SettingsManager = {
     },
 };
 
+// ===== SEARCH MODULE =====
+const SearchManager = {
+    PAGE_SIZE: 20,
+    query: '',
+    page: 1,
+    timer: null,
+
+    // Esperar a que el usuario deje de escribir antes de consultar
+    onInput(value) {
+        clearTimeout(this.timer);
+        this.timer = setTimeout(() => this.search(value.trim(), 1), 250);
+    },
+
+    async search(query, page) {
+        this.query = query;
+        this.page = page;
+        const panel = document.getElementById('searchResults');
+        if (!query) {
+            panel.style.display = 'none';
+            panel.innerHTML = '';
+            return;
+        }
+        const response = await window.pywebview.api.get_item('search', { query, scope: 'all', page, page_size: this.PAGE_SIZE });
+        // Ignorar respuestas de consultas ya reemplazadas
+        if (!response.success || query !== this.query) return;
+        this.render(response);
+    },
+
+    // El backend ya escapa el texto; solo las marcas <mark> son HTML
+    render(response) {
+        const panel = document.getElementById('searchResults');
+        const items = [
+            ...response.tasks.map(t => `
+                <div class="search-hit" onclick="SearchManager.openTask(${t.id})">
+                    <span class="search-kind">Task</span>
+                    <span class="search-title">${t.highlight.title}</span>
+                    <span class="search-snippet">${t.highlight.description}</span>
+                </div>`),
+            ...response.events.map(e => `
+                <div class="search-hit">
+                    <span class="search-kind">Event ${e.date || ''}</span>
+                    <span class="search-title">${e.highlight.title}</span>
+                    <span class="search-snippet">${e.highlight.description}</span>
+                </div>`)
+        ];
+        const more = Math.max(response.tasks_total, response.events_total) > this.page * this.PAGE_SIZE;
+        panel.innerHTML = items.length ? items.join('') : `<div class="search-empty">No results.</div>`;
+        if (this.page > 1 || more) {
+            panel.innerHTML += `
+                <div class="search-pager">
+                    <button class="btn-secondary" ${this.page > 1 ? '' : 'disabled'} onclick="SearchManager.search(SearchManager.query, ${this.page - 1})">Prev</button>
+                    <button class="btn-secondary" ${more ? '' : 'disabled'} onclick="SearchManager.search(SearchManager.query, ${this.page + 1})">Next</button>
+                </div>`;
+        }
+        panel.style.display = 'block';
+    },
+
+    // La tarea puede no estar cargada todavía en su columna: pedirla primero
+    async openTask(taskId) {
+        if (!AppState.tasks.find(t => t.id === taskId)) {
+            const response = await window.pywebview.api.get_item('get_task', { task_id: taskId });
+            if (!response.success) return;
+            TaskManager.upsertTask(response.task);
+        }
+        document.getElementById('searchResults').style.display = 'none';
+        TaskManager.editTask(taskId);
+    }
+};
+
 // ===== UTILITY FUNCTIONS =====
 const Utils = {
     // Format date for display
@@ -1255,6 +1847,8 @@ window.PyWebViewAPI = {
             }
             
             UserAuth.saveUserData();
+            // El estado cambió fuera de TaskManager: reconstruir las columnas
+            TaskManager.reindexTasks();
             
             if (AppState.currentPage === 'tasks') {
                 TaskManager.renderTasks();
@@ -1289,6 +1883,7 @@ window.TodoApp = {
     TaskManager,
     CalendarManager,
     SettingsManager,
+    SearchManager,
     Utils,
     AppState
 };
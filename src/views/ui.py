@@ -1,242 +1,729 @@
+import functools
+import html
 import os
-import webview
+import threading
 from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from src.controllers.startup import StartupProfile
 from src.controllers.task_controller import TaskController as TC
+from src.controllers.task_changes import TaskChangeFeed
+from src.database.db import pool_metrics
+from src.database.instrumentation import query_metrics
+from src.database.list_cache import EVENTS, TASKS
+from src.database.repository import STATUS_ALIASES
+from src.database.search import HIGHLIGHT_CLOSE, HIGHLIGHT_OPEN
+from src.views.action_metrics import UNKNOWN_ACTION, action_metrics
+from src.views.serializers import TASK_COLUMNS, serialize_task, serialize_task_list, task_list_format
+
+# (método del Api, acción) -> función que la atiende; se llena con @api_action
+ACTIONS: Dict[Tuple[str, str], Callable[..., dict]] = {}
+
+
+def api_action(method: str, action: str):
+    """Registra la función como la que atiende `action` en el método `method` del Api."""
+    def decorator(fn):
+        ACTIONS[(method, action)] = fn
+        return fn
+    return decorator
+
+
+def _unknown_action() -> dict:
+    return {"success": False, "message": "Acción desconocida"}
+
+
+def _after_startup(method):
+    """Hace esperar a la acción hasta que termine la inicialización en segundo plano."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.ready is not None:
+            self.ready.wait()
+        return method(self, *args, **kwargs)
+    return wrapper
+
 
 class Api:
-    def __init__(self):
-        self.controller = TC()
-        # Seed de usuarios iniciales
-        self.controller.repository.seed_initial_users()
+    # Parámetros que convierten get_tasks en una consulta paginada
+    TASK_PAGE_KEYS = ('status', 'priority', 'due_from', 'due_to', 'sort', 'descending', 'cursor', 'limit')
+
+    def __init__(self, controller: TC = None, changes: TaskChangeFeed = None,
+                 ready: Optional[threading.Event] = None, payload_sizes: Optional[bool] = None):
+        # Sin controlador se crea uno que carga los datos demo
+        self.controller = controller if controller is not None else TC()
+        # Registro de cambios para que la UI aplique parches en vez de recargar todo
+        self.changes = changes if changes is not None else TaskChangeFeed()
+        # Base de datos lista (esquema y datos demo); None si ya lo estaba al crear el Api
+        self.ready = ready
+        # Medir el JSON de cada acción (None = TODO_ACTION_PAYLOADS); el servidor mide el cuerpo HTTP
+        self.payload_sizes = payload_sizes
+
+    def _dispatch(self, method: str, action: str, data: dict) -> dict:
+        """Busca la acción en ACTIONS y la ejecuta midiendo latencia, tamaños y errores."""
+        handler = ACTIONS.get((method, action)) if isinstance(action, str) else None
+        if handler is None:
+            return action_metrics.call(method, UNKNOWN_ACTION, _unknown_action, data, self.payload_sizes)
+        return action_metrics.call(method, action, functools.partial(handler, self, data), data, self.payload_sizes)
 
+    @_after_startup
     def get_item(self, action: str, data: dict) -> dict:
-        if action == 'get_user':
-            username_or_email = data.get('email')
-            password = data.get('password')
-            success, message, *info = self.controller.login(username_or_email, password)
+        return self._dispatch('get_item', action, data)
+
+    @api_action('get_item', 'get_user')
+    def _get_user(self, data: dict) -> dict:
+        username_or_email = data.get('email')
+        password = data.get('password')
+        success, message, *info = self.controller.login(username_or_email, password)
+        return {
+            "success": success,
+            "message": message,
+            "user": info[0] if info else None
+        }
+
+    @api_action('get_item', 'get_tasks')
+    def _get_tasks(self, data: dict) -> dict:
+        revision = self.changes.revision
+        if any(key in data for key in self.TASK_PAGE_KEYS):
+            return self._task_page(data, revision)
+        task_format = task_list_format(data.get('format'))
+        # Tuplas con solo las columnas serializadas, sin objetos del ORM
+        tasks = self._cached_list(TASKS, task_format, lambda: serialize_task_list(
+            self.controller.get_user_tasks(columns=TASK_COLUMNS), task_format))
+        return {
+            "success": True,
+            "tasks": tasks,
+            "format": task_format,
+            "revision": revision,
+            "epoch": self.changes.epoch
+        }
+
+    @api_action('get_item', 'get_task_changes')
+    def _get_task_changes(self, data: dict) -> dict:
+        return self._task_changes(data)
+
+    @api_action('get_item', 'search')
+    def _search(self, data: dict) -> dict:
+        try:
+            page = int(data.get('page') or 1)
+            page_size = int(data.get('page_size') or 20)
+        except (TypeError, ValueError):
+            return {"success": False, "message": "Página inválida"}
+        success, message, results = self.controller.search(
+            data.get('query') or '', data.get('scope') or 'all', page, page_size
+        )
+        if not success:
+            return {"success": False, "message": message}
+        return {
+            "success": True,
+            "tasks": [self._search_hit(serialize_task(r["item"]), r, "name") for r in results["tasks"]],
+            "events": [self._search_hit(self._event_to_dict(r["item"]), r, "title") for r in results["events"]],
+            "tasks_total": results["tasks_total"],
+            "events_total": results["events_total"],
+            "page": max(1, page),
+            "page_size": page_size
+        }
+
+    @api_action('get_item', 'get_archived_tasks')
+    def _get_archived_tasks(self, data: dict) -> dict:
+        # Historial de tareas archivadas, paginado
+        try:
+            page = int(data.get('page') or 1)
+            page_size = int(data.get('page_size') or 50)
+        except (TypeError, ValueError):
+            return {"success": False, "message": "Página inválida"}
+        tasks, total = self.controller.get_archived_tasks(page, page_size)
+        return {
+            "success": True,
+            "tasks": [serialize_task(t) for t in tasks],
+            "page": max(1, page),
+            "page_size": page_size,
+            "total": total
+        }
+
+    @api_action('get_item', 'get_stats')
+    def _get_stats(self, data: dict) -> dict:
+        # Contadores del dashboard leídos de estadisticas_tareas (no recorre las tareas)
+        stats = self.controller.get_stats()
+        if stats is None:
+            return {"success": False, "message": "Usuario no autenticado"}
+        return {"success": True, "stats": self._stats_to_dict(stats)}
+
+    @api_action('get_item', 'get_metrics')
+    def _get_metrics(self, data: dict) -> dict:
+        return {
+            "success": True,
+            "metrics": {
+                "identity_queries_saved": self.controller.identity_queries_saved,
+                "password_kdf_seconds": self.controller.passwords.last_seconds,
+                "db_pool": pool_metrics(self.controller.repository.session_factory.kw.get("bind")),
+                "recurrence_cache": {
+                    "hits": self.controller.occurrences.hits,
+                    "misses": self.controller.occurrences.misses,
+                    "size": self.controller.occurrences.size,
+                },
+                "list_cache": self.controller.list_cache.stats()
+            }
+        }
+
+    @api_action('get_item', 'get_query_metrics')
+    def _get_query_metrics(self, data: dict) -> dict:
+        # Sentencias por método, consultas lentas con su plan y posibles N+1
+        metrics = query_metrics.snapshot()
+        if data.get('reset'):
+            query_metrics.reset()
+        return {"success": True, "metrics": metrics}
+
+    @api_action('get_item', 'get_action_metrics')
+    def _get_action_metrics(self, data: dict) -> dict:
+        # Latencia, tamaños y errores por acción; con format='prometheus', el texto de exportación
+        if data.get('format') == 'prometheus':
+            result = {"success": True, "text": action_metrics.to_prometheus()}
+        else:
+            result = {"success": True, "metrics": action_metrics.snapshot(traces=bool(data.get('traces', True)))}
+        if data.get('reset'):
+            action_metrics.reset()
+        return result
+
+    @api_action('get_item', 'get_task')
+    def _get_task(self, data: dict) -> dict:
+        task_id = int(data.get('task_id'))
+        task = self.controller.get_task_by_id(task_id)
+        if not task:
+            return {"success": False, "message": "Tarea no encontrada"}
+        task_dict = serialize_task(task)
+        return {
+            "success": True,
+            "task": task_dict,
+            "status": task_dict.get('status')
+        }
+
+    @api_action('get_item', 'get_events')
+    def _get_events(self, data: dict) -> dict:
+        events = self._cached_list(EVENTS, None, lambda: [
+            self._event_to_dict(e) for e in self.controller.get_user_events()])
+        return {
+            "success": True,
+            "events": events
+        }
+
+    @api_action('get_item', 'get_task_occurrences')
+    def _get_task_occurrences(self, data: dict) -> dict:
+        # Tareas que vencen en el rango, con las recurrentes expandidas por ocurrencia
+        tasks = self.controller.get_task_occurrences(data.get('start'), data.get('end'))
+        return {"success": True, "tasks": [serialize_task(t) for t in tasks]}
+
+    @api_action('get_item', 'get_events_in_range')
+    def _get_events_in_range(self, data: dict) -> dict:
+        # Solo los días visibles del calendario ('YYYY-MM-DD', ambos incluidos)
+        events = self.controller.get_events_in_range(data.get('start'), data.get('end'))
+        return {
+            "success": True,
+            "start": data.get('start'),
+            "end": data.get('end'),
+            "events": [self._event_to_dict(e) for e in events]
+        }
+
+    @_after_startup
+    def add_item(self, action: str, data: dict) -> dict:
+        return self._dispatch('add_item', action, data)
+
+    @api_action('add_item', 'create_user')
+    def _create_user(self, data: dict) -> dict:
+        name = data.get('name')
+        email = data.get('email')
+        password = data.get('password')
+        success, message = self.controller.register_user(name, email, password)
+        return {"success": success, "message": message}
+
+    @api_action('add_item', 'create_task')
+    def _create_task(self, data: dict) -> dict:
+        # Convertir fechas y enums
+        try:
+            start_date = datetime.fromisoformat(data.get('start_date'))
+            end_date = datetime.fromisoformat(data.get('end_date'))
+            priority = data.get('priority')
+            success, message, created_task = self.controller.create_task_returning(
+                name=data.get('name'),
+                description=data.get('description'),
+                start_date=start_date,
+                end_date=end_date,
+                priority=priority,
+                recurrence=data.get('recurrence')
+            )
+            task_dict = serialize_task(created_task) if created_task else None
+            revision = self.changes.revision
+            if created_task:
+                revision = self.changes.record(self.controller.get_current_user_id(), task_dict["id"], TaskChangeFeed.INSERTED)
             return {
                 "success": success,
                 "message": message,
-                "user": info[0] if info else None
-            }
-        elif action == 'get_tasks':
-            tasks = self.controller.get_user_tasks()
-            return {
-                "success": True,
-                "tasks": [self._task_to_dict(t) for t in tasks]
+                "task": task_dict,
+                "created_status": task_dict.get('status') if task_dict else None,
+                "revision": revision
             }
-        elif action == 'get_task':
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @api_action('add_item', 'create_event')
+    def _create_event(self, data: dict) -> dict:
+        success, message, event = self.controller.create_event_returning(
+            title=data.get('title'),
+            description=data.get('description'),
+            date=data.get('date'),
+            time=data.get('time'),
+            priority=data.get('priority'),
+            recurrence=data.get('recurrence')
+        )
+        return {"success": success, "message": message, "event": self._event_to_dict(event) if event else None}
+
+    @_after_startup
+    def update_item(self, action: str, data: dict) -> dict:
+        return self._dispatch('update_item', action, data)
+
+    @api_action('update_item', 'update_task')
+    def _update_task(self, data: dict) -> dict:
+        try:
             task_id = int(data.get('task_id'))
-            task = self.controller.get_task_by_id(task_id)
-            if not task:
-                return {"success": False, "message": "Tarea no encontrada"}
-            task_dict = self._task_to_dict(task)
+            start_date = datetime.fromisoformat(data.get('start_date'))
+            end_date = datetime.fromisoformat(data.get('end_date'))
+            priority = data.get('priority')
+            status = data.get('status')  # Corregido: obtener status correctamente
+            success, message = self.controller.update_task(
+                task_id=task_id,
+                name=data.get('name'),
+                description=data.get('description'),
+                start_date=start_date,
+                end_date=end_date,
+                priority=priority,
+                status=status  # Corregido: pasar status correctamente
+            )
+            task_dict, revision = self._changed_task(task_id, success)
             return {
-                "success": True,
+                "success": success,
+                "message": message,
                 "task": task_dict,
-                "status": task_dict.get('status')
+                "updated_status": task_dict.get('status') if task_dict else None,
+                "revision": revision
             }
-        elif action == 'get_events':
-            events = self.controller.get_user_events()
-            return {
-                "success": True,
-                "events": [self._event_to_dict(e) for e in events]
-            }
-        return {"success": False, "message": "Acción desconocida"}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
 
-    def add_item(self, action: str, data: dict) -> dict:
-        if action == 'create_user':
-            name = data.get('name')
-            email = data.get('email')
-            password = data.get('password')
-            success, message = self.controller.register_user(name, email, password)
-            return {"success": success, "message": message}
-        elif action == 'create_task':
-            # Convertir fechas y enums
-            try:
-                start_date = datetime.fromisoformat(data.get('start_date'))
-                end_date = datetime.fromisoformat(data.get('end_date'))
-                priority = data.get('priority')
-                success, message = self.controller.create_task(
-                    name=data.get('name'),
-                    description=data.get('description'),
-                    start_date=start_date,
-                    end_date=end_date,
-                    priority=priority
-                )
-                tasks = self.controller.get_user_tasks()
-                created_task = None
-                if tasks:
-                    created_task = max(tasks, key=lambda t: getattr(t, 'task_id', getattr(t, 'idTarea', 0)))
-                created_status = self._task_to_dict(created_task).get('status') if created_task else None
-                return {"success": success, "message": message, "tasks": [self._task_to_dict(t) for t in tasks], "created_status": created_status}
-            except Exception as e:
-                return {"success": False, "message": str(e)}
-        elif action == 'create_event':
-            success, message = self.controller.create_event(
-                title=data.get('title'),
-                description=data.get('description'),
-                date=data.get('date'),
-                time=data.get('time'),
-                priority=data.get('priority')
-            )
-            events = self.controller.get_user_events()
-            return {"success": success, "message": message, "events": [self._event_to_dict(e) for e in events]}
-        return {"success": False, "message": "Acción desconocida"}
+    @api_action('update_item', 'update_recurrence')
+    def _update_recurrence(self, data: dict) -> dict:
+        # {kind: 'event' | 'task', id, recurrence}; recurrence vacía = deja de repetirse
+        try:
+            item_id = int(data.get('id'))
+        except (TypeError, ValueError):
+            return {"success": False, "message": "ID inválido"}
+        success, message = self.controller.set_recurrence(data.get('kind'), item_id, data.get('recurrence'))
+        return {"success": success, "message": message}
 
-    def update_item(self, action: str, data: dict) -> dict:
-        if action == 'update_task':
-            try:
-                task_id = int(data.get('task_id'))
-                start_date = datetime.fromisoformat(data.get('start_date'))
-                end_date = datetime.fromisoformat(data.get('end_date'))
-                priority = data.get('priority')
-                status = data.get('status')  # Corregido: obtener status correctamente
-                success, message = self.controller.update_task(
-                    task_id=task_id,
-                    name=data.get('name'),
-                    description=data.get('description'),
-                    start_date=start_date,
-                    end_date=end_date,
-                    priority=priority,
-                    status=status  # Corregido: pasar status correctamente
-                )
-                tasks = self.controller.get_user_tasks()
-                updated_task = next((t for t in tasks if getattr(t, 'task_id', getattr(t, 'idTarea', None)) == task_id), None)
-                updated_status = None
-                if updated_task:
-                    updated_status = self._task_to_dict(updated_task).get('status')
-                return {"success": success, "message": message, "tasks": [self._task_to_dict(t) for t in tasks], "updated_status": updated_status}
-            except Exception as e:
-                return {"success": False, "message": str(e)}
-        elif action == 'update_user':
-            # Actualizar usuario (nombre, email, password)
-            name = data.get('name')
-            email = data.get('email')
-            new_password = data.get('new_password')
-            current_password = data.get('current_password')
-            # Validar usuario autenticado
-            user = self.controller.repository.get_user_by_email(self.controller.current_user)
-            if not user:
-                return {"success": False, "message": "Usuario no autenticado"}
-            # Validar contraseña actual
-            if not current_password or user.contraseña != current_password:
-                return {"success": False, "message": "Contraseña actual incorrecta"}
-            # Validar nombre y email no vacíos
-            if not name or not email:
-                return {"success": False, "message": "Nombre y email no pueden estar vacíos"}
-            # Validar formato de email
-            import re
-            email_regex = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-            if not re.match(email_regex, email):
-                return {"success": False, "message": "El email no tiene un formato válido"}
-            # Validar email único si cambia
-            if email != user.email:
-                if self.controller.repository.get_user_by_email(email):
-                    return {"success": False, "message": "El email ya está en uso!"}
-            # Actualizar campos
-            update_kwargs = {}
-            if name: update_kwargs['nombre'] = name
-            if email: update_kwargs['email'] = email
-            if new_password: update_kwargs['contraseña'] = new_password
-            ok = self.controller.repository.update_user(user.idUsuario, **update_kwargs)
-            if ok:
-                # Si el email cambió, actualizar current_user
-                if email:
-                    self.controller.current_user = email
-                return {"success": True, "message": "Usuario actualizado"}
-            return {"success": False, "message": "No se pudo actualizar el usuario"}
-        return {"success": False, "message": "Acción desconocida"}
+    @api_action('update_item', 'edit_occurrence')
+    def _edit_occurrence(self, data: dict) -> dict:
+        # {kind, id, occurrence (fecha original), title?, description?, date?, time?, priority?, status?}
+        try:
+            item_id = int(data.get('id'))
+        except (TypeError, ValueError):
+            return {"success": False, "message": "ID inválido"}
+        changes = {key: data.get(key) for key in ('title', 'description', 'date', 'time', 'priority', 'status')}
+        success, message = self.controller.edit_occurrence(data.get('kind'), item_id, data.get('occurrence'), **changes)
+        return {"success": success, "message": message}
+
+    @api_action('update_item', 'update_retention')
+    def _update_retention(self, data: dict) -> dict:
+        days = data.get('days')
+        try:
+            days = None if days in (None, '') else int(days)
+        except (TypeError, ValueError):
+            return {"success": False, "message": "Días de retención inválidos"}
+        success, message = self.controller.set_retention_days(days)
+        return {"success": success, "message": message}
 
+    @api_action('update_item', 'update_user')
+    def _update_user(self, data: dict) -> dict:
+        # Actualizar usuario (nombre, email, password)
+        name = data.get('name')
+        email = data.get('email')
+        new_password = data.get('new_password')
+        current_password = data.get('current_password')
+        # Validar usuario autenticado
+        user = self.controller.get_current_user()
+        if not user:
+            return {"success": False, "message": "Usuario no autenticado"}
+        # Validar contraseña actual
+        if not self.controller.verify_password(current_password):
+            return {"success": False, "message": "Contraseña actual incorrecta"}
+        # Validar nombre y email no vacíos
+        if not name or not email:
+            return {"success": False, "message": "Nombre y email no pueden estar vacíos"}
+        # Validar formato de email
+        import re
+        email_regex = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
+        if not re.match(email_regex, email):
+            return {"success": False, "message": "El email no tiene un formato válido"}
+        # Validar email único si cambia
+        if email != user.email:
+            if self.controller.repository.get_user_by_email(email):
+                return {"success": False, "message": "El email ya está en uso!"}
+        # Actualizar campos
+        update_kwargs = {}
+        if name: update_kwargs['nombre'] = name
+        if email: update_kwargs['email'] = email
+        if new_password: update_kwargs['contraseña'] = self.controller.passwords.hash(new_password)
+        ok = self.controller.repository.update_user(user.idUsuario, **update_kwargs)
+        if ok:
+            # Releer el perfil para que la sesión refleje el nuevo email/nombre
+            self.controller.refresh_session()
+            return {"success": True, "message": "Usuario actualizado"}
+        return {"success": False, "message": "No se pudo actualizar el usuario"}
+
+    @_after_startup
     def remove_item(self, action: str, data: dict) -> dict:
-        if action == 'delete_task':
-            try:
-                task_id = int(data.get('task_id'))
-                success, message = self.controller.delete_task(task_id)
-                tasks = self.controller.get_user_tasks()
-                return {"success": success, "message": message, "tasks": [self._task_to_dict(t) for t in tasks]}
-            except Exception as e:
-                return {"success": False, "message": str(e)}
-        elif action == 'delete_event':
-            event_id = int(data.get('event_id'))
-            success, message = self.controller.delete_event(event_id)
-            events = self.controller.get_user_events()
-            return {"success": success, "message": message, "events": [self._event_to_dict(e) for e in events]}
-        elif action == 'delete_user':
-            # Eliminar usuario autenticado
-            current_password = data.get('current_password')
-            # Buscar usuario actual
-            user = self.controller.repository.get_user_by_email(self.controller.current_user)
-            if not current_password or user.contraseña != current_password:
-                return {"success": False, "message": "Contraseña incorrecta"}
-            ok = self.controller.repository.delete_user(user.idUsuario)
-            if ok:
-                self.controller.current_user = None
-                return {"success": True, "message": "Usuario eliminado"}
-            return {"success": False, "message": "No se pudo eliminar el usuario"}
-        return {"success": False, "message": "Acción desconocida"}
+        return self._dispatch('remove_item', action, data)
+
+    @api_action('remove_item', 'delete_task')
+    def _delete_task(self, data: dict) -> dict:
+        try:
+            task_id = int(data.get('task_id'))
+            success, message = self.controller.delete_task(task_id)
+            revision = self.changes.revision
+            if success:
+                revision = self.changes.record(self.controller.get_current_user_id(), task_id, TaskChangeFeed.DELETED)
+            return {"success": success, "message": message, "task_id": task_id, "revision": revision}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @api_action('remove_item', 'delete_event')
+    def _delete_event(self, data: dict) -> dict:
+        event_id = int(data.get('event_id'))
+        success, message = self.controller.delete_event(event_id)
+        return {"success": success, "message": message, "event_id": event_id}
+
+    @api_action('remove_item', 'delete_occurrence')
+    def _delete_occurrence(self, data: dict) -> dict:
+        # Elimina solo una ocurrencia de la serie: {kind, id, occurrence}
+        try:
+            item_id = int(data.get('id'))
+        except (TypeError, ValueError):
+            return {"success": False, "message": "ID inválido"}
+        success, message = self.controller.edit_occurrence(data.get('kind'), item_id, data.get('occurrence'), cancel=True)
+        return {"success": success, "message": message}
 
+    @api_action('remove_item', 'delete_user')
+    def _delete_user(self, data: dict) -> dict:
+        # Eliminar usuario autenticado
+        current_password = data.get('current_password')
+        # Buscar usuario actual
+        user = self.controller.get_current_user()
+        if not user:
+            return {"success": False, "message": "Usuario no autenticado"}
+        if not self.controller.verify_password(current_password):
+            return {"success": False, "message": "Contraseña incorrecta"}
+        ok = self.controller.repository.delete_user(user.idUsuario)
+        if ok:
+            self.changes.forget(user.idUsuario)
+            self.controller.sessions.forget_user(user.idUsuario)
+            self.controller.logout()
+            return {"success": True, "message": "Usuario eliminado"}
+        return {"success": False, "message": "No se pudo eliminar el usuario"}
+
+    @api_action('remove_item', 'logout')
+    def _logout(self, data: dict) -> dict:
+        # Cerrar sesión e invalidar el token
+        self.controller.logout()
+        return {"success": True, "message": "Sesión cerrada"}
+
+    @_after_startup
     def toggle_item(self, action: str, data: dict) -> dict:
-        if action == 'complete_task':
+        return self._dispatch('toggle_item', action, data)
+
+    @api_action('toggle_item', 'complete_task')
+    def _complete_task(self, data: dict) -> dict:
+        try:
+            task_id = int(data.get('task_id'))
+            success, message = self.controller.complete_task(task_id)
+            task_dict, revision = self._changed_task(task_id, success)
+            return {"success": success, "message": message, "task": task_dict, "revision": revision}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    @_after_startup
+    def batch(self, data: dict) -> dict:
+        """
+        Ejecuta varias operaciones de tareas con una transacción por tipo.
+
+        data = {"operations": [{"op": "create" | "update" | "complete" | "delete", "data": {...}}]}
+
+        Las operaciones se agrupan y se aplican en el orden create, update,
+        complete, delete. Devuelve un resultado por operación, en el mismo
+        orden en que se recibieron.
+        """
+        return self._dispatch('batch', 'batch', data)
+
+    @api_action('batch', 'batch')
+    def _batch(self, data: dict) -> dict:
+        operations = data.get('operations') or []
+        if not isinstance(operations, list):
+            return {"success": False, "message": "Se esperaba una lista de operaciones", "results": []}
+        results = [None] * len(operations)
+        groups = {'create': [], 'update': [], 'complete': [], 'delete': []}
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or not isinstance(operation.get('data') or {}, dict):
+                results[index] = {"success": False, "message": "Operación inválida"}
+                continue
+            op = operation.get('op')
+            payload = operation.get('data') or {}
             try:
-                task_id = int(data.get('task_id'))
-                success, message = self.controller.complete_task(task_id)
-                tasks = self.controller.get_user_tasks()
-                return {"success": success, "message": message, "tasks": [self._task_to_dict(t) for t in tasks]}
-            except Exception as e:
-                return {"success": False, "message": str(e)}
-        return {"success": False, "message": "Acción desconocida"}
-
-    def _task_to_dict(self, t):
-        def iso(val):
-            if isinstance(val, datetime):
-                return val.isoformat()
-            return val
-        # Mapeo de estado backend -> frontend
-        raw_status = getattr(t, 'status', getattr(t, 'estado', None))
-        status_map = {
-            'todo': 'new',
-            'pending': 'progress',
-            'completed': 'completed',
-            'new': 'new',
-            'progress': 'progress',
-            'complete': 'completed',
+                if op == 'create':
+                    groups['create'].append((index, {
+                        'name': payload.get('name'),
+                        'description': payload.get('description'),
+                        'start_date': datetime.fromisoformat(payload.get('start_date')),
+                        'end_date': datetime.fromisoformat(payload.get('end_date')),
+                        'priority': payload.get('priority'),
+                        'status': payload.get('status'),
+                    }))
+                elif op == 'update':
+                    item = {'task_id': int(payload.get('task_id'))}
+                    for key in ('name', 'description', 'priority', 'status'):
+                        if key in payload:
+                            item[key] = payload[key]
+                    for key in ('start_date', 'end_date'):
+                        if payload.get(key):
+                            item[key] = datetime.fromisoformat(payload[key])
+                    groups['update'].append((index, item))
+                elif op in ('complete', 'delete'):
+                    groups[op].append((index, int(payload.get('task_id'))))
+                else:
+                    results[index] = {"success": False, "message": "Operación desconocida"}
+            except (TypeError, ValueError) as e:
+                results[index] = {"success": False, "message": str(e)}
+
+        changed = {}
+        if groups['create']:
+            success, message, ids = self.controller.bulk_create_tasks([item for _, item in groups['create']])
+            for (index, _), task_id in zip(groups['create'], ids or [None] * len(groups['create'])):
+                results[index] = {"success": success, "message": message, "task_id": task_id}
+                if task_id is not None:
+                    changed[task_id] = TaskChangeFeed.INSERTED
+        for op, method in (('update', self.controller.bulk_update_tasks), ('complete', self.controller.bulk_complete_tasks)):
+            if not groups[op]:
+                continue
+            items = [item for _, item in groups[op]]
+            success, message, ids = method(items)
+            done = set(ids)
+            for index, item in groups[op]:
+                task_id = item['task_id'] if op == 'update' else item
+                ok = success and task_id in done
+                # Si falló toda la operación en bloque se informa el error real
+                results[index] = {"success": ok, "message": message if ok or not success else "Tarea no encontrada",
+                                  "task_id": task_id}
+                if ok:
+                    changed.setdefault(task_id, TaskChangeFeed.UPDATED)
+        if groups['delete']:
+            success, message, ids = self.controller.bulk_delete_tasks([task_id for _, task_id in groups['delete']])
+            done = set(ids)
+            for index, task_id in groups['delete']:
+                ok = success and task_id in done
+                # Si falló toda la operación en bloque se informa el error real
+                results[index] = {"success": ok, "message": message if ok or not success else "Tarea no encontrada",
+                                  "task_id": task_id}
+                if ok:
+                    changed[task_id] = TaskChangeFeed.DELETED
+
+        revision = self.changes.revision
+        if changed:
+            user_id = self.controller.get_current_user_id()
+            for task_id, kind in changed.items():
+                revision = self.changes.record(user_id, task_id, kind)
+        live_ids = [task_id for task_id, kind in changed.items() if kind != TaskChangeFeed.DELETED]
+        tasks = {t.idTarea: serialize_task(t) for t in self.controller.get_tasks_by_ids(live_ids)}
+        for result in results:
+            if result.get("success") and result.get("task_id") in tasks:
+                result["task"] = tasks[result["task_id"]]
+        return {
+            "success": all(r["success"] for r in results),
+            "results": results,
+            "revision": revision
         }
-        status = status_map.get(str(raw_status).lower(), str(raw_status).lower())
+
+    def _task_page(self, data: dict, revision: int) -> dict:
+        """
+        Página de get_tasks con filtros, orden y cursor resueltos en la base de datos.
+
+        data = {"status": "new" | [...], "priority": ..., "due_from": iso, "due_to": iso,
+                "sort": "end_date", "descending": false, "cursor": str, "limit": 50,
+                "format": "rows" | "columnar"}
+        """
+        def as_list(value):
+            if value is None or value == '':
+                return None
+            return value if isinstance(value, list) else [value]
+        try:
+            due_from = datetime.fromisoformat(data['due_from']) if data.get('due_from') else None
+            due_to = datetime.fromisoformat(data['due_to']) if data.get('due_to') else None
+            limit = int(data.get('limit') or 50)
+        except (TypeError, ValueError) as e:
+            return {"success": False, "message": str(e)}
+        success, message, page = self.controller.get_tasks_page(
+            status=as_list(data.get('status')),
+            priority=as_list(data.get('priority')),
+            due_from=due_from,
+            due_to=due_to,
+            sort=data.get('sort') or 'end_date',
+            descending=bool(data.get('descending')),
+            cursor=data.get('cursor'),
+            limit=limit,
+            columns=TASK_COLUMNS
+        )
+        if not success:
+            return {"success": False, "message": message}
+        task_format = task_list_format(data.get('format'))
         return {
-            "id": getattr(t, 'task_id', getattr(t, 'idTarea', None)),
-            "name": getattr(t, 'name', getattr(t, 'titulo', None)),
-            "description": getattr(t, 'description', getattr(t, 'descripcion', None)),
-            "priority": getattr(t, 'priority', getattr(t, 'prioridad', None)),
-            "status": status,
-            "start_date": iso(getattr(t, 'start_date', getattr(t, 'fechaCreacion', None))),
-            "end_date": iso(getattr(t, 'end_date', getattr(t, 'fechaVencimiento', None))),
-            "created_at": iso(getattr(t, 'created_at', getattr(t, 'fechaCreacion', None))),
-            "completed_at": iso(getattr(t, 'completed_at', None)),
+            "success": True,
+            "tasks": serialize_task_list(page["tasks"], task_format),
+            "format": task_format,
+            "next_cursor": page["next_cursor"],
+            "total": page["total"],
+            "revision": revision,
+            "epoch": self.changes.epoch
         }
 
+    @staticmethod
+    def _search_hit(item: dict, result: dict, title_key: str) -> dict:
+        """Agrega al resultado serializado el título y fragmento resaltados como HTML seguro."""
+        def mark(value, fallback):
+            if value is None:
+                return html.escape(fallback or '')
+            return html.escape(value).replace(HIGHLIGHT_OPEN, '<mark>').replace(HIGHLIGHT_CLOSE, '</mark>')
+        item["highlight"] = {
+            "title": mark(result["titulo"], item.get(title_key)),
+            "description": mark(result["descripcion"], item.get("description")),
+        }
+        return item
+
+    def _changed_task(self, task_id: int, success: bool):
+        """Registra la actualización de una tarea y devuelve (tarea serializada, revisión)."""
+        if not success:
+            return None, self.changes.revision
+        task = self.controller.get_task_by_id(task_id)
+        if not task:
+            return None, self.changes.revision
+        revision = self.changes.record(self.controller.get_current_user_id(), task_id, TaskChangeFeed.UPDATED)
+        return serialize_task(task), revision
+
+    def _task_changes(self, data: dict) -> dict:
+        """
+        Devuelve las tareas cambiadas desde `since_revision`.
+
+        Si la revisión ya no está disponible (reinicio del proceso o historial
+        descartado) se responde con `reset` y la lista completa.
+        """
+        if not self.controller.current_user:
+            return {"success": False, "message": "Usuario no autenticado"}
+        try:
+            since_revision = int(data.get('since_revision') or 0)
+        except (TypeError, ValueError):
+            return {"success": False, "message": "Revisión inválida"}
+        changes = self.changes.changes_since(self.controller.get_current_user_id(), since_revision, data.get('epoch'))
+        if changes is None:
+            # Directo al manejador: get_item volvería a esperar el arranque y a medirse como otra acción
+            response = self._get_tasks({})
+            response["reset"] = True
+            response.update({"inserted": [], "updated": [], "deleted": []})
+            return response
+        revision, inserted, updated, deleted = changes
+        tasks = self.controller.get_tasks_by_ids(inserted + updated)
+        return {
+            "success": True,
+            "reset": False,
+            "revision": revision,
+            "epoch": self.changes.epoch,
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "tasks": [serialize_task(t) for t in tasks]
+        }
+
+    def _stats_to_dict(self, stats):
+        # Estados guardados -> estados de la vista (new, progress, completed)
+        by_status = {status: sum(stats["estados"].get(alias, 0) for alias in aliases)
+                     for status, aliases in STATUS_ALIASES.items()}
+        return {
+            "total": stats["total"],
+            "by_status": by_status,
+            "by_priority": stats["prioridades"],
+            "overdue": stats["vencidas"],
+        }
+
+    def _cached_list(self, kind: str, variant, loader: Callable[[], list]):
+        """
+        Lista completa del usuario desde la caché compartida, o cargada con `loader`.
+
+        Args:
+            kind (str): TASKS o EVENTS.
+            variant (Hashable): Forma de la lista (p. ej. el formato de get_tasks).
+            loader (Callable): Consulta y serializa la lista.
+
+        Returns:
+            list: La lista serializada (compartida: no modificar).
+        """
+        user_id = self.controller.get_current_user_id() if self.controller.current_user else None
+        if user_id is None:
+            return loader()
+        # Sin `repository.db`: fuera de una unidad de trabajo abriría una sesión del hilo que nadie cierra
+        return self.controller.list_cache.get(user_id, kind, variant, loader, bind=self.controller.repository.bind)
+
     def _event_to_dict(self, e):
+        fecha = getattr(e, 'fecha', None)
+        hora = getattr(e, 'hora', None)
+        ocurrencia = getattr(e, 'ocurrencia', None)
         return {
             "id": getattr(e, 'idEvento', None),
             "title": getattr(e, 'titulo', None),
             "description": getattr(e, 'descripcion', None),
-            "date": getattr(e, 'fecha', None),
-            "time": getattr(e, 'hora', None),
+            "date": fecha.isoformat() if fecha else None,
+            "time": hora.strftime('%H:%M') if hora else None,
             "priority": getattr(e, 'prioridad', None),
+            "recurrence": getattr(e, 'reglaRecurrencia', None),
+            "occurrence": ocurrencia.isoformat() if ocurrencia else None,
         }
 
     def toggle_fullscreen(self) -> None:
+        import webview
         webview.windows[0].toggle_fullscreen()
 
 
-def load_interface() -> None:
-    api = Api()
-    webview.create_window(
+def load_interface(retention=None, sessions=None, ready: Optional[threading.Event] = None,
+                   profile: Optional[StartupProfile] = None) -> None:
+    """
+    Abre la ventana de escritorio (bloqueante).
+
+    Args:
+        retention (RetentionScheduler, optional): Archivo periódico cuyas bajas se notifican a la UI.
+        sessions (SessionManager, optional): Sesiones compartidas.
+        ready (threading.Event, optional): Fin de la inicialización en segundo
+            plano; con él los datos demo no se cargan aquí.
+        profile (StartupProfile, optional): Fases del arranque (--profile-startup).
+    """
+    profile = profile or StartupProfile(enabled=False)
+    # pywebview (y Qt) se importan recién al abrir la ventana
+    with profile.phase("importar webview"):
+        import webview
+    with profile.phase("crear Api"):
+        # Sin medir tamaños: obligaría a serializar de nuevo cada respuesta
+        api = Api(TC(sessions=sessions, seed=ready is None), ready=ready, payload_sizes=False)
+    if retention is not None:
+        retention.add_listener(api.changes.record_deleted)
+    window = webview.create_window(
         'TODO APP',
         './src/views/static/index.html',
         js_api=api,
         min_size=(1280, 720)
     )
+
+    def shown():
+        profile.mark("ventana visible")
+        profile.print_when(ready)
+    window.events.shown += shown
     webview.start(debug=True, gui='qt')
 
 # if __name__ == '__main__':
@@ -11,6 +11,7 @@ from getpass import getpass
 from datetime import datetime
 from src.database.repository import Repository
 from src.models.models import Usuario, Tarea
+from src.controllers.passwords import hash_password, verify_password
 
 # Instancia del repositorio
 repo = Repository()
@@ -52,7 +53,7 @@ def login():
     contraseña = getpass("Contraseña: ")
 
     usuario = repo.get_user(email)
-    if usuario and usuario.contraseña == contraseña:
+    if usuario and verify_password(contraseña, usuario.contraseña):
         print(f"\n✅ Bienvenido {usuario.nombre}")
         usuario_actual = usuario
         menu_tareas()
@@ -81,7 +82,7 @@ def crear_cuenta():
     nuevo_usuario = Usuario(
         nombre=nombre,
         email=email,
-        contraseña=contraseña,
+        contraseña=hash_password(contraseña),
         modoOscuro=False
     )
 
@@ -228,10 +229,10 @@ def eliminar_todas_tareas():
     """
     confirmacion = input("¿Seguro que deseas eliminar TODAS tus tareas? (s/n): ")
     if confirmacion.lower() == "s":
-        tareas = repo.get_user_tasks(usuario_actual.idUsuario)
-        for tarea in tareas:
-            repo.delete_task(tarea.idTarea, usuario_actual.idUsuario)
-        print("✅ Todas las tareas fueron eliminadas.")
+        ids = [tarea.idTarea for tarea in repo.get_tasks_by_user(usuario_actual.idUsuario)]
+        # Un solo DELETE en una transacción en lugar de una por tarea
+        eliminadas = repo.bulk_delete_tasks(ids, usuario_actual.idUsuario)
+        print(f"✅ {len(eliminadas)} tareas fueron eliminadas.")
     else:
         print("❌ Cancelado.")
 
@@ -248,10 +249,9 @@ def buscar_tarea_por_id(tarea_id):
     """
     try:
         tarea_id = int(tarea_id)
-        tareas = repo.get_user_tasks(usuario_actual.idUsuario)
-        for tarea in tareas:
-            if tarea.idTarea == tarea_id:
-                return tarea
+        tarea = repo.get_task_by_id(tarea_id)
+        if tarea and tarea.idUsuario == usuario_actual.idUsuario:
+            return tarea
         print("❌ Tarea no encontrada.")
         return None
     except ValueError:
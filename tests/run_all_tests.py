@@ -26,6 +26,29 @@ from test_10_create_task_postponable import TestCreateTaskPostponable
 from test_11_read_tasks import TestReadTasks
 from test_12_update_task import TestUpdateTask
 from test_13_delete_task import TestDeleteTask
+from test_14_task_change_feed import TestTaskChangeFeed
+from test_15_user_session import TestUserSession
+from test_16_schema_migrations import TestSchemaMigrations
+from test_17_sqlite_profiles import TestSqliteProfiles
+from test_18_bulk_operations import TestBulkOperations
+from test_19_retention import TestRetention
+from test_20_task_archive import TestTaskArchive
+from test_21_task_pagination import TestTaskPagination
+from test_22_search import TestSearch
+from test_23_passwords import TestPasswords
+from test_24_http_server import TestHttpServer
+from test_25_session_tokens import TestSessionTokens
+from test_26_unit_of_work import TestUnitOfWork
+from test_27_async_repository import TestAsyncRepository
+from test_28_event_store import TestEventStore
+from test_29_recurrence import TestRecurrence
+from test_30_task_stats import TestTaskStats
+from test_31_serializers import TestSerializers
+from test_32_startup import TestStartup
+from test_33_bench_suite import TestBenchSuite
+from test_34_query_metrics import TestQueryMetrics
+from test_35_action_metrics import TestActionMetrics
+from test_36_list_cache import TestListCache, TestListCacheSharedFile
 
 
 if __name__ == "__main__":
@@ -47,7 +70,31 @@ if __name__ == "__main__":
         TestCreateTaskPostponable,
         TestReadTasks,
         TestUpdateTask,
-        TestDeleteTask
+        TestDeleteTask,
+        TestTaskChangeFeed,
+        TestUserSession,
+        TestSchemaMigrations,
+        TestSqliteProfiles,
+        TestBulkOperations,
+        TestRetention,
+        TestTaskArchive,
+        TestTaskPagination,
+        TestSearch,
+        TestPasswords,
+        TestHttpServer,
+        TestSessionTokens,
+        TestUnitOfWork,
+        TestAsyncRepository,
+        TestEventStore,
+        TestRecurrence,
+        TestTaskStats,
+        TestSerializers,
+        TestStartup,
+        TestBenchSuite,
+        TestQueryMetrics,
+        TestActionMetrics,
+        TestListCache,
+        TestListCacheSharedFile
     ]
 
     # Cargar y agregar los tests de cada clase a la suite
@@ -12,6 +12,7 @@ from sqlalchemy.orm import sessionmaker
 # Agrega el directorio raíz del proyecto al path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.controllers.passwords import INVALID_CREDENTIALS
 from src.controllers.task_controller import TaskController
 from src.models.models import Base
 
@@ -43,7 +44,7 @@ class TestLoginWrongPassword(unittest.TestCase):
         success, message, _ = self.controller.login("login@example.com", "wrongpassword")
 
         self.assertFalse(success)
-        self.assertEqual(message, "Contraseña incorrecta")
+        self.assertEqual(message, INVALID_CREDENTIALS)
 
 
 if __name__ == "__main__":
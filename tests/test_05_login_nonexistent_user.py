@@ -6,12 +6,14 @@ el inicio de sesión de un usuario que no existe.
 import sys
 import os
 import unittest
+from unittest import mock
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Agrega el directorio raíz del proyecto al path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.controllers.passwords import INVALID_CREDENTIALS
 from src.controllers.task_controller import TaskController
 from src.models.models import Base
 
@@ -36,12 +38,17 @@ class TestLoginNonexistentUser(unittest.TestCase):
     def test_login_nonexistent_user(self):
         """
         Intenta iniciar sesión con un correo que no existe.
-        Verifica que el sistema indique que el usuario no fue encontrado.
+        Verifica que la respuesta sea la misma que con una contraseña incorrecta
+        y que igual se derive un hash (sin diferencia de tiempo).
         """
-        success, message, _ = self.controller.login("login123@example.com", "password123")
+        passwords = self.controller.passwords
+        with mock.patch.object(passwords, 'verify', wraps=passwords.verify) as verify:
+            success, message, _ = self.controller.login("login123@example.com", "password123")
 
         self.assertFalse(success)
-        self.assertIn("no encontrado", message.lower())
+        self.assertEqual(message, INVALID_CREDENTIALS)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(verify.call_args[0][1], passwords.dummy_hash())
 
 
 if __name__ == "__main__":
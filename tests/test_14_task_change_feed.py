@@ -0,0 +1,113 @@
+"""
+Prueba unitaria para verificar el protocolo de sincronización por cambios:
+las mutaciones devuelven solo la tarea afectada y una revisión, y
+get_task_changes devuelve únicamente lo cambiado desde esa revisión.
+"""
+
+import sys
+import os
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.task_changes import TaskChangeFeed
+from src.models.models import Base
+from src.views.ui import Api
+
+
+class TestTaskChangeFeed(unittest.TestCase):
+    """
+    Prueba el registro de cambios y las acciones del Api que lo usan.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria, enlaza el Api
+        y deja un usuario autenticado.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.api.controller.repository.db = SessionLocal()
+        self.api.controller.register_user("sync", "sync@example.com", "password123")
+        self.api.controller.login("sync@example.com", "password123")
+
+    def _create(self, name):
+        return self.api.add_item('create_task', {
+            "name": name,
+            "description": "",
+            "start_date": "2026-01-01T00:00:00",
+            "end_date": "2026-01-02T00:00:00",
+            "priority": "normal"
+        })
+
+    def test_feed_compacts_and_trims(self):
+        """
+        Una inserción seguida de una actualización se reporta como inserción
+        y las revisiones descartadas obligan a recargar.
+        """
+        feed = TaskChangeFeed(max_entries_per_user=2)
+        feed.record("u", 1, TaskChangeFeed.INSERTED)
+        feed.record("u", 1, TaskChangeFeed.UPDATED)
+        revision, inserted, updated, deleted = feed.changes_since("u", 0)
+        self.assertEqual((revision, inserted, updated, deleted), (2, [1], [], []))
+
+        feed.record("u", 2, TaskChangeFeed.INSERTED)
+        feed.record("u", 3, TaskChangeFeed.DELETED)
+        self.assertIsNone(feed.changes_since("u", 0))
+        self.assertEqual(feed.changes_since("u", 2), (4, [2], [], [3]))
+        self.assertIsNone(feed.changes_since("u", 2, epoch="otro"))
+
+    def test_mutations_return_single_task(self):
+        """
+        Crear, completar y eliminar devuelven la tarea afectada, no la lista.
+        """
+        baseline = self.api.get_item('get_tasks', {})
+        created = self._create("Primera")
+        self.assertTrue(created["success"])
+        self.assertNotIn("tasks", created)
+        self.assertEqual(created["task"]["name"], "Primera")
+        self.assertEqual(created["revision"], baseline["revision"] + 1)
+
+        task_id = created["task"]["id"]
+        completed = self.api.toggle_item('complete_task', {"task_id": task_id})
+        self.assertEqual(completed["task"]["status"], "completed")
+
+        other = self._create("Segunda")
+        removed = self.api.remove_item('delete_task', {"task_id": other["task"]["id"]})
+        self.assertTrue(removed["success"])
+
+        changes = self.api.get_item('get_task_changes', {
+            "since_revision": baseline["revision"],
+            "epoch": baseline["epoch"]
+        })
+        self.assertFalse(changes["reset"])
+        self.assertEqual(changes["inserted"], [task_id])
+        self.assertEqual(changes["deleted"], [other["task"]["id"]])
+        self.assertEqual([t["id"] for t in changes["tasks"]], [task_id])
+
+        # Sin cambios posteriores no se devuelve nada
+        empty = self.api.get_item('get_task_changes', {
+            "since_revision": changes["revision"],
+            "epoch": changes["epoch"]
+        })
+        self.assertEqual(empty["tasks"], [])
+        self.assertEqual(empty["deleted"], [])
+
+    def test_unknown_epoch_resets(self):
+        """
+        Una revisión de otro proceso devuelve la lista completa.
+        """
+        self._create("Tarea")
+        changes = self.api.get_item('get_task_changes', {"since_revision": 0, "epoch": "viejo"})
+        self.assertTrue(changes["reset"])
+        self.assertEqual(len(changes["tasks"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
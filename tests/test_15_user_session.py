@@ -0,0 +1,89 @@
+"""
+Prueba unitaria para verificar que la sesión del usuario autenticado evita
+la búsqueda por email en cada operación y se invalida al modificar o
+eliminar el usuario.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.models import Base
+from src.views.ui import Api
+
+
+class TestUserSession(unittest.TestCase):
+    """
+    Prueba la caché de identidad del controlador.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria y enlaza el Api.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.controller.repository.db = SessionLocal()
+        self.controller.register_user("sesion", "sesion@example.com", "password123")
+
+    def test_login_resolves_session_once(self):
+        """
+        Tras el login, las operaciones de tareas no vuelven a buscar por email.
+        """
+        self.controller.login("sesion@example.com", "password123")
+        self.assertTrue(self.controller.session.resolved)
+
+        with mock.patch.object(self.controller.repository, 'get_user_by_email',
+                               wraps=self.controller.repository.get_user_by_email) as lookup:
+            self.controller.create_task("T", "", datetime(2026, 1, 1), datetime(2026, 1, 2), "normal")
+            tasks = self.controller.get_tasks()
+            self.controller.complete_task(tasks[0].idTarea)
+            self.controller.delete_task(tasks[0].idTarea)
+            self.assertEqual(lookup.call_count, 0)
+
+        self.assertEqual(self.controller.identity_queries_saved, 4)
+        metrics = self.api.get_item('get_metrics', {})["metrics"]
+        self.assertEqual(metrics["identity_queries_saved"], 4)
+
+        # Una acción del Api cuenta una sola búsqueda evitada aunque consulte el ID varias veces
+        self.api.get_item('get_tasks', {})
+        self.assertEqual(self.controller.identity_queries_saved, 5)
+
+    def test_update_user_refreshes_session(self):
+        """
+        Cambiar el email actualiza la sesión sin cerrarla.
+        """
+        self.controller.login("sesion@example.com", "password123")
+        response = self.api.update_item('update_user', {
+            "name": "Nuevo",
+            "email": "nuevo@example.com",
+            "current_password": "password123"
+        })
+        self.assertTrue(response["success"])
+        self.assertEqual(self.controller.current_user, "nuevo@example.com")
+        self.assertEqual(self.controller.session.nombre, "Nuevo")
+
+    def test_delete_user_clears_session(self):
+        """
+        Eliminar el usuario cierra la sesión.
+        """
+        self.controller.login("sesion@example.com", "password123")
+        response = self.api.remove_item('delete_user', {"current_password": "password123"})
+        self.assertTrue(response["success"])
+        self.assertIsNone(self.controller.session)
+        self.assertIsNone(self.controller.get_current_user_id())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Prueba unitaria para verificar que las migraciones versionadas agregan los
+índices a una base de datos existente creada con el esquema original.
+"""
+
+import sys
+import os
+import unittest
+from sqlalchemy import create_engine, inspect, text
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.migrations import MIGRATIONS, get_schema_version, run_migrations
+from src.models.models import Base
+
+
+# Esquema original, sin índices, tal como existe en bases de datos antiguas
+LEGACY_SCHEMA = [
+    "CREATE TABLE usuarios (idUsuario INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, email TEXT, contraseña TEXT, modoOscuro BOOLEAN)",
+    "CREATE TABLE tareas (idTarea INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, descripcion TEXT, fechaCreacion TIMESTAMP, "
+    "fechaVencimiento TIMESTAMP, estado TEXT, prioridad TEXT, tipo TEXT, idUsuario INTEGER, idGrupo INTEGER, idTipoTarea INTEGER)",
+    "CREATE TABLE eventos (idEvento INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, descripcion TEXT, fecha TEXT, hora TEXT, "
+    "prioridad TEXT, idUsuario INTEGER)",
+]
+
+
+class TestSchemaMigrations(unittest.TestCase):
+    """
+    Prueba el mecanismo de migraciones sobre una base SQLite en memoria.
+    """
+
+    def setUp(self):
+        """
+        Crea una base de datos en memoria con el esquema antiguo.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        with self.engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO usuarios (nombre, email) VALUES ('a', 'a@example.com')"))
+
+    def _index_names(self, table):
+        return {index["name"] for index in inspect(self.engine).get_indexes(table)}
+
+    def test_upgrade_existing_database(self):
+        """
+        Las migraciones crean los índices y registran la versión sin perder datos.
+        """
+        self.assertEqual(get_schema_version(self.engine), 0)
+        version = run_migrations(self.engine)
+
+        self.assertEqual(version, MIGRATIONS[-1][0])
+        self.assertIn("ux_usuarios_email", self._index_names("usuarios"))
+        self.assertTrue({"ix_tareas_usuario_estado", "ix_tareas_usuario_vencimiento"} <= self._index_names("tareas"))
+        self.assertIn("ix_eventos_usuario_fecha", self._index_names("eventos"))
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM usuarios")).scalar(), 1)
+
+    def test_migrations_are_idempotent(self):
+        """
+        Ejecutar las migraciones dos veces no vuelve a aplicar ningún paso.
+        """
+        first = run_migrations(self.engine)
+        second = run_migrations(self.engine)
+        self.assertEqual(first, second)
+        with self.engine.connect() as conn:
+            applied = conn.execute(text("SELECT COUNT(*) FROM schema_version")).scalar()
+        self.assertEqual(applied, len(MIGRATIONS))
+
+    def test_fresh_database_matches_models(self):
+        """
+        Una base nueva creada con create_all también queda migrada sin errores.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.assertEqual(run_migrations(engine), MIGRATIONS[-1][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
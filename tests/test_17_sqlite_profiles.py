@@ -0,0 +1,76 @@
+"""
+Prueba unitaria para verificar que el motor aplica los PRAGMAs del perfil
+de SQLite elegido por argumento, variable de entorno o archivo de configuración.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import text
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.db import PROFILE_ENV_VAR, create_db_engine, resolve_pragmas
+
+
+class TestSqliteProfiles(unittest.TestCase):
+    """
+    Prueba la fábrica de motores y sus perfiles de PRAGMAs.
+    """
+
+    def setUp(self):
+        """
+        Crea un directorio temporal para una base de datos en archivo.
+        """
+        self.tmpdir = tempfile.mkdtemp()
+        self.url = "sqlite:///" + os.path.join(self.tmpdir, "perfil.db")
+        self.missing_config = os.path.join(self.tmpdir, "no_existe.ini")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _pragma(self, engine, name):
+        with engine.connect() as conn:
+            return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_fast_profile_is_applied_on_connect(self):
+        """
+        El perfil 'fast' activa WAL y desactiva el fsync.
+        """
+        engine = create_db_engine(self.url, profile="fast", config_path=self.missing_config)
+        self.assertEqual(self._pragma(engine, "journal_mode"), "wal")
+        self.assertEqual(self._pragma(engine, "synchronous"), 0)
+        self.assertEqual(self._pragma(engine, "foreign_keys"), 1)
+        self.assertEqual(self._pragma(engine, "busy_timeout"), 2000)
+        engine.dispose()
+
+    def test_environment_and_config_file(self):
+        """
+        La variable de entorno elige el perfil y el archivo INI sobrescribe valores.
+        """
+        config = os.path.join(self.tmpdir, "todo_app.ini")
+        with open(config, "w", encoding="utf-8") as f:
+            f.write("[database]\nprofile = fast\ncache_size = -1234\n")
+
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VAR: "durable"}):
+            pragmas = resolve_pragmas(config_path=config)
+        self.assertEqual(pragmas["synchronous"], "FULL")
+        self.assertEqual(pragmas["cache_size"], "-1234")
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(resolve_pragmas(config_path=config)["synchronous"], "OFF")
+
+    def test_unknown_profile_falls_back_to_default(self):
+        """
+        Un perfil desconocido usa el perfil por defecto en lugar de fallar.
+        """
+        pragmas = resolve_pragmas("inexistente", config_path=self.missing_config)
+        self.assertEqual(pragmas["synchronous"], "NORMAL")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Prueba unitaria para verificar las operaciones masivas de tareas del
+repositorio y la acción batch del Api.
+"""
+
+import sys
+import os
+import unittest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.models import Base
+from src.views.ui import Api
+
+
+class TestBulkOperations(unittest.TestCase):
+    """
+    Prueba bulk_create/update/delete y la acción batch.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria y un usuario autenticado.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("bulk", "bulk@example.com", "password123")
+        self.controller.login("bulk@example.com", "password123")
+        self.user_id = self.controller.get_current_user_id()
+
+    def _rows(self, n):
+        return [{"titulo": f"T{i}", "estado": "todo", "prioridad": "normal"} for i in range(n)]
+
+    def test_bulk_create_uses_one_transaction(self):
+        """
+        Crear 200 tareas ejecuta un único COMMIT.
+        """
+        commits = []
+        event.listen(self.engine, "commit", lambda conn: commits.append(1))
+        ids = self.repository.bulk_create_tasks(self.user_id, self._rows(200))
+        self.assertEqual(len(ids), 200)
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(len(self.controller.get_tasks()), 200)
+
+    def test_bulk_update_and_delete_only_touch_own_tasks(self):
+        """
+        Las operaciones masivas ignoran IDs inexistentes o de otro usuario.
+        """
+        ids = self.repository.bulk_create_tasks(self.user_id, self._rows(3))
+        otro = self.repository.create_user("otro", "otro@example.com", "x")
+        ajena = self.repository.bulk_create_tasks(otro.idUsuario, self._rows(1))[0]
+
+        updated = self.repository.bulk_update_tasks(self.user_id, [
+            {"idTarea": ids[0], "estado": "progress"},
+            {"idTarea": ids[1], "estado": "completed", "prioridad": "high"},
+            {"idTarea": ajena, "estado": "completed"},
+        ])
+        self.assertEqual(sorted(updated), sorted(ids[:2]))
+        self.assertEqual(self.repository.get_task_by_id(ids[1]).prioridad, "high")
+        self.assertIsNotNone(self.repository.get_task_by_id(ids[1]).fechaCompletado)
+        self.assertIsNone(self.repository.get_task_by_id(ids[0]).fechaCompletado)
+        self.assertEqual(self.repository.get_task_by_id(ajena).estado, "todo")
+
+        deleted = self.repository.bulk_delete_tasks([ids[0], ids[2], ajena, 9999], self.user_id)
+        self.assertEqual(sorted(deleted), sorted([ids[0], ids[2]]))
+        self.assertIsNotNone(self.repository.get_task_by_id(ajena))
+
+    def test_batch_action_returns_per_item_results(self):
+        """
+        La acción batch devuelve un resultado por operación en el orden recibido.
+        """
+        existing = self.repository.bulk_create_tasks(self.user_id, self._rows(2))
+        response = self.api.batch({"operations": [
+            {"op": "create", "data": {"name": "Nueva", "description": "", "priority": "normal",
+                                      "start_date": "2026-01-01T00:00:00", "end_date": "2026-01-02T00:00:00"}},
+            {"op": "complete", "data": {"task_id": existing[0]}},
+            {"op": "delete", "data": {"task_id": existing[1]}},
+            {"op": "delete", "data": {"task_id": 12345}},
+            {"op": "rename", "data": {}},
+        ]})
+        results = response["results"]
+        self.assertFalse(response["success"])
+        self.assertEqual([r["success"] for r in results], [True, True, True, False, False])
+        self.assertEqual(results[0]["task"]["name"], "Nueva")
+        self.assertEqual(results[1]["task"]["status"], "completed")
+
+        changes = self.api.get_item('get_task_changes', {"since_revision": 0, "epoch": self.api.changes.epoch})
+        self.assertEqual(changes["deleted"], [existing[1]])
+
+    def test_batch_rejects_malformed_operations(self):
+        """
+        Entradas que no son objetos fallan una por una; una lista que no es lista falla sin excepción.
+        """
+        existing = self.repository.bulk_create_tasks(self.user_id, self._rows(1))
+        response = self.api.batch({"operations": ["complete", None, {"op": "delete", "data": [1]},
+                                                  {"op": "complete", "data": {"task_id": existing[0]}}]})
+        self.assertEqual([r["success"] for r in response["results"]], [False, False, False, True])
+        self.assertEqual(response["results"][0]["message"], "Operación inválida")
+
+        response = self.api.batch({"operations": {"op": "delete", "data": {"task_id": existing[0]}}})
+        self.assertEqual((response["success"], response["results"]), (False, []))
+
+    def test_batch_reports_bulk_failure_message(self):
+        """
+        Si la operación en bloque falla, cada resultado lleva su mensaje y no "Tarea no encontrada".
+        """
+        existing = self.repository.bulk_create_tasks(self.user_id, self._rows(1))
+        self.controller.logout()
+        response = self.api.batch({"operations": [{"op": "delete", "data": {"task_id": existing[0]}},
+                                                  {"op": "update", "data": {"task_id": existing[0], "name": "X"}}]})
+        self.assertEqual([r["message"] for r in response["results"]], ["Usuario no autenticado"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
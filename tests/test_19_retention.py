@@ -0,0 +1,106 @@
+"""
+Prueba unitaria para verificar la limpieza de tareas completadas según la
+retención de cada usuario, borrando por bloques.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.retention import RetentionScheduler
+from src.controllers.task_controller import TaskController
+from src.models.models import Base, Tarea
+
+
+class TestRetention(unittest.TestCase):
+    """
+    Prueba cleanup_completed_tasks del repositorio, del controlador y el planificador.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con dos usuarios.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.controller = TaskController()
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.ana = self.repository.create_user("ana", "ana@example.com", "x")
+        self.beto = self.repository.create_user("beto", "beto@example.com", "x")
+
+    def _add(self, user, estado, days_ago, n=1):
+        when = datetime.now() - timedelta(days=days_ago)
+        for _ in range(n):
+            self.repository.db.add(Tarea(titulo="t", estado=estado, idUsuario=user.idUsuario,
+                                         fechaCompletado=when if estado == 'completed' else None,
+                                         fechaVencimiento=when))
+        self.repository.db.commit()
+
+    def _count(self, user):
+        return len(self.repository.get_tasks_by_user(user.idUsuario))
+
+    def test_deletes_old_completed_tasks_in_chunks(self):
+        """
+        Solo se borran tareas completadas más antiguas que la retención.
+        """
+        self._add(self.ana, 'completed', 40, n=7)
+        self._add(self.ana, 'completed', 5)
+        self._add(self.ana, 'todo', 90)
+
+        removed = self.repository.cleanup_completed_tasks(default_days=30, chunk_size=3)
+        self.assertEqual(list(removed), [self.ana.idUsuario])
+        self.assertEqual(len(removed[self.ana.idUsuario]), 7)
+        self.assertEqual(self._count(self.ana), 2)
+
+    def test_per_user_retention(self):
+        """
+        La retención propia del usuario tiene prioridad; 0 desactiva la limpieza.
+        """
+        self._add(self.ana, 'completed', 10)
+        self._add(self.beto, 'completed', 400)
+        self.repository.update_user(self.ana.idUsuario, diasRetencion=7)
+        self.repository.update_user(self.beto.idUsuario, diasRetencion=0)
+
+        self.assertEqual({u: len(ids) for u, ids in self.repository.cleanup_completed_tasks(default_days=30).items()},
+                         {self.ana.idUsuario: 1})
+        self.assertEqual(self._count(self.ana), 0)
+        self.assertEqual(self._count(self.beto), 1)
+
+    def test_controller_limits_to_current_user_and_reports(self):
+        """
+        Con sesión iniciada solo se limpian las tareas del usuario actual.
+        """
+        self.controller.register_user("carla", "carla@example.com", "password123")
+        self.controller.login("carla@example.com", "password123")
+        carla = self.repository.get_user_by_email("carla@example.com")
+        self._add(carla, 'completed', 100)
+        self._add(self.ana, 'completed', 100)
+
+        report = self.controller.cleanup_completed_tasks(default_days=30)
+        self.assertEqual(report["removed"], 1)
+        self.assertGreaterEqual(report["seconds"], 0)
+        self.assertEqual(self._count(self.ana), 1)
+
+    def test_scheduler_run_once(self):
+        """
+        El planificador ejecuta una pasada con su propio repositorio y guarda el reporte.
+        """
+        self._add(self.ana, 'completed', 100)
+        # Sin archivo: la tarea vieja sigue en `tareas` y la retención la elimina
+        scheduler = RetentionScheduler(default_days=30, archive_days=-1, repository_factory=lambda: self.repository)
+        report = scheduler.run_once()
+        self.assertEqual(report["removed"], 1)
+        self.assertIs(scheduler.last_report, report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Prueba unitaria para verificar que las tareas completadas antiguas se mueven
+a la tabla de archivo y se consultan por páginas con la misma forma que las
+tareas vigentes.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.retention import RetentionScheduler
+from src.models.models import Base, Tarea, TareaArchivo
+from src.views.ui import Api
+
+
+class TestTaskArchive(unittest.TestCase):
+    """
+    Prueba archive_completed_tasks y la acción get_archived_tasks.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria y un usuario autenticado.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        self.user = self.repository.get_user_by_email("ana@example.com")
+
+    def _add(self, titulo, estado, days_ago):
+        when = datetime.now() - timedelta(days=days_ago)
+        tarea = Tarea(titulo=titulo, estado=estado, prioridad="normal", idUsuario=self.user.idUsuario,
+                      fechaCreacion=when, fechaVencimiento=when,
+                      fechaCompletado=when if estado == 'completed' else None)
+        self.repository.db.add(tarea)
+        self.repository.db.commit()
+        return tarea.idTarea
+
+    def test_moves_old_completed_tasks_in_chunks(self):
+        """
+        Solo se archivan las tareas completadas antes del plazo, conservando su ID.
+        """
+        old_ids = [self._add(f"vieja {i}", 'completed', 20) for i in range(5)]
+        recent = self._add("reciente", 'completed', 1)
+        pending = self._add("pendiente", 'todo', 20)
+
+        archived = self.repository.archive_completed_tasks(7, chunk_size=2)
+        self.assertEqual(sorted(archived[self.user.idUsuario]), old_ids)
+        hot_ids = {t.idTarea for t in self.repository.get_tasks_by_user(self.user.idUsuario)}
+        self.assertEqual(hot_ids, {recent, pending})
+        cold = self.repository.db.query(TareaArchivo).all()
+        self.assertEqual(sorted(t.idTarea for t in cold), old_ids)
+        self.assertTrue(all(t.fechaArchivado for t in cold))
+
+    def test_archived_tasks_action_is_paginated_with_same_shape(self):
+        """
+        get_tasks solo lee la tabla vigente; get_archived_tasks pagina el historial.
+        """
+        for i in range(3):
+            self._add(f"vieja {i}", 'completed', 30)
+        live = self._add("actual", 'todo', 0)
+        self.controller.archive_completed_tasks(delay_days=7)
+
+        tasks = self.api.get_item('get_tasks', {})["tasks"]
+        self.assertEqual([t["id"] for t in tasks], [live])
+
+        first = self.api.get_item('get_archived_tasks', {"page": 1, "page_size": 2})
+        second = self.api.get_item('get_archived_tasks', {"page": 2, "page_size": 2})
+        self.assertEqual(first["total"], 3)
+        self.assertEqual(len(first["tasks"]), 2)
+        self.assertEqual(len(second["tasks"]), 1)
+        self.assertEqual(set(first["tasks"][0]), set(tasks[0]))
+        self.assertEqual(first["tasks"][0]["status"], "completed")
+
+    def test_scheduler_notifies_listeners_and_keeps_archive(self):
+        """
+        El planificador avisa a la interfaz; la retención del usuario no recorta el archivo.
+        """
+        recent = self._add("archivable", 'completed', 10)
+        old = self._add("antigua", 'completed', 100)
+        scheduler = RetentionScheduler(default_days=30, archive_days=7, archive_retention_days=0,
+                                       repository_factory=lambda: self.repository)
+        scheduler.add_listener(self.api.changes.record_deleted)
+
+        report = scheduler.run_once()
+        self.assertEqual((report["archived"], report["removed"]), (2, 0))
+        self.assertEqual(sorted(t.idTarea for t in self.repository.get_archived_tasks(self.user.idUsuario)),
+                         sorted([recent, old]))
+        changes = self.api.changes.changes_since(self.user.idUsuario, 0, self.api.changes.epoch)
+        self.assertEqual(len(changes[3]), 2)
+
+    def test_archive_has_its_own_retention(self):
+        """
+        Con retención del archivo se borran solo las archivadas más antiguas que ese plazo.
+        """
+        recent = self._add("archivable", 'completed', 10)
+        self._add("antigua", 'completed', 100)
+        self.repository.archive_completed_tasks(7)
+        removed = self.repository.cleanup_completed_tasks(default_days=30, archive_retention_days=60)
+        self.assertEqual(sum(len(ids) for ids in removed.values()), 1)
+        self.assertEqual([t.idTarea for t in self.repository.get_archived_tasks(self.user.idUsuario)], [recent])
+
+    def test_scheduler_notifies_tasks_deleted_without_archive(self):
+        """
+        Las tareas que la retención borra directamente de `tareas` también se notifican.
+        """
+        old = self._add("antigua", 'completed', 100)
+        scheduler = RetentionScheduler(default_days=30, archive_days=-1, repository_factory=lambda: self.repository)
+        scheduler.add_listener(self.api.changes.record_deleted)
+
+        report = scheduler.run_once()
+        self.assertEqual((report["archived"], report["removed"]), (0, 1))
+        self.assertEqual(report["deleted"], {self.user.idUsuario: [old]})
+        changes = self.api.changes.changes_since(self.user.idUsuario, 0, self.api.changes.epoch)
+        self.assertEqual(changes[3], [old])
+
+    def test_delete_user_removes_archive(self):
+        """
+        Eliminar un usuario borra también sus tareas archivadas.
+        """
+        self._add("vieja", 'completed', 30)
+        self.repository.archive_completed_tasks(7)
+        self.assertTrue(self.repository.delete_user(self.user.idUsuario))
+        self.assertEqual(self.repository.db.query(TareaArchivo).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Prueba unitaria para verificar la paginación por cursor, los filtros y el
+orden de get_tasks resueltos en la base de datos.
+"""
+
+import base64
+import json
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.models import Base, Tarea
+from src.views.ui import Api
+
+
+class TestTaskPagination(unittest.TestCase):
+    """
+    Prueba query_tasks del repositorio y get_item('get_tasks') con parámetros.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con tareas variadas.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        user_id = self.controller.get_current_user_id()
+
+        base = datetime(2025, 1, 1)
+        estados = ['todo', 'new', 'pending', 'completed']
+        prioridades = ['high', 'normal', 'postponable']
+        for i in range(24):
+            self.repository.db.add(Tarea(
+                titulo=f"tarea {i}", estado=estados[i % 4], prioridad=prioridades[i % 3],
+                fechaCreacion=base, idUsuario=user_id,
+                # Algunas sin vencimiento y varias con el mismo, para probar los empates
+                fechaVencimiento=None if i % 5 == 0 else base + timedelta(days=i // 3)
+            ))
+        self.repository.db.commit()
+
+    def _all_pages(self, **params):
+        ids, cursor, total = [], None, None
+        while True:
+            data = dict(params, limit=4)
+            if cursor:
+                data["cursor"] = cursor
+            response = self.api.get_item('get_tasks', data)
+            self.assertTrue(response["success"], response.get("message"))
+            if total is None:
+                total = response["total"]
+            ids.extend(t["id"] for t in response["tasks"])
+            cursor = response["next_cursor"]
+            if not cursor:
+                return ids, total
+
+    def test_status_aliases_and_total(self):
+        """
+        El estado de la vista incluye sus alias y el total se calcula en SQL.
+        """
+        ids, total = self._all_pages(status="new")
+        self.assertEqual(total, 12)
+        self.assertEqual(len(ids), 12)
+        statuses = {t["status"] for t in self.api.get_item('get_tasks', {"status": "new", "limit": 50})["tasks"]}
+        self.assertEqual(statuses, {"new"})
+
+    def test_keyset_pages_match_full_sort_with_nulls_and_ties(self):
+        """
+        Recorrer todas las páginas equivale a ordenar la lista completa, en ambos sentidos.
+        """
+        tareas = self.repository.get_tasks_by_user(self.controller.get_current_user_id())
+        key = lambda t: (t.fechaVencimiento is not None, t.fechaVencimiento or datetime.min, t.idTarea)
+        expected = [t.idTarea for t in sorted(tareas, key=key)]
+
+        ids, total = self._all_pages(sort="end_date")
+        self.assertEqual(ids, expected)
+        self.assertEqual(total, 24)
+        ids, _ = self._all_pages(sort="end_date", descending=True)
+        self.assertEqual(ids, list(reversed(expected)))
+
+    def test_priority_and_date_range_filters(self):
+        """
+        Los filtros de prioridad y rango de vencimiento se combinan.
+        """
+        response = self.api.get_item('get_tasks', {
+            "priority": ["high", "normal"],
+            "due_from": "2025-01-02T00:00:00",
+            "due_to": "2025-01-04T00:00:00",
+            "sort": "priority",
+            "limit": 50
+        })
+        tasks = response["tasks"]
+        self.assertTrue(tasks)
+        self.assertTrue(all(t["priority"] in ("high", "normal") for t in tasks))
+        self.assertTrue(all("2025-01-02" <= t["end_date"][:10] <= "2025-01-04" for t in tasks))
+        self.assertEqual([t["priority"] for t in tasks], sorted(t["priority"] for t in tasks))
+
+    def test_invalid_cursor_and_sort(self):
+        """
+        Un cursor de otro orden o una clave de orden desconocida se rechazan.
+        """
+        first = self.api.get_item('get_tasks', {"sort": "name", "limit": 2})
+        response = self.api.get_item('get_tasks', {"sort": "end_date", "cursor": first["next_cursor"]})
+        self.assertFalse(response["success"])
+        self.assertFalse(self.api.get_item('get_tasks', {"sort": "idUsuario"})["success"])
+
+    def test_forged_cursor_is_rejected(self):
+        """
+        Un cursor manipulado (tipos inesperados o que no es texto) se rechaza sin excepción.
+        """
+        def forge(value):
+            return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+        forged = [
+            ("end_date", forge(["end_date", 5, 1])),
+            ("end_date", forge(["end_date", "2025-01-01", "1"])),
+            ("name", forge(["name", {"a": 1}, 1])),
+            ("name", forge({"a": 1, "b": 2, "c": 3})),
+            ("name", 123),
+            ("name", "%%%"),
+        ]
+        for sort, cursor in forged:
+            response = self.api.get_item('get_tasks', {"sort": sort, "cursor": cursor})
+            self.assertEqual(response, {"success": False, "message": "Cursor inválido"})
+
+    def test_get_tasks_without_parameters_returns_everything(self):
+        """
+        Sin parámetros se mantiene la lista completa para la sincronización por revisiones.
+        """
+        response = self.api.get_item('get_tasks', {})
+        self.assertEqual(len(response["tasks"]), 24)
+        self.assertNotIn("next_cursor", response)
+        self.assertEqual(len(self.controller.get_tasks(filter_completed=True)), 18)
+
+
+if __name__ == "__main__":
+    unittest.main()
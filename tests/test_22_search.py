@@ -0,0 +1,147 @@
+"""
+Prueba unitaria para verificar la búsqueda de texto completo (FTS5) sobre
+tareas y eventos, su sincronización por triggers y la reconstrucción del índice.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.search import ensure_search_index, has_search_index, rebuild_search_index, to_match_query
+from src.models.models import Base, Event, Tarea
+from src.views.ui import Api
+
+
+class TestSearch(unittest.TestCase):
+    """
+    Prueba search_tasks/search_events del repositorio y la acción 'search'.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con índice FTS5.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            ensure_search_index(conn)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        self.user_id = self.controller.get_current_user_id()
+
+    def _task(self, titulo, descripcion):
+        ok, _, tarea = self.controller.create_task_returning(titulo, descripcion, datetime.now(), datetime.now(), "normal")
+        self.assertTrue(ok)
+        return tarea.idTarea
+
+    def test_ranked_and_highlighted(self):
+        """
+        Las coincidencias en el título pesan más y se marcan con <mark>.
+        """
+        in_description = self._task("Comprar pan", "Pasar por el informe <b>anual</b>")
+        in_title = self._task("Informe trimestral", "Enviar al jefe")
+        self._task("Llamar al banco", "Sin relación")
+
+        response = self.api.get_item('search', {"query": "inform", "scope": "tasks"})
+        self.assertTrue(response["success"])
+        self.assertEqual([t["id"] for t in response["tasks"]], [in_title, in_description])
+        self.assertEqual(response["tasks_total"], 2)
+        self.assertIn("<mark>Informe</mark>", response["tasks"][0]["highlight"]["title"])
+        # El texto del usuario se escapa; solo <mark> es HTML
+        self.assertIn("&lt;b&gt;anual&lt;/b&gt;", response["tasks"][1]["highlight"]["description"])
+
+    def test_triggers_follow_updates_and_deletes(self):
+        """
+        El índice refleja ediciones y borrados, incluidos los masivos.
+        """
+        task_id = self._task("Revisar contrato", "")
+        self.controller.update_task(task_id, "Firmar contrato", "", datetime.now(), datetime.now(), "normal", "todo")
+        self.assertEqual(self.repository.search_tasks(self.user_id, "revisar")[1], 0)
+        self.assertEqual(self.repository.search_tasks(self.user_id, "firmar")[1], 1)
+        self.controller.bulk_delete_tasks([task_id])
+        self.assertEqual(self.repository.search_tasks(self.user_id, "firmar")[1], 0)
+
+    def test_events_pagination_and_other_users(self):
+        """
+        Se buscan eventos, se pagina y no aparecen datos de otros usuarios.
+        """
+        other = self.repository.create_user("beto", "beto@example.com", "x")
+        for i in range(5):
+            self.repository.db.add(Event(titulo=f"Reunión {i}", descripcion="equipo", idUsuario=self.user_id))
+        self.repository.db.add(Event(titulo="Reunión ajena", idUsuario=other.idUsuario))
+        self.repository.db.commit()
+
+        first = self.api.get_item('search', {"query": "reunion", "scope": "events", "page": 1, "page_size": 3})
+        second = self.api.get_item('search', {"query": "reunion", "scope": "events", "page": 2, "page_size": 3})
+        self.assertEqual(first["events_total"], 5)
+        self.assertEqual(len(first["events"]) + len(second["events"]), 5)
+        self.assertEqual(first["tasks"], [])
+
+    def test_rebuild_indexes_existing_rows_and_sanitizes_query(self):
+        """
+        La reconstrucción indexa filas previas al índice; la sintaxis FTS5 no se interpreta.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.repository.db = sessionmaker(bind=engine)()
+        self.repository.db.add(Tarea(titulo="Tarea heredada", idUsuario=self.user_id))
+        self.repository.db.commit()
+        # Sin índice se usa LIKE
+        self.assertEqual(self.repository.search_tasks(self.user_id, "heredada")[1], 1)
+
+        self.assertTrue(rebuild_search_index(engine))
+        results, total = self.repository.search_tasks(self.user_id, 'hered" :*(')
+        self.assertEqual(total, 1)
+        self.assertIsNotNone(results[0]["titulo"])
+        self.assertEqual(to_match_query('a" NEAR(b'), '"a"* "NEAR"* "b"*')
+
+    def test_like_fallback_treats_wildcards_literally(self):
+        """
+        Sin índice FTS5, % y _ de la consulta no actúan como comodines de LIKE.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.repository.db = sessionmaker(bind=engine)()
+        for titulo in ("Rebaja 50% hoy", "Pedido de 500 cajas", "nota_final", "notaXfinal"):
+            self.repository.db.add(Tarea(titulo=titulo, idUsuario=self.user_id))
+        self.repository.db.commit()
+
+        results, total = self.repository.search_tasks(self.user_id, "50%")
+        self.assertEqual((total, [r["item"].titulo for r in results]), (1, ["Rebaja 50% hoy"]))
+        results, total = self.repository.search_tasks(self.user_id, "nota_final")
+        self.assertEqual((total, [r["item"].titulo for r in results]), (1, ["nota_final"]))
+
+
+    def test_index_lookup_is_cached_per_engine(self):
+        """
+        sqlite_master se consulta una vez por motor y nunca fuera de SQLite.
+        """
+        self._task("Informe trimestral", "")
+        catalog = []
+        listener = lambda conn, cursor, statement, *args: catalog.append(statement) if "sqlite_master" in statement else None
+        event.listen(self.engine, "before_cursor_execute", listener)
+        for _ in range(3):
+            self.assertEqual(self.repository.search_tasks(self.user_id, "inform")[1], 1)
+        event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(len(catalog), 1)
+
+        with mock.patch.object(self.engine.dialect, "name", "postgresql"):
+            self.assertFalse(has_search_index(self.repository.db, 'tareas_fts'))
+            with self.engine.connect() as conn:
+                self.assertFalse(has_search_index(conn, 'tareas_fts'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Prueba unitaria para verificar el hash de contraseñas, la migración de
+contraseñas heredadas en texto plano y el límite de intentos de login.
+"""
+
+import sys
+import os
+import threading
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.passwords import PBKDF2, LoginThrottle, PasswordHasher, hash_password, needs_rehash, verify_password
+from src.models.models import Base
+from src.views.ui import Api
+
+# Costo bajo para que las pruebas sean rápidas
+FAST_SCRYPT = {"algorithm": "scrypt", "n": 2 ** 10, "r": 8, "p": 1}
+
+
+class TestPasswords(unittest.TestCase):
+    """
+    Prueba el módulo de contraseñas y su uso en TaskController y Api.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.controller.passwords.params = FAST_SCRYPT
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+
+    def test_hash_formats_and_verification(self):
+        """
+        Cada hash lleva su propia sal y se verifica con scrypt o PBKDF2.
+        """
+        first = hash_password("secreto", FAST_SCRYPT)
+        self.assertNotEqual(first, hash_password("secreto", FAST_SCRYPT))
+        self.assertTrue(first.startswith("scrypt$1024$8$1$"))
+        self.assertTrue(verify_password("secreto", first))
+        self.assertFalse(verify_password("otro", first))
+
+        pbkdf2 = hash_password("secreto", {"algorithm": PBKDF2, "iterations": 1000})
+        self.assertTrue(verify_password("secreto", pbkdf2))
+        self.assertTrue(needs_rehash(pbkdf2, FAST_SCRYPT))
+        self.assertFalse(needs_rehash(first, FAST_SCRYPT))
+
+    def test_hasher_runs_in_caller_thread_with_concurrency_limit(self):
+        """
+        hash y verify derivan en el hilo que llama; el semáforo acota las derivaciones a la vez.
+        """
+        hasher = PasswordHasher(FAST_SCRYPT, max_workers=1)
+        threads = []
+        hasher._timed(lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()])
+
+        with hasher._slots:
+            worker = threading.Thread(target=hasher.hash, args=("secreto",))
+            worker.start()
+            worker.join(0.2)
+            self.assertTrue(worker.is_alive())
+        worker.join()
+        self.assertTrue(hasher.verify("secreto", hasher.hash("secreto")))
+
+    def test_register_stores_hash_and_legacy_rows_are_upgraded(self):
+        """
+        El registro guarda un hash y el login reemplaza las contraseñas en texto plano.
+        """
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        stored = self.repository.get_user_by_email("ana@example.com").contraseña
+        self.assertNotEqual(stored, "password123")
+        self.assertTrue(self.controller.login("ana@example.com", "password123")[0])
+
+        self.repository.create_user("beto", "beto@example.com", "plano")
+        self.assertTrue(self.controller.login("beto@example.com", "plano")[0])
+        upgraded = self.repository.get_user_by_email("beto@example.com").contraseña
+        self.assertTrue(upgraded.startswith("scrypt$"))
+        self.assertTrue(self.controller.login("beto@example.com", "plano")[0])
+
+    def test_seeded_users_are_hashed(self):
+        """
+        Los usuarios demo se crean con hash, nunca en texto plano.
+        """
+        self.repository.seed_initial_users()
+        stored = self.repository.get_user_by_email("admin@gmail.com").contraseña
+        self.assertNotEqual(stored, "admin")
+        self.assertTrue(verify_password("admin", stored))
+        self.assertFalse(needs_rehash(stored))
+
+    def test_api_checks_current_password_against_hash(self):
+        """
+        update_user verifica contra el hash y guarda la nueva contraseña con hash.
+        """
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        data = {"name": "Ana", "email": "ana@example.com", "current_password": "mal", "new_password": "nueva456"}
+        self.assertFalse(self.api.update_item('update_user', data)["success"])
+        data["current_password"] = "password123"
+        self.assertTrue(self.api.update_item('update_user', data)["success"])
+        self.assertTrue(self.controller.login("ana@example.com", "nueva456")[0])
+
+    def test_throttle_blocks_after_repeated_failures(self):
+        """
+        Tras varios fallos el email se bloquea, incluso con la contraseña correcta.
+        """
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        for _ in range(self.controller.throttle.max_attempts):
+            self.assertFalse(self.controller.login("ana@example.com", "mal")[0])
+        success, message, _ = self.controller.login("ANA@example.com", "password123")
+        self.assertFalse(success)
+        self.assertIn("Demasiados intentos", message)
+
+        throttle = LoginThrottle(max_attempts=2, window=10)
+        throttle.record_failure("x@example.com", now=0)
+        throttle.record_failure("x@example.com", now=1)
+        self.assertEqual(throttle.retry_after("x@example.com", now=5), 5)
+        self.assertEqual(throttle.retry_after("x@example.com", now=10.5), 0)
+        throttle.reset("x@example.com")
+        self.assertEqual(throttle.retry_after("x@example.com", now=1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
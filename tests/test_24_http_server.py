@@ -0,0 +1,153 @@
+"""
+Prueba unitaria para verificar el modo servidor: acciones de Api por HTTP,
+sesiones por token en cookie y archivos estáticos.
+"""
+
+import sys
+import os
+import unittest
+from unittest import mock
+import aiohttp
+from aiohttp.test_utils import TestClient, TestServer
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.task_controller import TaskController
+from src.models.models import Base
+from src.views.action_metrics import UNKNOWN_ACTION, action_metrics
+from src.views.server import ApiPool, create_app
+
+
+class TestHttpServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Prueba create_app con un cliente HTTP de aiohttp.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Configura una base de datos en memoria compartida entre hilos y el servidor de prueba.
+        """
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        def controller_factory(**kwargs):
+            controller = TaskController(**kwargs)
+            controller.repository.session_factory = SessionLocal
+            return controller
+
+        self.pool = ApiPool(controller_factory=controller_factory)
+        self.pool.passwords.params = {"algorithm": "scrypt", "n": 2 ** 10, "r": 8, "p": 1}
+        self.app = create_app(self.pool, threads=4)
+        self.client = TestClient(TestServer(self.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def _call(self, client, method, action=None, data=None):
+        body = {"data": data or {}}
+        if action is not None:
+            body["action"] = action
+        response = await client.post(self.client.make_url(f"/api/{method}"), json=body)
+        self.assertEqual(response.status, 200)
+        return await response.json()
+
+    async def test_actions_over_http_keep_a_session_per_cookie(self):
+        """
+        Dos navegadores inician sesión con usuarios distintos y solo ven sus tareas.
+        """
+        # Cada sesión HTTP tiene su propio cookie jar, como dos navegadores
+        ana = self.client.session
+        beto = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+        self.addAsyncCleanup(beto.close)
+        for client, name in ((ana, "ana"), (beto, "beto")):
+            await self._call(client, "add_item", "create_user",
+                             {"name": name, "email": f"{name}@example.com", "password": "password123"})
+            login = await self._call(client, "get_item", "get_user",
+                                     {"email": f"{name}@example.com", "password": "password123"})
+            self.assertTrue(login["success"])
+
+        created = await self._call(ana, "add_item", "create_task", {
+            "name": "Solo de Ana", "description": "", "start_date": "2025-01-01T00:00:00",
+            "end_date": "2025-01-02T00:00:00", "priority": "high"
+        })
+        self.assertTrue(created["success"])
+        batch = await self._call(ana, "batch", data={"operations": [{"op": "complete", "data": {"task_id": created["task"]["id"]}}]})
+        self.assertTrue(batch["success"])
+
+        ana_tasks = await self._call(ana, "get_item", "get_tasks")
+        beto_tasks = await self._call(beto, "get_item", "get_tasks")
+        self.assertEqual([t["name"] for t in ana_tasks["tasks"]], ["Solo de Ana"])
+        self.assertEqual(ana_tasks["tasks"][0]["status"], "completed")
+        self.assertEqual(beto_tasks["tasks"], [])
+
+        # Tras cerrar sesión la cookie ya no identifica a Beto
+        logout = await self._call(beto, "remove_item", "logout")
+        self.assertTrue(logout["success"])
+        created = await self._call(beto, "add_item", "create_task", {
+            "name": "Anónima", "description": "", "start_date": "2025-01-01T00:00:00",
+            "end_date": "2025-01-02T00:00:00", "priority": "high"
+        })
+        self.assertFalse(created["success"])
+
+    async def test_unknown_method_and_static_files(self):
+        """
+        Los métodos fuera de la lista blanca se rechazan y la interfaz se sirve con el puente HTTP.
+        """
+        response = await self.client.post("/api/toggle_fullscreen", json={})
+        self.assertEqual(response.status, 404)
+        response = await self.client.post("/api/get_item", data="no es json")
+        self.assertEqual(response.status, 400)
+
+        index = await (await self.client.get("/")).text()
+        self.assertIn('window.TODO_HTTP_API = "/api"', index)
+        self.assertIn("http_bridge.js", index)
+        script = await self.client.get("/script.js")
+        self.assertEqual(script.status, 200)
+
+    async def test_metrics_endpoint(self):
+        """
+        /metrics exporta en formato Prometheus, con el tamaño real del cuerpo HTTP de cada acción.
+        """
+        action_metrics.reset()
+        body = await self._call(self.client.session, "get_item", "no_existe")
+        self.assertFalse(body["success"])
+        response = await self.client.get("/metrics")
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = await response.text()
+        labels = f'method="get_item",action="{UNKNOWN_ACTION}"'
+        self.assertIn(f'todo_action_duration_seconds_count{{{labels}}} 1', text)
+        self.assertIn(f'todo_action_request_bytes_count{{{labels}}} 1', text)
+        self.assertNotIn(f'todo_action_response_bytes_sum{{{labels}}} 0\n', text)
+        action_metrics.reset()
+
+
+    async def test_bad_data_and_errors_answer_json(self):
+        """
+        `data` que no es un objeto se rechaza con 400; una excepción responde JSON con 500 y se cuenta una vez.
+        """
+        response = await self.client.post("/api/get_item", json={"action": "get_tasks", "data": [1, 2]})
+        self.assertEqual(response.status, 400)
+        self.assertFalse((await response.json())["success"])
+
+        action_metrics.reset()
+        with mock.patch.object(TaskController, "resume_session", side_effect=RuntimeError("sin conexión")):
+            response = await self.client.post("/api/get_item", json={"action": "get_tasks", "data": {}})
+        self.assertEqual(response.status, 500)
+        self.assertEqual(await response.json(), {"success": False, "message": "Error interno del servidor"})
+        with mock.patch.object(TaskController, "get_user_tasks", side_effect=RuntimeError("sin conexión")):
+            response = await self.client.post("/api/get_item", json={"action": "get_tasks", "data": {}})
+        self.assertEqual(response.status, 500)
+        stats = action_metrics.snapshot(traces=False)["actions"]["get_item:get_tasks"]
+        self.assertEqual((stats["count"], stats["errors"]), (1, 2))
+        self.assertGreater(stats["bytes_out"], 0)
+        action_metrics.reset()
+
+if __name__ == "__main__":
+    unittest.main()
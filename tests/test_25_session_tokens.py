@@ -0,0 +1,120 @@
+"""
+Prueba unitaria para verificar los tokens de sesión: emisión en login,
+resolución desde memoria o desde la tabla `sesiones`, expiración y cierre.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.session import SessionManager, hash_token
+from src.controllers.task_controller import TaskController
+from src.models.models import Base, Sesion
+
+
+class TestSessionTokens(unittest.TestCase):
+    """
+    Prueba SessionManager y su uso desde TaskController.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria y un controlador con sesiones propias.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.sessions = SessionManager(ttl=3600, max_cached=2)
+        self.controller = TaskController(sessions=self.sessions)
+        self.controller.repository.db = SessionLocal()
+        self.repository = self.controller.repository
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.register_user("beto", "beto@example.com", "password123")
+
+    def _login(self, email):
+        success, _, _ = self.controller.login(email, "password123")
+        self.assertTrue(success)
+        return self.controller.session.token
+
+    def _stored_sessions(self):
+        return self.repository.db.execute(select(func.count()).select_from(Sesion)).scalar()
+
+    def test_login_issues_token_stored_as_hash(self):
+        """
+        El token se entrega al cliente y en la tabla solo queda su SHA-256.
+        """
+        token = self._login("ana@example.com")
+        self.assertTrue(token)
+        stored = self.repository.db.execute(select(Sesion.token)).scalars().all()
+        self.assertEqual(stored, [hash_token(token)])
+
+    def test_each_call_resolves_its_own_user(self):
+        """
+        Un mismo controlador atiende a dos usuarios según el token de cada llamada.
+        """
+        ana = self._login("ana@example.com")
+        beto = self._login("beto@example.com")
+        self.assertTrue(self.controller.resume_session(ana))
+        self.controller.create_task("De Ana", "", datetime(2025, 1, 1), datetime(2025, 1, 2), "high")
+        self.assertTrue(self.controller.resume_session(beto))
+        self.assertEqual(self.controller.get_tasks(), [])
+        self.assertTrue(self.controller.resume_session(ana))
+        self.assertEqual([t.titulo for t in self.controller.get_tasks()], ["De Ana"])
+        self.assertFalse(self.controller.resume_session("token-inventado"))
+        self.assertIsNone(self.controller.current_user)
+
+    def test_token_survives_cache_eviction_and_restart(self):
+        """
+        Un token que ya no está en memoria se recupera de la tabla `sesiones`.
+        """
+        ana = self._login("ana@example.com")
+        self._login("beto@example.com")
+        self._login("beto@example.com")
+        self._login("beto@example.com")  # max_cached=2: la sesión de Ana sale de la caché
+        misses = self.sessions.misses
+        self.assertEqual(self.sessions.resolve(self.repository, ana).email, "ana@example.com")
+        self.assertEqual(self.sessions.misses, misses + 1)
+        self.assertEqual(self.sessions.resolve(self.repository, ana).email, "ana@example.com")
+        self.assertEqual(self.sessions.misses, misses + 1)
+
+        # Otro proceso (otro SessionManager) acepta el mismo token
+        restarted = SessionManager(ttl=3600)
+        self.assertEqual(restarted.resolve(self.repository, ana).email, "ana@example.com")
+
+    def test_expired_sessions_are_rejected_and_swept(self):
+        """
+        Las sesiones vencidas no se resuelven y sweep las elimina de memoria y de la tabla.
+        """
+        ana = self._login("ana@example.com")
+        self._login("beto@example.com")
+        later = datetime.utcnow() + timedelta(hours=2)
+        self.assertIsNone(self.sessions.resolve(self.repository, ana, now=later))
+        self.assertEqual(self.sessions.sweep(self.repository, now=later), 2)
+        self.assertEqual(self._stored_sessions(), 0)
+        self.assertIsNone(self.sessions.resolve(self.repository, ana))
+
+    def test_logout_and_delete_user_invalidate_tokens(self):
+        """
+        Cerrar sesión invalida el token; eliminar el usuario borra todas sus sesiones.
+        """
+        first = self._login("ana@example.com")
+        self.controller.logout()
+        self.assertIsNone(self.sessions.resolve(self.repository, first))
+
+        second = self._login("ana@example.com")
+        user_id = self.controller.get_current_user_id()
+        self.assertTrue(self.repository.delete_user(user_id))
+        self.sessions.forget_user(user_id)
+        self.assertIsNone(self.sessions.resolve(self.repository, second))
+        self.assertEqual(self._stored_sessions(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Prueba unitaria para verificar las unidades de trabajo del repositorio:
+una sesión por operación o por bloque, uso desde varios hilos y métricas
+del pool de conexiones.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.db import MeteredQueuePool, create_db_engine, pool_metrics
+from src.database.repository import Repository
+from src.models.models import Base
+
+
+class TestUnitOfWork(unittest.TestCase):
+    """
+    Prueba Repository con sesiones por operación sobre una base de datos en archivo.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite temporal con pool de conexiones.
+        """
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_db_engine("sqlite:///" + os.path.join(self.tmpdir, "uow.db"),
+                                       profile="fast", pool_size=2, max_overflow=2)
+        Base.metadata.create_all(self.engine)
+        self.repository = Repository(sessionmaker(bind=self.engine, expire_on_commit=False))
+        self.user = self.repository.create_user("ana", "ana@example.com", "x")
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _create_task(self, repository, title):
+        return repository.create_task(title, "", datetime(2025, 1, 1), datetime(2025, 1, 2),
+                                      "todo", "normal", "normal", self.user.idUsuario)
+
+    def test_each_operation_releases_its_connection(self):
+        """
+        Tras cada operación no queda ninguna conexión tomada del pool.
+        """
+        self.assertIsInstance(self.engine.pool, MeteredQueuePool)
+        task = self._create_task(self.repository, "Primera")
+        self.assertEqual(self.repository.get_task_by_id(task.idTarea).titulo, "Primera")
+        metrics = pool_metrics(self.engine)
+        self.assertEqual(metrics["checked_out"], 0)
+        self.assertGreaterEqual(metrics["checkouts"], 3)
+        self.assertEqual(metrics["timeouts"], 0)
+
+    def test_reads_see_commits_from_other_repositories(self):
+        """
+        Una lectura posterior no devuelve el objeto viejo del identity map.
+        """
+        task = self._create_task(self.repository, "Original")
+        self.assertEqual(self.repository.get_task_by_id(task.idTarea).titulo, "Original")
+        other = Repository(self.repository.session_factory)
+        self.assertTrue(other.update_task(task.idTarea, self.user.idUsuario, titulo="Cambiada"))
+        self.assertEqual(self.repository.get_task_by_id(task.idTarea).titulo, "Cambiada")
+
+    def test_unit_of_work_shares_one_session(self):
+        """
+        Las operaciones dentro de unit_of_work usan la misma sesión y una sola conexión.
+        """
+        with self.repository.unit_of_work() as session:
+            task = self._create_task(self.repository, "En bloque")
+            self.assertIs(self.repository.db, session)
+            self.assertIs(self.repository.get_task_by_id(task.idTarea), task)
+            with self.repository.unit_of_work() as nested:
+                self.assertIs(nested, session)
+        self.assertEqual(pool_metrics(self.engine)["checked_out"], 0)
+
+    def test_repository_is_safe_to_share_across_threads(self):
+        """
+        Varios hilos comparten un Repository sin compartir sesión.
+        """
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(10):
+                    self.assertIsNotNone(self._create_task(self.repository, f"{n}-{i}"))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.repository.get_tasks_by_user(self.user.idUsuario)), 40)
+        self.assertEqual(pool_metrics(self.engine)["checked_out"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
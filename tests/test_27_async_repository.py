@@ -0,0 +1,122 @@
+"""
+Prueba unitaria para verificar AsyncRepository y AsyncTaskController sobre
+SQLite con aiosqlite: CRUD, sesiones por token y tareas concurrentes.
+"""
+
+import sys
+import os
+import asyncio
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.async_task_controller import AsyncTaskController
+from src.controllers.passwords import PasswordHasher
+from src.controllers.session import SessionManager
+from src.database.async_repository import AsyncRepository, create_async_db_engine, to_async_url
+from src.models.models import Base
+
+
+class TestAsyncRepository(unittest.IsolatedAsyncioTestCase):
+    """
+    Prueba la capa asíncrona con una base de datos temporal en archivo.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Crea el esquema y un controlador asíncrono con un hasher barato.
+        """
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_async_db_engine("sqlite:///" + os.path.join(self.tmpdir, "async.db"), profile="fast")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.repository = AsyncRepository(async_sessionmaker(self.engine, expire_on_commit=False))
+        self.passwords = PasswordHasher({"algorithm": "scrypt", "n": 2 ** 10, "r": 8, "p": 1})
+        self.sessions = SessionManager()
+        self.controller = self._controller()
+        await self.controller.register_user("ana", "ana@example.com", "password123")
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _controller(self):
+        return AsyncTaskController(self.repository, passwords=self.passwords, sessions=self.sessions)
+
+    def test_async_url(self):
+        """
+        Las URL de SQLite pasan al driver aiosqlite.
+        """
+        self.assertEqual(to_async_url("sqlite:///todo_app.db"), "sqlite+aiosqlite:///todo_app.db")
+        self.assertEqual(to_async_url("postgresql+asyncpg://u@h/db"), "postgresql+asyncpg://u@h/db")
+
+    async def test_task_crud_through_controller(self):
+        """
+        Crear, leer, completar y eliminar una tarea con el controlador asíncrono.
+        """
+        success, _, _ = await self.controller.login("ana@example.com", "password123")
+        self.assertTrue(success)
+        success, _, tarea = await self.controller.create_task_returning(
+            "Asíncrona", "", datetime(2025, 1, 1), datetime(2025, 1, 2), "high")
+        self.assertTrue(success)
+        self.assertEqual([t.titulo for t in await self.controller.get_tasks()], ["Asíncrona"])
+
+        self.assertEqual(await self.controller.complete_task(tarea.idTarea), (True, "Tarea completada exitosamente"))
+        stored = await self.controller.get_task_by_id(tarea.idTarea)
+        self.assertEqual(stored.estado, "completed")
+        self.assertIsNotNone(stored.fechaCompletado)
+        self.assertEqual(await self.controller.get_tasks(filter_completed=True), [])
+
+        success, _ = await self.controller.delete_task(tarea.idTarea)
+        self.assertTrue(success)
+        self.assertEqual(await self.controller.get_tasks(), [])
+
+    async def test_tokens_and_events(self):
+        """
+        Un controlador nuevo retoma la sesión por token; los eventos se guardan por usuario.
+        """
+        await self.controller.login("ana@example.com", "password123")
+        token = self.controller.session.token
+        other = self._controller()
+        self.assertTrue(await other.resume_session(token))
+        success, _ = await other.create_event("Reunión", "", "2025-01-10", "09:00", "high")
+        self.assertTrue(success)
+        events = await other.get_user_events()
+        self.assertEqual([e.titulo for e in events], ["Reunión"])
+
+        await other.logout()
+        self.assertFalse(await self._controller().resume_session(token))
+
+    async def test_concurrent_requests_use_separate_sessions(self):
+        """
+        Peticiones concurrentes sobre el mismo repositorio no comparten sesión.
+        """
+        await self.controller.login("ana@example.com", "password123")
+        token = self.controller.session.token
+
+        async def request(i):
+            controller = self._controller()
+            await controller.resume_session(token)
+            success, _ = await controller.create_task(f"Tarea {i}", "", datetime(2025, 1, 1), datetime(2025, 1, 2), "normal")
+            return success
+
+        results = await asyncio.gather(*(request(i) for i in range(20)))
+        self.assertTrue(all(results))
+        user_id = await self.controller.get_current_user_id()
+        self.assertEqual(await self.repository.count_tasks(user_id), 20)
+        page = await self.repository.query_tasks(user_id, orden='name', limite=5)
+        self.assertEqual(len(page), 5)
+
+        async with self.repository.unit_of_work() as session:
+            self.assertIs(self.repository.db, session)
+        with self.assertRaises(RuntimeError):
+            self.repository.db
+
+
+if __name__ == '__main__':
+    unittest.main()
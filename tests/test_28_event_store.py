@@ -0,0 +1,125 @@
+"""
+Prueba unitaria para verificar el almacenamiento de eventos con columnas
+DATE/TIME, la consulta por rango de fechas y la migración de los eventos
+guardados como texto.
+"""
+
+import sys
+import os
+import unittest
+from datetime import date, time
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.migrations import run_migrations
+from src.models.models import Base, Event
+from src.views.ui import Api
+
+
+class TestEventStore(unittest.TestCase):
+    """
+    Prueba los eventos del repositorio y las acciones de calendario del Api.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con un usuario autenticado.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        self.user_id = self.controller.get_current_user_id()
+
+    def test_events_in_range_only_visible_month(self):
+        """
+        get_events_in_range devuelve solo los días pedidos, ordenados y del usuario actual.
+        """
+        for title, day, hour in (("Cierre", "2025-01-31", "18:00"), ("Reunión", "2025-02-10", "09:30"),
+                                 ("Feriado", "2025-02-10", ""), ("Entrega", "2025-02-28", "23:59"),
+                                 ("Marzo", "2025-03-01", "08:00")):
+            response = self.api.add_item('create_event', {"title": title, "description": "", "date": day,
+                                                          "time": hour, "priority": "normal"})
+            self.assertTrue(response["success"])
+        other = self.repository.create_user("beto", "beto@example.com", "x")
+        self.repository.save_event(Event(titulo="Ajeno", fecha=date(2025, 2, 10), idUsuario=other.idUsuario))
+
+        response = self.api.get_item('get_events_in_range', {"start": "2025-02-01", "end": "2025-02-28"})
+        self.assertTrue(response["success"])
+        self.assertEqual([(e["title"], e["date"], e["time"]) for e in response["events"]], [
+            ("Feriado", "2025-02-10", None),
+            ("Reunión", "2025-02-10", "09:30"),
+            ("Entrega", "2025-02-28", "23:59"),
+        ])
+        stored = self.repository.get_events_in_range(self.user_id, date(2025, 2, 10), date(2025, 2, 10))
+        self.assertEqual(stored[1].hora, time(9, 30))
+
+        # Rango invertido o fecha inválida: lista vacía
+        self.assertEqual(self.api.get_item('get_events_in_range', {"start": "2025-03-01", "end": "2025-02-01"})["events"], [])
+        self.assertEqual(self.api.get_item('get_events_in_range', {"start": "ayer", "end": "2025-02-01"})["events"], [])
+
+    def test_create_rejects_invalid_date_and_delete_is_per_user(self):
+        """
+        Una fecha inválida no crea el evento y solo el dueño puede eliminarlo.
+        """
+        response = self.api.add_item('create_event', {"title": "X", "date": "2025-02-30", "time": "10:00"})
+        self.assertFalse(response["success"])
+        self.assertEqual(self.repository.get_user_events(self.user_id), [])
+
+        created = self.api.add_item('create_event', {"title": "Demo", "date": "2025-05-05", "time": "10:00",
+                                                     "priority": "high"})
+        event_id = created["event"]["id"]
+        other = self.repository.create_user("beto", "beto@example.com", "x")
+        self.assertFalse(self.repository.delete_event(event_id, other.idUsuario))
+        response = self.api.remove_item('delete_event', {"event_id": event_id})
+        self.assertTrue(response["success"])
+        self.assertEqual(self.repository.get_user_events(self.user_id), [])
+
+    def test_migration_converts_text_columns(self):
+        """
+        La migración 6 reconstruye eventos con DATE/TIME y conserva datos, índice y búsqueda.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE usuarios (idUsuario INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, "
+                              "email TEXT, contraseña TEXT, modoOscuro BOOLEAN)"))
+            conn.execute(text("CREATE TABLE tareas (idTarea INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, "
+                              "descripcion TEXT, fechaCreacion TIMESTAMP, fechaVencimiento TIMESTAMP, estado TEXT, "
+                              "prioridad TEXT, tipo TEXT, idUsuario INTEGER, idGrupo INTEGER, idTipoTarea INTEGER)"))
+            conn.execute(text("CREATE TABLE eventos (idEvento INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, "
+                              "descripcion TEXT, fecha TEXT, hora TEXT, prioridad TEXT, idUsuario INTEGER)"))
+            conn.execute(text("INSERT INTO eventos (titulo, fecha, hora, idUsuario) VALUES "
+                              "('Kickoff', '2024-12-15', '14:00', 1), ('Sin hora', '2024-12-16', NULL, 1), "
+                              "('Roto', 'mañana', 'tarde', 1)"))
+        run_migrations(engine)
+
+        columns = {c["name"]: str(c["type"]) for c in inspect(engine).get_columns("eventos")}
+        self.assertEqual((columns["fecha"], columns["hora"]), ("DATE", "TIME"))
+        self.assertIn("ix_eventos_usuario_fecha", {i["name"] for i in inspect(engine).get_indexes("eventos")})
+        session = sessionmaker(bind=engine)()
+        events = {e.titulo: (e.fecha, e.hora) for e in session.query(Event).all()}
+        self.assertEqual(events, {
+            "Kickoff": (date(2024, 12, 15), time(14, 0)),
+            "Sin hora": (date(2024, 12, 16), None),
+            "Roto": (None, None),
+        })
+        # Los triggers FTS se recrearon sobre la nueva tabla
+        session.add(Event(titulo="Planificación anual", fecha=date(2025, 1, 1), idUsuario=1))
+        session.commit()
+        with engine.connect() as conn:
+            hits = conn.execute(text("SELECT COUNT(*) FROM eventos_fts WHERE eventos_fts MATCH 'planificacion'")).scalar()
+        self.assertEqual(hits, 1)
+        session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
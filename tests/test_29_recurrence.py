@@ -0,0 +1,217 @@
+"""
+Prueba unitaria para verificar las reglas de recurrencia, la expansión de
+ocurrencias por rango, sus excepciones (cancelar, mover, editar) y la
+migración que agrega las columnas de recurrencia.
+"""
+
+import sys
+import os
+import unittest
+from datetime import date, datetime
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.recurrence import RecurrenceRule, parse_rule
+from src.database.migrations import run_migrations
+from src.models.models import Base
+from src.views.ui import Api
+
+
+class TestRecurrence(unittest.TestCase):
+    """
+    Prueba el motor de recurrencia y las acciones del Api que lo usan.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con un usuario autenticado.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+
+    def events(self, start, end):
+        response = self.api.get_item('get_events_in_range', {"start": start, "end": end})
+        self.assertTrue(response["success"])
+        return [(e["title"], e["date"], e["occurrence"]) for e in response["events"]]
+
+    def test_rule_parsing_and_expansion(self):
+        """
+        Las reglas se normalizan y generan las fechas esperadas.
+        """
+        rule = RecurrenceRule.parse("RRULE:freq=weekly;byday=fr,mo;interval=2;count=5")
+        self.assertEqual(str(rule), "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR;COUNT=5")
+        self.assertIsNone(parse_rule(""))
+        for invalid in ("FREQ=HOURLY", "FREQ=DAILY;INTERVAL=0", "FREQ=MONTHLY;BYDAY=MO", "FREQ=DAILY;BYSETPOS=1"):
+            with self.assertRaises(ValueError):
+                RecurrenceRule.parse(invalid)
+
+        # Lunes 6 de enero de 2025, cada dos semanas lunes y viernes, 5 veces
+        anchor = date(2025, 1, 6)
+        self.assertEqual(rule.occurrences(anchor, date(2025, 1, 1), date(2025, 12, 31)), [
+            date(2025, 1, 6), date(2025, 1, 10), date(2025, 1, 20), date(2025, 1, 24), date(2025, 2, 3)])
+        self.assertEqual(rule.last_date(anchor), date(2025, 2, 3))
+
+        # El día 31 se omite en los meses que no lo tienen
+        monthly = RecurrenceRule.parse("FREQ=MONTHLY;UNTIL=20250731")
+        self.assertEqual(monthly.occurrences(date(2025, 1, 31), date(2025, 1, 1), date(2025, 12, 31)),
+                         [date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31), date(2025, 7, 31)])
+
+        # Sin COUNT, una ventana lejana no recorre toda la serie
+        daily = RecurrenceRule.parse("FREQ=DAILY;INTERVAL=3")
+        self.assertEqual(daily.occurrences(date(2000, 1, 1), date(2099, 1, 1), date(2099, 1, 6)),
+                         [date(2099, 1, 3), date(2099, 1, 6)])
+        self.assertTrue(daily.includes(date(2000, 1, 1), date(2000, 1, 7)))
+        self.assertFalse(daily.includes(date(2000, 1, 1), date(2000, 1, 8)))
+
+    def test_event_series_with_exceptions(self):
+        """
+        Una serie semanal se expande por rango y respeta ocurrencias canceladas, movidas y editadas.
+        """
+        created = self.api.add_item('create_event', {"title": "Standup", "description": "", "date": "2025-03-03",
+                                                     "time": "09:00", "priority": "normal",
+                                                     "recurrence": "FREQ=WEEKLY"})
+        self.assertTrue(created["success"])
+        self.assertEqual(created["event"]["recurrence"], "FREQ=WEEKLY")
+        event_id = created["event"]["id"]
+        self.api.add_item('create_event', {"title": "Único", "date": "2025-03-12", "time": "", "priority": "low"})
+        self.assertFalse(self.api.add_item('create_event', {"title": "X", "date": "2025-03-01",
+                                                            "recurrence": "FREQ=SOMETIMES"})["success"])
+
+        self.assertEqual(self.events("2025-03-01", "2025-03-31"), [
+            ("Standup", "2025-03-03", "2025-03-03"),
+            ("Standup", "2025-03-10", "2025-03-10"),
+            ("Único", "2025-03-12", None),
+            ("Standup", "2025-03-17", "2025-03-17"),
+            ("Standup", "2025-03-24", "2025-03-24"),
+            ("Standup", "2025-03-31", "2025-03-31"),
+        ])
+
+        # Cancelar una, mover otra al mes siguiente y renombrar una tercera
+        self.assertTrue(self.api.remove_item('delete_occurrence', {"kind": "event", "id": event_id,
+                                                                   "occurrence": "2025-03-10"})["success"])
+        self.assertTrue(self.api.update_item('edit_occurrence', {"kind": "event", "id": event_id,
+                                                                 "occurrence": "2025-03-31",
+                                                                 "date": "2025-04-02"})["success"])
+        self.assertTrue(self.api.update_item('edit_occurrence', {"kind": "event", "id": event_id,
+                                                                 "occurrence": "2025-03-17",
+                                                                 "title": "Retro"})["success"])
+        self.assertFalse(self.api.update_item('edit_occurrence', {"kind": "event", "id": event_id,
+                                                                  "occurrence": "2025-03-18"})["success"])
+
+        self.assertEqual([e[:2] for e in self.events("2025-03-01", "2025-03-31")], [
+            ("Standup", "2025-03-03"), ("Único", "2025-03-12"), ("Retro", "2025-03-17"), ("Standup", "2025-03-24")])
+        self.assertEqual(self.events("2025-04-01", "2025-04-07"), [
+            ("Standup", "2025-04-02", "2025-03-31"), ("Standup", "2025-04-07", "2025-04-07")])
+
+        # Eliminar la serie borra también sus excepciones
+        self.assertTrue(self.api.remove_item('delete_event', {"event_id": event_id})["success"])
+        self.assertEqual(self.events("2025-03-01", "2025-04-30"), [("Único", "2025-03-12", None)])
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM excepciones_recurrencia")).scalar(), 0)
+
+    def test_cache_hits_and_invalidation(self):
+        """
+        La misma ventana se sirve de la caché y cambiar la regla la invalida.
+        """
+        event_id = self.api.add_item('create_event', {"title": "Gym", "date": "2025-06-02", "time": "07:00",
+                                                      "priority": "normal", "recurrence": "FREQ=DAILY"})["event"]["id"]
+        cache = self.controller.occurrences
+        self.assertEqual(len(self.events("2025-06-01", "2025-06-30")), 29)
+        self.assertEqual(len(self.events("2025-06-01", "2025-06-30")), 29)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        response = self.api.update_item('update_recurrence', {"kind": "event", "id": event_id,
+                                                              "recurrence": "FREQ=DAILY;COUNT=3"})
+        self.assertTrue(response["success"])
+        self.assertEqual(cache.size, 0)
+        self.assertEqual([e[1] for e in self.events("2025-06-01", "2025-06-30")],
+                         ["2025-06-02", "2025-06-03", "2025-06-04"])
+        self.assertEqual(self.repository.get_user_event(event_id, self.controller.get_current_user_id()).finRecurrencia,
+                         date(2025, 6, 4))
+
+        # Sin regla vuelve a ser un evento simple
+        self.api.update_item('update_recurrence', {"kind": "event", "id": event_id, "recurrence": ""})
+        self.assertEqual(self.events("2025-06-01", "2025-06-30"), [("Gym", "2025-06-02", None)])
+        self.assertIn("recurrence_cache", self.api.get_item('get_metrics', {})["metrics"])
+
+    def test_task_occurrences(self):
+        """
+        Las tareas recurrentes se expanden por vencimiento y cada ocurrencia se completa por separado.
+        """
+        ok, _, task = self.controller.create_task_returning(
+            "Reporte", "", datetime(2025, 1, 30, 9, 0), datetime(2025, 1, 31, 17, 0), "high",
+            recurrence="FREQ=MONTHLY;COUNT=4")
+        self.assertTrue(ok)
+        self.controller.create_task_returning("Suelta", "", datetime(2025, 3, 1), datetime(2025, 3, 10, 12, 0), "low")
+
+        response = self.api.get_item('get_task_occurrences', {"start": "2025-01-01", "end": "2025-12-31"})
+        self.assertTrue(response["success"])
+        # COUNT=4 desde el 31 de enero: febrero, abril y junio no tienen día 31
+        self.assertEqual([(t["name"], t["occurrence"]) for t in response["tasks"]], [
+            ("Reporte", "2025-01-31"), ("Suelta", None), ("Reporte", "2025-03-31"),
+            ("Reporte", "2025-05-31"), ("Reporte", "2025-07-31")])
+
+        self.assertTrue(self.api.update_item('edit_occurrence', {"kind": "task", "id": task.idTarea,
+                                                                 "occurrence": "2025-03-31",
+                                                                 "status": "completed"})["success"])
+        tasks = self.controller.get_task_occurrences("2025-03-01", "2025-03-31")
+        self.assertEqual([(t.titulo, t.estado) for t in tasks], [("Suelta", "todo"), ("Reporte", "completed")])
+        self.assertEqual(tasks[1].fechaVencimiento, datetime(2025, 3, 31, 17, 0))
+        self.assertEqual(tasks[1].fechaCreacion, datetime(2025, 3, 30, 9, 0))
+        self.assertIsNotNone(tasks[1].fechaCompletado)
+
+    def test_recurring_task_is_a_single_insert(self):
+        """
+        La regla y su fin se guardan en el mismo INSERT, sin un UPDATE ni un commit aparte.
+        """
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        ok, _, task = self.controller.create_task_returning(
+            "Reporte", "", datetime(2025, 1, 30, 9, 0), datetime(2025, 1, 31, 17, 0), "high",
+            recurrence="FREQ=MONTHLY;COUNT=4")
+        event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertTrue(ok)
+        self.assertEqual((task.reglaRecurrencia, task.finRecurrencia), ("FREQ=MONTHLY;COUNT=4", date(2025, 7, 31)))
+        self.assertEqual(statements.count("INSERT"), 1)
+        self.assertNotIn("UPDATE", statements)
+
+    def test_migration_adds_recurrence_columns(self):
+        """
+        La migración 7 agrega las columnas, la tabla de excepciones y los índices parciales.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE usuarios (idUsuario INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, "
+                              "email TEXT, contraseña TEXT, modoOscuro BOOLEAN)"))
+            conn.execute(text("CREATE TABLE tareas (idTarea INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, "
+                              "descripcion TEXT, fechaCreacion TIMESTAMP, fechaVencimiento TIMESTAMP, estado TEXT, "
+                              "prioridad TEXT, tipo TEXT, idUsuario INTEGER, idGrupo INTEGER, idTipoTarea INTEGER)"))
+            conn.execute(text("CREATE TABLE eventos (idEvento INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, "
+                              "descripcion TEXT, fecha TEXT, hora TEXT, prioridad TEXT, idUsuario INTEGER)"))
+        run_migrations(engine)
+
+        inspector = inspect(engine)
+        for table in ("tareas", "tareas_archivo", "eventos"):
+            columns = {c["name"] for c in inspector.get_columns(table)}
+            self.assertTrue({"reglaRecurrencia", "finRecurrencia"} <= columns, table)
+        self.assertIn("excepciones_recurrencia", inspector.get_table_names())
+        self.assertIn("ix_eventos_recurrentes", {i["name"] for i in inspector.get_indexes("eventos")})
+        self.assertIn("ix_tareas_recurrentes", {i["name"] for i in inspector.get_indexes("tareas")})
+        # Aplicarla de nuevo no hace nada
+        run_migrations(engine)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Prueba unitaria para verificar los contadores de tareas por usuario
+mantenidos por triggers, la acción get_stats y la comprobación y
+reconstrucción de la tabla de estadísticas.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.migrations import run_migrations
+from src.database.stats import check_task_stats, ensure_task_stats, has_task_stats, rebuild_task_stats
+from src.models.models import Base
+from src.views.ui import Api
+
+
+class TestTaskStats(unittest.TestCase):
+    """
+    Prueba la tabla estadisticas_tareas y su lectura desde el Api.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con los triggers de estadísticas y un usuario autenticado.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            ensure_task_stats(conn)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        self.user_id = self.controller.get_current_user_id()
+
+    def create(self, name, due, priority="normal", status="todo"):
+        ok, _, task = self.controller.create_task_returning(name, "", due - timedelta(days=1), due, priority, status)
+        self.assertTrue(ok)
+        return task.idTarea
+
+    def stats(self):
+        response = self.api.get_item('get_stats', {})
+        self.assertTrue(response["success"])
+        return response["stats"]
+
+    def test_counters_follow_every_write(self):
+        """
+        Crear, editar, completar, eliminar y las operaciones masivas actualizan los contadores.
+        """
+        future = datetime.now() + timedelta(days=3)
+        first = self.create("A", future, "high")
+        second = self.create("B", future, "low", "pending")
+        self.create("C", datetime.now() - timedelta(days=2))
+        self.assertEqual(self.stats(), {
+            "total": 3, "by_status": {"new": 2, "progress": 1, "completed": 0},
+            "by_priority": {"high": 1, "low": 1, "normal": 1}, "overdue": 1,
+        })
+
+        self.controller.update_task(first, "A", "", future, future, "normal", "pending")
+        self.controller.complete_task(second)
+        stats = self.stats()
+        self.assertEqual(stats["by_status"], {"new": 1, "progress": 1, "completed": 1})
+        self.assertEqual(stats["by_priority"], {"low": 1, "normal": 2})
+
+        self.controller.delete_task(first)
+        ids = self.repository.bulk_create_tasks(self.user_id, [
+            {"titulo": f"T{i}", "fechaVencimiento": future, "estado": "todo", "prioridad": "high"} for i in range(4)])
+        self.repository.bulk_update_tasks(self.user_id, [{"idTarea": ids[0], "estado": "completed"}])
+        self.repository.bulk_delete_tasks(ids[1:3], self.user_id)
+        stats = self.stats()
+        self.assertEqual((stats["total"], stats["by_status"]), (4, {"new": 2, "progress": 0, "completed": 2}))
+        self.assertEqual(check_task_stats(self.engine), [])
+
+        # Un usuario sin tareas no deja filas en la tabla
+        other = self.repository.create_user("beto", "beto@example.com", "x")
+        self.repository.create_task("X", "", future, future, "todo", "normal", "General", other.idUsuario)
+        self.repository.delete_user(other.idUsuario)
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text(
+                'SELECT COUNT(*) FROM estadisticas_tareas WHERE "idUsuario" = :u'), {"u": other.idUsuario}).scalar(), 0)
+
+    def test_overdue_matches_full_scan(self):
+        """
+        Las vencidas se cuentan por día y, para hoy, hasta la hora de referencia.
+        """
+        now = datetime(2025, 5, 20, 12, 0)
+        self.create("Ayer", now - timedelta(days=1))
+        self.create("Ayer hecha", now - timedelta(days=1), status="completed")
+        self.create("Hoy temprano", now - timedelta(hours=3))
+        self.create("Hoy tarde", now + timedelta(hours=3))
+        self.create("Mes pasado", now - timedelta(days=40), status="pending")
+        stats = self.repository.get_task_stats(self.user_id, now=now)
+        self.assertEqual(stats["vencidas"], 3)
+
+        # Sin la tabla de contadores el resultado es el mismo, calculado con GROUP BY
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP TABLE estadisticas_tareas"))
+        self.assertEqual(self.repository.get_task_stats(self.user_id, now=now), stats)
+
+    def test_other_dialects_skip_sqlite_master(self):
+        """
+        Fuera de SQLite no se consulta sqlite_master y los contadores se calculan con GROUP BY.
+        """
+        now = datetime(2025, 5, 20, 12, 0)
+        self.create("Ayer", now - timedelta(days=1))
+        stats = self.repository.get_task_stats(self.user_id, now=now)
+        self.assertTrue(has_task_stats(self.repository.db))
+
+        with mock.patch.object(self.engine.dialect, "name", "postgresql"):
+            self.assertFalse(has_task_stats(self.repository.db))
+            with self.engine.connect() as conn:
+                self.assertFalse(has_task_stats(conn))
+            self.assertEqual(self.repository.get_task_stats(self.user_id, now=now), stats)
+
+    def test_migration_populates_and_rebuild_repairs(self):
+        """
+        La migración 8 cuenta las tareas existentes; la comprobación detecta diferencias y la reconstrucción las corrige.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO usuarios (nombre, email, \"contraseña\") VALUES ('u', 'u@example.com', 'x')"))
+            conn.execute(text(
+                'INSERT INTO tareas (titulo, "fechaVencimiento", estado, prioridad, "idUsuario") VALUES '
+                "('a', '2020-01-01 10:00:00.000000', 'todo', 'high', 1), "
+                "('b', '2020-01-01 18:00:00.000000', 'completed', 'high', 1), "
+                "('c', '2999-01-01 00:00:00.000000', 'pending', 'low', 1)"
+            ))
+        run_migrations(engine)
+        with engine.connect() as conn:
+            rows = dict(conn.execute(text("SELECT clave, valor FROM estadisticas_tareas")).all())
+        self.assertEqual(rows, {"total": 3, "estado:todo": 1, "estado:completed": 1, "estado:pending": 1,
+                                "prioridad:high": 2, "prioridad:low": 1,
+                                "vence:2020-01-01": 1, "vence:2999-01-01": 1})
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE estadisticas_tareas SET valor = 7 WHERE clave = 'total'"))
+            conn.execute(text("DELETE FROM estadisticas_tareas WHERE clave = 'prioridad:low'"))
+        self.assertEqual(check_task_stats(engine), [(1, "prioridad:low", 0, 1), (1, "total", 7, 3)])
+        self.assertTrue(rebuild_task_stats(engine))
+        self.assertEqual(check_task_stats(engine), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Prueba unitaria para verificar la serialización de tareas por esquema
+estático: listas leídas como tuplas desde SQL, formato columnar, tareas
+sueltas del ORM y JSON compacto.
+"""
+
+import sys
+import os
+import json
+import unittest
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.recurrence import task_occurrence
+from src.models.models import Base
+from src.views.serializers import (
+    TASK_FIELDS, compact_dumps, serialize_task, serialize_task_columns, view_status
+)
+from src.views.ui import Api
+
+
+class TestSerializers(unittest.TestCase):
+    """
+    Prueba el serializador de tareas y su uso desde las acciones del Api.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con un usuario autenticado y tres tareas.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.repository = self.controller.repository
+        self.repository.db = SessionLocal()
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+
+        self.ids = []
+        for i, status in enumerate(("todo", "pending", "completed")):
+            ok, _, task = self.controller.create_task_returning(
+                f"Tarea {i}", f"Descripción {i}", datetime(2025, 4, 1, 9, 0), datetime(2025, 4, 10 - i, 18, 30),
+                "high", status, recurrence="FREQ=WEEKLY" if i == 0 else None)
+            self.assertTrue(ok)
+            self.ids.append(task.idTarea)
+
+    def test_rows_match_orm_serialization(self):
+        """
+        La lista leída como tuplas produce lo mismo que serializar cada objeto Tarea.
+        """
+        response = self.api.get_item('get_tasks', {})
+        self.assertTrue(response["success"])
+        self.assertEqual(response["format"], "rows")
+        self.assertEqual([t["id"] for t in response["tasks"]], self.ids)
+        self.assertEqual(response["tasks"], [serialize_task(t) for t in self.controller.get_tasks_by_ids(self.ids)])
+        self.assertEqual(response["tasks"][0], {
+            "id": self.ids[0], "name": "Tarea 0", "description": "Descripción 0", "priority": "high",
+            "status": "new", "start_date": "2025-04-01T09:00:00", "end_date": "2025-04-10T18:30:00",
+            "created_at": "2025-04-01T09:00:00", "completed_at": None, "recurrence": "FREQ=WEEKLY",
+            "occurrence": None,
+        })
+        self.assertEqual([t["status"] for t in response["tasks"]], ["new", "progress", "completed"])
+        self.assertIsNotNone(response["tasks"][2]["completed_at"])
+
+    def test_columnar_format(self):
+        """
+        El formato columnar trae un arreglo por campo con las mismas tareas que el formato por filas.
+        """
+        rows = self.api.get_item('get_tasks', {})["tasks"]
+        response = self.api.get_item('get_tasks', {"format": "columnar"})
+        self.assertEqual(response["format"], "columnar")
+        columns = response["tasks"]
+        self.assertEqual(tuple(columns), TASK_FIELDS)
+        self.assertEqual([dict(zip(TASK_FIELDS, values)) for values in zip(*columns.values())], rows)
+        self.assertEqual(serialize_task_columns([]), {field: [] for field in TASK_FIELDS})
+
+        # También en las páginas, y el cursor sigue funcionando con tuplas
+        first = self.api.get_item('get_tasks', {"sort": "end_date", "limit": 2, "format": "columnar"})
+        self.assertEqual(first["tasks"]["id"], [self.ids[2], self.ids[1]])
+        second = self.api.get_item('get_tasks', {"sort": "end_date", "limit": 2, "cursor": first["next_cursor"]})
+        self.assertEqual(([t["id"] for t in second["tasks"]], second["format"]), ([self.ids[0]], "rows"))
+
+    def test_single_tasks_and_occurrences(self):
+        """
+        Las tareas sueltas y las ocurrencias transitorias usan el mismo esquema.
+        """
+        task = self.controller.get_task_by_id(self.ids[0])
+        occurrence = serialize_task(task_occurrence(task, date(2025, 4, 17)))
+        self.assertEqual((occurrence["id"], occurrence["end_date"], occurrence["occurrence"]),
+                         (self.ids[0], "2025-04-17T18:30:00", "2025-04-17"))
+        self.assertEqual(self.api.get_item('get_task', {"task_id": self.ids[0]})["task"], serialize_task(task))
+
+        self.assertEqual([view_status(s) for s in ("todo", "TODO", "complete", "Blocked", None)],
+                         ["new", "new", "completed", "blocked", "none"])
+        self.assertEqual(compact_dumps({"a": [1, "ñ"]}), '{"a":[1,"ñ"]}')
+        self.assertEqual(json.loads(compact_dumps(self.api.get_item('get_tasks', {}))), self.api.get_item('get_tasks', {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Prueba unitaria para verificar el arranque por fases: inicialización en
+segundo plano, marca de base de datos inicializada, espera de las acciones
+del Api y medición de fases.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine, text
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.startup import StartupProfile, start_initialization
+from src.controllers.task_controller import TaskController
+from src.database.migrations import is_initialized, latest_version
+from src.database.repository import Repository
+from src.views.ui import Api
+
+
+class TestStartup(unittest.TestCase):
+    """
+    Prueba StartupInit, la marca de inicializada y StartupProfile.
+    """
+
+    def setUp(self):
+        """
+        Crea un motor sobre una base de datos SQLite vacía en un directorio temporal.
+        """
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_engine("sqlite:///" + os.path.join(self.tmpdir, "startup.db"))
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def emails(self):
+        with self.engine.connect() as conn:
+            return sorted(row[0] for row in conn.execute(text("SELECT email FROM usuarios")))
+
+    def test_background_init_and_marker(self):
+        """
+        La primera vez se crea el esquema y los datos demo en un hilo; con la marca se omite todo.
+        """
+        profile = StartupProfile()
+        ready = start_initialization(self.engine, profile=profile)
+        self.assertTrue(ready.wait(30))
+        self.assertEqual(self.emails(), ["admin@gmail.com", "user@example.com"])
+        self.assertTrue(is_initialized(self.engine))
+        phases = [name for name, _, _ in profile.entries]
+        self.assertIn("esquema y migraciones (hilo)", phases)
+        self.assertIn("datos demo (hilo)", phases)
+
+        # Con la marca presente no se vuelve a sembrar (el usuario borrado no reaparece)
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM tareas"))
+            conn.execute(text("DELETE FROM usuarios WHERE email = 'user@example.com'"))
+        with mock.patch("src.controllers.startup.StartupInit.start") as start:
+            ready = start_initialization(self.engine)
+        self.assertTrue(ready.is_set())
+        start.assert_not_called()
+
+        # Una migración nueva invalida la marca
+        with self.engine.begin() as conn:
+            conn.execute(text(f"PRAGMA user_version = {latest_version() - 1}"))
+        self.assertFalse(is_initialized(self.engine))
+        self.assertTrue(start_initialization(self.engine).wait(30))
+        self.assertEqual(self.emails(), ["admin@gmail.com", "user@example.com"])
+
+    def test_api_waits_until_ready(self):
+        """
+        Las acciones del Api esperan al evento y el controlador no siembra con seed=False.
+        """
+        with mock.patch.object(Repository, "seed_initial_users") as seed_users, \
+                mock.patch.object(Repository, "seed_initial_tasks") as seed_tasks:
+            controller = TaskController(seed=False)
+        seed_users.assert_not_called()
+        seed_tasks.assert_not_called()
+
+        ready = threading.Event()
+        api = Api(controller, ready=ready)
+        responses = []
+        caller = threading.Thread(target=lambda: responses.append(api.get_item('no_existe', {})))
+        caller.start()
+        caller.join(0.2)
+        self.assertTrue(caller.is_alive())
+        self.assertEqual(responses, [])
+        ready.set()
+        caller.join(5)
+        self.assertEqual(responses, [{"success": False, "message": "Acción desconocida"}])
+
+    def test_profile_report(self):
+        """
+        El informe lista fases y marcas en orden de inicio; deshabilitado no registra nada.
+        """
+        profile = StartupProfile()
+        with profile.phase("importar algo"):
+            pass
+        profile.mark("ventana visible")
+        lines = profile.report().splitlines()
+        self.assertEqual([line.split("  ")[0].strip() for line in lines[1:]], ["importar algo", "ventana visible"])
+        self.assertTrue(lines[2].rstrip().endswith("-"))
+
+        disabled = StartupProfile(enabled=False)
+        with disabled.phase("x"):
+            pass
+        self.assertEqual(disabled.entries, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
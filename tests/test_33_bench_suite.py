@@ -0,0 +1,58 @@
+"""
+Prueba unitaria para verificar la suite de benchmarks: generador de datos,
+resumen de latencias y comparación con la línea base.
+"""
+
+import sys
+import os
+import argparse
+import unittest
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_suite import OPERATIONS, compare, run_suite, summarize
+
+
+class TestBenchSuite(unittest.TestCase):
+    """
+    Prueba bench_suite con tamaños mínimos.
+    """
+
+    def test_summarize_percentiles(self):
+        """
+        p50 y p99 usan el rango más cercano; ops/s sale del tiempo total.
+        """
+        result = summarize([i / 1000 for i in range(1, 101)])
+        self.assertEqual((result["n"], result["p50_ms"], result["p99_ms"]), (100, 50.0, 99.0))
+        self.assertAlmostEqual(result["ops_per_sec"], 100 / 5.05, places=1)
+
+    def test_compare_flags_regressions(self):
+        """
+        Solo las métricas que empeoran más que el umbral cuentan como regresión.
+        """
+        baseline = {"results": {"memory": {"login": {"p50_ms": 10.0, "p99_ms": 20.0},
+                                           "delete": {"p50_ms": 1.0, "p99_ms": 2.0}}}}
+        current = {"results": {"memory": {"login": {"p50_ms": 12.0, "p99_ms": 40.0},
+                                          "delete": {"p50_ms": 0.5, "p99_ms": 1.0}}}}
+        regressions = compare(current, baseline, 0.3)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("memory/login p99_ms"))
+        self.assertEqual(compare(current, baseline, 1.5), [])
+        # Las operaciones que faltan en la ejecución actual no se comparan
+        self.assertEqual(compare({"results": {}}, baseline, 0.0), [])
+
+    def test_run_suite_in_memory(self):
+        """
+        Una ejecución mínima mide todas las operaciones y se compara sin regresiones consigo misma.
+        """
+        args = argparse.Namespace(users=2, tasks=5, events=2, repeat=3, backends=["memory"])
+        document = run_suite(args)
+        self.assertEqual(document["meta"]["params"], {"users": 2, "tasks": 5, "events": 2, "repeat": 3})
+        self.assertEqual(tuple(document["results"]["memory"]), OPERATIONS)
+        self.assertTrue(all(r["n"] == 3 for r in document["results"]["memory"].values()))
+        self.assertEqual(compare(document, document, 0.0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
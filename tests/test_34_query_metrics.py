@@ -0,0 +1,115 @@
+"""
+Prueba unitaria para verificar la instrumentación de consultas: conteo por
+método y por sentencia, filas leídas, consultas lentas con su plan,
+detección de N+1 y la acción get_query_metrics del Api.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.instrumentation import QueryMetrics, fingerprint, query_metrics, traced
+from src.models.models import Base, Usuario
+from src.views.ui import Api
+
+
+class TestQueryMetrics(unittest.TestCase):
+    """
+    Prueba QueryMetrics sobre una base de datos SQLite en memoria.
+    """
+
+    def setUp(self):
+        """
+        Configura la base de datos, instala las métricas y crea un usuario con tres tareas.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.metrics = QueryMetrics(slow_ms=0, n_plus_one_threshold=5, log=False).install(self.engine)
+        query_metrics.install(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.controller.repository.db = self.session
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        for i in range(3):
+            self.controller.create_task(f"Tarea {i}", "", datetime(2025, 4, 1), datetime(2025, 4, 10), "high")
+        self.metrics.reset()
+        query_metrics.reset()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_counts_by_caller_and_rows(self):
+        """
+        Las sentencias se atribuyen al método del repositorio y cuentan las filas leídas.
+        """
+        self.assertEqual(len(self.controller.get_tasks()), 3)
+        snapshot = self.metrics.snapshot()
+        by_caller = snapshot["by_caller"]
+        self.assertIn("Repository.get_tasks_by_user", by_caller)
+        self.assertEqual(by_caller["Repository.get_tasks_by_user"]["rows"], 3)
+        self.assertGreaterEqual(snapshot["statements"], 1)
+        top = snapshot["top_statements"][0]
+        self.assertIn("Repository.get_tasks_by_user", top["callers"])
+        self.assertNotIn("(sin etiqueta)", by_caller)
+
+    def test_slow_queries_keep_plan(self):
+        """
+        Con umbral 0 toda sentencia es lenta y se guarda con su EXPLAIN QUERY PLAN.
+        """
+        self.controller.get_tasks()
+        slow = [entry for entry in self.metrics.snapshot()["slow_queries"]
+                if entry["caller"] == "Repository.get_tasks_by_user"]
+        self.assertTrue(slow)
+        self.assertEqual(slow[0]["scope"], "TaskController.get_tasks")
+        self.assertEqual(slow[0]["rows"], 3)
+        self.assertTrue(any("tareas" in line for line in slow[0]["plan"]))
+
+    def test_n_plus_one(self):
+        """
+        La misma sentencia repetida en una llamada de primer nivel se marca como N+1.
+        """
+        @traced("Prueba.por_usuario")
+        def load_one_by_one():
+            for _ in range(6):
+                self.session.execute(select(Usuario).where(Usuario.email == "ana@example.com")).scalar_one()
+
+        load_one_by_one()
+        n_plus_one = self.metrics.snapshot()["n_plus_one"]
+        self.assertEqual(len(n_plus_one), 1)
+        self.assertEqual((n_plus_one[0]["scope"], n_plus_one[0]["executions"]), ("Prueba.por_usuario", 6))
+
+        self.metrics.reset()
+        for _ in range(6):
+            load_one_by_one.__wrapped__()
+        self.assertEqual(self.metrics.snapshot()["n_plus_one"], [])
+
+    def test_fingerprint_collapses_in_lists(self):
+        """
+        Las listas IN de distinto largo comparten la misma forma.
+        """
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (?, ?)"),
+                         fingerprint("SELECT *\n  FROM t WHERE id IN (?,?,?,?)"))
+
+    def test_api_action_and_reset(self):
+        """
+        get_query_metrics devuelve el snapshot y con reset empieza de cero.
+        """
+        self.api.get_item('get_tasks', {})
+        response = self.api.get_item('get_query_metrics', {"reset": True})
+        self.assertTrue(response["success"])
+        self.assertEqual(response["metrics"]["by_caller"]["Repository.query_tasks"]["rows"], 3)
+        self.assertEqual(query_metrics.snapshot()["statements"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
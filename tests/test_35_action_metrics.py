@@ -0,0 +1,157 @@
+"""
+Prueba unitaria para verificar el despacho de acciones del Api por registro:
+histogramas de latencia, tamaños, errores, trazas con spans y exportación
+en JSON y formato Prometheus.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.instrumentation import query_metrics
+from src.models.models import Base
+from src.views.action_metrics import LATENCY_BUCKETS, UNKNOWN_ACTION, ActionMetrics, action_metrics, payload_size
+from src.views.ui import ACTIONS, Api
+
+
+class TestActionMetrics(unittest.TestCase):
+    """
+    Prueba ActionMetrics y su uso desde Api.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con un usuario autenticado y dos tareas.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        query_metrics.install(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.controller.repository.db = self.session
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        for i in range(2):
+            self.controller.create_task(f"Tarea {i}", "", datetime(2025, 4, 1), datetime(2025, 4, 10), "high")
+        action_metrics.reset()
+
+    def tearDown(self):
+        action_metrics.tracing = False
+        action_metrics.reset()
+        self.session.close()
+        self.engine.dispose()
+
+    def test_registry_covers_every_method(self):
+        """
+        Cada método público del Api tiene sus acciones registradas; las desconocidas comparten etiqueta.
+        """
+        methods = {method for method, _ in ACTIONS}
+        self.assertEqual(methods, {'get_item', 'add_item', 'update_item', 'remove_item', 'toggle_item', 'batch'})
+        self.assertIn(('toggle_item', 'complete_task'), ACTIONS)
+
+        self.assertEqual(self.api.get_item('no_existe', {}), {"success": False, "message": "Acción desconocida"})
+        self.assertEqual(self.api.add_item(['no', 'hashable'], {})["message"], "Acción desconocida")
+        actions = action_metrics.snapshot()["actions"]
+        self.assertEqual(actions[f"get_item:{UNKNOWN_ACTION}"]["failures"], 1)
+        self.assertIn(f"add_item:{UNKNOWN_ACTION}", actions)
+
+    def test_latency_sizes_and_failures(self):
+        """
+        Cada llamada suma al histograma, a los bytes de entrada y salida y a los fallos.
+        """
+        self.api.payload_sizes = True
+        for _ in range(3):
+            response = self.api.get_item('get_tasks', {})
+        self.api.get_item('get_task', {"task_id": 999})
+        actions = action_metrics.snapshot()["actions"]
+
+        tasks = actions["get_item:get_tasks"]
+        self.assertEqual((tasks["count"], tasks["errors"], tasks["failures"]), (3, 0, 0))
+        self.assertEqual(sum(tasks["buckets"].values()), 3)
+        self.assertEqual(tasks["bytes_out"], 3 * payload_size(response))
+        self.assertEqual(tasks["bytes_in"], 3 * payload_size({}))
+        self.assertLessEqual(tasks["p50_ms"], tasks["max_ms"])
+        self.assertEqual(actions["get_item:get_task"]["failures"], 1)
+
+        # Por defecto no se vuelve a serializar para medir
+        self.api.payload_sizes = None
+        action_metrics.reset()
+        self.api.get_item('get_tasks', {})
+        tasks = action_metrics.snapshot()["actions"]["get_item:get_tasks"]
+        self.assertEqual((tasks["count"], tasks["bytes_out"]), (1, 0))
+
+    def test_reset_changes_are_measured_once(self):
+        """
+        Un get_task_changes que responde con la lista completa no suma una llamada a get_tasks.
+        """
+        response = self.api.get_item('get_task_changes', {"since_revision": 0, "epoch": "otro"})
+        self.assertTrue(response["reset"])
+        self.assertEqual(len(response["tasks"]), 2)
+        actions = action_metrics.snapshot()["actions"]
+        self.assertEqual(actions["get_item:get_task_changes"]["count"], 1)
+        self.assertNotIn("get_item:get_tasks", actions)
+
+    def test_errors_are_counted_and_raised(self):
+        """
+        Una excepción del controlador se cuenta como error y se propaga igual que antes.
+        """
+        with mock.patch.object(self.controller, "get_stats", side_effect=RuntimeError("fallo")):
+            with self.assertRaises(RuntimeError):
+                self.api.get_item('get_stats', {})
+        stats = action_metrics.snapshot()["actions"]["get_item:get_stats"]
+        self.assertEqual((stats["count"], stats["errors"], stats["bytes_out"]), (1, 1, 0))
+
+    def test_tracing_records_controller_repository_and_sql_spans(self):
+        """
+        Con trazas activas, la llamada queda con spans anidados hasta las sentencias SQL.
+        """
+        action_metrics.tracing = True
+        self.api.get_item('get_tasks', {})
+        response = self.api.get_item('get_action_metrics', {})
+        trace = response["metrics"]["traces"][-1]
+        self.assertEqual(trace["name"], "get_item:get_tasks")
+        spans = {span["name"]: span for span in trace["spans"]}
+        self.assertEqual(spans["TaskController.get_user_tasks"]["depth"], 0)
+        self.assertEqual(spans["TaskController.get_tasks"]["depth"], 1)
+        query = spans["Repository.query_tasks"]
+        sql = [span for span in trace["spans"] if span["name"].startswith("SELECT")]
+        self.assertEqual(len(sql), 1)
+        self.assertEqual((sql[0]["depth"], sql[0]["rows"]), (query["depth"] + 1, 2))
+        self.assertGreaterEqual(sql[0]["start_ms"], query["start_ms"])
+
+        self.assertNotIn("traces", self.api.get_item('get_action_metrics', {"traces": False})["metrics"])
+
+    def test_prometheus_export(self):
+        """
+        El texto de Prometheus tiene cubetas acumuladas, suma, conteo, errores y tamaños.
+        """
+        metrics = ActionMetrics(measure_payloads=False)
+        for seconds in (0.0005, 0.003, 20.0):
+            with mock.patch("src.views.action_metrics.time.perf_counter", side_effect=[0.0, seconds]):
+                metrics.call("get_item", "get_tasks", lambda: {"success": True})
+        metrics.record_payload("get_item", "get_tasks", 10, 200)
+        lines = metrics.to_prometheus().splitlines()
+        labels = 'method="get_item",action="get_tasks"'
+        self.assertIn(f'todo_action_duration_seconds_bucket{{{labels},le="0.001"}} 1', lines)
+        self.assertIn(f'todo_action_duration_seconds_bucket{{{labels},le="{LATENCY_BUCKETS[-1]}"}} 2', lines)
+        self.assertIn(f'todo_action_duration_seconds_bucket{{{labels},le="+Inf"}} 3', lines)
+        self.assertIn(f'todo_action_duration_seconds_count{{{labels}}} 3', lines)
+        self.assertIn(f'todo_action_errors_total{{{labels}}} 0', lines)
+        self.assertIn(f'todo_action_response_bytes_sum{{{labels}}} 200', lines)
+
+        response = self.api.get_item('get_action_metrics', {"format": "prometheus", "reset": True})
+        self.assertIn("# TYPE todo_action_duration_seconds histogram", response["text"])
+        self.assertEqual(action_metrics.snapshot()["actions"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+"""
+Prueba unitaria para verificar la caché de listas de tareas y eventos:
+aciertos y fallos, invalidación por escritura, desalojo LRU por filas y
+detección de escrituras de otras conexiones al mismo archivo SQLite.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Agrega el directorio raíz del proyecto al path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.list_cache import EVENTS, TASKS, VERSIONS_TABLE, ListCache
+from src.database.migrations import run_migrations
+from src.models.models import Base
+from src.views.ui import Api
+
+
+class TestListCache(unittest.TestCase):
+    """
+    Prueba ListCache sola y a través de Api.
+    """
+
+    def setUp(self):
+        """
+        Configura una base de datos SQLite en memoria con un usuario autenticado y dos tareas.
+        """
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.controller.repository.db = self.session
+        self.controller.register_user("ana", "ana@example.com", "password123")
+        self.controller.login("ana@example.com", "password123")
+        for i in range(2):
+            self.controller.create_task(f"Tarea {i}", "", datetime(2025, 4, 1), datetime(2025, 4, 10), "high")
+        self.cache = self.controller.list_cache
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _titles(self):
+        return sorted(task["name"] for task in self.api.get_item('get_tasks', {})["tasks"])
+
+    def test_hits_and_misses(self):
+        """
+        La segunda lectura sale de la caché sin consultar; cada formato es una entrada aparte.
+        """
+        first = self.api.get_item('get_tasks', {})["tasks"]
+        with mock.patch.object(self.controller, "get_user_tasks", side_effect=AssertionError):
+            second = self.api.get_item('get_tasks', {})["tasks"]
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        columnar = self.api.get_item('get_tasks', {"format": "columnar"})["tasks"]
+        self.assertEqual(len(columnar["id"]), 2)
+        self.assertEqual((self.cache.size, self.cache.rows), (2, 4))
+        self.assertEqual(self.api.get_item('get_metrics', {})["metrics"]["list_cache"]["misses"], 2)
+
+    def test_writes_invalidate_after_commit(self):
+        """
+        Crear, editar y eliminar tareas o eventos descarta solo la lista afectada.
+        """
+        self.assertEqual(self._titles(), ["Tarea 0", "Tarea 1"])
+        self.assertEqual(self.api.get_item('get_events', {})["events"], [])
+
+        task = self.controller.create_task_returning("Tarea 2", "", datetime(2025, 4, 1), datetime(2025, 4, 10), "high")[2]
+        self.assertEqual(self._titles(), ["Tarea 0", "Tarea 1", "Tarea 2"])
+        self.controller.update_task(task.idTarea, "Editada", "", datetime(2025, 4, 1), datetime(2025, 4, 10), "high", "todo")
+        self.assertEqual(self._titles(), ["Editada", "Tarea 0", "Tarea 1"])
+        self.controller.delete_task(task.idTarea)
+        self.assertEqual(self._titles(), ["Tarea 0", "Tarea 1"])
+
+        hits = self.cache.hits
+        self.controller.create_event("Reunión", "", date(2025, 4, 2), None, "high")
+        self.assertEqual([e["title"] for e in self.api.get_item('get_events', {})["events"]], ["Reunión"])
+        self._titles()
+        self.assertEqual(self.cache.hits, hits + 1)
+
+    def test_rollback_keeps_entries(self):
+        """
+        Una escritura que no se confirma no descarta nada.
+        """
+        self._titles()
+        invalidations = self.cache.invalidations
+        self.controller.repository._lists_changed(self.controller.get_current_user_id(), TASKS)
+        self.session.rollback()
+        self.session.commit()
+        self._titles()
+        self.assertEqual(self.cache.invalidations, invalidations)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_lru_eviction_by_rows(self):
+        """
+        Al pasar el límite de filas se descartan las listas menos usadas.
+        """
+        cache = ListCache(max_rows=5)
+        cache.get(1, TASKS, None, lambda: [1, 2])
+        cache.get(2, TASKS, None, lambda: [1, 2])
+        cache.get(1, TASKS, None, lambda: [])
+        cache.get(3, TASKS, None, lambda: [1, 2])
+        self.assertEqual((cache.evictions, cache.rows, cache.size), (1, 4, 2))
+        self.assertEqual(cache.get(1, TASKS, None, lambda: "cargada"), [1, 2])
+        self.assertEqual(cache.get(2, TASKS, None, lambda: "cargada"), "cargada")
+
+        self.assertEqual(cache.get(4, TASKS, None, lambda: list(range(6))), list(range(6)))
+        self.assertEqual(cache.get(4, TASKS, None, lambda: "cargada"), "cargada")
+
+    def test_invalidation_during_load_is_not_stored(self):
+        """
+        Si la lista cambia mientras se carga, el resultado se devuelve pero no se guarda.
+        """
+        cache = ListCache()
+
+        def load():
+            cache.invalidate(1, TASKS)
+            return ["vieja"]
+
+        self.assertEqual(cache.get(1, TASKS, None, load), ["vieja"])
+        self.assertEqual(cache.size, 0)
+        cache.get(1, EVENTS, None, lambda: ["evento"])
+        cache.invalidate(1, TASKS)
+        self.assertEqual(cache.get(1, EVENTS, None, lambda: []), ["evento"])
+
+
+class TestListCacheSharedFile(unittest.TestCase):
+    """
+    Prueba que las escrituras de otra conexión al mismo archivo invalidan la caché.
+    """
+
+    def setUp(self):
+        """
+        Crea una base de datos en archivo, migrada, con dos usuarios y una tarea cada uno.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "todo.db")
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        Base.metadata.create_all(self.engine)
+        run_migrations(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.api = Api()
+        self.controller = self.api.controller
+        self.controller.repository.db = self.session
+        for name in ("ana", "luis"):
+            self.controller.register_user(name, f"{name}@example.com", "password123")
+            self.controller.login(f"{name}@example.com", "password123")
+            self.controller.create_task(f"Tarea de {name}", "", datetime(2025, 4, 1), datetime(2025, 4, 10), "high")
+        self.luis = self.controller.get_current_user_id()
+        self.controller.login("ana@example.com", "password123")
+        self.ana = self.controller.get_current_user_id()
+        self.cache = self.controller.list_cache
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _other_process(self, sql, *params):
+        connection = sqlite3.connect(self.path)
+        with connection:
+            connection.execute(sql, params)
+        connection.close()
+
+    def test_external_write_invalidates_only_its_user(self):
+        """
+        Una escritura externa invalida la lista de su usuario; la de los demás se revalida y sigue valiendo.
+        """
+        tasks = self.api.get_item('get_tasks', {})["tasks"]
+        self.assertEqual([t["name"] for t in tasks], ["Tarea de ana"])
+
+        self._other_process("UPDATE tareas SET titulo = ? WHERE \"idUsuario\" = ?", "Cambiada", self.luis)
+        self.assertIs(self.api.get_item('get_tasks', {})["tasks"], tasks)
+
+        self._other_process("UPDATE tareas SET titulo = ? WHERE \"idUsuario\" = ?", "Externa", self.ana)
+        self.assertEqual([t["name"] for t in self.api.get_item('get_tasks', {})["tasks"]], ["Externa"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_no_session_left_open_per_thread(self):
+        """
+        Leer la lista desde otro hilo (como el puente de pywebview) no deja una conexión tomada.
+        """
+        self.session.close()
+        repository = self.controller.repository
+        repository.db = None
+        repository.session_factory = sessionmaker(bind=self.engine)
+        for _ in range(3):
+            thread = threading.Thread(target=self.api.get_item, args=('get_tasks', {}))
+            thread.start()
+            thread.join()
+            self.assertEqual(self.engine.pool.checkedout(), 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_versions_follow_triggers(self):
+        """
+        Los triggers suben la versión de la lista del usuario al insertar, editar y borrar.
+        """
+        connection = sqlite3.connect(self.path)
+        version = lambda: connection.execute(
+            f'SELECT {TASKS}, {EVENTS} FROM {VERSIONS_TABLE} WHERE "idUsuario" = ?', (self.ana,)).fetchone()
+        before = version()
+        self._other_process("DELETE FROM tareas WHERE \"idUsuario\" = ?", self.ana)
+        self.assertEqual(version(), (before[0] + 1, before[1]))
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()